@@ -35,6 +35,8 @@ from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 import mediapipe as mp
 
+logger = logging.getLogger(__name__)
+
 class MobileNetFaceRecognitionSystem:
     def __init__(self):
         print("Loading MobileNetV2 model...")
@@ -98,7 +100,7 @@ class MobileNetFaceRecognitionSystem:
             return features.flatten()
             
         except Exception as e:
-            print(f"Error extracting features: {e}")
+            logger.warning("Error extracting features: %s", e)
             return None
     
     def detect_faces(self, image):
@@ -326,11 +328,10 @@ class MobileNetFaceRecognitionSystem:
             second_prob = sorted_probs[1] if len(sorted_probs) > 1 else 0
             confidence_gap = max_probability - second_prob
             
-            print(f"Debug: RAW Unknown={raw_predictions[unknown_idx]:.3f} → CALIBRATED={predictions[unknown_idx]:.3f}")
-            print(f"Debug: max confidence {max_probability:.3f}, 2nd: {second_prob:.3f}, gap: {confidence_gap:.3f}")
-            
             predicted_label = self.label_encoder.inverse_transform([max_prob_index])[0]  # type: ignore
-            print(f"Debug: Predicted class: {predicted_label}")
+            logger.debug("RAW Unknown=%.3f → CALIBRATED=%.3f, max confidence %.3f, 2nd: %.3f, gap: %.3f, predicted: %s",
+                         raw_predictions[unknown_idx], predictions[unknown_idx],
+                         max_probability, second_prob, confidence_gap, predicted_label)
             
             # Improved criteria for stable recognition:
             # For authorized persons (not Unknown): need higher confidence
@@ -342,22 +343,23 @@ class MobileNetFaceRecognitionSystem:
                 if max_probability >= 0.85 or confidence_gap >= 0.60:
                     face_names.append("Unknown")
                     verification_results.append(False)  # Not authorized
-                    print(f"🚨 UNAUTHORIZED: Unknown (conf: {max_probability:.3f}, gap: {confidence_gap:.3f})")
+                    logger.debug("🚨 UNAUTHORIZED: Unknown (conf: %.3f, gap: %.3f)", max_probability, confidence_gap)
                 else:
                     # Confidence too low for Unknown - reject as Unknown
                     face_names.append("Unknown")
                     verification_results.append(False)
-                    print(f"🚨 REJECTED as Unknown: Low confidence")
+                    logger.debug("🚨 REJECTED as Unknown: Low confidence")
             else:
                 # Authorized person detection: More lenient thresholds
                 # Accept if confidence >= 50% AND gap >= 15%
                 if max_probability >= 0.50 and confidence_gap >= 0.15:
                     face_names.append(predicted_label)
                     verification_results.append(True)
-                    print(f"✅ AUTHORIZED: {predicted_label} (conf: {max_probability:.3f}, gap: {confidence_gap:.3f})")
+                    logger.debug("✅ AUTHORIZED: %s (conf: %.3f, gap: %.3f)", predicted_label, max_probability, confidence_gap)
                 else:
                     # Confidence too low - mark as Unknown
-                    print(f"🚨 REJECTED: {predicted_label} - confidence {max_probability:.3f} or gap {confidence_gap:.3f} too low")
+                    logger.debug("🚨 REJECTED: %s - confidence %.3f or gap %.3f too low",
+                                 predicted_label, max_probability, confidence_gap)
                     face_names.append("Unknown")
                     verification_results.append(False)
         
@@ -0,0 +1,166 @@
+"""
+Alert Digest
+Coalesces alert emails raised within a time window into a single digest
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional
+import logging
+
+from app.services.alert_writer import SEVERITY_PRIORITY
+
+logger = logging.getLogger(__name__)
+
+# Alert fields copied into a digest entry (the digest is stored in the email outbox as JSON)
+DIGEST_FIELDS = ('type', 'severity', 'camera_id', 'location', 'description', 'confidence', 'image_path')
+
+
+class AlertDigest:
+    """
+    Buffers alerts and hands them to `flush_callback` as one digest per window
+
+    The window opens with the first buffered alert and the digest is flushed
+    when it closes. Repeated alerts of the same type from the same camera are
+    merged into one entry with a count, keeping the latest snapshot. Entries
+    are ordered most severe first. Alert types listed in `immediate_types`
+    (e.g. weapon_detected) are not meant to be buffered: callers check
+    is_immediate() and send them right away.
+    """
+
+    def __init__(self, window: float, flush_callback: Callable[[Dict], None],
+                 immediate_types: Iterable[str] = ('weapon_detected',)):
+        """
+        Initialize digest
+
+        Args:
+            window: Seconds alerts are collected before the digest is sent
+            flush_callback: Called with the digest dictionary (type 'digest')
+            immediate_types: Alert types that bypass the digest
+        """
+        self.window = window
+        self.flush_callback = flush_callback
+        self.immediate_types = set(immediate_types)
+
+        self._entries: Dict[tuple, Dict] = {}  # (camera_id, type) -> entry
+        self._total = 0
+        self._deadline: Optional[float] = None  # monotonic time the open window closes
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.digests_sent = 0
+        self.alerts_coalesced = 0
+
+    def start(self):
+        """Start the flush thread"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name="AlertDigest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flush thread and send whatever is buffered"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def is_immediate(self, alert_data: Dict) -> bool:
+        return alert_data.get('type') in self.immediate_types
+
+    def add(self, alert_data: Dict):
+        """Buffer an alert for the current digest window"""
+        key = (alert_data.get('camera_id', 'unknown'), alert_data.get('type'))
+        timestamp = alert_data.get('timestamp') or datetime.now().isoformat()
+
+        with self._condition:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {field: alert_data.get(field) for field in DIGEST_FIELDS}
+                entry.update(count=0, first_seen=timestamp)
+                self._entries[key] = entry
+            elif alert_data.get('image_path'):
+                entry['image_path'] = alert_data['image_path']
+                entry['description'] = alert_data.get('description', entry['description'])
+
+            entry['count'] += 1
+            entry['last_seen'] = timestamp
+            self._total += 1
+
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+                self._condition.notify()
+
+    @property
+    def pending(self) -> int:
+        return self._total
+
+    def _take(self) -> Optional[Dict]:
+        """Remove buffered entries and build the digest (caller holds the lock)"""
+        if not self._entries:
+            self._deadline = None
+            return None
+
+        entries = sorted(self._entries.values(),
+                         key=lambda e: (SEVERITY_PRIORITY.get(e['severity'], SEVERITY_PRIORITY['medium']),
+                                        e['first_seen']))
+        digest = {
+            'type': 'digest',
+            'severity': entries[0]['severity'],
+            'timestamp': datetime.now().isoformat(),
+            'window_seconds': self.window,
+            'total_alerts': self._total,
+            'cameras': sorted({str(e['camera_id']) for e in entries}),
+            'alerts': entries
+        }
+
+        self._entries = {}
+        self._total = 0
+        self._deadline = None
+        return digest
+
+    def flush(self) -> Optional[Dict]:
+        """Send the buffered alerts now"""
+        with self._condition:
+            digest = self._take()
+        if digest is None:
+            return None
+
+        self.digests_sent += 1
+        self.alerts_coalesced += digest['total_alerts']
+        logger.info("Sending digest of %d alerts (%d entries) from %d cameras",
+                    digest['total_alerts'], len(digest['alerts']), len(digest['cameras']))
+        try:
+            self.flush_callback(digest)
+        except Exception as e:
+            logger.error("Digest delivery failed: %s", e)
+        return digest
+
+    def _run(self):
+        """Flush thread: send the digest when the open window closes"""
+        while True:
+            with self._condition:
+                while self._running and (self._deadline is None or self._deadline > time.monotonic()):
+                    timeout = None if self._deadline is None else self._deadline - time.monotonic()
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+            self.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            'window_seconds': self.window,
+            'pending_alerts': self.pending,
+            'digests_sent': self.digests_sent,
+            'alerts_coalesced': self.alerts_coalesced,
+            'immediate_types': sorted(self.immediate_types)
+        }
@@ -1,6 +1,10 @@
 from flask_socketio import emit
-from app.services.email_service import EmailAlertService
-import threading
+from app.services.email_service import get_email_service, get_email_delivery_stats, shutdown_email_dispatcher
+from app.services.alert_writer import AlertWriter
+from database.alert_dedup import alert_dedup_index
+from app.services.alert_digest import AlertDigest
+from app.services.snapshot_service import snapshot_service
+from app.services.settings_cache import settings_cache
 import time
 import os
 from datetime import datetime, timedelta
@@ -17,7 +21,7 @@ except ImportError:
 class AlertManager:
     def __init__(self, socketio):
         self.socketio = socketio
-        self.email_service = EmailAlertService()
+        self.email_service = get_email_service()
         self.active_alerts = {}
         self.alert_history = []
         
@@ -32,10 +36,31 @@ class AlertManager:
         else:
             self.alert_model = None
         
-        # Email cooldown settings (to prevent spam) - load from database
+        # Alerts are persisted in batches by a background writer so camera threads never wait on MongoDB
+        self.alert_writer = None
+        if self.alert_model:
+            self.alert_writer = AlertWriter(
+                self.alert_model,
+                max_queue_size=int(os.getenv('ALERT_QUEUE_SIZE', '1000')),
+                batch_size=int(os.getenv('ALERT_BATCH_SIZE', '50')),
+                max_attempts=int(os.getenv('ALERT_WRITE_ATTEMPTS', '5'))
+            )
+            self.alert_writer.start()
+        
+        # Email cooldown settings (to prevent spam) - loaded once, then pushed by the settings cache
+        settings_cache.start()
         self.email_cooldown_minutes = self._get_alert_cooldown()
-        self.last_email_sent = defaultdict(lambda: datetime.min)
-        self.last_settings_check = datetime.min
+        self.email_notifications_enabled = self._should_email_notifications_enabled()  # Kept here: the email service is shared
+        settings_cache.subscribe(self._on_alert_settings_changed, kind='settings', key='alerts')
+        self.dedup_index = alert_dedup_index  # Email cooldowns ('email' scope, keyed by alert type)
+        
+        # Digest mode: alert emails raised within the window are coalesced into one email
+        self.email_digest = None
+        digest_window = float(os.getenv('EMAIL_DIGEST_WINDOW', '0'))
+        if digest_window > 0:
+            immediate_types = [t.strip() for t in os.getenv('EMAIL_DIGEST_IMMEDIATE_TYPES', 'weapon_detected').split(',') if t.strip()]
+            self.email_digest = AlertDigest(digest_window, self._send_email_alert, immediate_types)
+            self.email_digest.start()
         
         # Alert severity mapping
         self.severity_mapping = {
@@ -51,70 +76,48 @@ class AlertManager:
         
         print(f"🚨 Alert Manager initialized with SendGrid email service")
         print(f"📧 Email cooldown: {self.email_cooldown_minutes} minutes")
+        if self.email_digest:
+            print(f"📋 Email digest: every {self.email_digest.window:.0f}s (immediate: {', '.join(sorted(self.email_digest.immediate_types))})")
         print(f"📊 Email service status: {self.email_service.get_configuration_status()}")
     
     def _get_alert_cooldown(self):
-        """Get alert cooldown from database settings"""
+        """Get alert cooldown from the cached alert settings"""
         try:
-            from database.models import settings_model
-            all_settings = settings_model.get_settings('alerts')
-            # Settings returns {'alerts': {'emailNotifications': True, ...}}
-            alert_settings = all_settings.get('alerts', {})
-            if not alert_settings:
-                # Fallback: maybe it's just the settings dict
-                alert_settings = all_settings if isinstance(all_settings, dict) else {}
-            cooldown = alert_settings.get('alertCooldown', '5')
+            cooldown = settings_cache.get('alerts').get('alertCooldown', '5')
             return int(cooldown) if cooldown else 5
-        except Exception as e:
-            print(f"⚠️ Could not load alert cooldown from settings, using default: {e}")
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ Invalid alert cooldown setting, using default: {e}")
             return int(os.getenv('ALERT_COOLDOWN_MINUTES', '5'))
     
     def _should_email_notifications_enabled(self):
-        """Check if email notifications are enabled in settings"""
-        try:
-            from database.models import settings_model
-            all_settings = settings_model.get_settings('alerts')
-            # Settings returns {'alerts': {'emailNotifications': True, ...}}
-            alert_settings = all_settings.get('alerts', {})
-            if not alert_settings:
-                # Fallback: maybe it's just the settings dict
-                alert_settings = all_settings if isinstance(all_settings, dict) else {}
-            return alert_settings.get('emailNotifications', True)
-        except Exception as e:
-            print(f"⚠️ Could not load email notification settings: {e}")
-            return True
+        """Check if email notifications are enabled in the cached alert settings"""
+        return settings_cache.get('alerts').get('emailNotifications', True)
     
-    def _reload_settings_if_needed(self):
-        """Reload settings from database every 30 seconds"""
-        if (datetime.now() - self.last_settings_check).total_seconds() > 30:
-            self.email_cooldown_minutes = self._get_alert_cooldown()
-            self.email_service.enabled = self._should_email_notifications_enabled()
-            self.last_settings_check = datetime.now()
+    def _on_alert_settings_changed(self, change):
+        """Apply alert settings pushed by the settings cache"""
+        self.email_cooldown_minutes = self._get_alert_cooldown()
+        self.email_notifications_enabled = self._should_email_notifications_enabled()
+        print(f"🔄 Alert settings updated: cooldown {self.email_cooldown_minutes} min, "
+              f"email {'enabled' if self.email_notifications_enabled else 'disabled'}")
         
     def send_alert(self, alert_data):
         """Send alert through multiple channels with smart filtering"""
-        # Reload settings from database if needed
-        self._reload_settings_if_needed()
-        
         # Enhance alert data
         alert_data['id'] = self._generate_alert_id()
         alert_data['timestamp'] = datetime.now().isoformat()
         alert_data['severity'] = self.severity_mapping.get(alert_data['type'], 'medium')
         
-        # Store alert in MongoDB
-        if self.alert_model:
-            try:
-                db_alert_id = self.alert_model.create_alert(
-                    camera_id=alert_data.get('camera_id', 'unknown'),
-                    alert_type=alert_data['type'],
-                    message=alert_data.get('description', ''),
-                    severity=alert_data['severity'],
-                    image_path=alert_data.get('image_path')
-                )
-                alert_data['db_id'] = db_alert_id
-                print(f"💾 Alert saved to database: {db_alert_id}")
-            except Exception as e:
-                print(f"⚠️ Failed to save alert to database: {e}")
+        # Queue alert for MongoDB (written in batches by the background writer, which sets 'db_id').
+        # Recent duplicates are known in memory, so they are not even queued.
+        if self.alert_writer:
+            stored_fields = {
+                'camera_id': alert_data.get('camera_id', 'unknown'),
+                'type': alert_data['type'],
+                'message': alert_data.get('description', ''),
+                'severity': alert_data['severity']
+            }
+            if not self.dedup_index.is_active(stored_fields):
+                self.alert_writer.enqueue(alert_data)
         
         # Store alert in memory
         self.active_alerts[alert_data['id']] = alert_data
@@ -131,17 +134,18 @@ class AlertManager:
         # Determine if email should be sent
         should_send_email = self._should_send_email(alert_data)
         
+        digested = False
         if should_send_email:
-            # Send email notification in background
-            email_thread = threading.Thread(
-                target=self._send_email_alert, 
-                args=(alert_data,)
-            )
-            email_thread.daemon = True
-            email_thread.start()
+            if self.email_digest and not self.email_digest.is_immediate(alert_data):
+                # Sent with the other alerts of this window
+                self.email_digest.add(alert_data)
+                digested = True
+            else:
+                # Queue email notification in the outbox (delivered by the email dispatcher workers)
+                self._send_email_alert(alert_data)
             
-            # Update last email sent time
-            self.last_email_sent[alert_data['type']] = datetime.now()
+            # Start email cooldown for this alert type
+            self.dedup_index.mark(alert_data, self.email_cooldown_minutes * 60, scope='email', fields=('type',))
         
         # Log alert
         severity_icons = {
@@ -153,39 +157,39 @@ class AlertManager:
         icon = severity_icons.get(alert_data['severity'], '⚪')
         
         print(f"{icon} Alert [{alert_data['severity'].upper()}]: {alert_data['type']} at {alert_data.get('location', 'Unknown')} "
-              f"(Email: {'✅' if should_send_email else '❌ Cooldown'})")
+              f"(Email: {'📋 Digest' if digested else '✅' if should_send_email else '❌ Cooldown'})")
         
         return alert_data['id']
     
     def _should_send_email(self, alert_data):
         """Determine if email should be sent based on severity and cooldown"""
         # Check if email alerts are enabled
-        if not self.email_service.enabled:
+        if not self.email_service.enabled or not self.email_notifications_enabled:
             return False
             
         # Always send critical alerts
         if alert_data['severity'] == 'critical':
             return True
+        
+        # In digest mode the window limits the email rate instead of the per-type cooldown
+        if self.email_digest:
+            return alert_data['severity'] in ['high', 'medium']
             
         # Check cooldown for other alert types
-        alert_type = alert_data['type']
-        last_sent = self.last_email_sent[alert_type]
-        cooldown_period = timedelta(minutes=self.email_cooldown_minutes)
-        
-        if datetime.now() - last_sent > cooldown_period:
+        if not self.dedup_index.is_active(alert_data, scope='email', fields=('type',)):
             # Send high/medium severity alerts after cooldown
             return alert_data['severity'] in ['high', 'medium']
         
         return False
     
     def _send_email_alert(self, alert_data):
-        """Send email alert with error handling"""
+        """Queue email alert with error handling"""
         try:
-            success = self.email_service.send_alert(alert_data)
+            success = self.email_service.send_alert(alert_data, wait=False)
             if success:
-                print(f"📧 Email alert sent successfully for {alert_data['type']}")
+                print(f"📧 Email alert queued for {alert_data['type']}")
             else:
-                print(f"❌ Failed to send email alert for {alert_data['type']}")
+                print(f"❌ Failed to queue email alert for {alert_data['type']}")
         except Exception as e:
             print(f"❌ Error sending email alert: {e}")
     
@@ -222,7 +226,7 @@ class AlertManager:
         if details:
             alert_data['details'] = details
         
-        if image_path and os.path.exists(image_path):
+        if image_path and snapshot_service.is_known(image_path):
             alert_data['image_path'] = image_path
             
         return self.send_alert(alert_data)
@@ -238,7 +242,7 @@ class AlertManager:
             'weapon_type': weapon_type
         }
         
-        if image_path and os.path.exists(image_path):
+        if image_path and snapshot_service.is_known(image_path):
             alert_data['image_path'] = image_path
             
         return self.send_alert(alert_data)
@@ -254,7 +258,7 @@ class AlertManager:
             'person_name': person_name
         }
         
-        if image_path and os.path.exists(image_path):
+        if image_path and snapshot_service.is_known(image_path):
             alert_data['image_path'] = image_path
             
         return self.send_alert(alert_data)
@@ -284,7 +288,10 @@ class AlertManager:
                 'total_alerts': 0,
                 'alerts_by_type': {},
                 'alerts_by_severity': {},
-                'recent_alerts': []
+                'recent_alerts': [],
+                'persistence': self.alert_writer.get_stats() if self.alert_writer else None,
+                'email_delivery': get_email_delivery_stats(),
+                'email_digest': self.email_digest.get_stats() if self.email_digest else None
             }
         
         # Count by type and severity
@@ -300,9 +307,21 @@ class AlertManager:
             'alerts_by_type': dict(alerts_by_type),
             'alerts_by_severity': dict(alerts_by_severity),
             'recent_alerts': self.alert_history[-10:],  # Last 10 alerts
-            'email_service_status': self.email_service.get_configuration_status()
+            'email_service_status': self.email_service.get_configuration_status(),
+            'persistence': self.alert_writer.get_stats() if self.alert_writer else None,
+            'email_delivery': get_email_delivery_stats(),
+            'email_digest': self.email_digest.get_stats() if self.email_digest else None
         }
     
+    def shutdown(self, timeout=5.0):
+        """Flush queued alerts to the database, send the pending digest, stop the email workers and save cooldowns"""
+        if self.alert_writer:
+            self.alert_writer.stop(timeout)
+        if self.email_digest:
+            self.email_digest.stop(timeout)
+        shutdown_email_dispatcher(timeout)
+        self.dedup_index.save_snapshot()
+    
     def _generate_alert_id(self):
         """Generate unique alert ID"""
         return f"ALERT_{int(time.time() * 1000)}"
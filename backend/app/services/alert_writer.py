@@ -0,0 +1,244 @@
+"""
+Alert Writer
+Background, batched persistence of alerts so camera threads only enqueue
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower value = written first
+SEVERITY_PRIORITY = {
+    'critical': 0,
+    'high': 1,
+    'medium': 2,
+    'low': 3
+}
+
+class AlertWriter:
+    """
+    Bounded priority queue of alerts drained by a background writer thread
+
+    The writer takes up to `batch_size` alerts at a time, most severe first,
+    and stores them with a single AlertModel.create_alerts() call. When the
+    queue is full a new alert replaces the least severe queued alert if it
+    outranks it; otherwise it is dropped. Neither case blocks the caller.
+
+    A batch that fails to write is requeued at its original priority and
+    retried after an exponential backoff; alerts are only given up on (and
+    counted as failed) after `max_attempts` writes.
+    """
+
+    def __init__(self, alert_model, max_queue_size: int = 1000, batch_size: int = 50,
+                 flush_interval: float = 0.5, max_attempts: int = 5, retry_delay: float = 1.0):
+        """
+        Initialize alert writer
+
+        Args:
+            alert_model: AlertModel (or anything with create_alerts(list) -> list of IDs
+                         that raises when the write fails)
+            max_queue_size: Maximum number of queued alerts
+            batch_size: Maximum alerts per database write
+            flush_interval: Seconds to wait for more alerts before writing a partial batch
+            max_attempts: Writes tried per alert before it is dropped
+            retry_delay: Seconds before the first retry (doubled on every further failure)
+        """
+        self.alert_model = alert_model
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        # heap of (priority, sequence, enqueue monotonic time, raised_at UTC, alert_data, failed attempts)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.last_write_ms = 0.0
+        self.avg_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.avg_queue_wait_ms = 0.0
+
+    def start(self):
+        """Start the background writer thread"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name="AlertWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the writer after flushing queued alerts"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def enqueue(self, alert_data: dict) -> bool:
+        """
+        Queue an alert for persistence (never blocks on the database)
+
+        The writer sets alert_data['db_id'] once the alert is stored.
+
+        Args:
+            alert_data: Alert dictionary from AlertManager.send_alert
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        priority = SEVERITY_PRIORITY.get(alert_data.get('severity'), SEVERITY_PRIORITY['medium'])
+        entry = (priority, next(self._sequence), time.monotonic(), datetime.utcnow(), alert_data, 0)
+
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                # Make room by dropping the least severe, newest alert if the new one outranks it
+                worst = max(self._queue)
+                if worst[0] <= priority:
+                    self.dropped += 1
+                    logger.warning("Alert queue full, dropped %s alert from %s",
+                                   alert_data.get('type'), alert_data.get('camera_id'))
+                    return False
+
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                self.dropped += 1
+                logger.warning("Alert queue full, dropped queued %s alert", worst[4].get('type'))
+
+            heapq.heappush(self._queue, entry)
+            self.enqueued += 1
+            self._condition.notify()
+
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _next_batch(self):
+        """Wait for alerts and pop up to batch_size of them (most severe first)"""
+        with self._condition:
+            while self._running and not self._queue:
+                self._condition.wait()
+
+            # Give a partial batch a short chance to fill up
+            deadline = time.monotonic() + self.flush_interval
+            while self._running and len(self._queue) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            count = min(self.batch_size, len(self._queue))
+            return [heapq.heappop(self._queue) for _ in range(count)]
+
+    def _run(self):
+        """Writer thread main loop"""
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if not self._running:
+                    break
+                continue
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        """Store one batch and update metrics"""
+        started = time.monotonic()
+        alerts = [entry[4] for entry in batch]
+
+        try:
+            db_ids = self.alert_model.create_alerts([
+                {
+                    'camera_id': alert.get('camera_id', 'unknown'),
+                    'type': alert['type'],
+                    'message': alert.get('description', ''),
+                    'severity': alert.get('severity', 'medium'),
+                    'image_path': alert.get('image_path'),
+                    'timestamp': entry[3]
+                }
+                for entry, alert in zip(batch, alerts)
+            ])
+        except Exception as e:
+            self._retry(batch, e)
+            return
+
+        finished = time.monotonic()
+        for alert, db_id in zip(alerts, db_ids):
+            if db_id:
+                alert['db_id'] = db_id
+
+        write_ms = (finished - started) * 1000
+        wait_ms = sum(started - entry[2] for entry in batch) * 1000 / len(batch)
+
+        self.batches += 1
+        self.written += len(alerts)
+        self.last_write_ms = write_ms
+        self.max_write_ms = max(self.max_write_ms, write_ms)
+        # Exponential moving averages
+        alpha = 0.2 if self.batches > 1 else 1.0
+        self.avg_write_ms += alpha * (write_ms - self.avg_write_ms)
+        self.avg_queue_wait_ms += alpha * (wait_ms - self.avg_queue_wait_ms)
+
+        logger.debug("Wrote %d alerts in %.1f ms (queue depth %d)", len(alerts), write_ms, self.queue_depth)
+
+    def _retry(self, batch, error: Exception):
+        """Requeue a failed batch at its original priority, dropping alerts that ran out of attempts"""
+        retry = [entry[:5] + (entry[5] + 1,) for entry in batch if entry[5] + 1 < self.max_attempts]
+        given_up = len(batch) - len(retry)
+        attempt = max(entry[5] for entry in batch) + 1
+
+        with self._condition:
+            for entry in retry:
+                heapq.heappush(self._queue, entry)  # Same sequence: back in its original place
+            self.retried += len(retry)
+            self.failed += given_up
+
+        if given_up:
+            logger.error("Failed to write %d alerts after %d attempts, dropped: %s",
+                         given_up, self.max_attempts, error)
+        if retry:
+            delay = self.retry_delay * 2 ** (attempt - 1)
+            logger.warning("Failed to write %d alerts (attempt %d/%d), retrying in %.1fs: %s",
+                           len(retry), attempt, self.max_attempts, delay, error)
+            with self._condition:
+                if self._running:  # Stopping: flush the retries without waiting
+                    self._condition.wait_for(lambda: not self._running, timeout=delay)
+
+    def get_stats(self) -> dict:
+        """Queue depth, throughput and latency metrics"""
+        return {
+            'queue_depth': self.queue_depth,
+            'max_queue_size': self.max_queue_size,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'retried': self.retried,
+            'batches': self.batches,
+            'last_write_ms': round(self.last_write_ms, 2),
+            'avg_write_ms': round(self.avg_write_ms, 2),
+            'max_write_ms': round(self.max_write_ms, 2),
+            'avg_queue_wait_ms': round(self.avg_queue_wait_ms, 2),
+            'running': self._running
+        }
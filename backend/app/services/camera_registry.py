@@ -0,0 +1,199 @@
+"""
+Camera Registry
+Thread-safe registry of the cameras under surveillance and their per-camera state
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CameraState:
+    """
+    Everything kept about one camera
+
+    Writes go through the camera's own lock; reads take no lock. Fields that
+    hold collections (stats, latest result) are replaced as a whole rather
+    than modified, so a reader holding one always sees a consistent value,
+    and the dictionaries returned must be treated as read-only.
+    """
+
+    def __init__(self, name: str, info: Union[str, Dict[str, Any]], tracker=None, analyzer=None,
+                 stats: Optional[Dict[str, Any]] = None):
+        """
+        Initialize camera state
+
+        Args:
+            name: Camera name
+            info: Camera URL, or a dict with 'url' and optionally 'ai_mode'
+            tracker: PersonTracker of the camera
+            analyzer: SuspiciousActivityAnalyzer of the camera
+            stats: Initial stats
+        """
+        self.name = name
+        self.info = info
+        self.tracker = tracker
+        self.analyzer = analyzer
+        self.lock = threading.Lock()
+
+        self.active = False
+        self.run = 0  # Incremented on every start; a camera thread stops when it no longer matches
+        self.stats: Dict[str, Any] = dict(stats or {})
+        self.latest = None  # Latest FrameResult of the AI pipeline
+        self.face_frames = 0  # Frames seen by the face recognition stage
+
+    @property
+    def url(self) -> str:
+        return self.info if isinstance(self.info, str) else self.info['url']
+
+    @property
+    def ai_mode(self) -> str:
+        return self.stats.get('ai_mode') or (
+            'both' if isinstance(self.info, str) else self.info.get('ai_mode', 'both'))
+
+    def running(self, run: int) -> bool:
+        """Whether the camera thread started as `run` should keep going"""
+        return self.active and self.run == run
+
+    def publish_latest(self, run: int, result, publish: Optional[Callable[[], Any]] = None) -> bool:
+        """
+        Make `result` the latest one, unless the camera was stopped or restarted
+
+        Args:
+            run: Run number of the calling camera thread
+            result: Processing result to store
+            publish: Called under the camera lock after storing it (e.g. to hand the
+                     frame to the live view), so a concurrent stop cannot interleave
+
+        Returns:
+            False if the thread started as `run` should stop (nothing stored)
+        """
+        with self.lock:
+            if not self.running(run):
+                return False
+            self.latest = result
+            if publish is not None:
+                publish()
+            return True
+
+    def update_stats(self, **changes) -> Dict[str, Any]:
+        """Replace the stats with a copy that has `changes` applied"""
+        with self.lock:
+            self.stats = {**self.stats, **changes}
+            return self.stats
+
+    def add_stats(self, **amounts) -> Dict[str, Any]:
+        """Add to numeric stats (copy-on-write, like update_stats)"""
+        with self.lock:
+            self.stats = {**self.stats, **{key: self.stats.get(key, 0) + amount for key, amount in amounts.items()}}
+            return self.stats
+
+
+class CameraRegistry:
+    """
+    Cameras by name, copy-on-write
+
+    Adding or removing a camera builds a new dictionary under the registry
+    lock and swaps it in, so readers (dashboard, status API) iterate a
+    snapshot that never changes size under them and never wait for camera
+    or discovery threads. Per-camera changes use the camera's own lock.
+    """
+
+    def __init__(self):
+        self._cameras: Dict[str, CameraState] = {}
+        self._lock = threading.Lock()
+        self.version = 0  # Bumped when cameras are added, removed, started or stopped
+
+    # ------------------------------------------------------------------ reads
+
+    def snapshot(self) -> Dict[str, CameraState]:
+        """All cameras at this moment (read-only; later changes swap in a new dict)"""
+        return self._cameras
+
+    def get(self, name: str) -> Optional[CameraState]:
+        return self._cameras.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._cameras)
+
+    def active(self) -> List[CameraState]:
+        """Cameras under surveillance"""
+        return [state for state in self._cameras.values() if state.active]
+
+    def active_names(self) -> List[str]:
+        return [state.name for state in self.active()]
+
+    def is_active(self, name: str) -> bool:
+        state = self._cameras.get(name)
+        return state is not None and state.active
+
+    def infos(self) -> Dict[str, Union[str, Dict[str, Any]]]:
+        """Camera name -> URL or config dict"""
+        return {name: state.info for name, state in self._cameras.items()}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cameras
+
+    def __len__(self) -> int:
+        return len(self._cameras)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cameras)
+
+    # ----------------------------------------------------------------- writes
+
+    def add(self, name: str, info: Union[str, Dict[str, Any]], **kwargs) -> CameraState:
+        """Register a camera (returns the existing state if it is already known)"""
+        with self._lock:
+            state = self._cameras.get(name)
+            if state is None:
+                state = CameraState(name, info, **kwargs)
+                self._cameras = {**self._cameras, name: state}
+                self.version += 1
+            return state
+
+    def remove(self, name: str) -> Optional[CameraState]:
+        """Unregister a camera (it is stopped first)"""
+        with self._lock:
+            if name not in self._cameras:
+                return None
+            cameras = dict(self._cameras)
+            state = cameras.pop(name)
+            self._cameras = cameras
+            self.version += 1
+        self.deactivate(state)
+        return state
+
+    def activate(self, name: str) -> Optional[int]:
+        """
+        Mark a camera as under surveillance
+
+        Returns:
+            The run number for its new camera thread, or None if the camera is
+            unknown or already active
+        """
+        state = self._cameras.get(name)
+        if state is None:
+            return None
+        with state.lock:
+            if state.active:
+                return None
+            state.active = True
+            state.run += 1
+            run = state.run
+        with self._lock:
+            self.version += 1
+        return run
+
+    def deactivate(self, state: CameraState) -> bool:
+        """Stop surveillance on a camera; False if it was not active"""
+        with state.lock:
+            if not state.active:
+                return False
+            state.active = False
+            state.latest = None
+        with self._lock:
+            self.version += 1
+        return True
@@ -0,0 +1,360 @@
+"""
+Email Dispatcher
+Long-lived SendGrid sender: one pooled HTTP session, a fixed set of worker
+threads and a durable on-disk outbox with retries
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'https://api.sendgrid.com/v3/mail/send'
+RECENT_DELIVERIES = 50  # Per-message delivery records kept for get_stats()
+
+
+class EmailDispatcher:
+    """
+    Outbox of alert emails delivered by a bounded pool of worker threads
+
+    submit() records the message in the outbox (one JSON file per message
+    when an outbox directory is set) and returns immediately. Workers render
+    the message with `build_payload` and POST it to the SendGrid v3 API over a
+    single keep-alive session. Network errors, 429 and 5xx responses are
+    retried with exponential backoff; other 4xx responses and exhausted
+    retries move the message to ``<outbox>/failed``. Messages still in the
+    outbox when the process stops are picked up again by start().
+    """
+
+    def __init__(self, api_key: str, build_payload: Callable[[Dict, List[str]], Dict],
+                 api_url: str = DEFAULT_API_URL, outbox_dir: Optional[str] = None,
+                 workers: int = 2, max_pending: int = 500, max_attempts: int = 5,
+                 backoff_base: float = 2.0, backoff_max: float = 300.0, timeout: float = 10.0):
+        """
+        Initialize dispatcher
+
+        Args:
+            api_key: SendGrid API key
+            build_payload: (alert_data, recipients) -> SendGrid mail/send JSON body
+            api_url: mail/send endpoint (point at a local stand-in for tests)
+            outbox_dir: Directory for pending messages (None keeps them in memory only)
+            workers: Number of sender threads (also the connection pool size)
+            max_pending: Maximum queued messages; further submits are rejected
+            max_attempts: Delivery attempts before a message is given up
+            backoff_base: Delay in seconds before the first retry (doubles per attempt)
+            backoff_max: Upper bound of the retry delay
+            timeout: HTTP timeout per request in seconds
+        """
+        self.build_payload = build_payload
+        self.api_url = api_url
+        self.outbox_dir = outbox_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+
+        self._jobs: Dict[str, Dict] = {}  # id -> job, queued or in flight
+        self._heap = []  # (next attempt at, sequence, id)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, threading.Event] = {}
+        self._results: Dict[str, bool] = {}
+        self._threads = []
+        self._running = False
+
+        # Metrics
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rejected = 0
+        self.last_send_ms = 0.0
+        self.avg_send_ms = 0.0
+        self.max_send_ms = 0.0
+        self.recent = deque(maxlen=RECENT_DELIVERIES)
+
+    def start(self):
+        """Load messages left in the outbox and start the workers"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._load_outbox()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"EmailDispatcher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers; undelivered messages stay in the outbox"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.session.close()
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def submit(self, alert_data: Dict, recipients: List[str]) -> Optional[str]:
+        """
+        Queue an alert email (never blocks on the network)
+
+        Args:
+            alert_data: Alert dictionary passed to build_payload
+            recipients: Email addresses
+
+        Returns:
+            Message ID, or None if the outbox is full
+        """
+        return self._enqueue(alert_data, recipients)
+
+    def send(self, alert_data: Dict, recipients: List[str], timeout: float = 30.0) -> bool:
+        """
+        Queue an alert email and wait for its delivery
+
+        A message that is still being retried when the timeout passes stays in
+        the outbox and may be delivered later.
+
+        Returns:
+            True if SendGrid accepted the message within the timeout
+        """
+        event = threading.Event()
+        message_id = self._enqueue(alert_data, recipients, event)
+        if message_id is None:
+            return False
+
+        event.wait(timeout)
+        with self._condition:
+            self._waiters.pop(message_id, None)
+            return self._results.pop(message_id, False)
+
+    def _enqueue(self, alert_data: Dict, recipients: List[str],
+                 event: Optional[threading.Event] = None) -> Optional[str]:
+        job = {
+            'id': uuid.uuid4().hex,
+            'alert': alert_data,
+            'recipients': list(recipients),
+            'attempts': 0,
+            'next_attempt': time.time(),
+            'created': time.time()
+        }
+
+        with self._condition:
+            if len(self._jobs) >= self.max_pending:
+                self.rejected += 1
+                logger.warning("Email outbox full, dropped %s alert email", alert_data.get('type'))
+                return None
+            self._jobs[job['id']] = job
+            if event is not None:
+                self._waiters[job['id']] = event
+            self.submitted += 1
+
+        self._persist(job)
+        self._schedule(job)
+        return job['id']
+
+    def _schedule(self, job: Dict):
+        with self._condition:
+            heapq.heappush(self._heap, (job['next_attempt'], next(self._sequence), job['id']))
+            self._condition.notify()
+
+    def _next_job(self) -> Optional[Dict]:
+        """Wait until a message is due (or the dispatcher stops)"""
+        with self._condition:
+            while self._running:
+                if self._heap:
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        _, _, message_id = heapq.heappop(self._heap)
+                        return self._jobs.get(message_id)
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _run(self):
+        """Worker thread main loop"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                if not self._running:
+                    break
+                continue
+            self._deliver(job)
+
+    def _deliver(self, job: Dict):
+        """Send one message and retry, finish or give it up"""
+        job['attempts'] += 1
+        started = time.monotonic()
+        status = None
+        try:
+            payload = self.build_payload(job['alert'], job['recipients'])
+        except Exception as e:
+            logger.error("Could not build email %s: %s", job['id'], e)
+            self._finish(job, False, status)
+            return
+
+        try:
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+            status = response.status_code
+            retryable = status == 429 or status >= 500
+        except requests.RequestException as e:
+            logger.warning("Email %s attempt %d failed: %s", job['id'], job['attempts'], e)
+            retryable = True
+
+        send_ms = (time.monotonic() - started) * 1000
+        with self._condition:
+            self.last_send_ms = send_ms
+            self.max_send_ms = max(self.max_send_ms, send_ms)
+            # Exponential moving average
+            alpha = 0.2 if self.sent + self.failed + self.retries else 1.0
+            self.avg_send_ms += alpha * (send_ms - self.avg_send_ms)
+
+        if status is not None and 200 <= status < 300:
+            logger.info("Email %s (%s) sent in %.0f ms after %d attempt(s)",
+                        job['id'], job['alert'].get('type'), send_ms, job['attempts'])
+            self._finish(job, True, status, send_ms)
+        elif retryable and job['attempts'] < self.max_attempts:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (job['attempts'] - 1))
+            job['next_attempt'] = time.time() + delay
+            with self._condition:
+                self.retries += 1
+            logger.warning("Email %s got status %s, retrying in %.1fs", job['id'], status, delay)
+            self._persist(job)
+            self._schedule(job)
+        else:
+            logger.error("Email %s (%s) failed with status %s after %d attempt(s)",
+                         job['id'], job['alert'].get('type'), status, job['attempts'])
+            self._finish(job, False, status, send_ms)
+
+    def _finish(self, job: Dict, success: bool, status: Optional[int], send_ms: float = 0.0):
+        """Record the outcome, clear the outbox entry and wake a waiting send()"""
+        if success:
+            self._remove(job)
+        else:
+            self._move_to_failed(job)
+
+        with self._condition:
+            if success:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self.recent.append({
+                'id': job['id'],
+                'type': job['alert'].get('type'),
+                'status': status,
+                'attempts': job['attempts'],
+                'send_ms': round(send_ms, 2),
+                'total_ms': round((time.time() - job['created']) * 1000, 2),
+                'success': success
+            })
+            self._jobs.pop(job['id'], None)
+            event = self._waiters.get(job['id'])
+            if event is not None:
+                self._results[job['id']] = success
+                event.set()
+
+    def _path(self, job: Dict, folder: str = '') -> str:
+        return os.path.join(self.outbox_dir, folder, f"{job['id']}.json")
+
+    def _persist(self, job: Dict):
+        """Write a job to the outbox (atomic replace)"""
+        if not self.outbox_dir:
+            return
+        try:
+            os.makedirs(self.outbox_dir, exist_ok=True)
+            path = self._path(job)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(job, f, default=str)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning("Could not write email %s to the outbox: %s", job['id'], e)
+
+    def _remove(self, job: Dict):
+        if not self.outbox_dir:
+            return
+        try:
+            os.remove(self._path(job))
+        except OSError:
+            pass
+
+    def _move_to_failed(self, job: Dict):
+        if not self.outbox_dir:
+            return
+        try:
+            os.makedirs(os.path.join(self.outbox_dir, 'failed'), exist_ok=True)
+            os.replace(self._path(job), self._path(job, 'failed'))
+        except OSError as e:
+            logger.warning("Could not move email %s to the failed folder: %s", job['id'], e)
+
+    def _load_outbox(self):
+        """Queue messages left over from a previous run"""
+        if not self.outbox_dir or not os.path.isdir(self.outbox_dir):
+            return
+
+        loaded = 0
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.outbox_dir, name), encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable outbox entry %s: %s", name, e)
+                continue
+
+            with self._condition:
+                if job['id'] in self._jobs:
+                    continue
+                self._jobs[job['id']] = job
+            self._schedule(job)
+            loaded += 1
+
+        if loaded:
+            logger.info("Loaded %d pending emails from %s", loaded, self.outbox_dir)
+
+    def get_stats(self) -> dict:
+        """Outbox depth, delivery counts and send latency"""
+        return {
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'last_send_ms': round(self.last_send_ms, 2),
+            'avg_send_ms': round(self.avg_send_ms, 2),
+            'max_send_ms': round(self.max_send_ms, 2),
+            'recent': list(self.recent),
+            'running': self._running
+        }
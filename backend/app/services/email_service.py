@@ -1,12 +1,18 @@
 import os
 import base64
+import cv2
+import atexit
+import threading
 from datetime import datetime
-from sendgrid import SendGridAPIClient
+from markupsafe import escape
 from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition, ContentId
 from config.settings import *
+from app.services.snapshot_service import snapshot_service, SnapshotService
+from app.services.email_dispatcher import EmailDispatcher, DEFAULT_API_URL
+from app.services.email_templates import email_template_renderer
 
 class EmailAlertService:
-    def __init__(self):
+    def __init__(self, dispatcher=None):
         # SendGrid Configuration
         self.api_key = os.getenv('SENDGRID_API_KEY', 'your_sendgrid_api_key_here')
         self.from_email = os.getenv('SENDGRID_FROM_EMAIL', 'alerts@yourdomain.com')
@@ -14,12 +20,11 @@ class EmailAlertService:
         self.recipients = os.getenv('ALERT_RECIPIENTS', 'admin@yourdomain.com').split(',')
         self.enabled = os.getenv('ENABLE_EMAIL_ALERTS', 'true').lower() == 'true'
         
-        # Initialize SendGrid client
-        try:
-            self.sg = SendGridAPIClient(api_key=self.api_key)
-        except Exception as e:
-            print(f"⚠️ SendGrid initialization failed: {e}")
-            self.sg = None
+        # Alert emails go through the shared dispatcher unless one is given
+        self.dispatcher = dispatcher
+        
+        # Digest emails attach small thumbnails instead of full snapshots
+        self.digest_max_thumbnails = int(os.getenv('EMAIL_DIGEST_MAX_THUMBNAILS', '12'))
         
         # Email templates with enhanced styling
         self.templates = {
@@ -60,458 +65,223 @@ class EmailAlertService:
                 'icon': '👥'
             }
         }
+        
+        # Compile the email body template of every alert style once
+        email_template_renderer.warm(self.templates.values())
     
-    def send_alert(self, alert_data):
-        """Send email alert using SendGrid with enhanced formatting"""
-        if not self.enabled or not self.sg:
+    @property
+    def configured(self):
+        """True if a SendGrid API key is set (emails are sent by the dispatcher)"""
+        return bool(self.api_key) and self.api_key != 'your_sendgrid_api_key_here'
+    
+    def send_alert(self, alert_data, recipients=None, wait=True, timeout=30.0):
+        """
+        Send email alert using SendGrid with enhanced formatting
+        
+        Args:
+            alert_data: Alert dictionary
+            recipients: Email addresses overriding the configured recipients
+            wait: Wait for delivery; otherwise only queue the email in the outbox
+            timeout: Seconds to wait for delivery
+        
+        Returns:
+            True if the email was sent (or queued when wait is False)
+        """
+        if not self.enabled or not self.configured:
             print("📧 Email alerts disabled or SendGrid not configured")
             return False
         
-        try:
-            # Get template based on alert type
-            template = self.templates.get(alert_data['type'], self.templates['suspicious_activity'])
-            
-            # Modify subject if escalated
-            subject = template['subject']
-            if alert_data.get('escalated'):
-                escalated_to = alert_data.get('escalated_to', 'Authorized Person')
-                subject = f"⚡ ESCALATED: {template['subject']} → {escalated_to}"
-            
-            # Create email content
-            html_content = self._create_modern_html_body(alert_data, template)
-            
-            # Create Mail object
-            message = Mail(
-                from_email=(self.from_email, self.from_name),
-                to_emails=self.recipients,
-                subject=subject,
-                html_content=html_content
-            )
-            
-            # Add image attachment if available
-            if 'image_path' in alert_data and os.path.exists(alert_data['image_path']):
-                self._add_image_attachment(message, alert_data['image_path'])
-            
-            # Send email
-            response = self.sg.send(message)
-            
-            if response.status_code == 202:
-                print(f"✅ Alert email sent successfully for {alert_data['type']}")
-                return True
-            else:
-                print(f"❌ Failed to send email. Status: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error sending SendGrid email alert: {e}")
-            return False
+        dispatcher = self.dispatcher or get_email_dispatcher()
+        recipients = list(recipients or self.recipients)
+        
+        if not wait:
+            return dispatcher.submit(alert_data, recipients) is not None
+        
+        if dispatcher.send(alert_data, recipients, timeout):
+            print(f"✅ Alert email sent successfully for {alert_data['type']}")
+            return True
+        
+        print(f"❌ Failed to send email alert for {alert_data['type']}")
+        return False
+    
+    def build_payload(self, alert_data, recipients):
+        """Build the SendGrid mail/send request body for an alert (or an alert digest)"""
+        if alert_data['type'] == 'digest':
+            return self._build_digest_payload(alert_data, recipients)
+        if alert_data['type'] == 'system_test':
+            return self._build_test_payload(recipients)
+        
+        # Get template based on alert type
+        template = self.templates.get(alert_data['type'], self.templates['suspicious_activity'])
+        
+        # Modify subject if escalated
+        subject = template['subject']
+        if alert_data.get('escalated'):
+            escalated_to = alert_data.get('escalated_to', 'Authorized Person')
+            subject = f"⚡ ESCALATED: {template['subject']} → {escalated_to}"
+        
+        # Create email content
+        html_content = self._create_modern_html_body(alert_data, template)
+        
+        # Create Mail object
+        message = Mail(
+            from_email=(self.from_email, self.from_name),
+            to_emails=recipients,
+            subject=subject,
+            html_content=html_content
+        )
+        
+        # Add image attachment if available
+        if alert_data.get('image_path'):
+            self._add_image_attachment(message, alert_data['image_path'])
+        
+        return message.get()
+    
+    def _snapshot_bytes(self, image_path, profile):
+        """Snapshot encoded for a profile, from the snapshot service cache or the archived file"""
+        # Snapshots saved through the snapshot service are already encoded for email
+        data = snapshot_service.get_encoded(image_path, profile)
+        if data is not None or not os.path.exists(image_path):
+            return data
+        
+        if profile == 'email':
+            with open(image_path, 'rb') as f:
+                return f.read()
+        
+        # Evicted from the cache: re-encode the archived file (e.g. thumbnails)
+        frame = cv2.imread(image_path)
+        if frame is None or profile not in snapshot_service.profiles:
+            return None
+        return SnapshotService.encode(frame, snapshot_service.profiles[profile])
+    
+    def _image_attachment(self, image_path, profile='email', content_id='alert_image',
+                          file_name='security_alert.jpg'):
+        """Inline JPEG attachment of a snapshot, or None if the snapshot is unavailable"""
+        data = self._snapshot_bytes(image_path, profile)
+        if data is None:
+            return None
+        encoded = base64.b64encode(data).decode()
+        
+        attachment = Attachment()
+        attachment.file_content = FileContent(encoded)
+        attachment.file_type = FileType('image/jpeg')
+        attachment.file_name = FileName(file_name)
+        attachment.disposition = Disposition('inline')
+        attachment.content_id = ContentId(content_id)
+        return attachment
     
     def _add_image_attachment(self, message, image_path):
         """Add image as attachment and inline content"""
         try:
-            with open(image_path, 'rb') as f:
-                data = f.read()
-                encoded = base64.b64encode(data).decode()
-            
-            # Add as attachment
-            attachment = Attachment()
-            attachment.file_content = FileContent(encoded)
-            attachment.file_type = FileType('image/jpeg')
-            attachment.file_name = FileName('security_alert.jpg')
-            attachment.disposition = Disposition('inline')
-            attachment.content_id = ContentId('alert_image')
-            
-            message.attachment = attachment
-            
+            attachment = self._image_attachment(image_path)
+            if attachment is not None:
+                message.attachment = attachment
         except Exception as e:
             print(f"⚠️ Error adding image attachment: {e}")
     
-    def _create_modern_html_body(self, alert_data, template):
-        """Create modern, responsive HTML email body"""
+    def _build_digest_payload(self, digest, recipients):
+        """Build one email for a digest of coalesced alerts, with a thumbnail per entry"""
+        alerts = digest['alerts']
+        subject = (f"📋 AI Eyes Security Digest: {digest['total_alerts']} alerts "
+                   f"from {len(digest['cameras'])} camera(s)")
+        if digest.get('severity') in ('critical', 'high'):
+            subject = f"🚨 {subject}"
         
-        # Format timestamp
-        timestamp = alert_data.get('timestamp', datetime.now().isoformat())
-        if isinstance(timestamp, str):
+        # Thumbnails for the most severe entries only
+        attachments = {}
+        for index, entry in enumerate(alerts):
+            if len(attachments) >= self.digest_max_thumbnails:
+                break
+            if not entry.get('image_path'):
+                continue
             try:
-                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            except:
-                timestamp = datetime.now()
-        formatted_time = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                attachment = self._image_attachment(entry['image_path'], profile='thumbnail',
+                                                    content_id=f'alert_thumb_{index}',
+                                                    file_name=f'alert_{index + 1}.jpg')
+            except Exception as e:
+                print(f"⚠️ Error adding digest thumbnail: {e}")
+                continue
+            if attachment is not None:
+                attachments[index] = attachment
         
-        # Get detection details
-        raw_confidence = alert_data.get('confidence', 0)
-        # Convert to percentage if needed (handle both 0.5 format and 50 format)
-        confidence = raw_confidence * 100 if raw_confidence <= 1.0 else raw_confidence
-        location = alert_data.get('location', 'Camera Feed')
-        camera_id = alert_data.get('camera_id', alert_data.get('camera', 'Unknown'))
-        description = alert_data.get('description', f"Unauthorized person detected in {location}")
+        message = Mail(
+            from_email=(self.from_email, self.from_name),
+            to_emails=recipients,
+            subject=subject,
+            html_content=self._create_digest_html_body(digest, attachments.keys())
+        )
+        if attachments:
+            message.attachment = list(attachments.values())
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>AI Eyes Security Alert</title>
-            <style>
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                }}
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    background-color: #f4f4f4;
-                }}
-                .email-container {{
-                    max-width: 600px;
-                    margin: 20px auto;
-                    background: #ffffff;
-                    border-radius: 15px;
-                    box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-                    overflow: hidden;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, {template['color']}, {template['color']}dd);
-                    color: white;
-                    padding: 30px;
-                    text-align: center;
-                    position: relative;
-                }}
-                .header::before {{
-                    content: '';
-                    position: absolute;
-                    top: 0;
-                    left: 0;
-                    right: 0;
-                    bottom: 0;
-                    background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><defs><pattern id="grid" width="10" height="10" patternUnits="userSpaceOnUse"><path d="M 10 0 L 0 0 0 10" fill="none" stroke="rgba(255,255,255,0.1)" stroke-width="1"/></pattern></defs><rect width="100" height="100" fill="url(%23grid)"/></svg>');
-                }}
-                .header-content {{
-                    position: relative;
-                    z-index: 1;
-                }}
-                .header-icon {{
-                    width: 80px;
-                    height: 80px;
-                    margin: 0 auto 15px;
-                    background: rgba(255,255,255,0.2);
-                    border-radius: 50%;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    backdrop-filter: blur(10px);
-                }}
-                .header-icon svg {{
-                    width: 40px;
-                    height: 40px;
-                    fill: white;
-                }}
-                .header h1 {{
-                    font-size: 28px;
-                    font-weight: 700;
-                    margin-bottom: 10px;
-                }}
-                .priority-badge {{
-                    display: inline-block;
-                    background: rgba(255,255,255,0.2);
-                    padding: 8px 16px;
-                    border-radius: 20px;
-                    font-size: 14px;
-                    font-weight: 600;
-                    backdrop-filter: blur(10px);
-                }}
-                .content {{
-                    padding: 30px;
-                }}
-                .alert-summary {{
-                    background: {template['color']}10;
-                    border-left: 4px solid {template['color']};
-                    padding: 20px;
-                    margin-bottom: 25px;
-                    border-radius: 0 8px 8px 0;
-                }}
-                .alert-title {{
-                    font-size: 20px;
-                    font-weight: 600;
-                    color: {template['color']};
-                    margin-bottom: 8px;
-                }}
-                .alert-description {{
-                    color: #666;
-                    font-size: 16px;
-                }}
-                .details-grid {{
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 20px;
-                    margin: 25px 0;
-                }}
-                .detail-card {{
-                    background: #f8f9fa;
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 1px solid #e9ecef;
-                }}
-                .detail-label {{
-                    font-size: 12px;
-                    text-transform: uppercase;
-                    font-weight: 600;
-                    color: #666;
-                    margin-bottom: 5px;
-                    letter-spacing: 0.5px;
-                }}
-                .detail-value {{
-                    font-size: 16px;
-                    font-weight: 600;
-                    color: #333;
-                }}
-                .confidence-container {{
-                    margin: 20px 0;
-                }}
-                .confidence-bar {{
-                    background: #e9ecef;
-                    height: 25px;
-                    border-radius: 12px;
-                    overflow: hidden;
-                    position: relative;
-                }}
-                .confidence-fill {{
-                    height: 100%;
-                    background: linear-gradient(90deg, {template['color']}, {template['color']}cc);
-                    width: {confidence}%;
-                    border-radius: 12px;
-                    position: relative;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }}
-                .confidence-text {{
-                    color: white;
-                    font-weight: 600;
-                    font-size: 12px;
-                    text-shadow: 0 1px 2px rgba(0,0,0,0.3);
-                }}
-                .image-container {{
-                    text-align: center;
-                    margin: 25px 0;
-                    background: #f8f9fa;
-                    padding: 20px;
-                    border-radius: 10px;
-                }}
-                .alert-image {{
-                    max-width: 100%;
-                    height: auto;
-                    border-radius: 8px;
-                    box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                }}
-                .action-required {{
-                    background: linear-gradient(135deg, #fff3cd, #ffeeba);
-                    border: 1px solid #ffd700;
-                    color: #856404;
-                    padding: 20px;
-                    border-radius: 10px;
-                    margin: 25px 0;
-                }}
-                .action-title {{
-                    font-weight: 700;
-                    margin-bottom: 8px;
-                    display: flex;
-                    align-items: center;
-                }}
-                .footer {{
-                    background: #f8f9fa;
-                    padding: 25px;
-                    text-align: center;
-                    border-top: 1px solid #e9ecef;
-                }}
-                .footer-brand {{
-                    font-weight: 700;
-                    color: {template['color']};
-                    margin-bottom: 8px;
-                }}
-                .footer-details {{
-                    font-size: 12px;
-                    color: #666;
-                    line-height: 1.4;
-                }}
-                .status-indicators {{
-                    display: flex;
-                    justify-content: center;
-                    gap: 20px;
-                    margin-top: 15px;
-                }}
-                .status-item {{
-                    display: flex;
-                    align-items: center;
-                    font-size: 12px;
-                    color: #666;
-                }}
-                .status-dot {{
-                    width: 8px;
-                    height: 8px;
-                    background: #28a745;
-                    border-radius: 50%;
-                    margin-right: 6px;
-                }}
-                @media (max-width: 600px) {{
-                    .email-container {{
-                        margin: 10px;
-                        border-radius: 10px;
-                    }}
-                    .header {{
-                        padding: 20px;
-                    }}
-                    .content {{
-                        padding: 20px;
-                    }}
-                    .details-grid {{
-                        grid-template-columns: 1fr;
-                        gap: 15px;
-                    }}
-                    .status-indicators {{
-                        flex-direction: column;
-                        gap: 10px;
-                    }}
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="email-container">
-                <div class="header">
-                    <div class="header-content">
-                        <div class="header-icon">
-                            <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">
-                                <path d="M12 2L4 6v6c0 5.5 3.8 10.7 8 12 4.2-1.3 8-6.5 8-12V6l-8-4zm0 2.2l6 3V12c0 4.5-3.1 8.9-6 10.2-2.9-1.3-6-5.7-6-10.2V7.2l6-3zM12 7c-2.8 0-5 2.2-5 5s2.2 5 5 5 5-2.2 5-5-2.2-5-5-5zm0 2c1.7 0 3 1.3 3 3s-1.3 3-3 3-3-1.3-3-3 1.3-3 3-3z"/>
-                            </svg>
-                        </div>
-                        <h1>{template['icon']} AI Eyes Security</h1>
-                        <div class="priority-badge">{template['priority']} Priority Alert</div>
-                    </div>
-                </div>
-                
-                <div class="content">"""
+        return message.get()
+    
+    def _create_digest_html_body(self, digest, thumbnails):
+        """Compact HTML body for a digest: one row per camera and alert type, most severe first"""
+        severity_colors = {
+            'critical': '#dc3545',
+            'high': '#fd7e14',
+            'medium': '#ffc107',
+            'low': '#28a745'
+        }
         
-        # Add escalation banner if this alert was manually escalated
-        if alert_data.get('escalated'):
-            escalated_to = alert_data.get('escalated_to', 'Authorized Person')
-            escalated_by = alert_data.get('escalated_by', 'Security Team')
-            html_body += f"""
-                    <div style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); color: white; padding: 20px; margin-bottom: 20px; border-radius: 10px; border-left: 5px solid #b45309;">
-                        <div style="display: flex; align-items: center; gap: 15px;">
-                            <div style="font-size: 40px;">⚡</div>
-                            <div>
-                                <div style="font-size: 18px; font-weight: bold; margin-bottom: 5px;">
-                                    🔔 ESCALATED ALERT
-                                </div>
-                                <div style="font-size: 14px; opacity: 0.95;">
-                                    This alert was <strong>manually escalated</strong> to you (<strong>{escalated_to}</strong>) by {escalated_by} via the Security Dashboard.
-                                    <br>
-                                    This indicates the situation requires <strong>immediate attention</strong> from authorized personnel.
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-"""
+        # Alert values are escaped, like the autoescaped single-alert template
+        rows = []
+        for index, entry in enumerate(digest['alerts']):
+            template = self.templates.get(entry['type'], self.templates['suspicious_activity'])
+            severity = entry.get('severity') or 'medium'
+            thumbnail = (f"<img src='cid:alert_thumb_{index}' width='160' style='border-radius:4px;display:block' />"
+                         if index in thumbnails else "")
+            last_seen = str(entry.get('last_seen', ''))[:19].replace('T', ' ')
+            rows.append(f"""
+                <tr>
+                    <td style="padding:8px;border-bottom:1px solid #eee;width:170px">{thumbnail}</td>
+                    <td style="padding:8px;border-bottom:1px solid #eee">
+                        <strong>{template['icon']} {escape(entry['type'].replace('_', ' ').title())}</strong>
+                        <span style="background:{severity_colors.get(severity, '#6c757d')};color:white;padding:2px 8px;border-radius:10px;font-size:11px">{escape(severity.upper())}</span><br>
+                        {escape(entry.get('description') or '')}<br>
+                        <small style="color:#666">{escape(entry.get('location') or entry.get('camera_id') or '')} • {entry['count']}× • last at {escape(last_seen)}</small>
+                    </td>
+                </tr>""")
         
-        html_body += f"""
-                    <div class="alert-summary">
-                        <div class="alert-title">{description}</div>
-                        <div class="alert-description">
-                            {"This security event was escalated for your immediate attention." if alert_data.get('escalated') else "Automated detection system has identified a security event requiring attention."}
-                        </div>
-                    </div>
-                    
-                    <div class="details-grid">
-                        <div class="detail-card">
-                            <div class="detail-label">Alert Type</div>
-                            <div class="detail-value">{alert_data['type'].replace('_', ' ').title()}</div>
-                        </div>
-                        <div class="detail-card">
-                            <div class="detail-label">Location</div>
-                            <div class="detail-value">{location}</div>
-                        </div>
-                        <div class="detail-card">
-                            <div class="detail-label">Timestamp</div>
-                            <div class="detail-value">{formatted_time}</div>
-                        </div>
-                        <div class="detail-card">
-                            <div class="detail-label">Camera ID</div>
-                            <div class="detail-value">{camera_id}</div>
-                        </div>
-                    </div>
-                    
-                    <div class="confidence-container">
-                        <div class="detail-label">Detection Confidence</div>
-                        <div class="confidence-bar">
-                            <div class="confidence-fill">
-                                <span class="confidence-text">{confidence:.1f}%</span>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    {"<div class='image-container'><img src='cid:alert_image' alt='Security Alert Image' class='alert-image' /></div>" if 'image_path' in alert_data else ""}
-                    
-                    <div class="action-required">
-                        <div class="action-title">
-                            ⚠️ Immediate Action Required
-                        </div>
-                        <div>
-                            Please review the security footage and assess the situation. If this represents a genuine threat, 
-                            contact security personnel or authorities immediately. This alert was generated by AI analysis 
-                            and should be verified by human assessment.
-                        </div>
-                    </div>
+        return f"""<!DOCTYPE html>
+        <html lang="en">
+        <head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><title>AI Eyes Security Digest</title></head>
+        <body style="font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;background:#f4f4f4;margin:0;padding:20px">
+            <div style="max-width:600px;margin:0 auto;background:white;border-radius:15px;overflow:hidden">
+                <div style="background:{severity_colors.get(digest.get('severity'), '#6c757d')};color:white;padding:20px;text-align:center">
+                    <h2 style="margin:0">📋 Security Alert Digest</h2>
+                    <p style="margin:5px 0 0">{digest['total_alerts']} alerts • {len(digest['cameras'])} camera(s) • last {int(digest['window_seconds'])}s</p>
                 </div>
-                
-                <div class="footer">
-                    <div class="footer-brand">AI Eyes Security System</div>
-                    <div class="footer-details">
-                        Powered by Advanced Computer Vision & Deep Learning<br>
-                        Real-time Intelligent Surveillance & Threat Detection
-                    </div>
-                    <div class="status-indicators">
-                        <div class="status-item">
-                            <div class="status-dot"></div>
-                            System Active
-                        </div>
-                        <div class="status-item">
-                            <div class="status-dot"></div>
-                            AI Detection Online
-                        </div>
-                        <div class="status-item">
-                            <div class="status-dot"></div>
-                            Alert ID: {alert_data.get('id', 'N/A')}
-                        </div>
-                    </div>
+                <table style="width:100%;border-collapse:collapse;font-size:14px">{''.join(rows)}
+                </table>
+                <div style="background:#f8f9fa;padding:15px;text-align:center;color:#666;font-size:12px">
+                    AI Eyes Security System • Alerts raised in the same window are grouped into one email
                 </div>
             </div>
         </body>
-        </html>
-        """
-        
-        return html_body
+        </html>"""
+    
+    def _create_modern_html_body(self, alert_data, template):
+        """Create modern, responsive HTML email body (precompiled per alert style)"""
+        return email_template_renderer.render_alert(alert_data, template)
     
-    def send_test_alert(self):
-        """Send a test alert using SendGrid to verify email configuration"""
-        if not self.enabled or not self.sg:
+    def send_test_alert(self, timeout=30.0):
+        """Send a test alert through the dispatcher to verify email configuration"""
+        if not self.enabled or not self.configured:
             print("📧 Email alerts disabled or SendGrid not configured")
             return False
         
-        test_alert = {
-            'type': 'system_test',
-            'description': 'AI Eyes Security System Test Alert',
-            'location': 'System Configuration',
-            'timestamp': datetime.now().isoformat(),
-            'confidence': 100,
-            'camera_id': 'TEST',
-            'id': 'TEST-001'
-        }
+        dispatcher = self.dispatcher or get_email_dispatcher()
+        if dispatcher.send({'type': 'system_test'}, list(self.recipients), timeout):
+            print("✅ SendGrid test email sent successfully!")
+            return True
         
-        try:
-            html_content = f"""
+        print("❌ Failed to send SendGrid test email")
+        return False
+    
+    def _build_test_payload(self, recipients):
+        """SendGrid mail/send request body of the configuration test email"""
+        html_content = f"""
             <!DOCTYPE html>
             <html>
             <head>
@@ -567,25 +337,13 @@ class EmailAlertService:
             </html>
             """
             
-            message = Mail(
-                from_email=(self.from_email, self.from_name),
-                to_emails=self.recipients,
-                subject='✅ AI Eyes Security - SendGrid Test Successful',
-                html_content=html_content
-            )
-            
-            response = self.sg.send(message)
-            
-            if response.status_code == 202:
-                print("✅ SendGrid test email sent successfully!")
-                return True
-            else:
-                print(f"❌ Failed to send test email. Status: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error sending SendGrid test email: {e}")
-            return False
+        message = Mail(
+            from_email=(self.from_email, self.from_name),
+            to_emails=recipients,
+            subject='✅ AI Eyes Security - SendGrid Test Successful',
+            html_content=html_content
+        )
+        return message.get()
     
     def add_recipient(self, email):
         """Add new email recipient"""
@@ -606,10 +364,55 @@ class EmailAlertService:
         return {
             'service': 'SendGrid',
             'enabled': self.enabled,
-            'configured': self.sg is not None,
+            'configured': self.configured,
             'api_key_set': bool(self.api_key and self.api_key != 'your_sendgrid_api_key_here'),
             'from_email': self.from_email,
             'from_name': self.from_name,
             'recipients_count': len(self.recipients),
             'recipients': self.recipients if len(self.recipients) <= 3 else self.recipients[:3] + ['...']
-        }
\ No newline at end of file
+        }
+
+
+_shared_service = None
+_shared_dispatcher = None
+_shared_lock = threading.Lock()
+
+
+def get_email_service():
+    """Email service shared by the alert managers and API routes"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = EmailAlertService()
+        return _shared_service
+
+
+def get_email_dispatcher():
+    """Shared dispatcher (started on first use) that delivers all alert emails"""
+    global _shared_dispatcher
+    service = get_email_service()
+    with _shared_lock:
+        if _shared_dispatcher is None:
+            _shared_dispatcher = EmailDispatcher(
+                api_key=service.api_key,
+                build_payload=service.build_payload,
+                api_url=os.getenv('SENDGRID_API_URL', DEFAULT_API_URL),
+                outbox_dir=os.getenv('EMAIL_OUTBOX_DIR', 'storage/email_outbox') or None,
+                workers=int(os.getenv('EMAIL_WORKERS', '2')),
+                max_pending=int(os.getenv('EMAIL_OUTBOX_SIZE', '500')),
+                max_attempts=int(os.getenv('EMAIL_MAX_ATTEMPTS', '5'))
+            )
+            _shared_dispatcher.start()
+            atexit.register(_shared_dispatcher.stop)
+        return _shared_dispatcher
+
+
+def get_email_delivery_stats():
+    """Dispatcher metrics, or None if no email has been sent yet"""
+    return _shared_dispatcher.get_stats() if _shared_dispatcher else None
+
+
+def shutdown_email_dispatcher(timeout=5.0):
+    """Stop the shared dispatcher; undelivered emails stay in the outbox for the next start"""
+    if _shared_dispatcher:
+        _shared_dispatcher.stop(timeout)
@@ -0,0 +1,144 @@
+"""
+Email Templates
+Precompiled Jinja2 templates for alert emails
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import escape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+
+# Per-alert fields of templates/email/alert.html
+ALERT_FIELDS = ('formatted_time', 'confidence', 'confidence_text', 'location', 'camera_id', 'description',
+                'alert_type_title', 'alert_id', 'escalated_to', 'escalated_by', 'image_cid')
+_FIELD_MARKER = re.compile(r'\x00(\w+)\x00')
+_NEEDS_ESCAPE = re.compile(r'[&<>"\']')  # Values without these are inserted as is
+
+
+class EmailTemplateRenderer:
+    """
+    Renderer for alert email bodies with cached static blocks
+
+    The layout (templates/email/alert.html) is compiled once. Its ``[[ ]]``
+    fields depend only on the alert style (colour, icon, priority) and its
+    ``{% if %}`` blocks only on two flags (escalated, has image). For each
+    style and flag combination the layout is rendered once with a marker in
+    place of every per-alert field and split into static fragments, which
+    are cached. Rendering an alert then only escapes the per-alert values
+    (time, camera, confidence, image CID...) and joins them with the cached
+    fragments; the output is the same as rendering the layout with Jinja2
+    autoescaping.
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        """
+        Initialize renderer
+
+        Args:
+            template_dir: Directory containing alert.html
+        """
+        self._layout_env = Environment(
+            loader=FileSystemLoader(template_dir),
+            variable_start_string='[[', variable_end_string=']]',
+            block_start_string='[%', block_end_string='%]',
+            comment_start_string='[#', comment_end_string='#]',
+            keep_trailing_newline=True
+        )
+        self._alert_env = Environment(autoescape=True, keep_trailing_newline=True)
+        self._layout = self._layout_env.get_template('alert.html')
+
+        self._styles = {}  # style key -> per-style template (layout fields filled in)
+        self._fragments: Dict[tuple, Tuple[List[str], List[str]]] = {}  # (style key, flags) -> (static, fields)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _style_key(style: Dict) -> tuple:
+        return (style['color'], style['icon'], style['priority'])
+
+    def _compile(self, style: Dict, escalated: bool, has_image: bool) -> Tuple[List[str], List[str]]:
+        """Render one style/flag combination with field markers and split it into fragments"""
+        key = self._style_key(style)
+        template = self._styles.get(key)
+        if template is None:
+            template = self._alert_env.from_string(self._layout.render(style=style))
+            self._styles[key] = template
+
+        marked = template.render(escalated=escalated, has_image=has_image,
+                                 **{field: f'\x00{field}\x00' for field in ALERT_FIELDS})
+        parts = _FIELD_MARKER.split(marked)
+        return parts[0::2], parts[1::2]
+
+    def fragments(self, style: Dict, escalated: bool, has_image: bool) -> Tuple[List[str], List[str]]:
+        """Static fragments and the field names between them, compiled on first use"""
+        key = (self._style_key(style), escalated, has_image)
+        compiled = self._fragments.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._fragments.get(key)
+                if compiled is None:
+                    compiled = self._compile(style, escalated, has_image)
+                    self._fragments[key] = compiled
+        return compiled
+
+    def warm(self, styles: Iterable[Dict]):
+        """Compile every flag combination of the known alert styles up front"""
+        for style in styles:
+            for escalated in (False, True):
+                for has_image in (False, True):
+                    self.fragments(style, escalated, has_image)
+
+    def render_alert(self, alert_data: Dict, style: Dict) -> str:
+        """
+        Render the HTML body of an alert email
+
+        Args:
+            alert_data: Alert dictionary
+            style: Alert style from EmailAlertService.templates
+
+        Returns:
+            HTML document
+        """
+        # Format timestamp
+        timestamp = alert_data.get('timestamp', datetime.now().isoformat())
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            except ValueError:
+                timestamp = datetime.now()
+
+        # Convert to percentage if needed (handle both 0.5 format and 50 format)
+        raw_confidence = alert_data.get('confidence', 0)
+        confidence = raw_confidence * 100 if raw_confidence <= 1.0 else raw_confidence
+        location = alert_data.get('location', 'Camera Feed')
+
+        values = {
+            'formatted_time': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'confidence': confidence,
+            'confidence_text': f'{confidence:.1f}',
+            'location': location,
+            'camera_id': alert_data.get('camera_id', alert_data.get('camera', 'Unknown')),
+            'description': alert_data.get('description', f"Unauthorized person detected in {location}"),
+            'alert_type_title': alert_data['type'].replace('_', ' ').title(),
+            'alert_id': alert_data.get('id', 'N/A'),
+            'escalated_to': alert_data.get('escalated_to', 'Authorized Person'),
+            'escalated_by': alert_data.get('escalated_by', 'Security Team'),
+            'image_cid': 'alert_image'
+        }
+
+        static, fields = self.fragments(style, bool(alert_data.get('escalated')), 'image_path' in alert_data)
+        parts = [static[0]]
+        for field, text in zip(fields, static[1:]):
+            value = str(values[field])
+            parts.append(str(escape(value)) if _NEEDS_ESCAPE.search(value) else value)
+            parts.append(text)
+        return ''.join(parts)
+
+
+# Shared by all EmailAlertService instances
+email_template_renderer = EmailTemplateRenderer()
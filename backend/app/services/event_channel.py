@@ -0,0 +1,243 @@
+"""
+Event Channel
+Push channel (Server-Sent Events) for dashboard status changes, activities and alerts
+"""
+
+import copy
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from surveillance.event_store import EventStore
+
+logger = logging.getLogger(__name__)
+
+# Marks a key removed from the status (e.g. a camera that went away)
+REMOVED = None
+
+
+def status_delta(old: Dict, new: Dict) -> Dict:
+    """Keys of `new` that differ from `old` (nested dicts diffed recursively, removed keys -> None)"""
+    delta = {}
+    for key, value in new.items():
+        before = old.get(key)
+        if isinstance(value, dict) and isinstance(before, dict):
+            nested = status_delta(before, value)
+            if nested:
+                delta[key] = nested
+        elif key not in old or before != value:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            delta[key] = REMOVED
+    return delta
+
+
+def merge_delta(target: Dict, delta: Dict) -> Dict:
+    """Apply a status delta to `target` in place (also used to coalesce deltas)"""
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_delta(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+class EventChannel:
+    """
+    Ordered log of dashboard events streamed to every connected client
+
+    Events are kept in an EventStore, so each client only needs a cursor:
+    a stream sends everything after its cursor, and every message id is the
+    cursor to resume from (browsers send it back as Last-Event-ID when an
+    EventSource reconnects). Each message (snapshot, status, activity or
+    alert) counts against the client's rate; events that arrive while a
+    client is rate limited are coalesced into the next messages: status deltas are merged,
+    activities and alerts are sent as one list per type. A client whose
+    cursor is older than the retained events gets a full status snapshot
+    instead.
+
+    Status is pushed as deltas: a background thread samples the status
+    provider while clients are connected and publishes only what changed.
+    """
+
+    def __init__(self, status_provider: Optional[Callable[[], Dict]] = None, capacity: int = 1000,
+                 max_rate: float = 2.0, status_interval: float = 1.0):
+        """
+        Initialize channel
+
+        Args:
+            status_provider: Returns the current status dict (JSON-serializable)
+            capacity: Events kept for clients that reconnect
+            max_rate: Most messages per second per client (events in between are coalesced)
+            status_interval: Seconds between status samples while clients are connected
+        """
+        self.status_provider = status_provider
+        self.max_rate = max_rate
+        self.status_interval = status_interval
+
+        self.events = EventStore(capacity=capacity, index_fields=('type',))
+        self._status: Dict = {}  # Last published status (the state the deltas in the log add up to)
+        self._status_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._clients = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.messages_sent = 0
+
+    # ------------------------------------------------------------- publishers
+
+    def publish(self, event_type: str, data: Any) -> int:
+        """
+        Add an event for all clients
+
+        Args:
+            event_type: 'status', 'activity', 'alert' or any other name
+            data: JSON-serializable payload
+
+        Returns:
+            Sequence number of the event
+        """
+        seq = self.events.append((event_type, data), time.time(), type=event_type)
+        with self._changed:
+            self._changed.notify_all()
+        return seq
+
+    def emit(self, event: str, data: Any, **kwargs):
+        """Socket.IO-style emit, so the channel can stand in for AlertManager's socketio"""
+        self.publish('alert' if event == 'new_alert' else event, data)
+
+    def publish_status(self, status: Dict) -> bool:
+        """Publish what changed since the last status; False if nothing did"""
+        with self._status_lock:
+            delta = status_delta(self._status, status)
+            self._status = status
+            if not delta:
+                return False
+            self.publish('status', delta)
+            return True
+
+    def _sample_status(self):
+        while not self._stop.wait(self.status_interval):
+            if self._clients == 0:
+                continue
+            try:
+                self.publish_status(self.status_provider())
+            except Exception as e:
+                logger.error("Dashboard status sample failed: %s", e)
+
+    def start(self):
+        """Start sampling the status provider"""
+        if self.status_provider is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_status, name="EventChannelStatus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    # ---------------------------------------------------------------- clients
+
+    @staticmethod
+    def _message(event_type: str, data: Any, cursor: int) -> str:
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        return f"event: {event_type}\nid: {cursor}\ndata: {payload}\n\n"
+
+    def _snapshot(self) -> Tuple[Dict, int]:
+        """Current status and the cursor it is valid at (later deltas apply on top of it)"""
+        if self.status_provider is not None:
+            try:
+                self.publish_status(self.status_provider())
+            except Exception as e:
+                logger.error("Dashboard status snapshot failed: %s", e)
+        with self._status_lock:
+            return self._status, self.events.cursor
+
+    @staticmethod
+    def coalesce(events: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Merge a run of events: one status delta, one list per other event type"""
+        batch: Dict[str, Any] = {}
+        for event_type, data in events:
+            if event_type == 'status':
+                merge_delta(batch.setdefault('status', {}), copy.deepcopy(data))  # Events are shared
+            else:
+                batch.setdefault(event_type, []).append(data)
+        return batch
+
+    def stream(self, cursor: Optional[int] = None, max_rate: Optional[float] = None,
+               keepalive: float = 15.0) -> Iterator[str]:
+        """
+        Server-Sent Events for one client
+
+        Args:
+            cursor: Resume after this cursor (Last-Event-ID); None starts with a snapshot
+            max_rate: Messages per second for this client (capped at the channel's max_rate;
+                      None or non-positive values use the channel's max_rate)
+            keepalive: Seconds between comment lines when nothing happens
+        """
+        rate = self.max_rate if not max_rate or max_rate <= 0 else min(max_rate, self.max_rate)
+        min_interval = 1.0 / rate if rate > 0 else 0.0
+
+        with self._changed:
+            self._clients += 1
+        try:
+            yield "retry: 2000\n\n"
+            if cursor is None or cursor > self.events.cursor:
+                cursor = -1  # Fresh client (or a cursor from before a restart)
+
+            last_sent = time.monotonic()
+            while not self._stop.is_set():
+                if cursor < self.events.cursor - len(self.events):
+                    # New client, or events it missed were overwritten: start from the current state
+                    status, cursor = self._snapshot()
+                    self.messages_sent += 1
+                    yield self._message('snapshot', status, cursor)
+                    last_sent = time.monotonic()
+                    if min_interval:
+                        self._stop.wait(min_interval)
+                    continue
+
+                with self._changed:
+                    self._changed.wait_for(lambda: self.events.cursor > cursor or self._stop.is_set(),
+                                           timeout=keepalive)
+                events, new_cursor = self.events.since(cursor)
+                if not events:
+                    if time.monotonic() - last_sent >= keepalive:
+                        last_sent = time.monotonic()
+                        yield ": keepalive\n\n"
+                    continue
+
+                cursor = new_cursor
+                batch = self.coalesce(events)
+                for event_type, data in batch.items():
+                    self.messages_sent += 1
+                    yield self._message(event_type, data, cursor)
+                last_sent = time.monotonic()
+
+                # Rate limit (every message counts): whatever arrives meanwhile goes out coalesced next time
+                if min_interval:
+                    self._stop.wait(min_interval * len(batch))
+        finally:
+            with self._changed:
+                self._clients -= 1
+
+    @property
+    def clients(self) -> int:
+        return self._clients
+
+    def get_stats(self) -> dict:
+        return {
+            'clients': self._clients,
+            'cursor': self.events.cursor,
+            'retained_events': len(self.events),
+            'messages_sent': self.messages_sent
+        }
@@ -0,0 +1,406 @@
+"""
+Frame Broadcast
+Encode-once MJPEG fan-out of live camera frames to any number of viewers,
+paced per client, plus a per-frame detection metadata stream for client-side overlays
+"""
+
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from app.services.snapshot_service import SnapshotProfile, env_profile
+from app.services.stream_pacing import ClientPacer
+
+logger = logging.getLogger(__name__)
+
+# Live view quality tiers (?quality= on /video_feed); 'medium' is the classic 640 px / q60 view
+STREAM_TIERS = {
+    'low': env_profile('STREAM_LOW', 320, 40),
+    'medium': env_profile('STREAM_MEDIUM', 640, 60),
+    'high': env_profile('STREAM_HIGH', 1280, 80)
+}
+DEFAULT_TIER = 'medium'
+
+MJPEG_BOUNDARY = b'--frame\r\nContent-Type: image/jpeg\r\n'
+
+
+def mjpeg_part(version: int, jpeg: bytes) -> bytes:
+    """One multipart part; X-Frame-Version matches the 'v' of the frame's metadata event"""
+    return MJPEG_BOUNDARY + b'X-Frame-Version: %d\r\n\r\n' % version + jpeg + b'\r\n'
+
+
+def encode_live_frame(frame: np.ndarray, profile: SnapshotProfile) -> Optional[bytes]:
+    """JPEG for the live view (linear downscale: cheaper than the snapshot encoder's area filter)"""
+    height, width = frame.shape[:2]
+    if profile.max_width and width > profile.max_width:
+        frame = cv2.resize(frame, (profile.max_width, int(height * profile.max_width / width)))
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, profile.quality])
+    return buffer.tobytes() if ok else None
+
+
+class FrameBroadcaster:
+    """
+    Latest frame of one camera, encoded at most once per quality tier
+
+    The camera thread publishes every new frame, which bumps the version.
+    Viewers wait for a version newer than the one they last sent, so an
+    unchanged frame is never sent twice. The first viewer asking for a tier
+    at a new version encodes it; every other viewer of that tier gets the
+    same bytes. Nothing is encoded while nobody is watching.
+
+    Frames are published raw, optionally with a render function that draws
+    the overlays. It is only called when a viewer or snapshot needs the
+    frame, at the output width, and its result is memoized per version.
+    Viewers that draw overlays themselves take the frames without overlays
+    and follow metadata_stream(), whose events carry the same version.
+    """
+
+    def __init__(self, camera_name: str, tiers: Optional[Dict[str, SnapshotProfile]] = None):
+        """
+        Initialize broadcaster
+
+        Args:
+            camera_name: Camera the frames come from
+            tiers: Tier name -> encoding settings
+        """
+        self.camera_name = camera_name
+        self.tiers = tiers or STREAM_TIERS
+
+        self.version = 0
+        self.closed = False
+        self._frame: Optional[np.ndarray] = None
+        self._render: Optional[Callable[[np.ndarray, int], np.ndarray]] = None
+        self._describe: Optional[Callable[[], Dict]] = None
+        self._timestamp = 0.0
+        self._rendered: Dict[tuple, Tuple[int, np.ndarray]] = {}  # (output width, overlay) -> (version, image)
+        self._encoded: Dict[tuple, Tuple[int, bytes]] = {}  # (tier, overlay) -> (version, jpeg)
+        self._metadata: Optional[Tuple[int, str]] = None  # (version, JSON)
+        self._encode_locks = {tier: threading.Lock() for tier in self.tiers}
+        self._viewers: Dict[str, int] = {tier: 0 for tier in self.tiers}
+        self.metadata_viewers = 0
+        self._clients: Dict[int, ClientPacer] = {}  # Adaptive viewers by pacer id
+        self._changed = threading.Condition()
+
+        self.frames_published = 0
+        self.renders = 0
+        self.encodes = 0
+        self.frames_sent = 0
+
+    def publish(self, frame: np.ndarray,
+                render: Optional[Callable[[np.ndarray, int], np.ndarray]] = None,
+                describe: Optional[Callable[[], Dict]] = None,
+                timestamp: Optional[float] = None) -> int:
+        """
+        Make a frame the latest one (not copied: do not modify it afterwards)
+
+        Args:
+            frame: Raw BGR frame
+            render: Called as render(frame, max_width) to get the image to show
+                    (max_width 0 = full resolution); None shows the frame as is
+            describe: Called (at most once) to get the frame's metadata fields
+            timestamp: Capture time (defaults to now)
+
+        Returns:
+            The frame's version
+        """
+        with self._changed:
+            self._frame = frame
+            self._render = render
+            self._describe = describe
+            self._timestamp = timestamp if timestamp is not None else time.time()
+            self._rendered = {}
+            self.version += 1
+            self.frames_published += 1
+            self._changed.notify_all()
+            return self.version
+
+    def clear(self):
+        """Drop the latest frame and everything rendered from it (until the next publish)"""
+        with self._changed:
+            self._frame = None
+            self._render = None
+            self._describe = None
+            self._rendered = {}
+            self._encoded = {}
+            self._metadata = None
+
+    def close(self):
+        """Stop all viewers of this camera"""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def _wait_newer(self, after_version: int, timeout: float) -> bool:
+        """Wait for a version newer than `after_version`; False on timeout or when closed"""
+        with self._changed:
+            if not self._changed.wait_for(lambda: self.closed or self.version > after_version, timeout):
+                return False
+            return not self.closed
+
+    def wait_for_frame(self, tier: str, after_version: int = 0, timeout: float = 1.0,
+                       overlay: bool = True) -> Optional[Tuple[int, bytes]]:
+        """
+        Wait for a frame newer than `after_version`, encoded for a tier
+
+        Returns:
+            (version, jpeg bytes), or None on timeout or when closed
+        """
+        if not self._wait_newer(after_version, timeout):
+            return None
+        return self.encoded(tier, overlay)
+
+    def rendered(self, max_width: int = 0, overlay: bool = True) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Latest frame with overlays at an output width, rendered once per version
+
+        Args:
+            max_width: Downscale frames wider than this (0 = full resolution)
+            overlay: False for the frame as captured (resized when encoded)
+
+        Returns:
+            (version, image) or None if nothing was published yet
+        """
+        key = (max_width, overlay)
+        with self._changed:
+            version, frame, render = self.version, self._frame, self._render
+            cached = self._rendered.get(key)
+        if cached is not None and cached[0] == version:
+            return cached
+        if frame is None:
+            return None
+        if not overlay or render is None:
+            return version, frame
+
+        image = render(frame, max_width)
+        with self._changed:
+            self.renders += 1
+            if self.version == version:
+                self._rendered[key] = (version, image)
+        return version, image
+
+    def encoded(self, tier: str, overlay: bool = True) -> Optional[Tuple[int, bytes]]:
+        """Latest frame encoded for a tier, encoding it if no viewer has yet"""
+        key = (tier, overlay)
+        cached = self._encoded.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached
+
+        with self._encode_locks[tier]:
+            cached = self._encoded.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached  # Another viewer encoded it while we waited
+
+            profile = self.tiers[tier]
+            rendered = self.rendered(profile.max_width, overlay)
+            if rendered is None:
+                return None
+            version, image = rendered
+
+            jpeg = encode_live_frame(image, profile)
+            if jpeg is None:
+                return None
+            cached = (version, jpeg)
+            self._encoded[key] = cached
+            self.encodes += 1
+            return cached
+
+    def metadata(self) -> Optional[Tuple[int, str]]:
+        """
+        Latest frame's metadata as JSON, serialized once per version
+
+        Fields: v (frame version), ts (capture time), camera, plus whatever
+        the publisher's describe function returns.
+
+        Returns:
+            (version, JSON) or None if nothing was published yet
+        """
+        with self._changed:
+            cached = self._metadata
+            version, describe, timestamp = self.version, self._describe, self._timestamp
+        if cached is not None and cached[0] == version:
+            return cached
+        if version == 0:
+            return None
+
+        fields = {'v': version, 'ts': round(timestamp, 3), 'camera': self.camera_name}
+        if describe is not None:
+            fields.update(describe())
+        cached = (version, json.dumps(fields, separators=(',', ':')))
+        with self._changed:
+            if self.version == version:
+                self._metadata = cached
+        return cached
+
+    def stream(self, tier: str = DEFAULT_TIER, max_fps: float = 20.0,
+               overlay: bool = True) -> Iterator[bytes]:
+        """
+        MJPEG multipart parts for one viewer
+
+        Args:
+            tier: Quality tier (unknown tiers fall back to the default)
+            max_fps: Upper bound on frames sent to this viewer
+            overlay: False to send frames without overlays (drawn by the client)
+        """
+        if tier not in self.tiers:
+            tier = DEFAULT_TIER
+        min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+
+        with self._changed:
+            self._viewers[tier] += 1
+        try:
+            last_version, last_sent = 0, 0.0
+            while not self.closed:
+                item = self.wait_for_frame(tier, last_version, overlay=overlay)
+                if item is None:
+                    continue
+                last_version, jpeg = item
+                self.frames_sent += 1
+                yield mjpeg_part(last_version, jpeg)
+
+                wait = min_interval - (time.monotonic() - last_sent)
+                if wait > 0:
+                    time.sleep(wait)
+                last_sent = time.monotonic()
+        finally:
+            with self._changed:
+                self._viewers[tier] -= 1
+
+    def adaptive_stream(self, pacer: ClientPacer, overlay: bool = True) -> Iterator[bytes]:
+        """
+        MJPEG multipart parts for one viewer, at the tier and frame rate its pacer picks
+
+        The time each part takes to be written is reported to the pacer. Only
+        the newest frame is ever sent: frames published while the client was
+        still taking the previous one are skipped rather than queued.
+
+        Args:
+            pacer: Adapts this viewer's tier and frame rate (its ladder must use this broadcaster's tiers)
+            overlay: False to send frames without overlays (drawn by the client)
+        """
+        tier = pacer.tier
+        with self._changed:
+            self._viewers[tier] += 1
+            self._clients[pacer.id] = pacer
+        try:
+            last_version, last_sent = 0, 0.0
+            while not self.closed:
+                item = self.wait_for_frame(pacer.tier, last_version, overlay=overlay)
+                if item is None:
+                    continue
+                version, jpeg = item
+                skipped = version - last_version - 1 if last_version else 0
+                last_version = version
+
+                last_sent = time.monotonic()
+                self.frames_sent += 1
+                yield mjpeg_part(version, jpeg)
+                if pacer.record(time.monotonic() - last_sent, len(jpeg), skipped) and pacer.tier != tier:
+                    with self._changed:
+                        self._viewers[tier] -= 1
+                        self._viewers[pacer.tier] += 1
+                    tier = pacer.tier
+
+                wait = 1.0 / pacer.fps - (time.monotonic() - last_sent)
+                if wait > 0:
+                    time.sleep(wait)
+        finally:
+            with self._changed:
+                self._viewers[tier] -= 1
+                self._clients.pop(pacer.id, None)
+
+    def clients(self) -> List[dict]:
+        """Stats of the connected adaptive viewers"""
+        with self._changed:
+            pacers = list(self._clients.values())
+        return [pacer.get_stats() for pacer in pacers]
+
+    def metadata_stream(self, keepalive: float = 15.0) -> Iterator[str]:
+        """
+        Server-Sent Events with the metadata of every new frame
+
+        Each event is `event: frame`, `id: <version>` and the metadata JSON
+        as data. A comment line is sent every `keepalive` seconds without
+        frames so proxies keep the connection open.
+        """
+        with self._changed:
+            self.metadata_viewers += 1
+        try:
+            yield "retry: 2000\n\n"
+            last_version, last_sent = 0, time.monotonic()
+            while not self.closed:
+                if not self._wait_newer(last_version, 1.0):
+                    if time.monotonic() - last_sent >= keepalive:
+                        last_sent = time.monotonic()
+                        yield ": keepalive\n\n"
+                    continue
+                item = self.metadata()
+                if item is None:
+                    continue
+                last_version, data = item
+                last_sent = time.monotonic()
+                yield f"event: frame\nid: {last_version}\ndata: {data}\n\n"
+        finally:
+            with self._changed:
+                self.metadata_viewers -= 1
+
+    @property
+    def viewers(self) -> int:
+        return sum(self._viewers.values()) + self.metadata_viewers
+
+    def get_stats(self) -> dict:
+        return {
+            'version': self.version,
+            'viewers': dict(self._viewers, metadata=self.metadata_viewers),
+            'frames_published': self.frames_published,
+            'renders': self.renders,
+            'encodes': self.encodes,
+            'frames_sent': self.frames_sent
+        }
+
+
+class BroadcastHub:
+    """One FrameBroadcaster per camera"""
+
+    def __init__(self, tiers: Optional[Dict[str, SnapshotProfile]] = None):
+        self.tiers = tiers or STREAM_TIERS
+        self._broadcasters: Dict[str, FrameBroadcaster] = {}
+        self._lock = threading.Lock()
+
+    def get(self, camera_name: str) -> FrameBroadcaster:
+        """Broadcaster of a camera, created on first use"""
+        broadcaster = self._broadcasters.get(camera_name)
+        if broadcaster is None or broadcaster.closed:
+            with self._lock:
+                broadcaster = self._broadcasters.get(camera_name)
+                if broadcaster is None or broadcaster.closed:
+                    broadcaster = FrameBroadcaster(camera_name, self.tiers)
+                    self._broadcasters[camera_name] = broadcaster
+        return broadcaster
+
+    def viewers(self, camera_name: str) -> int:
+        """Connected viewers of a camera"""
+        broadcaster = self._broadcasters.get(camera_name)
+        return broadcaster.viewers if broadcaster is not None else 0
+
+    def remove(self, camera_name: str):
+        """Close a camera's broadcaster (its viewers' streams end)"""
+        with self._lock:
+            broadcaster = self._broadcasters.pop(camera_name, None)
+        if broadcaster is not None:
+            broadcaster.close()
+
+    def clients(self) -> List[dict]:
+        """Per-client pacing stats of all adaptive viewers"""
+        with self._lock:
+            broadcasters = list(self._broadcasters.values())
+        return [client for b in broadcasters for client in b.clients()]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            broadcasters = dict(self._broadcasters)
+        return {name: b.get_stats() for name, b in broadcasters.items()}
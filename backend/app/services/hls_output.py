@@ -0,0 +1,308 @@
+"""
+HLS Output
+Low-bandwidth live view: each camera encoded once to H.264 in fragmented MP4
+segments with a sliding HLS playlist, served to any number of viewers as
+static files. Needs an FFmpeg binary (FFMPEG_BINARY, PATH or imageio-ffmpeg).
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from app.services.frame_broadcast import BroadcastHub
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = 'index.m3u8'
+INIT_SEGMENT_NAME = 'init.mp4'
+SEGMENT_PATTERN = 'segment_%06d.m4s'
+_SEGMENT_FILE = re.compile(r'^segment_\d{6}\.m4s$')
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Path of the FFmpeg binary, or None if there is none"""
+    configured = os.getenv('FFMPEG_BINARY')
+    if configured:
+        return shutil.which(configured)
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+FFMPEG_PATH = find_ffmpeg()
+HLS_AVAILABLE = FFMPEG_PATH is not None
+
+
+@dataclass
+class HLSProfile:
+    """Encoding and playlist settings of the HLS output"""
+    max_width: int  # Frames wider than this are downscaled
+    fps: int  # Constant output frame rate (the latest frame is repeated if the camera is slower)
+    bitrate_kbps: int  # Target H.264 bitrate
+    segment_seconds: int  # Segment duration (one keyframe per segment)
+    playlist_size: int  # Segments listed in the sliding playlist (older ones are deleted)
+
+
+def hls_profile_from_env() -> HLSProfile:
+    return HLSProfile(
+        max_width=int(os.getenv('HLS_MAX_WIDTH', '640')),
+        fps=int(os.getenv('HLS_FPS', '10')),
+        bitrate_kbps=int(os.getenv('HLS_BITRATE_KBPS', '400')),
+        segment_seconds=int(os.getenv('HLS_SEGMENT_SECONDS', '2')),
+        playlist_size=int(os.getenv('HLS_PLAYLIST_SIZE', '5'))
+    )
+
+
+def is_hls_file(filename: str) -> bool:
+    """Whether a requested file name is one the encoder writes"""
+    return filename in (PLAYLIST_NAME, INIT_SEGMENT_NAME) or bool(_SEGMENT_FILE.match(filename))
+
+
+def ffmpeg_command(ffmpeg: str, frame_size: Tuple[int, int], profile: HLSProfile, output_dir: str) -> List[str]:
+    """
+    FFmpeg arguments reading raw BGR frames on stdin and writing fMP4 HLS to output_dir
+
+    Args:
+        ffmpeg: FFmpeg binary
+        frame_size: (width, height) of the frames written to stdin
+        profile: Encoding and playlist settings
+        output_dir: Directory of the playlist and segments
+    """
+    width, height = frame_size
+    gop = max(1, profile.fps * profile.segment_seconds)
+    return [
+        ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin',
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(profile.fps), '-i', 'pipe:0',
+        '-an', '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',  # yuv420p needs even dimensions
+        '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'zerolatency', '-pix_fmt', 'yuv420p',
+        '-b:v', f'{profile.bitrate_kbps}k', '-maxrate', f'{profile.bitrate_kbps}k',
+        '-bufsize', f'{profile.bitrate_kbps * 2}k',
+        '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+        '-f', 'hls', '-hls_time', str(profile.segment_seconds), '-hls_list_size', str(profile.playlist_size),
+        '-hls_flags', 'delete_segments+independent_segments+temp_file',
+        '-hls_segment_type', 'fmp4', '-hls_fmp4_init_filename', INIT_SEGMENT_NAME,
+        '-hls_segment_filename', os.path.join(output_dir, SEGMENT_PATTERN),
+        os.path.join(output_dir, PLAYLIST_NAME)
+    ]
+
+
+class HLSStream:
+    """
+    HLS encoder of one camera
+
+    Requests for the camera's playlist or segments call touch(), which starts
+    a feeder thread and an FFmpeg process if they are not running. The feeder
+    takes the camera's latest frame from the BroadcastHub at a constant frame
+    rate and pipes it to FFmpeg, which writes the segments and playlist.
+    Viewers only download files, so each camera is encoded once however many
+    are watching. The encoder stops, and its files are deleted, once nothing
+    has been requested for `idle_timeout` seconds.
+    """
+
+    def __init__(self, hub: BroadcastHub, camera_name: str, output_dir: str, profile: HLSProfile,
+                 ffmpeg: Optional[str] = FFMPEG_PATH, overlay: bool = True, idle_timeout: float = 30.0):
+        """
+        Initialize stream
+
+        Args:
+            hub: Per-camera frame broadcasters
+            camera_name: Camera to encode
+            output_dir: Directory of the playlist and segments (emptied on start and stop)
+            profile: Encoding and playlist settings
+            ffmpeg: FFmpeg binary
+            overlay: Encode the frames with the AI overlays
+            idle_timeout: Seconds without requests before the encoder stops
+        """
+        self.hub = hub
+        self.camera_name = camera_name
+        self.output_dir = output_dir
+        self.profile = profile
+        self.ffmpeg = ffmpeg
+        self.overlay = overlay
+        self.idle_timeout = idle_timeout
+
+        self._thread = None
+        self._last_request = time.monotonic()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.processes_started = 0
+        self.frames_written = 0
+        self.last_error = None
+
+    @property
+    def playlist_path(self) -> str:
+        return os.path.join(self.output_dir, PLAYLIST_NAME)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the playlist (and therefore a first segment) exists"""
+        return os.path.exists(self.playlist_path)
+
+    def touch(self):
+        """Record a viewer request and make sure the encoder runs"""
+        with self._lock:
+            self._last_request = time.monotonic()
+            if self._thread is None and self.ffmpeg is not None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f"HLS-{self.camera_name}", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the encoder and delete its files"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return self._stop.is_set() or time.monotonic() - self._last_request > self.idle_timeout
+
+    def _latest_frame(self) -> Optional[np.ndarray]:
+        rendered = self.hub.get(self.camera_name).rendered(self.profile.max_width, self.overlay)
+        if rendered is None:
+            return None
+        frame = rendered[1]
+        height, width = frame.shape[:2]
+        if width > self.profile.max_width:
+            frame = cv2.resize(frame, (self.profile.max_width, int(height * self.profile.max_width / width)))
+        return frame
+
+    def _clear_output(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _run(self):
+        while True:
+            self._feed()
+            with self._lock:
+                # FFmpeg has exited, so nothing writes to the directory any more
+                self._clear_output()
+                if self._stop.is_set() or time.monotonic() - self._last_request > self.idle_timeout:
+                    self._thread = None  # touch() starts a new thread for the next request
+                    return
+
+    def _feed(self):
+        """Encode until idle, restarting FFmpeg (with backoff) if it fails"""
+        interval = 1.0 / self.profile.fps
+        backoff = 1.0
+        while not self._idle():
+            frame = self._latest_frame()
+            if frame is None:
+                self._stop.wait(interval)  # No frame from the camera yet
+                continue
+            try:
+                self._encode(frame, interval)
+                backoff = 1.0
+            except OSError as e:
+                self.last_error = str(e)[:200]
+                logger.warning("[%s] HLS encoder failed: %s", self.camera_name, self.last_error)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _encode(self, frame: np.ndarray, interval: float):
+        """Run one FFmpeg process until idle or it exits"""
+        self._clear_output()
+        os.makedirs(self.output_dir, exist_ok=True)
+        height, width = frame.shape[:2]
+        process = subprocess.Popen(ffmpeg_command(self.ffmpeg, (width, height), self.profile, self.output_dir),
+                                   stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.processes_started += 1
+        logger.info("[%s] HLS encoder started (%dx%d @ %d fps)", self.camera_name, width, height, self.profile.fps)
+
+        try:
+            next_tick = time.monotonic()
+            while not self._idle():
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height))  # Camera resolution changed mid-stream
+                process.stdin.write(np.ascontiguousarray(frame).tobytes())
+                self.frames_written += 1
+
+                next_tick += interval
+                self._stop.wait(max(0.0, next_tick - time.monotonic()))
+                latest = self._latest_frame()
+                if latest is not None:  # Otherwise repeat the last frame (camera restarting)
+                    frame = latest
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            stderr = process.stderr.read().decode('utf-8', 'replace').strip()
+            process.stderr.close()
+            if process.returncode and stderr:
+                self.last_error = stderr[-200:]
+                logger.warning("[%s] HLS encoder exited with %d: %s", self.camera_name,
+                               process.returncode, self.last_error)
+
+    def get_stats(self) -> dict:
+        segments = 0
+        if os.path.isdir(self.output_dir):
+            segments = sum(1 for name in os.listdir(self.output_dir) if _SEGMENT_FILE.match(name))
+        return {
+            'running': self._thread is not None,
+            'ready': self.ready,
+            'segments': segments,
+            'processes_started': self.processes_started,
+            'frames_written': self.frames_written,
+            'last_error': self.last_error
+        }
+
+
+class HLSHub:
+    """One HLSStream per camera, each writing to its own directory under `root_dir`"""
+
+    def __init__(self, hub: BroadcastHub, root_dir: str, profile: Optional[HLSProfile] = None,
+                 ffmpeg: Optional[str] = FFMPEG_PATH, idle_timeout: float = 30.0):
+        self.hub = hub
+        self.root_dir = root_dir
+        self.profile = profile or hls_profile_from_env()
+        self.ffmpeg = ffmpeg
+        self.idle_timeout = idle_timeout
+        self._streams: Dict[str, HLSStream] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def get(self, camera_name: str) -> HLSStream:
+        """Stream of a camera, created on first use"""
+        with self._lock:
+            stream = self._streams.get(camera_name)
+            if stream is None:
+                directory = re.sub(r'[^A-Za-z0-9_-]', '_', camera_name)
+                stream = HLSStream(self.hub, camera_name, os.path.join(self.root_dir, directory), self.profile,
+                                   ffmpeg=self.ffmpeg, idle_timeout=self.idle_timeout)
+                self._streams[camera_name] = stream
+            return stream
+
+    def remove(self, camera_name: str):
+        with self._lock:
+            stream = self._streams.pop(camera_name, None)
+        if stream is not None:
+            stream.stop()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            streams = dict(self._streams)
+        return {name: stream.get_stats() for name, stream in streams.items()}
@@ -0,0 +1,314 @@
+"""
+MJPEG Relay
+Passthrough live view: relays a camera's own JPEG parts to viewers without
+decoding or re-encoding, over one shared upstream connection per camera
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+_BOUNDARY = re.compile(rb'boundary="?([^";]+)"?', re.IGNORECASE)
+_CONTENT_LENGTH = re.compile(rb'content-length:\s*(\d+)', re.IGNORECASE)
+_SOI, _EOI = b'\xff\xd8', b'\xff\xd9'
+
+
+class MultipartJPEGParser:
+    """
+    Incremental parser for multipart/x-mixed-replace JPEG streams
+
+    Parts are delimited by the boundary from the response Content-Type and
+    sized by their Content-Length header when the camera sends one. Without
+    a boundary the stream is cut at JPEG start/end markers instead.
+    """
+
+    def __init__(self, content_type: str = '', max_buffer: int = 8 * 1024 * 1024):
+        """
+        Initialize parser
+
+        Args:
+            content_type: Content-Type header of the upstream response
+            max_buffer: Bytes kept while looking for the end of a part (more = corrupt stream)
+        """
+        match = _BOUNDARY.search(content_type.encode('latin-1'))
+        boundary = match.group(1).strip() if match else None
+        if boundary and boundary.startswith(b'--'):
+            boundary = boundary[2:]  # Some cameras repeat the dashes in the header
+        self._delimiter = b'--' + boundary if boundary else None
+        self._buffer = bytearray()
+        self.max_buffer = max_buffer
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add upstream bytes; returns the JPEG images completed by them"""
+        self._buffer += chunk
+        parts = self._split_boundary() if self._delimiter else self._split_markers()
+        if len(self._buffer) > self.max_buffer:
+            logger.warning("MJPEG part larger than %d bytes, resynchronizing", self.max_buffer)
+            self._buffer.clear()
+        return parts
+
+    def _split_boundary(self) -> List[bytes]:
+        parts = []
+        buffer, delimiter = self._buffer, self._delimiter
+        while True:
+            start = buffer.find(delimiter)
+            if start < 0:
+                del buffer[:max(0, len(buffer) - len(delimiter))]
+                break
+            headers_end = buffer.find(b'\r\n\r\n', start)
+            if headers_end < 0:
+                del buffer[:start]
+                break
+            body_start = headers_end + 4
+
+            length = _CONTENT_LENGTH.search(buffer, start, headers_end)
+            if length:
+                body_end = body_start + int(length.group(1))
+                if len(buffer) < body_end:
+                    del buffer[:start]
+                    break
+                body = bytes(buffer[body_start:body_end])
+            else:
+                body_end = buffer.find(delimiter, body_start)
+                if body_end < 0:
+                    del buffer[:start]
+                    break
+                body = bytes(buffer[body_start:body_end]).rstrip(b'\r\n')
+
+            del buffer[:body_end]
+            if body.startswith(_SOI):
+                parts.append(body)
+        return parts
+
+    def _split_markers(self) -> List[bytes]:
+        parts = []
+        buffer = self._buffer
+        while True:
+            start = buffer.find(_SOI)
+            if start < 0:
+                del buffer[:max(0, len(buffer) - 1)]
+                break
+            end = buffer.find(_EOI, start + 2)
+            if end < 0:
+                del buffer[:start]
+                break
+            parts.append(bytes(buffer[start:end + 2]))
+            del buffer[:end + 2]
+        return parts
+
+
+class MJPEGRelay:
+    """
+    Shared upstream MJPEG connection of one camera
+
+    The first viewer starts a reader thread that keeps the latest JPEG part
+    with a version number; all viewers are served from it. The connection
+    is closed once nobody has watched for `idle_timeout` seconds, and
+    reopened (with backoff) if the camera drops it. Viewers limited to a
+    lower frame rate skip parts; nothing is decoded or re-encoded.
+    """
+
+    def __init__(self, camera_name: str, url: str, idle_timeout: float = 5.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 10.0, chunk_size: int = 64 * 1024):
+        """
+        Initialize relay
+
+        Args:
+            camera_name: Camera being relayed
+            url: HTTP(S) MJPEG URL of the camera
+            idle_timeout: Seconds without viewers before the upstream is closed
+            connect_timeout: Upstream connect timeout in seconds
+            read_timeout: Upstream read timeout in seconds
+            chunk_size: Bytes read from the upstream at a time
+        """
+        self.camera_name = camera_name
+        self.url = url
+        self.idle_timeout = idle_timeout
+        self.timeout = (connect_timeout, read_timeout)
+        self.chunk_size = chunk_size
+
+        self.version = 0
+        self.closed = False
+        self._part: Optional[bytes] = None
+        self._viewers = 0
+        self._last_viewer = time.monotonic()
+        self._thread = None
+        self._changed = threading.Condition()
+
+        self.connections = 0
+        self.parts_received = 0
+        self.parts_sent = 0
+        self.parts_dropped = 0
+        self.last_error = None
+
+    # ---------------------------------------------------------------- upstream
+
+    def _ensure_reader(self):
+        with self._changed:
+            if self._thread is None and not self.closed:
+                self._thread = threading.Thread(target=self._run, name=f"MJPEGRelay-{self.camera_name}", daemon=True)
+                self._thread.start()
+
+    def _idle(self) -> bool:
+        with self._changed:
+            return self.closed or (self._viewers == 0 and
+                                   time.monotonic() - self._last_viewer > self.idle_timeout)
+
+    def _run(self):
+        backoff = 1.0
+        session = requests.Session()
+        try:
+            while not self._idle():
+                try:
+                    self._relay(session)
+                    backoff = 1.0
+                    if not self._idle():
+                        time.sleep(0.5)  # Camera ended the stream; reconnect without hammering it
+                except requests.RequestException as e:
+                    self.last_error = str(e)[:200]
+                    logger.warning("[%s] Passthrough upstream failed: %s", self.camera_name, self.last_error)
+                    if self._idle():
+                        break
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+        finally:
+            session.close()
+            with self._changed:
+                self._thread = None
+                self._changed.notify_all()
+
+            # A viewer may have arrived while the reader was shutting down
+            if not self._idle():
+                self._ensure_reader()
+
+    def _chunks(self, response: requests.Response) -> Iterator[bytes]:
+        """Upstream bytes as soon as they arrive (iter_content would wait for full chunks)"""
+        read1 = getattr(response.raw, 'read1', None)  # urllib3 >= 2
+        if read1 is None:
+            yield from response.iter_content(chunk_size=1024)
+            return
+        while True:
+            chunk = read1(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _relay(self, session: requests.Session):
+        """Read one upstream connection until it ends or nobody is watching"""
+        with session.get(self.url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            self.connections += 1
+            parser = MultipartJPEGParser(response.headers.get('Content-Type', ''))
+            logger.info("[%s] Passthrough upstream connected", self.camera_name)
+
+            for chunk in self._chunks(response):
+                for part in parser.feed(chunk):
+                    with self._changed:
+                        self._part = part
+                        self.version += 1
+                        self.parts_received += 1
+                        self._changed.notify_all()
+                if self._idle():
+                    logger.info("[%s] No passthrough viewers, closing upstream", self.camera_name)
+                    return
+
+    # ----------------------------------------------------------------- viewers
+
+    def latest(self) -> Optional[bytes]:
+        """Latest JPEG part (None before the first one arrives)"""
+        return self._part
+
+    def stream(self, max_fps: float = 0.0) -> Iterator[bytes]:
+        """
+        MJPEG multipart parts for one viewer
+
+        Args:
+            max_fps: Drop parts arriving faster than this (0 = relay every part)
+        """
+        min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        with self._changed:
+            self._viewers += 1
+        self._ensure_reader()
+        try:
+            last_version, last_sent = 0, 0.0
+            while not self.closed:
+                with self._changed:
+                    if not self._changed.wait_for(lambda: self.closed or self.version > last_version, 1.0):
+                        continue
+                    if self.closed:
+                        break
+                    skipped = self.version - last_version - 1
+                    last_version, part = self.version, self._part
+                if last_sent and skipped > 0:
+                    self.parts_dropped += skipped
+
+                now = time.monotonic()
+                if now - last_sent < min_interval:
+                    self.parts_dropped += 1
+                    continue
+                last_sent = now
+                self.parts_sent += 1
+                yield (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(part)
+                       + part + b'\r\n')
+        finally:
+            with self._changed:
+                self._viewers -= 1
+                self._last_viewer = time.monotonic()
+
+    def close(self):
+        """End all viewers and the upstream connection"""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    def get_stats(self) -> dict:
+        return {
+            'viewers': self._viewers,
+            'upstream_open': self._thread is not None,
+            'connections': self.connections,
+            'parts_received': self.parts_received,
+            'parts_sent': self.parts_sent,
+            'parts_dropped': self.parts_dropped,
+            'last_error': self.last_error
+        }
+
+
+class PassthroughHub:
+    """One MJPEGRelay per camera"""
+
+    def __init__(self, idle_timeout: float = 5.0):
+        self.idle_timeout = idle_timeout
+        self._relays: Dict[str, MJPEGRelay] = {}
+        self._lock = threading.Lock()
+
+    def get(self, camera_name: str, url: str) -> MJPEGRelay:
+        """Relay of a camera, created on first use (and again if its URL changed)"""
+        with self._lock:
+            relay = self._relays.get(camera_name)
+            if relay is None or relay.closed or relay.url != url:
+                if relay is not None:
+                    relay.close()
+                relay = MJPEGRelay(camera_name, url, idle_timeout=self.idle_timeout)
+                self._relays[camera_name] = relay
+            return relay
+
+    def remove(self, camera_name: str):
+        with self._lock:
+            relay = self._relays.pop(camera_name, None)
+        if relay is not None:
+            relay.close()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            relays = dict(self._relays)
+        return {name: relay.get_stats() for name, relay in relays.items()}
@@ -0,0 +1,228 @@
+"""
+Mosaic
+Composes the live frames of all active cameras into one tiled stream
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from app.services.frame_broadcast import BroadcastHub, FrameBroadcaster
+from app.services.snapshot_service import SnapshotProfile
+
+logger = logging.getLogger(__name__)
+
+MOSAIC_TIER = 'mosaic'
+
+# Requested settings are snapped to these, so query strings map onto a handful of shared streams
+MOSAIC_WIDTHS = (640, 960, 1280, 1920, 2560, 3840)
+MOSAIC_COLUMNS = (0, 1, 2, 3, 4, 6, 8)
+MOSAIC_FPS = (1, 2, 5, 10, 15, 20, 30)
+
+
+def snap(value: float, presets: tuple):
+    """Preset closest to `value`"""
+    return min(presets, key=lambda preset: abs(preset - value))
+
+
+class MosaicLayout:
+    """Grid geometry: output width, columns (0 = as square as possible) and tile aspect ratio"""
+
+    def __init__(self, width: int = 1280, columns: int = 0, aspect: float = 16 / 9):
+        self.width = width
+        self.columns = columns
+        self.aspect = aspect
+
+    def grid(self, count: int) -> Tuple[int, int]:
+        """(columns, rows) for `count` tiles"""
+        columns = self.columns or max(1, math.ceil(math.sqrt(count)))
+        return columns, max(1, math.ceil(count / columns))
+
+    def tiles(self, count: int) -> Tuple[int, int, List[Tuple[int, int]]]:
+        """Canvas size and the top-left corner of each tile"""
+        columns, rows = self.grid(count)
+        tile_w = self.width // columns
+        tile_h = int(tile_w / self.aspect)
+        origins = [((i % columns) * tile_w, (i // columns) * tile_h) for i in range(count)]
+        return tile_w, tile_h, origins
+
+
+class MosaicStream:
+    """
+    One tiled stream (for one layout, frame rate and overlay setting)
+
+    A compose thread runs while someone watches: every tick it takes each
+    active camera's latest frame from the BroadcastHub (already scaled to
+    the tile width, and shared with live views of that width), pastes it
+    into the grid and publishes the result to its own FrameBroadcaster.
+    The mosaic is therefore composed and encoded once per tick however many
+    viewers there are, and ticks where no camera has a new frame are
+    skipped entirely.
+    """
+
+    def __init__(self, hub: BroadcastHub, cameras: Callable[[], List[str]], layout: MosaicLayout,
+                 fps: float = 5.0, quality: int = 70, overlay: bool = True, idle_timeout: float = 10.0,
+                 on_idle: Optional[Callable[['MosaicStream'], None]] = None):
+        """
+        Initialize mosaic stream
+
+        Args:
+            hub: Per-camera frame broadcasters
+            cameras: Returns the names of the cameras to show, in order
+            layout: Grid geometry
+            fps: Compositions per second
+            quality: JPEG quality of the mosaic
+            overlay: Draw the AI overlays on the tiles
+            idle_timeout: Seconds without viewers before the compose thread stops
+            on_idle: Called with this stream after its compose thread stopped
+        """
+        self.hub = hub
+        self.cameras = cameras
+        self.layout = layout
+        self.fps = fps
+        self.overlay = overlay
+        self.idle_timeout = idle_timeout
+        self.on_idle = on_idle
+
+        self.broadcaster = FrameBroadcaster('mosaic', {MOSAIC_TIER: SnapshotProfile(max_width=0, quality=quality)})
+        self._sources: Optional[tuple] = None  # (camera, version) of the last composition
+        self._thread = None
+        self._last_active = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.compositions = 0
+        self.ticks_skipped = 0
+
+    def compose(self) -> Optional[np.ndarray]:
+        """
+        Tile the latest frame of every camera
+
+        Returns:
+            The mosaic, or None if no camera has a new frame since the last one
+        """
+        cameras = self.cameras()
+        tile_w, tile_h, origins = self.layout.tiles(len(cameras))
+
+        tiles = []
+        for camera_name in cameras:
+            broadcaster = self.hub.get(camera_name)
+            tiles.append((camera_name, broadcaster.version, broadcaster.rendered(tile_w, self.overlay)))
+
+        sources = tuple((camera_name, version) for camera_name, version, _ in tiles)
+        if sources == self._sources:
+            return None
+        self._sources = sources
+
+        columns, rows = self.layout.grid(len(cameras))
+        canvas = np.zeros((rows * tile_h, columns * tile_w, 3), dtype=np.uint8)
+        for (camera_name, _, rendered), (x, y) in zip(tiles, origins):
+            if rendered is not None:
+                image = rendered[1]
+                height, width = image.shape[:2]
+                scale = min(tile_w / width, tile_h / height)
+                fitted_w, fitted_h = max(1, int(width * scale)), max(1, int(height * scale))
+                if (fitted_w, fitted_h) != (width, height):
+                    image = cv2.resize(image, (fitted_w, fitted_h))
+                offset_x, offset_y = x + (tile_w - fitted_w) // 2, y + (tile_h - fitted_h) // 2
+                canvas[offset_y:offset_y + fitted_h, offset_x:offset_x + fitted_w] = image
+            else:
+                cv2.putText(canvas, "No signal", (x + 10, y + tile_h // 2),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (128, 128, 128), 1)
+            cv2.putText(canvas, camera_name, (x + 8, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+        self.compositions += 1
+        return canvas
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        while True:
+            started = time.monotonic()
+            with self._lock:
+                if self.broadcaster.viewers:
+                    self._last_active = started
+                elif started - self._last_active > self.idle_timeout:
+                    self._thread = None  # stream() starts a new thread for the next viewer
+                    self.broadcaster.clear()  # Do not hold the last canvas while nobody watches
+                    break
+
+            try:
+                mosaic = self.compose()
+                if mosaic is None:
+                    self.ticks_skipped += 1
+                else:
+                    self.broadcaster.publish(mosaic)
+            except Exception as e:
+                logger.error("Mosaic composition failed: %s", e)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+        if self.on_idle is not None:
+            self.on_idle(self)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def stream(self):
+        """MJPEG parts of the mosaic for one viewer"""
+        with self._lock:
+            self._last_active = time.monotonic()
+            if self._thread is None:
+                self._sources = None  # Compose right away for the first viewer
+                self._thread = threading.Thread(target=self._run, name="MosaicComposer", daemon=True)
+                self._thread.start()
+            return self.broadcaster.stream(MOSAIC_TIER, max_fps=self.fps)
+
+    def get_stats(self) -> dict:
+        return {
+            'width': self.layout.width,
+            'columns': self.layout.columns,
+            'fps': self.fps,
+            'overlay': self.overlay,
+            'running': self.running,
+            'compositions': self.compositions,
+            'ticks_skipped': self.ticks_skipped,
+            **self.broadcaster.get_stats()
+        }
+
+
+class MosaicHub:
+    """
+    Mosaic streams by configuration, so viewers with the same settings share one
+
+    Width, columns and frame rate are snapped to the MOSAIC_* presets, and a
+    stream is dropped once its compose thread stops for lack of viewers.
+    """
+
+    def __init__(self, hub: BroadcastHub, cameras: Callable[[], List[str]], quality: int = 70):
+        self.hub = hub
+        self.cameras = cameras
+        self.quality = quality
+        self._streams: Dict[tuple, MosaicStream] = {}
+        self._lock = threading.Lock()
+
+    def get(self, width: int = 1280, columns: int = 0, fps: float = 5.0, overlay: bool = True) -> MosaicStream:
+        key = (snap(width, MOSAIC_WIDTHS), snap(columns, MOSAIC_COLUMNS), snap(fps, MOSAIC_FPS), bool(overlay))
+        with self._lock:
+            mosaic = self._streams.get(key)
+            if mosaic is None:
+                width, columns, fps, overlay = key
+                mosaic = MosaicStream(self.hub, self.cameras, MosaicLayout(width, columns),
+                                      fps=fps, quality=self.quality, overlay=overlay, on_idle=self._idle)
+                self._streams[key] = mosaic
+            return mosaic
+
+    def _idle(self, mosaic: MosaicStream):
+        """Forget a stream whose compose thread stopped (unless a viewer restarted it meanwhile)"""
+        with self._lock:
+            for key, existing in list(self._streams.items()):
+                if existing is mosaic and not mosaic.running:
+                    del self._streams[key]
+
+    def get_stats(self) -> list:
+        with self._lock:
+            return [mosaic.get_stats() for mosaic in self._streams.values()]
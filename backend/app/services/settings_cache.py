@@ -0,0 +1,296 @@
+"""
+Settings Cache
+Process-wide cache of system settings and camera configuration, kept up to
+date in the background and pushing change events to subscribers
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Camera fields that change on their own (status heartbeats) and do not raise change events
+VOLATILE_CAMERA_FIELDS = ('status', 'last_seen', 'updated_at')
+
+
+@dataclass
+class ConfigChange:
+    """A settings category or camera configuration that changed"""
+    kind: str  # 'settings' or 'camera'
+    key: str  # Settings category or camera name
+    old: Optional[Dict[str, Any]]  # None if added
+    new: Optional[Dict[str, Any]]  # None if removed
+    version: int  # Cache version after the change
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        old, new = self.old or {}, self.new or {}
+        return {field for field in set(old) | set(new) if old.get(field) != new.get(field)}
+
+
+def load_settings_from_db() -> Dict[str, Dict[str, Any]]:
+    """All settings categories from MongoDB, each merged over its defaults"""
+    from database.models import settings_model
+
+    collection = settings_model.collection
+    if collection is None:
+        raise ConnectionError("MongoDB not connected")
+
+    settings = settings_model._get_default_settings()
+    for doc in collection.find({}, {'category': 1, 'settings': 1}):
+        category = doc.get('category')
+        if category:
+            settings[category] = {**settings.get(category, {}), **(doc.get('settings') or {})}
+    return settings
+
+
+def load_cameras_from_db() -> Dict[str, Dict[str, Any]]:
+    """Camera documents from MongoDB keyed by camera name"""
+    from database.models import camera_model
+
+    collection = camera_model.collection
+    if collection is None:
+        raise ConnectionError("MongoDB not connected")
+
+    cameras = {}
+    for doc in collection.find():
+        doc['id'] = str(doc.pop('_id'))
+        if doc.get('name'):
+            cameras[doc['name']] = doc
+    return cameras
+
+
+def default_settings() -> Dict[str, Dict[str, Any]]:
+    from database.models import settings_model
+    return settings_model._get_default_settings()
+
+
+class SettingsCache:
+    """
+    In-memory settings and camera configuration
+
+    The first read loads everything once. After start(), a background thread
+    follows MongoDB change streams on the settings and cameras collections
+    and reloads on every change; when change streams are not available
+    (standalone server) it reloads every `poll_interval` seconds instead.
+    Each reload is diffed against the cache: changed categories and cameras
+    bump the cache version and are pushed to subscribers as ConfigChange
+    events. Reads never touch the database.
+
+    Returned dictionaries are shared: treat them as read-only.
+    """
+
+    def __init__(self, load_settings: Callable[[], Dict] = load_settings_from_db,
+                 load_cameras: Callable[[], Dict] = load_cameras_from_db,
+                 defaults: Callable[[], Dict] = default_settings,
+                 poll_interval: float = 10.0, use_change_streams: bool = True):
+        """
+        Initialize cache
+
+        Args:
+            load_settings: Returns {category: settings}; raises if the database is unavailable
+            load_cameras: Returns {camera name: camera document}; raises if unavailable
+            defaults: Settings used until the first successful load
+            poll_interval: Seconds between reloads when change streams are unavailable
+            use_change_streams: Try MongoDB change streams before falling back to polling
+        """
+        self._load_settings = load_settings
+        self._load_cameras = load_cameras
+        self._defaults = defaults
+        self.poll_interval = poll_interval
+        self.use_change_streams = use_change_streams
+
+        self._settings: Dict[str, Dict[str, Any]] = {}
+        self._cameras: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._subscribers: List[tuple] = []  # (callback, kind, key)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.version = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.change_source = None  # 'change_stream' or 'polling' once started
+
+    # ------------------------------------------------------------------ reads
+
+    def _ensure_loaded(self):
+        """Load once; without a database fall back to the defaults (the background thread keeps retrying)"""
+        if self._loaded:
+            return
+        if not self.reload(notify=False):
+            with self._lock:
+                if not self._loaded:
+                    self._settings = self._defaults()
+                    self._loaded = True
+
+    def get(self, category: str) -> Dict[str, Any]:
+        """Settings of one category (e.g. 'camera', 'alerts')"""
+        self._ensure_loaded()
+        return self._settings.get(category, {})
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._settings
+
+    def camera(self, name: str) -> Optional[Dict[str, Any]]:
+        """Camera document by name, or None if unknown"""
+        self._ensure_loaded()
+        return self._cameras.get(name)
+
+    # ---------------------------------------------------------- subscriptions
+
+    def subscribe(self, callback: Callable[[ConfigChange], None], kind: Optional[str] = None,
+                  key: Optional[str] = None) -> Callable[[], None]:
+        """
+        Receive change events
+
+        Args:
+            callback: Called with a ConfigChange (on the cache's background thread)
+            kind: Only 'settings' or only 'camera' events (None for both)
+            key: Only one settings category / camera name (None for all)
+
+        Returns:
+            Function that removes the subscription
+        """
+        entry = (callback, kind, key)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _notify(self, changes: List[ConfigChange]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for change in changes:
+            for callback, kind, key in subscribers:
+                if (kind is None or kind == change.kind) and (key is None or key == change.key):
+                    try:
+                        callback(change)
+                    except Exception as e:
+                        logger.error("Settings subscriber failed for %s %s: %s", change.kind, change.key, e)
+
+    # ---------------------------------------------------------------- reloads
+
+    @staticmethod
+    def _diff(kind: str, old: Dict, new: Dict, ignore=()) -> List[tuple]:
+        changed = []
+        for key in set(old) | set(new):
+            before, after = old.get(key), new.get(key)
+            if before is None or after is None:
+                if before is not after:
+                    changed.append((kind, key, before, after))
+            elif any(before.get(f) != after.get(f) for f in set(before) | set(after) if f not in ignore):
+                changed.append((kind, key, before, after))
+        return changed
+
+    def reload(self, notify: bool = True) -> bool:
+        """
+        Load settings and cameras and publish what changed
+
+        Returns:
+            True if the database could be read
+        """
+        try:
+            settings = self._load_settings()
+            cameras = self._load_cameras()
+        except Exception as e:
+            self.reload_errors += 1
+            logger.debug("Settings reload failed: %s", e)
+            return False
+
+        with self._lock:
+            first_load = not self._loaded
+            diffs = [] if first_load else (
+                self._diff('settings', self._settings, settings) +
+                self._diff('camera', self._cameras, cameras, VOLATILE_CAMERA_FIELDS))
+            self._settings = settings
+            self._cameras = cameras
+            self._loaded = True
+            self.reloads += 1
+
+            changes = []
+            for kind, key, old, new in diffs:
+                self.version += 1
+                changes.append(ConfigChange(kind, key, old, new, self.version))
+
+        if changes and notify:
+            for change in changes:
+                logger.info("🔄 %s '%s' changed: %s", change.kind.title(), change.key,
+                            ', '.join(sorted(change.changed_fields)) or 'added/removed')
+            self._notify(changes)
+        return True
+
+    # ------------------------------------------------------ background thread
+
+    def start(self):
+        """Load (if needed) and start following changes in the background"""
+        self._ensure_loaded()
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="SettingsCache", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        if self.use_change_streams and self._watch():
+            return
+
+        self.change_source = 'polling'
+        while not self._stop.wait(self.poll_interval):
+            self.reload()
+
+    def _watch(self) -> bool:
+        """Reload on every change stream event until stopped; False if change streams are unavailable"""
+        try:
+            from pymongo.errors import PyMongoError
+            from database.config import get_database, SETTINGS_COLLECTION, CAMERAS_COLLECTION
+        except ImportError:
+            return False
+
+        db = get_database()
+        if db is None:
+            return False
+
+        pipeline = [{'$match': {'ns.coll': {'$in': [SETTINGS_COLLECTION, CAMERAS_COLLECTION]}}}]
+        try:
+            with db.watch(pipeline, max_await_time_ms=1000) as stream:
+                self.change_source = 'change_stream'
+                self.reload()  # Pick up anything changed before the stream opened
+                while not self._stop.is_set():
+                    if stream.try_next() is not None:
+                        self.reload()
+        except PyMongoError as e:
+            logger.info("MongoDB change streams unavailable (%s), polling settings every %.0fs",
+                        str(e)[:80], self.poll_interval)
+            return False
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            'version': self.version,
+            'source': self.change_source,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors,
+            'cameras': len(self._cameras),
+            'subscribers': len(self._subscribers)
+        }
+
+
+# Shared by the camera pipelines and the alert manager
+settings_cache = SettingsCache(poll_interval=float(os.getenv('SETTINGS_POLL_INTERVAL', '10')))
@@ -0,0 +1,221 @@
+"""
+Snapshot Service
+Encodes alert snapshots off the camera thread and keeps encoded bytes for reuse (e.g. email)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SnapshotProfile:
+    """Encoding settings for one use of a snapshot"""
+    max_width: int  # Frames wider than this are downscaled (0 = keep full resolution)
+    quality: int  # JPEG quality 0-100
+
+
+def env_profile(prefix: str, max_width: int, quality: int) -> SnapshotProfile:
+    """Profile from <prefix>_MAX_WIDTH / <prefix>_QUALITY, with defaults"""
+    return SnapshotProfile(
+        max_width=int(os.getenv(f'{prefix}_MAX_WIDTH', str(max_width))),
+        quality=int(os.getenv(f'{prefix}_QUALITY', str(quality)))
+    )
+
+
+class SnapshotService:
+    """
+    Asynchronous snapshot encoder
+
+    save() hands the frame to a worker pool and returns immediately. A worker
+    encodes the frame once per profile: the 'archive' profile is written to
+    the snapshot path, the other profiles (e.g. 'email') are kept in a bounded
+    in-memory cache keyed by that path, so alert emails can attach the bytes
+    without reading the file back.
+
+    At most `max_pending` snapshots wait for a worker. When the queue is full
+    (slow disk, many cameras) save() encodes on the caller's thread instead,
+    so queued full-resolution frames cannot pile up without limit.
+
+    Frames are not copied: callers must not modify a frame after saving it.
+    """
+
+    ARCHIVE = 'archive'
+
+    def __init__(self, profiles: Optional[Dict[str, SnapshotProfile]] = None,
+                 max_workers: int = 2, cache_size: int = 64, max_pending: int = 16):
+        """
+        Initialize snapshot service
+
+        Args:
+            profiles: Profile name -> encoding settings ('archive' is written to disk)
+            max_workers: Encoder threads
+            cache_size: Number of snapshots whose encoded bytes are kept in memory
+            max_pending: Snapshots queued for the workers before save() encodes synchronously
+        """
+        self.profiles = profiles or {
+            self.ARCHIVE: SnapshotProfile(max_width=0, quality=95),
+            'email': SnapshotProfile(max_width=1280, quality=80)
+        }
+        self.cache_size = cache_size
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='SnapshotEncoder')
+        self._pending: Dict[str, Future] = {}
+        self._cache: 'OrderedDict[str, Dict[str, bytes]]' = OrderedDict()
+        self._created_dirs = set()
+        self._queued = 0  # Submitted and not finished (_pending is keyed by path)
+        self._full = False
+        self._lock = threading.Lock()
+
+        self.saved = 0
+        self.synchronous = 0
+        self.peak_pending = 0
+
+    @staticmethod
+    def encode(frame: np.ndarray, profile: SnapshotProfile) -> Optional[bytes]:
+        """
+        Encode a frame as JPEG with a profile's resolution and quality
+
+        Args:
+            frame: BGR image
+            profile: Encoding settings
+
+        Returns:
+            JPEG bytes or None if encoding failed
+        """
+        height, width = frame.shape[:2]
+        if profile.max_width and width > profile.max_width:
+            scale = profile.max_width / width
+            frame = cv2.resize(frame, (profile.max_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, profile.quality])
+        return buffer.tobytes() if ok else None
+
+    def save(self, frame: np.ndarray, path: str) -> str:
+        """
+        Queue a snapshot for encoding and writing
+
+        Args:
+            frame: BGR image (not copied)
+            path: File the archive encoding is written to (also the cache key)
+
+        Returns:
+            The snapshot path
+        """
+        with self._lock:
+            self.saved += 1
+            queue_full = self._queued >= self.max_pending
+            became_full, self._full = queue_full and not self._full, queue_full
+            if queue_full:
+                self.synchronous += 1
+            else:
+                self._queued += 1
+                self.peak_pending = max(self.peak_pending, self._queued)
+                self._pending[path] = self._executor.submit(self._encode_snapshot, frame, path, True)
+
+        if queue_full:
+            if became_full:
+                logger.warning("Snapshot queue full (%d pending): encoding on the caller's thread until it drains",
+                               self.max_pending)
+            self._encode_snapshot(frame, path)
+        return path
+
+    def is_known(self, path: str) -> bool:
+        """True if the snapshot is queued, cached or already on disk"""
+        with self._lock:
+            if path in self._pending or path in self._cache:
+                return True
+        return os.path.exists(path)
+
+    def _encode_snapshot(self, frame: np.ndarray, path: str, queued: bool = False):
+        """Worker: encode all profiles, write the archive file, cache the rest"""
+        encoded = {}
+        try:
+            for name, profile in self.profiles.items():
+                data = self.encode(frame, profile)
+                if data is not None:
+                    encoded[name] = data
+
+            archive = encoded.pop(self.ARCHIVE, None)
+            if archive is not None:
+                directory = os.path.dirname(path)
+                if directory and directory not in self._created_dirs:
+                    os.makedirs(directory, exist_ok=True)
+                    self._created_dirs.add(directory)
+                with open(path, 'wb') as f:
+                    f.write(archive)
+        except Exception as e:
+            logger.error("Snapshot encoding failed for %s: %s", path, e)
+        finally:
+            with self._lock:
+                if queued:
+                    self._queued -= 1
+                    self._pending.pop(path, None)
+                if encoded:
+                    self._cache[path] = encoded
+                    self._cache.move_to_end(path)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+    def get_encoded(self, path: str, profile: str = 'email', timeout: float = 5.0) -> Optional[bytes]:
+        """
+        Encoded bytes of a snapshot, waiting for a pending encode if needed
+
+        Args:
+            path: Snapshot path passed to save()
+            profile: Profile name
+            timeout: Seconds to wait for a pending encode
+
+        Returns:
+            JPEG bytes, or None if the snapshot is unknown or was evicted
+        """
+        with self._lock:
+            future = self._pending.get(path)
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception as e:
+                logger.warning("Snapshot %s not ready: %s", path, e)
+                return None
+
+        with self._lock:
+            return self._cache.get(path, {}).get(profile)
+
+    def get_stats(self) -> dict:
+        return {
+            'pending': self._queued,
+            'max_pending': self.max_pending,
+            'peak_pending': self.peak_pending,
+            'saved': self.saved,
+            'synchronous': self.synchronous,
+            'cached': len(self._cache)
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Finish queued snapshots and stop the workers"""
+        self._executor.shutdown(wait=wait)
+
+
+_profiles = {
+    SnapshotService.ARCHIVE: env_profile('SNAPSHOT_ARCHIVE', 0, 95),
+    'email': env_profile('SNAPSHOT_EMAIL', 1280, 80)
+}
+if float(os.getenv('EMAIL_DIGEST_WINDOW', '0')) > 0:
+    _profiles['thumbnail'] = env_profile('SNAPSHOT_THUMBNAIL', 320, 60)  # Only digest emails use it
+
+# Shared by the camera threads (save) and the email service (get_encoded)
+snapshot_service = SnapshotService(
+    profiles=_profiles,
+    max_workers=int(os.getenv('SNAPSHOT_WORKERS', '2')),
+    cache_size=int(os.getenv('SNAPSHOT_CACHE_SIZE', '64')),
+    max_pending=int(os.getenv('SNAPSHOT_MAX_PENDING', '16'))
+)
@@ -0,0 +1,173 @@
+"""
+Stream Pacing
+Per-client adaptation of live view quality and frame rate to the client's bandwidth
+"""
+
+import itertools
+import os
+import time
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Steps from best to cheapest: (quality tier, frames per second)
+PACING_LADDER: List[Tuple[str, float]] = [
+    ('high', 20), ('medium', 20), ('medium', 10), ('low', 10), ('low', 5), ('low', 2)
+]
+ADAPTIVE_STREAMS = os.getenv('STREAM_ADAPTIVE', '1') != '0'
+
+
+class ClientPacer:
+    """
+    Tier and frame rate for one live view client
+
+    After each frame the stream reports how long the client took to accept
+    it: the time the server blocked writing the part, which stays short
+    while the socket buffer has room and grows once the client cannot keep
+    up. The smoothed send time is compared with the frame interval of the
+    current step. Above `step_down_at` of the interval the client moves one
+    step down the ladder (smaller or fewer frames); below `step_up_at` for
+    `step_up_after` seconds it moves one step back up, never above its
+    ceiling.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, camera_name: str, ladder: Optional[List[Tuple[str, float]]] = None,
+                 start: int = 1, ceiling: int = 0, client: str = '',
+                 step_down_at: float = 0.8, step_up_at: float = 0.3, step_up_after: float = 5.0,
+                 min_samples: int = 3, smoothing: float = 0.3):
+        """
+        Initialize pacer
+
+        Args:
+            camera_name: Camera being watched
+            ladder: (tier, fps) steps from best to cheapest
+            start: Ladder index to start at
+            ceiling: Best ladder index the client may step up to
+            client: Client address (for the stats)
+            step_down_at: Send time / frame interval above which the client steps down
+            step_up_at: Send time / frame interval below which the client may step up
+            step_up_after: Seconds of headroom before stepping up
+            min_samples: Frames sent at a step before it can be left
+            smoothing: Weight of the newest send time in the moving average
+        """
+        self.id = next(self._ids)
+        self.camera_name = camera_name
+        self.client = client
+        self.ladder = ladder or PACING_LADDER
+        self.ceiling = min(max(ceiling, 0), len(self.ladder) - 1)
+        self.level = min(max(start, self.ceiling), len(self.ladder) - 1)
+        self.step_down_at = step_down_at
+        self.step_up_at = step_up_at
+        self.step_up_after = step_up_after
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+
+        self.send_time = 0.0  # Smoothed seconds per frame
+        self._samples = 0  # Frames sent at the current level
+        self._headroom_since: Optional[float] = None
+        self.connected_at = time.monotonic()
+
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.bytes_sent = 0
+        self.step_downs = 0
+        self.step_ups = 0
+
+    @classmethod
+    def for_quality(cls, camera_name: str, quality: str = 'auto', **kwargs) -> 'ClientPacer':
+        """
+        Pacer for a ?quality= value: 'auto' starts at medium and may use the
+        whole ladder, a tier name starts at that tier and never goes above it
+        """
+        ladder = kwargs.pop('ladder', None) or PACING_LADDER
+        tiers = [tier for tier, _ in ladder]
+        if quality in tiers:
+            ceiling = tiers.index(quality)
+            return cls(camera_name, ladder, start=ceiling, ceiling=ceiling, **kwargs)
+        return cls(camera_name, ladder, start=tiers.index('medium') if 'medium' in tiers else 0, **kwargs)
+
+    @property
+    def tier(self) -> str:
+        return self.ladder[self.level][0]
+
+    @property
+    def fps(self) -> float:
+        return self.ladder[self.level][1]
+
+    @property
+    def utilization(self) -> float:
+        """Share of the frame interval spent sending"""
+        return self.send_time * self.fps
+
+    def record(self, send_seconds: float, size: int, skipped: int = 0) -> bool:
+        """
+        Account for one sent frame and adapt
+
+        Args:
+            send_seconds: Time the client took to accept the frame
+            size: Bytes sent
+            skipped: Newer frames published while the client was busy (never sent)
+
+        Returns:
+            True if the client moved to another step
+        """
+        self.frames_sent += 1
+        self.frames_skipped += skipped
+        self.bytes_sent += size
+        self._samples += 1
+        if self.frames_sent == 1:
+            self.send_time = send_seconds
+        else:
+            self.send_time += self.smoothing * (send_seconds - self.send_time)
+
+        if self._samples < self.min_samples:
+            return False
+
+        utilization = self.utilization
+        if utilization > self.step_down_at:
+            self._headroom_since = None
+            if self.level < len(self.ladder) - 1:
+                return self._move(+1)
+        elif utilization < self.step_up_at:
+            now = time.monotonic()
+            if self._headroom_since is None:
+                self._headroom_since = now
+            if now - self._headroom_since >= self.step_up_after and self.level > self.ceiling:
+                return self._move(-1)
+        else:
+            self._headroom_since = None
+        return False
+
+    def _move(self, step: int) -> bool:
+        self.level += step
+        self._samples = 0
+        self._headroom_since = None
+        if step > 0:
+            self.step_downs += 1
+        else:
+            self.step_ups += 1
+        logger.debug("[%s] Client %s -> %s @ %g fps (send %.0f ms)", self.camera_name, self.client or self.id,
+                     self.tier, self.fps, self.send_time * 1000)
+        return True
+
+    def get_stats(self) -> dict:
+        connected = max(time.monotonic() - self.connected_at, 1e-6)
+        return {
+            'id': self.id,
+            'camera': self.camera_name,
+            'client': self.client,
+            'tier': self.tier,
+            'fps': self.fps,
+            'level': self.level,
+            'send_ms': round(self.send_time * 1000, 1),
+            'utilization': round(self.utilization, 2),
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped,
+            'kbps': round(self.bytes_sent * 8 / 1000 / connected, 1),
+            'step_downs': self.step_downs,
+            'step_ups': self.step_ups,
+            'connected_s': round(connected, 1)
+        }
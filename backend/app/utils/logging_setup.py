@@ -0,0 +1,233 @@
+"""
+Logging setup for the surveillance pipeline
+Per-module levels, per-key rate limiting and sampling, JSON-lines rotating file output
+
+Only DEBUG and INFO records are rate limited or sampled; warnings, errors and
+alerts are always written. Hot-path code should log through a module logger with %-style arguments
+(``logger.debug("Faces: %d", count)``) so nothing is formatted when the level is
+disabled. Optional ``extra`` fields understood by the filters:
+
+    rate_key      - key to rate limit on (default: logger name + message template),
+                    e.g. ``('yolo', camera_name)`` to give each camera its own budget
+    sample_every  - keep only 1 in N records for the key
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+DEFAULT_LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+DEFAULT_RATE_INTERVAL = 10.0  # seconds
+DEFAULT_RATE_BURST = 5  # records per key per interval
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+_FILTER_ATTRS = {'rate_key', 'sample_every', '_hot_path_allowed'}
+
+_configured_handlers = []
+
+
+def _record_key(record: logging.LogRecord):
+    """Rate limiting / sampling key: explicit rate_key or logger name + message template"""
+    key = getattr(record, 'rate_key', None)
+    if key is None:
+        key = (record.name, record.msg)
+    return key
+
+
+class HotPathFilter(logging.Filter):
+    """
+    Per-key rate limiting and sampling of DEBUG/INFO records
+
+    Records at `passthrough_level` (WARNING) or above are never dropped. At most `burst` records per key are let through every `interval` seconds.
+    Records logged with ``extra={'sample_every': N}`` are additionally thinned
+    to 1 in N. The first record after a window with suppressed records carries
+    a ``suppressed`` count.
+
+    The same instance can be attached to several handlers: the decision is
+    stored on the record, so a record is only counted once.
+    """
+
+    def __init__(self, interval: float = DEFAULT_RATE_INTERVAL, burst: int = DEFAULT_RATE_BURST,
+                 passthrough_level: int = logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.passthrough_level = passthrough_level
+        self._windows: Dict = {}  # key -> [window_start, passed, suppressed]
+        self._samples: Dict = {}  # key -> records seen
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        allowed = getattr(record, '_hot_path_allowed', None)
+        if allowed is not None:
+            return allowed
+
+        allowed = self._decide(record)
+        record._hot_path_allowed = allowed
+        return allowed
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.passthrough_level:
+            return True
+
+        key = _record_key(record)
+        now = time.monotonic()
+
+        with self._lock:
+            sample_every = getattr(record, 'sample_every', None)
+            if sample_every and sample_every > 1:
+                seen = self._samples.get(key, 0)
+                self._samples[key] = seen + 1
+                if seen % sample_every:
+                    return False
+
+            if self.burst <= 0:
+                return True
+
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+
+        for name, value in vars(record).items():
+            if name in _RESERVED_ATTRS or name in _FILTER_ATTRS:
+                continue
+            entry[name] = value
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_module_levels(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse per-module levels
+
+    Args:
+        spec: Comma separated ``module=LEVEL`` pairs,
+            e.g. ``"surveillance=WARNING,multi_camera=DEBUG"``
+
+    Returns:
+        Dictionary of logger name -> numeric level
+    """
+    levels = {}
+    if not spec:
+        return levels
+
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if '=' not in item:
+            raise ValueError(f"Invalid module level '{item}', expected module=LEVEL")
+
+        name, level = item.split('=', 1)
+        numeric = logging.getLevelName(level.strip().upper())
+        if not isinstance(numeric, int):
+            raise ValueError(f"Unknown log level '{level}' for module '{name}'")
+        levels[name.strip()] = numeric
+
+    return levels
+
+
+def configure_logging(level: Optional[str] = None,
+                      module_levels: Optional[str] = None,
+                      log_file: Optional[str] = None,
+                      console: bool = True,
+                      rate_interval: Optional[float] = None,
+                      rate_burst: Optional[int] = None) -> HotPathFilter:
+    """
+    Configure root logging for the surveillance services
+
+    Every argument falls back to an environment variable: LOG_LEVEL,
+    LOG_MODULE_LEVELS, LOG_FILE, LOG_RATE_INTERVAL, LOG_RATE_BURST (plus
+    LOG_MAX_BYTES / LOG_BACKUP_COUNT for file rotation). Calling it again
+    replaces the handlers installed by the previous call.
+
+    Args:
+        level: Root level name (default INFO)
+        module_levels: Per-module levels, see parse_module_levels
+        log_file: Path of the JSON-lines log file (disabled if empty)
+        console: Also log human readable lines to stderr
+        rate_interval: Rate limiting window in seconds
+        rate_burst: Records per key per window (0 disables rate limiting)
+
+    Returns:
+        The HotPathFilter shared by the installed handlers
+    """
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    module_levels = module_levels if module_levels is not None else os.getenv('LOG_MODULE_LEVELS', '')
+    log_file = log_file if log_file is not None else os.getenv('LOG_FILE', '')
+    if rate_interval is None:
+        rate_interval = float(os.getenv('LOG_RATE_INTERVAL', DEFAULT_RATE_INTERVAL))
+    if rate_burst is None:
+        rate_burst = int(os.getenv('LOG_RATE_BURST', DEFAULT_RATE_BURST))
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+
+    for handler in _configured_handlers:
+        root.removeHandler(handler)
+        handler.close()
+    _configured_handlers.clear()
+
+    hot_path_filter = HotPathFilter(interval=rate_interval, burst=rate_burst)
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(DEFAULT_LOG_FORMAT))
+        _configured_handlers.append(console_handler)
+
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv('LOG_MAX_BYTES', DEFAULT_MAX_BYTES)),
+            backupCount=int(os.getenv('LOG_BACKUP_COUNT', DEFAULT_BACKUP_COUNT)),
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        _configured_handlers.append(file_handler)
+
+    for handler in _configured_handlers:
+        handler.addFilter(hot_path_filter)
+        root.addHandler(handler)
+
+    for name, numeric in parse_module_levels(module_levels).items():
+        logging.getLogger(name).setLevel(numeric)
+
+    return hot_path_filter
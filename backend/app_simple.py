@@ -792,7 +792,7 @@ def create_app():
             return '', 204
             
         try:
-            from app.services.email_service import EmailService
+            from app.services.email_service import get_email_service
             
             data = request.get_json()
             
@@ -812,8 +812,8 @@ def create_app():
             if not recipient_emails:
                 return {'success': False, 'message': 'No valid email addresses found'}, 400
             
-            # Initialize email service
-            email_service = EmailService()
+            # Shared email service (pooled SendGrid connection)
+            email_service = get_email_service()
             
             # Prepare alert data for email
             alert_data = {
@@ -833,9 +833,8 @@ def create_app():
             
             for email in recipient_emails:
                 try:
-                    # Override recipient for individual emails
-                    email_service.recipient_email = email
-                    result = email_service.send_alert(alert_data)
+                    # Individual email per recipient, queued so the request does not wait for SendGrid
+                    result = email_service.send_alert(alert_data, recipients=[email], wait=False)
                     if result:
                         success_count += 1
                     else:
@@ -845,12 +844,12 @@ def create_app():
                     failed_recipients.append(email)
             
             if success_count > 0:
-                message = f'Email sent successfully to {success_count} recipient(s)'
+                message = f'Email queued for {success_count} recipient(s)'
                 if failed_recipients:
                     message += f'. Failed: {", ".join(failed_recipients)}'
                 return {'success': True, 'message': message}
             else:
-                return {'success': False, 'message': f'Failed to send to all recipients: {", ".join(failed_recipients)}'}, 500
+                return {'success': False, 'message': f'Failed to queue email for all recipients: {", ".join(failed_recipients)}'}, 500
                 
         except Exception as e:
             print(f"Error in send_alert_email: {e}")
@@ -1239,13 +1238,10 @@ def create_app():
             
             # Import email service
             try:
-                from app.services.email_service import EmailAlertService
+                from app.services.email_service import get_email_service
                 
-                # Initialize email service
-                email_service = EmailAlertService()
-                
-                # Override recipients for this specific email
-                email_service.recipients = [recipient_email]
+                # Shared email service (pooled SendGrid connection)
+                email_service = get_email_service()
                 
                 # Prepare alert data for email with escalation info
                 alert_data = {
@@ -1263,8 +1259,8 @@ def create_app():
                     'escalated_by': 'Dashboard User'  # Who escalated it
                 }
                 
-                # Send email using the EmailAlertService
-                success = email_service.send_alert(alert_data)
+                # Queue email to this recipient only (delivered and retried by the email dispatcher)
+                success = email_service.send_alert(alert_data, recipients=[recipient_email], wait=False)
                 
                 if success:
                     # Create log entry
@@ -1276,11 +1272,11 @@ def create_app():
                     
                     return {
                         'status': 'success',
-                        'message': f'Alert escalated to {recipient_name}',
+                        'message': f'Alert escalated to {recipient_name} (email queued)',
                         'email': recipient_email
                     }
                 else:
-                    print(f"❌ Email send failed for alert {alert_id}")
+                    print(f"❌ Email could not be queued for alert {alert_id}")
                     print(f"   Alert data: {alert_data}")
                     return {'status': 'error', 'errors': 'Failed to send email'}, 500
             except ImportError as e:
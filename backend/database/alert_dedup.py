@@ -0,0 +1,253 @@
+"""
+Alert Deduplication Index
+In-process TTL index shared by duplicate suppression and alert/email cooldowns
+"""
+
+import atexit
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY_FIELDS = ('camera_id', 'type', 'message')
+SNAPSHOT_INTERVAL = 5.0  # Minimum seconds between snapshot writes
+
+
+def parse_key_fields(spec: Optional[str]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Parse per-type key fields
+
+    Duplicate suppression for stored alerts only sees the stored fields
+    (camera_id, type, message, severity), so keys are mostly used to make
+    matching coarser than the default camera_id+type+message.
+
+    Args:
+        spec: Comma separated ``type=field+field`` pairs,
+            e.g. ``"intruder=camera_id+type,running=type"``
+
+    Returns:
+        Dictionary of alert type -> key fields
+    """
+    key_fields = {}
+    if not spec:
+        return key_fields
+
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if '=' not in item:
+            raise ValueError(f"Invalid dedup key '{item}', expected type=field+field")
+
+        alert_type, fields = item.split('=', 1)
+        key_fields[alert_type.strip()] = tuple(f.strip() for f in fields.split('+') if f.strip())
+
+    return key_fields
+
+
+class AlertDedupIndex:
+    """
+    TTL index of recently raised alert keys
+
+    A key is built from the alert fields configured for its type (or
+    DEFAULT_KEY_FIELDS) inside a scope, e.g. 'db' for duplicate inserts and
+    'email' for email cooldowns. A key stays active until its TTL expires;
+    expired keys are evicted lazily from a heap ordered by expiry. With a
+    snapshot path the active keys are written to disk (throttled) and reloaded
+    on start, so cooldowns survive restarts.
+    """
+
+    def __init__(self, key_fields: Optional[Dict[str, Sequence[str]]] = None,
+                 snapshot_path: Optional[str] = None):
+        """
+        Initialize index
+
+        Args:
+            key_fields: Alert type -> fields that identify a duplicate
+            snapshot_path: JSON file to persist active keys to (None to disable)
+        """
+        self.key_fields = {alert_type: tuple(fields) for alert_type, fields in (key_fields or {}).items()}
+        self.snapshot_path = snapshot_path
+
+        self._expiry: Dict[Tuple, float] = {}  # key -> expires at (wall clock)
+        self._heap = []  # (expires at, sequence, key), may hold stale entries
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+        self._dirty = False
+
+        if snapshot_path:
+            self.load_snapshot()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def make_key(self, alert: Dict, scope: str = 'db', fields: Optional[Sequence[str]] = None) -> Tuple:
+        """
+        Build the dedup key of an alert
+
+        Args:
+            alert: Alert dictionary
+            scope: Namespace of the key (each use keeps its own cooldowns)
+            fields: Key fields overriding the per-type configuration
+
+        Returns:
+            Hashable key
+        """
+        if fields is None:
+            fields = self.key_fields.get(alert.get('type'), DEFAULT_KEY_FIELDS)
+        return (scope,) + tuple(alert.get(field) for field in fields)
+
+    def _evict(self, now: float):
+        """Drop keys whose TTL has passed (caller holds the lock)"""
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._heap)
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+                self._dirty = True
+
+    def is_active(self, alert: Dict, scope: str = 'db', fields: Optional[Sequence[str]] = None,
+                  now: Optional[float] = None) -> bool:
+        """True if an alert with the same key was marked and has not expired"""
+        now = time.time() if now is None else now
+        key = self.make_key(alert, scope, fields)
+        with self._lock:
+            self._evict(now)
+            expires_at = self._expiry.get(key)
+            return expires_at is not None and expires_at > now
+
+    def mark(self, alert: Dict, ttl: float, scope: str = 'db', fields: Optional[Sequence[str]] = None,
+             now: Optional[float] = None):
+        """
+        Mark an alert as raised
+
+        Args:
+            alert: Alert dictionary
+            ttl: Seconds the key stays active
+            scope: Namespace of the key
+            fields: Key fields overriding the per-type configuration
+            now: Time the alert was raised (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        key = self.make_key(alert, scope, fields)
+        expires_at = now + ttl
+        with self._lock:
+            self._expiry[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, next(self._sequence), key))
+            self._dirty = True
+            self._evict(now)
+
+        self._maybe_save(now)
+
+    def check_and_mark(self, alert: Dict, ttl: float, scope: str = 'db',
+                       fields: Optional[Sequence[str]] = None, now: Optional[float] = None) -> bool:
+        """
+        Mark an alert unless it is a duplicate
+
+        Returns:
+            True if the alert is new (and is now marked), False if it is a duplicate
+        """
+        now = time.time() if now is None else now
+        key = self.make_key(alert, scope, fields)
+        with self._lock:
+            self._evict(now)
+            expires_at = self._expiry.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+
+            expires_at = now + ttl
+            self._expiry[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, next(self._sequence), key))
+            self._dirty = True
+
+        self._maybe_save(now)
+        return True
+
+    def forget(self, alert: Dict, scope: str = 'db', fields: Optional[Sequence[str]] = None):
+        """Drop an alert's key so the same alert can be raised again right away (e.g. once dismissed)"""
+        key = self.make_key(alert, scope, fields)
+        with self._lock:
+            if self._expiry.pop(key, None) is not None:
+                self._dirty = True  # Its heap entry is skipped as stale when popped
+
+    def clear(self, scope: Optional[str] = None):
+        """Forget all keys (or only those of one scope)"""
+        with self._lock:
+            if scope is None:
+                self._expiry.clear()
+                self._heap.clear()
+            else:
+                for key in [key for key in self._expiry if key[0] == scope]:
+                    del self._expiry[key]
+            self._dirty = True
+
+    def _maybe_save(self, now: float):
+        if self.snapshot_path and now - self._last_snapshot >= SNAPSHOT_INTERVAL:
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """Write active keys to the snapshot file (atomic replace)"""
+        if not self.snapshot_path:
+            return
+
+        now = time.time()
+        with self._lock:
+            if not self._dirty:
+                return
+            self._evict(now)
+            entries = [[list(key), expires_at] for key, expires_at in self._expiry.items()]
+            self._dirty = False
+            self._last_snapshot = now
+
+        try:
+            snapshot_dir = os.path.dirname(self.snapshot_path)
+            if snapshot_dir:
+                os.makedirs(snapshot_dir, exist_ok=True)
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, default=str)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning("Could not save alert dedup snapshot: %s", e)
+
+    def load_snapshot(self):
+        """Load unexpired keys from the snapshot file"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load alert dedup snapshot: %s", e)
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, expires_at in entries:
+                if expires_at > now:
+                    key = tuple(key)
+                    self._expiry[key] = expires_at
+                    heapq.heappush(self._heap, (expires_at, next(self._sequence), key))
+
+        logger.info("Loaded %d alert cooldowns from %s", len(self._expiry), self.snapshot_path)
+
+
+def _create_shared_index() -> AlertDedupIndex:
+    index = AlertDedupIndex(
+        key_fields=parse_key_fields(os.getenv('ALERT_DEDUP_FIELDS', '')),
+        snapshot_path=os.getenv('ALERT_DEDUP_SNAPSHOT', '') or None
+    )
+    if index.snapshot_path:
+        atexit.register(index.save_snapshot)
+    return index
+
+
+# Shared by AlertModel, the SendGrid AlertManager and the surveillance AlertManager
+alert_dedup_index = _create_shared_index()
@@ -78,6 +78,8 @@ class DatabaseConnection:
             self._database[ALERTS_COLLECTION].create_index("timestamp")
             self._database[ALERTS_COLLECTION].create_index("camera_id")
             self._database[ALERTS_COLLECTION].create_index("severity")
+            # Covers the duplicate check in AlertModel.create_alert(s)
+            self._database[ALERTS_COLLECTION].create_index([("camera_id", 1), ("type", 1), ("message", 1), ("timestamp", -1)])
             
             # Logs collection indexes
             self._database[LOGS_COLLECTION].create_index("timestamp")
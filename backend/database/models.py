@@ -4,10 +4,11 @@ MongoDB-only storage (no JSON fallback)
 """
 import os
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from bson import ObjectId
 from database.config import get_database, is_db_connected, CAMERAS_COLLECTION, ALERTS_COLLECTION, LOGS_COLLECTION, SETTINGS_COLLECTION, USERS_COLLECTION
+from database.alert_dedup import alert_dedup_index
 
 class BaseModel:
     """Base model with MongoDB-only operations"""
@@ -203,28 +204,66 @@ class AlertModel(BaseModel):
     def __init__(self):
         super().__init__(ALERTS_COLLECTION)
     
-    def create_alert(self, camera_id: str, alert_type: str, message: str, 
-                    severity: str = "medium", image_path: Optional[str] = None) -> str:
-        """Create a new alert"""
-        alert_data = {
+    DUPLICATE_WINDOW_SECONDS = 300  # Same camera/type/message within this window is a duplicate
+    
+    @staticmethod
+    def _utc_seconds(value) -> Optional[float]:
+        """Epoch seconds of a naive UTC datetime stored by MongoDB (None if missing)"""
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=timezone.utc).timestamp()
+        return None
+    
+    def update_by_id(self, doc_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update an alert; a dismissed alert may be raised again without waiting out the duplicate window"""
+        alert = self.find_by_id(doc_id) if update_data.get('status') == 'dismissed' else None
+        updated = super().update_by_id(doc_id, update_data)
+        if updated and alert is not None:
+            alert_dedup_index.forget(alert)
+        return updated
+    
+    def delete_by_id(self, doc_id: str) -> bool:
+        """Delete an alert (dismissing it) and forget its duplicate key"""
+        alert = self.find_by_id(doc_id)
+        deleted = super().delete_by_id(doc_id)
+        if deleted and alert is not None:
+            alert_dedup_index.forget(alert)
+        return deleted
+    
+    def _build_alert_document(self, camera_id: str, alert_type: str, message: str,
+                              severity: str = "medium", image_path: Optional[str] = None,
+                              timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """Build the alert document stored in MongoDB"""
+        now = datetime.utcnow()
+        return {
             'camera_id': camera_id,
-                'type': alert_type,
+            'type': alert_type,
             'message': message,
             'severity': severity,  # low, medium, high, critical
             'image_path': image_path,
-            'timestamp': datetime.utcnow(),
+            'timestamp': timestamp or now,
             'resolved': False,
-            'acknowledged': False
+            'acknowledged': False,
+            'created_at': now,
+            'updated_at': now
         }
-        
+    
+    def create_alert(self, camera_id: str, alert_type: str, message: str, 
+                    severity: str = "medium", image_path: Optional[str] = None) -> str:
+        """Create a new alert"""
         if self.collection is None:
             print(f"⚠️ MongoDB not connected - cannot create alert")
             return ""
+        
+        # Duplicates raised by this process are caught without a database round trip
+        alert_key = {'camera_id': camera_id, 'type': alert_type, 'message': message}
+        if alert_dedup_index.is_active(alert_key):
+            print(f" Duplicate alert blocked: {alert_type} from {camera_id}")
+            return ""
             
         try:
-            # Check for duplicates in last 5 minutes
+            # Check for duplicates in last 5 minutes (also catches other processes)
             from datetime import timedelta
-            recent_time = datetime.utcnow() - timedelta(seconds=300)
+            recent_time = datetime.utcnow() - timedelta(seconds=self.DUPLICATE_WINDOW_SECONDS)
             duplicate = self.collection.find_one({
                 'camera_id': camera_id,
                 'type': alert_type,
@@ -234,18 +273,95 @@ class AlertModel(BaseModel):
             })
             
             if duplicate:
+                alert_dedup_index.mark(alert_key, self.DUPLICATE_WINDOW_SECONDS,
+                                       now=self._utc_seconds(duplicate.get('timestamp')))
                 print(f" Duplicate alert blocked: {alert_type} from {camera_id}")
                 return ""
             
-            alert_data['created_at'] = datetime.utcnow()
-            alert_data['updated_at'] = datetime.utcnow()
+            alert_data = self._build_alert_document(camera_id, alert_type, message, severity, image_path)
             result = self.collection.insert_one(alert_data)
+            alert_dedup_index.mark(alert_key, self.DUPLICATE_WINDOW_SECONDS)
             print(f"💾 Alert saved to MongoDB: {result.inserted_id}")
             return str(result.inserted_id)
         except Exception as e:
             print(f"❌ MongoDB save failed: {e}")
             return ""
     
+    def create_alerts(self, alerts: List[Dict[str, Any]]) -> List[str]:
+        """Create several alerts with one duplicate query and one insert_many
+        
+        Args:
+            alerts: Dicts with camera_id, type, message and optionally severity,
+                image_path and timestamp (UTC datetime the alert was raised)
+        
+        Returns:
+            Inserted IDs in input order ("" for duplicates)
+        
+        Raises:
+            ConnectionError: MongoDB is not connected
+            Exception: The duplicate query or insert failed (nothing is marked as stored)
+        """
+        ids = [""] * len(alerts)
+        if not alerts:
+            return ids
+        
+        if self.collection is None:
+            raise ConnectionError(f"MongoDB not connected - cannot create {len(alerts)} alerts")
+            
+        # Duplicates raised by this process are caught without a database round trip
+        candidates = []
+        for position, alert in enumerate(alerts):
+            if alert_dedup_index.is_active(alert):
+                print(f" Duplicate alert blocked: {alert['type']} from {alert['camera_id']}")
+            else:
+                candidates.append((position, alert))
+        if not candidates:
+            return ids
+            
+        try:
+            from datetime import timedelta
+            recent_time = datetime.utcnow() - timedelta(seconds=self.DUPLICATE_WINDOW_SECONDS)
+            keys = {(alert['camera_id'], alert['type'], alert['message']) for _, alert in candidates}
+            existing = self.collection.find({
+                '$or': [{'camera_id': camera_id, 'type': alert_type, 'message': message}
+                        for camera_id, alert_type, message in keys],
+                'timestamp': {'$gte': recent_time},
+                'status': {'$ne': 'dismissed'}
+            }, {'camera_id': 1, 'type': 1, 'message': 1, 'severity': 1, 'timestamp': 1})
+            seen = set()
+            for doc in existing:
+                seen.add((doc.get('camera_id'), doc.get('type'), doc.get('message')))
+                alert_dedup_index.mark(doc, self.DUPLICATE_WINDOW_SECONDS,
+                                       now=self._utc_seconds(doc.get('timestamp')))
+            
+            documents = []
+            positions = []
+            for position, alert in candidates:
+                key = (alert['camera_id'], alert['type'], alert['message'])
+                if key in seen or alert_dedup_index.is_active(alert):
+                    print(f" Duplicate alert blocked: {alert['type']} from {alert['camera_id']}")
+                    continue
+                seen.add(key)
+                
+                documents.append(self._build_alert_document(
+                    alert['camera_id'], alert['type'], alert['message'],
+                    alert.get('severity', 'medium'), alert.get('image_path'), alert.get('timestamp')
+                ))
+                positions.append(position)
+            
+            if documents:
+                result = self.collection.insert_many(documents, ordered=False)
+                for position, inserted_id in zip(positions, result.inserted_ids):
+                    ids[position] = str(inserted_id)
+                    # Marked only once stored, so a failed insert does not block the next copy
+                    alert_dedup_index.mark(alerts[position], self.DUPLICATE_WINDOW_SECONDS)
+                print(f"💾 {len(documents)} alert(s) saved to MongoDB")
+        except Exception as e:
+            print(f"❌ MongoDB batch save failed: {e}")
+            raise  # The alert writer retries the batch
+        
+        return ids
+    
     def get_recent_alerts(self, limit: int = 50, include_dismissed: bool = False) -> List[Dict[str, Any]]:
         """Get recent alerts
         
@@ -23,8 +23,9 @@ import time
 import threading
 import requests
 from datetime import datetime
-from flask import Flask, jsonify, Response, render_template_string, request
+from flask import Flask, jsonify, Response, render_template_string, request, send_from_directory
 import json
+import logging
 from dotenv import load_dotenv
 
 # Suppress additional warnings
@@ -43,7 +44,34 @@ from surveillance.detector import YOLOv9Detector
 from ai_models.face_recognition.mobilenet_face_recognition import MobileNetFaceRecognitionSystem
 from surveillance.activity_analyzer import SuspiciousActivityAnalyzer, DetectionZone, ActivityType
 from surveillance.tracker import PersonTracker
+from surveillance.event_store import EventStore
+from surveillance.frame_result import FrameResult
 from app.services.alert_manager import AlertManager
+from app.services.snapshot_service import snapshot_service
+from app.services.settings_cache import settings_cache
+from app.services.camera_registry import CameraRegistry
+from app.services.frame_broadcast import BroadcastHub, DEFAULT_TIER
+from app.services.mjpeg_relay import PassthroughHub
+from app.services.stream_pacing import ClientPacer, ADAPTIVE_STREAMS
+from app.services.mosaic import MosaicHub
+from app.services.hls_output import HLSHub, PLAYLIST_NAME, is_hls_file
+from app.services.event_channel import EventChannel
+from app.utils.logging_setup import configure_logging
+
+# Named explicitly so LOG_MODULE_LEVELS works the same when run as a script
+logger = logging.getLogger('multi_camera')
+
+# Per-frame debug lines keep 1 in N records, rate limited per camera (see app/utils/logging_setup.py)
+LOG_FRAME_SAMPLE_EVERY = int(os.getenv('LOG_FRAME_SAMPLE_EVERY', '10'))
+
+
+def _frame_log(camera_name, stage, sample=True):
+    """`extra` for a per-frame debug line of one camera"""
+    extra = {'rate_key': (stage, camera_name)}
+    if sample:
+        extra['sample_every'] = LOG_FRAME_SAMPLE_EVERY
+    return extra
+
 
 class MultiCameraAISurveillance:
     """
@@ -62,33 +90,40 @@ class MultiCameraAISurveillance:
     def __init__(self):
         self.app = Flask(__name__)
         
+        # Dashboard push channel (/api/events); also receives the alert manager's new_alert events
+        self.event_channel = EventChannel(
+            status_provider=self._dashboard_status,
+            max_rate=float(os.getenv('DASHBOARD_PUSH_RATE', '2'))
+        )
+        
         # Initialize Alert Manager with SendGrid integration
-        self.alert_manager = AlertManager(socketio=None)  # No WebSocket for multi-camera system
+        self.alert_manager = AlertManager(socketio=self.event_channel)
         
-        # Auto-detect your IP cameras
-        self.camera_urls = self.auto_detect_cameras()
+        # Auto-detect your IP cameras; the registry holds each camera's trackers, stats and latest results
+        self.cameras = CameraRegistry()
+        for camera_name, camera_info in self.auto_detect_cameras().items():
+            self.cameras.add(camera_name, camera_info)
         
         # Surveillance state
-        self.active_cameras = {}
-        self.latest_frames = {}
-        self.activity_logs = []
+        self.frame_hub = BroadcastHub()  # Live view frames, encoded once per quality tier for all viewers
+        self.passthrough_hub = PassthroughHub(idle_timeout=float(os.getenv('PASSTHROUGH_IDLE_TIMEOUT', '5')))
+        self.mosaic_hub = MosaicHub(self.frame_hub, lambda: sorted(self.cameras.active_names()),
+                                    quality=int(os.getenv('MOSAIC_QUALITY', '70')))
+        self.hls_hub = HLSHub(self.frame_hub, os.getenv('HLS_DIR', os.path.join(STORAGE_DIR, 'hls')),
+                              idle_timeout=float(os.getenv('HLS_IDLE_TIMEOUT', '30')))
+        self.activity_logs = EventStore(capacity=500, index_fields=('camera', 'type'))
         self.alert_count = 0
-        self.detection_stats = {}
         
-        # Frame processing counters for optimization
-        self.frame_counters = {}  # Track frame numbers per camera
+        # Camera config and settings changes are pushed by the settings cache (no DB reads per frame)
+        settings_cache.start()
+        settings_cache.subscribe(self._on_camera_config_changed, kind='camera')
+        settings_cache.subscribe(self._on_camera_settings_changed, kind='settings', key='camera')
         
         # Camera auto-discovery settings
         self.camera_discovery_interval = 10  # Check for new cameras every 10 seconds
         self.discovery_thread = None
         self.discovery_running = False
         
-        # Person tracking for activity analysis
-        self.person_trackers = {}  # Track person movements per camera
-        
-        # Activity analyzers for each camera
-        self.activity_analyzers = {}  # Suspicious activity detection per camera
-        
         # Face detection memory - tracks last authorized person per camera
         # Prevents false alerts when authorized person's face is temporarily obscured
         self.last_authorized_person = {}  # camera_name -> {'names': [list], 'timestamp': datetime, 'frames_since_seen': int}
@@ -115,11 +150,12 @@ class MultiCameraAISurveillance:
         self._initialize_activity_detection()
         
         print(f"🔍 Multi-Camera AI Surveillance System Initialized")
-        print(f"📹 Found {len(self.camera_urls)} live cameras")
+        print(f"📹 Found {len(self.cameras)} live cameras")
         print(f"🚨 SendGrid Email Alerts: {'✅ Enabled' if self.alert_manager.email_service.enabled else '❌ Disabled'}")
         print(f"🎯 Activity Detection: Loitering | Zone Intrusion | Running | Fighting | Abandoned Objects")
         
         self.setup_flask_routes()
+        self.event_channel.start()
     
     def auto_detect_cameras(self, silent=False):
         """Automatically detect all live IP cameras using discovery service"""
@@ -215,16 +251,17 @@ class MultiCameraAISurveillance:
         """Initialize activity detection for suspicious behavior monitoring"""
         print("\n🎯 Initializing Suspicious Activity Detection...")
         
-        for camera_name in self.camera_urls.keys():
+        for camera_name, state in self.cameras.snapshot().items():
             # Create person tracker for each camera
-            self.person_trackers[camera_name] = PersonTracker(
+            state.tracker = PersonTracker(
                 tracker_type='KCF',  # Faster than CSRT for real-time
                 max_tracks=20,
-                track_timeout=5.0
+                track_timeout=5.0,
+                tracking_scale=0.3  # Track on the same downscaled frame used for detection
             )
             
             # Create activity analyzer for each camera
-            self.activity_analyzers[camera_name] = SuspiciousActivityAnalyzer(
+            state.analyzer = SuspiciousActivityAnalyzer(
                 loitering_threshold=30.0,      # 30 seconds for loitering
                 abandoned_object_threshold=60.0,  # 60 seconds for abandoned objects
                 speed_threshold=15.0,          # pixels/second for running detection (15 px/s based on observed speeds)
@@ -245,7 +282,7 @@ class MultiCameraAISurveillance:
                     ActivityType.WEAPON_DETECTED
                 ]
             )
-            self.activity_analyzers[camera_name].add_detection_zone(default_zone)
+            state.analyzer.add_detection_zone(default_zone)
             
             print(f"  ✅ {camera_name}: Tracker + Activity Analyzer initialized")
         
@@ -293,43 +330,83 @@ class MultiCameraAISurveillance:
         .detection-count { font-size: 14px; color: #2c3e50; margin: 5px 0; }
     </style>
     <script>
+        let activityCursor = 0;
+        let recentActivities = [];
+        let status = {camera_stats: {}};
+        
+        function renderStatus(data) {
+            document.getElementById('total-cameras').textContent = data.total_cameras;
+            document.getElementById('active-cameras').textContent = data.active_cameras;
+            document.getElementById('total-detections').textContent = data.total_detections;
+            document.getElementById('total-alerts').textContent = data.total_alerts;
+            
+            // Update camera stats
+            Object.keys(data.camera_stats).forEach(cameraName => {
+                const stats = data.camera_stats[cameraName];
+                const statsElement = document.getElementById(`stats-${cameraName}`);
+                if (statsElement) {
+                    statsElement.innerHTML = `
+                        <div class="detection-count">Objects: ${stats.detections}</div>
+                        <div class="detection-count">Persons: ${stats.persons}</div>
+                        <div class="detection-count">FPS: ${stats.fps}</div>
+                    `;
+                }
+            });
+        }
+        
+        function renderActivities(activities) {
+            if (activities.length === 0) return;
+            recentActivities = recentActivities.concat(activities).slice(-20);
+            
+            const logDiv = document.getElementById('activity-log');
+            logDiv.innerHTML = '';
+            recentActivities.slice().reverse().forEach(activity => {
+                const div = document.createElement('div');
+                div.className = activity.is_alert ? 'alert' : (activity.is_warning ? 'warning' : (activity.is_info ? 'info' : 'normal'));
+                div.innerHTML = `<strong>${activity.time}</strong> [${activity.camera}] ${activity.description}`;
+                logDiv.appendChild(div);
+            });
+        }
+        
+        function applyDelta(target, delta) {
+            Object.keys(delta).forEach(key => {
+                const value = delta[key];
+                if (value === null) {
+                    delete target[key];
+                } else if (typeof value === 'object' && !Array.isArray(value) && typeof target[key] === 'object') {
+                    applyDelta(target[key], value);
+                } else {
+                    target[key] = value;
+                }
+            });
+        }
+        
         function refreshData() {
             fetch('/api/status')
                 .then(response => response.json())
-                .then(data => {
-                    document.getElementById('total-cameras').textContent = data.total_cameras;
-                    document.getElementById('active-cameras').textContent = data.active_cameras;
-                    document.getElementById('total-detections').textContent = data.total_detections;
-                    document.getElementById('total-alerts').textContent = data.total_alerts;
-                    
-                    // Update camera stats
-                    Object.keys(data.camera_stats).forEach(cameraName => {
-                        const stats = data.camera_stats[cameraName];
-                        const statsElement = document.getElementById(`stats-${cameraName}`);
-                        if (statsElement) {
-                            statsElement.innerHTML = `
-                                <div class="detection-count">Objects: ${stats.detections}</div>
-                                <div class="detection-count">Persons: ${stats.persons}</div>
-                                <div class="detection-count">FPS: ${stats.fps}</div>
-                            `;
-                        }
-                    });
-                });
+                .then(data => { status = data; renderStatus(status); });
             
-            fetch('/api/activities')
+            // Only fetch entries newer than the last response
+            return fetch(`/api/activities?since=${activityCursor}&limit=20`)
                 .then(response => response.json())
                 .then(data => {
-                    const logDiv = document.getElementById('activity-log');
-                    logDiv.innerHTML = '';
-                    data.activities.slice(-20).reverse().forEach(activity => {
-                        const div = document.createElement('div');
-                        div.className = activity.is_alert ? 'alert' : (activity.is_warning ? 'warning' : (activity.is_info ? 'info' : 'normal'));
-                        div.innerHTML = `<strong>${activity.time}</strong> [${activity.camera}] ${activity.description}`;
-                        logDiv.appendChild(div);
-                    });
+                    activityCursor = data.cursor;
+                    renderActivities(data.activities);
                 });
         }
         
+        function subscribeEvents() {
+            // Pushed updates; EventSource reconnects by itself and resumes after the last event id
+            const events = new EventSource('/api/events');
+            events.addEventListener('snapshot', e => { status = JSON.parse(e.data); renderStatus(status); });
+            events.addEventListener('status', e => { applyDelta(status, JSON.parse(e.data)); renderStatus(status); });
+            events.addEventListener('activity', e => {
+                const activities = JSON.parse(e.data).filter(activity => activity.seq >= activityCursor);
+                activities.forEach(activity => { activityCursor = activity.seq + 1; });
+                renderActivities(activities);
+            });
+        }
+        
         function startAllSurveillance() {
             fetch('/api/start_all', {method: 'POST'})
                 .then(response => response.json())
@@ -366,8 +443,12 @@ class MultiCameraAISurveillance:
                 });
         }
         
-        setInterval(refreshData, 2000);
-        refreshData();
+        if (window.EventSource) {
+            refreshData().then(subscribeEvents);  // Pushed activities continue after the fetched ones
+        } else {
+            refreshData();
+            setInterval(refreshData, 2000);  // Browsers without Server-Sent Events keep polling
+        }
     </script>
 </head>
 <body>
@@ -426,15 +507,16 @@ class MultiCameraAISurveillance:
     </div>
 </body>
 </html>
-            ''', cameras=self.camera_urls, camera_count=len(self.camera_urls))
+            ''', cameras=self.cameras.infos(), camera_count=len(self.cameras))
         
         @self.app.route('/api/cameras')
         def api_cameras():
             """Get list of all cameras with status for dashboard"""
             cameras = []
-            for camera_name, camera_url in self.camera_urls.items():
+            for camera_name, state in self.cameras.snapshot().items():
+                camera_url = state.info
                 # Check if camera is currently active/online
-                is_online = camera_name in self.active_cameras
+                is_online = state.active
                 
                 cameras.append({
                     'id': camera_name,
@@ -449,40 +531,66 @@ class MultiCameraAISurveillance:
         
         @self.app.route('/api/status')
         def api_status():
-            """Get system status"""
-            total_detections = sum(self.detection_stats.get(cam, {}).get('total_detections', 0) for cam in self.active_cameras)
+            """Get system status (also pushed as deltas by /api/events)"""
+            status = self._dashboard_status()
+            status['streams'] = self.frame_hub.get_stats()
+            status['passthrough'] = self.passthrough_hub.get_stats()
+            status['mosaics'] = self.mosaic_hub.get_stats()
+            status['hls'] = self.hls_hub.get_stats()
+            status['events'] = self.event_channel.get_stats()
+            status['snapshots'] = snapshot_service.get_stats()
+            return jsonify(status)
+        
+        @self.app.route('/api/debug/stream_clients')
+        def api_debug_stream_clients():
+            """Per-client pacing of adaptive live views: tier, fps, send time, skipped frames, bandwidth"""
+            return jsonify(self.frame_hub.clients())
+        
+        @self.app.route('/api/events')
+        def api_events():
+            """
+            Dashboard push channel (Server-Sent Events): snapshot, status deltas, activities and alerts
             
-            camera_stats = {}
-            for camera_name in self.camera_urls.keys():
-                if camera_name in self.latest_frames:
-                    frame_data = self.latest_frames[camera_name]
-                    camera_stats[camera_name] = {
-                        'detections': len(frame_data.get('detections', [])),
-                        'persons': len(frame_data.get('persons', [])),
-                        'fps': self.detection_stats.get(camera_name, {}).get('fps', 0)
-                    }
-                else:
-                    camera_stats[camera_name] = {'detections': 0, 'persons': 0, 'fps': 0}
-            
-            return jsonify({
-                'total_cameras': len(self.camera_urls),
-                'active_cameras': len(self.active_cameras),
-                'total_detections': total_detections,
-                'total_alerts': self.alert_count,
-                'camera_stats': camera_stats
-            })
+            Resumes after the Last-Event-ID header (sent by EventSource on reconnect) or ?cursor=;
+            ?rate= lowers the number of messages per second (coalesced in between).
+            """
+            cursor = request.headers.get('Last-Event-ID', request.args.get('cursor'))
+            try:
+                cursor = int(cursor) if cursor not in (None, '') else None
+                rate = request.args.get('rate', type=float)
+            except ValueError:
+                return jsonify({'error': 'cursor must be an integer'}), 400
+            return Response(
+                self.event_channel.stream(cursor, rate),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
         
         @self.app.route('/api/activities')
         def api_activities():
-            """Get recent activities from all cameras"""
-            return jsonify({'activities': self.activity_logs[-50:]})
+            """
+            Get recent activities from all cameras
+            
+            Query parameters: since (cursor from a previous response, returns only
+            newer entries), camera, type, limit (default 50)
+            """
+            limit = request.args.get('limit', 50, type=int)
+            filters = {
+                'camera': request.args.get('camera'),
+                'type': request.args.get('type')
+            }
+            since = request.args.get('since', 0, type=int)
+            
+            activities, cursor = self.activity_logs.since(since, limit=limit, **filters)
+            
+            return jsonify({'activities': activities, 'cursor': cursor})
         
         @self.app.route('/api/start_all', methods=['POST'])
         def api_start_all():
             """Start surveillance on all cameras"""
             try:
                 self.start_all_surveillance()
-                return jsonify({'success': True, 'message': f'Started AI surveillance on all {len(self.camera_urls)} cameras!'})
+                return jsonify({'success': True, 'message': f'Started AI surveillance on all {len(self.cameras)} cameras!'})
             except Exception as e:
                 return jsonify({'success': False, 'message': f'Error: {str(e)}'})
         
@@ -507,7 +615,9 @@ class MultiCameraAISurveillance:
                         'total_alerts': status['total_alerts'],
                         'alerts_by_type': status['alerts_by_type'],
                         'alerts_by_severity': status['alerts_by_severity']
-                    }
+                    },
+                    'alert_persistence': status.get('persistence'),
+                    'email_delivery': status.get('email_delivery')
                 })
             except Exception as e:
                 return jsonify({'success': False, 'message': f'Error: {str(e)}'})
@@ -606,11 +716,8 @@ class MultiCameraAISurveillance:
                 print(f"   Detected: {detected_person}")
                 
                 # Prepare email data for SendGrid service
-                from app.services.email_service import EmailAlertService
-                email_service = EmailAlertService()
-                
-                # Override recipients with selected ones
-                email_service.recipients = recipient_emails
+                from app.services.email_service import get_email_service
+                email_service = get_email_service()
                 
                 # Prepare alert data for email
                 email_alert_data = {
@@ -624,12 +731,13 @@ class MultiCameraAISurveillance:
                     'image_path': image_path
                 }
                 
-                success = email_service.send_alert(email_alert_data)
+                # Queue for the selected recipients only (the dispatcher delivers and retries)
+                success = email_service.send_alert(email_alert_data, recipients=recipient_emails, wait=False)
                 
                 if success:
                     return jsonify({
                         'success': True,
-                        'message': f'✅ Email sent successfully to {len(recipient_emails)} recipient(s)',
+                        'message': f'✅ Email queued for {len(recipient_emails)} recipient(s)',
                         'recipients': recipient_emails,
                         'alert_type': alert_type
                     })
@@ -650,7 +758,7 @@ class MultiCameraAISurveillance:
         def api_start_camera(camera_name):
             """Start surveillance on specific camera"""
             try:
-                if camera_name in self.camera_urls:
+                if camera_name in self.cameras:
                     self.start_camera_surveillance(camera_name)
                     return jsonify({'success': True, 'message': f'Started surveillance on {camera_name}'})
                 else:
@@ -662,7 +770,7 @@ class MultiCameraAISurveillance:
         def api_stop_camera(camera_name):
             """Stop surveillance on specific camera"""
             try:
-                if camera_name in self.active_cameras:
+                if self.cameras.is_active(camera_name):
                     self.stop_camera_surveillance(camera_name)
                     return jsonify({'success': True, 'message': f'Stopped surveillance on {camera_name}'})
                 else:
@@ -670,46 +778,185 @@ class MultiCameraAISurveillance:
             except Exception as e:
                 return jsonify({'success': False, 'message': f'Error: {str(e)}'})
         
+        @self.app.route('/video_feed/mosaic')
+        def video_feed_mosaic():
+            """All active cameras tiled into one stream (?width=, ?columns=, ?fps=, ?overlay=0)"""
+            try:
+                width = int(request.args.get('width', os.getenv('MOSAIC_WIDTH', '1280')))
+                columns = int(request.args.get('columns', os.getenv('MOSAIC_COLUMNS', '0')))
+                fps = float(request.args.get('fps', os.getenv('MOSAIC_FPS', '5')))
+            except ValueError:
+                return jsonify({'error': 'width, columns and fps must be numbers'}), 400
+            
+            # Snapped to presets by the hub, so odd query strings share the nearest mosaic
+            mosaic = self.mosaic_hub.get(width=width, columns=columns, fps=fps,
+                                         overlay=request.args.get('overlay', '1') != '0')
+            return Response(mosaic.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
+        
         @self.app.route('/video_feed/<camera_name>')
         def video_feed(camera_name):
-            """Live video feed with AI annotations"""
+            """
+            Live video feed with AI annotations
+            
+            ?quality=auto (default) adapts tier and frame rate to the client's bandwidth,
+            ?quality=low|medium|high caps it at that tier, ?adaptive=0 pins the tier,
+            ?overlay=0 for the plain video.
+            """
+            adaptive = ADAPTIVE_STREAMS and request.args.get('adaptive', '1') != '0'
             return Response(
-                self.generate_frames(camera_name),
+                self.generate_frames(camera_name, request.args.get('quality', 'auto' if adaptive else DEFAULT_TIER),
+                                     overlay=request.args.get('overlay', '1') != '0',
+                                     adaptive=adaptive, client=request.remote_addr or ''),
                 mimetype='multipart/x-mixed-replace; boundary=frame'
             )
-    
-    def generate_frames(self, camera_name):
-        """Generate annotated video frames for specific camera"""
-        while camera_name in self.active_cameras:
+        
+        @self.app.route('/video_feed/<camera_name>/metadata')
+        def video_feed_metadata(camera_name):
+            """Per-frame detection, track and activity metadata (Server-Sent Events) for client-side overlays"""
+            if not self.cameras.is_active(camera_name):
+                return jsonify({'error': 'Camera not active'}), 404
+            return Response(
+                self.frame_hub.get(camera_name).metadata_stream(),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
+        @self.app.route('/video_feed/<camera_name>/passthrough')
+        def video_feed_passthrough(camera_name):
+            """Camera's own MJPEG relayed without decoding or AI overlays (?fps=N drops parts above N per second)"""
+            state = self.cameras.get(camera_name)
+            if state is None:
+                return jsonify({'error': 'Unknown camera'}), 404
+            camera_url = state.url
+            if not camera_url.lower().startswith(('http://', 'https://')):
+                return jsonify({'error': 'Passthrough needs an HTTP MJPEG camera, use /video_feed instead'}), 400
+            
+            max_fps = request.args.get('fps', os.getenv('PASSTHROUGH_MAX_FPS', '0'))
             try:
-                if camera_name in self.latest_frames:
-                    frame_data = self.latest_frames[camera_name]
-                    annotated_frame = frame_data.get('annotated_frame')
-                    
-                    if annotated_frame is not None:
-                        # Resize frame for faster streaming (reduce to 640x360 for web)
-                        height, width = annotated_frame.shape[:2]
-                        if width > 640:
-                            scale = 640 / width
-                            new_width = 640
-                            new_height = int(height * scale)
-                            annotated_frame = cv2.resize(annotated_frame, (new_width, new_height))
-                        
-                        # Lower JPEG quality for faster transmission (60 instead of 80)
-                        ret, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 60])
-                        if ret:
-                            frame = buffer.tobytes()
-                            yield (b'--frame\r\n'
-                                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                
-                time.sleep(0.05)  # ~20 FPS for smoother playback
-                
-            except Exception as e:
-                print(f"Frame generation error for {camera_name}: {e}")
-                time.sleep(1)
+                max_fps = float(max_fps)
+            except ValueError:
+                return jsonify({'error': 'fps must be a number'}), 400
+            return Response(
+                self.passthrough_hub.get(camera_name, camera_url).stream(max_fps),
+                mimetype='multipart/x-mixed-replace; boundary=frame'
+            )
+        
+        @self.app.route('/hls/<camera_name>/<filename>')
+        def hls_file(camera_name, filename):
+            """H.264 HLS live view: index.m3u8 and its fMP4 segments, encoded once per camera for all viewers"""
+            if not self.hls_hub.available:
+                return jsonify({'error': 'HLS output needs FFmpeg (install it or set FFMPEG_BINARY)'}), 501
+            if not self.cameras.is_active(camera_name) or not is_hls_file(filename):
+                return jsonify({'error': 'Camera not active or unknown file'}), 404
+            
+            stream = self.hls_hub.get(camera_name)
+            stream.touch()  # Every playlist/segment request keeps the encoder running
+            if filename == PLAYLIST_NAME:
+                if not stream.ready:
+                    return Response('Encoder starting', status=503,
+                                    headers={'Retry-After': str(self.hls_hub.profile.segment_seconds)})
+                response = send_from_directory(stream.output_dir, filename,
+                                               mimetype='application/vnd.apple.mpegurl', max_age=0)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            mimetype = 'video/mp4' if filename.endswith('.mp4') else 'video/iso.segment'
+            return send_from_directory(stream.output_dir, filename, mimetype=mimetype, max_age=60)
+        
+        @self.app.route('/snapshot/<camera_name>')
+        def camera_snapshot(camera_name):
+            """Latest annotated frame as a single JPEG (?quality=low|medium|high, ?overlay=0)"""
+            quality = request.args.get('quality', DEFAULT_TIER)
+            if not self.cameras.is_active(camera_name) or quality not in self.frame_hub.tiers:
+                return jsonify({'error': 'Camera not active or unknown quality'}), 404
+            encoded = self.frame_hub.get(camera_name).encoded(quality, request.args.get('overlay', '1') != '0')
+            if encoded is None:
+                return jsonify({'error': 'No frame yet'}), 503
+            return Response(encoded[1], mimetype='image/jpeg', headers={'Cache-Control': 'no-store'})
+    
+    def generate_frames(self, camera_name, quality=DEFAULT_TIER, overlay=True, adaptive=False, client=''):
+        """
+        Generate annotated video frames for specific camera
+        
+        All viewers of a camera share one broadcaster: each new frame is encoded
+        once per quality tier, and a frame that has not changed is not sent again.
+        With overlay=False the frames are sent as captured, for clients that draw
+        the boxes from /video_feed/<camera_name>/metadata. Adaptive viewers get
+        their own pacer, which steps tier and frame rate down while the client
+        cannot keep up and back up when it can.
+        """
+        if not self.cameras.is_active(camera_name):
+            return
+        broadcaster = self.frame_hub.get(camera_name)
+        if not adaptive:
+            yield from broadcaster.stream(quality, overlay=overlay)
+            return
+        pacer = ClientPacer.for_quality(camera_name, quality, client=client)
+        yield from broadcaster.adaptive_stream(pacer, overlay=overlay)
+    
+    def _dashboard_status(self):
+        """Totals and per-camera stats shown on the dashboard"""
+        cameras = self.cameras.snapshot()  # Does not change while we read it, even if cameras come or go
+        active = [state for state in cameras.values() if state.active]
+        total_detections = sum(state.stats.get('total_detections', 0) for state in active)
+        
+        camera_stats = {}
+        for camera_name, state in cameras.items():
+            frame_data = state.latest
+            if frame_data is not None:
+                camera_stats[camera_name] = {
+                    'detections': frame_data.detection_count,
+                    'persons': frame_data.person_count,
+                    'fps': state.stats.get('fps', 0),
+                    'viewers': self.frame_hub.viewers(camera_name)
+                }
+            else:
+                camera_stats[camera_name] = {'detections': 0, 'persons': 0, 'fps': 0, 'viewers': 0}
+        
+        return {
+            'total_cameras': len(cameras),
+            'active_cameras': len(active),
+            'total_detections': total_detections,
+            'total_alerts': self.alert_count,
+            'camera_stats': camera_stats
+        }
+    
+    def _on_camera_config_changed(self, change):
+        """Apply an updated camera document (AI mode) to its running pipeline"""
+        state = self.cameras.get(change.key)
+        if state is None or change.new is None:
+            return
+        new_ai_mode = change.new.get('ai_mode', 'both')
+        old_mode = state.stats.get('ai_mode', 'both')
+        if new_ai_mode != old_mode:
+            state.update_stats(ai_mode=new_ai_mode)
+            logger.info("🔄 [%s] AI Mode updated: %s → %s", change.key, old_mode, new_ai_mode)
+    
+    @staticmethod
+    def _motion_sensitivity(settings_data):
+        """Motion sensitivity from the cached camera settings (75 if missing or invalid)"""
+        try:
+            return int((settings_data or {}).get('motionSensitivity', 75))
+        except (TypeError, ValueError) as e:
+            logger.warning("Invalid motion sensitivity setting, using default: %s", e)
+            return 75
     
-    def process_camera_feed(self, camera_name, camera_info):
-        """Process individual camera with AI surveillance"""
+    def _on_camera_settings_changed(self, change):
+        """Apply updated global camera settings (motion sensitivity) to all running pipelines"""
+        new_motion_sens = self._motion_sensitivity(change.new)
+        for camera_name, state in self.cameras.snapshot().items():
+            old_sens = state.stats.get('motion_sensitivity', 75)
+            if new_motion_sens != old_sens:
+                state.update_stats(motion_sensitivity=new_motion_sens)
+                logger.info("🔄 [%s] Motion Sensitivity updated: %s%% → %s%%", camera_name, old_sens, new_motion_sens)
+    
+    def process_camera_feed(self, camera_name, camera_info, run=None):
+        """Process individual camera with AI surveillance (until stopped, or restarted as a newer run)"""
+        state = self.cameras.get(camera_name)
+        if state is None:
+            return
+        if run is None:
+            run = state.run
+        
         # Handle both string URL and dict format
         if isinstance(camera_info, str):
             camera_url = camera_info
@@ -729,13 +976,10 @@ class MultiCameraAISurveillance:
         
         cap = cv2.VideoCapture(camera_url)
         
-        # Load camera settings from database and apply them
+        # Apply camera settings (cached, loaded from the database once per process)
+        settings_data = settings_cache.get('camera')
         try:
-            from database.models import settings_model
-            camera_settings = settings_model.get_settings('camera')
-            if camera_settings:
-                settings_data = camera_settings.get('settings', {})
-                
+            if settings_data:
                 # Set resolution based on settings
                 resolution = settings_data.get('defaultResolution', '1080p')
                 if resolution == '1080p':
@@ -761,26 +1005,29 @@ class MultiCameraAISurveillance:
         last_fps_time = time.time()
         fps_counter = 0
         
-        # Initialize stats with AI mode
-        self.detection_stats[camera_name] = {
-            'total_detections': 0,
-            'fps': 0,
-            'start_time': time.time(),
-            'ai_mode': ai_mode,
-            'motion_sensitivity': 75  # Default, will be updated from settings
-        }
+        # Initialize stats with AI mode (camera document wins over the discovery config)
+        camera_doc = settings_cache.camera(camera_name)
+        if camera_doc:
+            ai_mode = camera_doc.get('ai_mode', ai_mode)
+        state.update_stats(
+            total_detections=0,
+            fps=0,
+            start_time=time.time(),
+            ai_mode=ai_mode,
+            motion_sensitivity=self._motion_sensitivity(settings_data)  # Updated on settings changes
+        )
         
-        while camera_name in self.active_cameras:
+        while state.running(run):
             try:
                 ret, frame = cap.read()
                 if not ret:
-                    print(f"Failed to read from {camera_name}, reconnecting...")
+                    logger.warning("Failed to read from %s, reconnecting...", camera_name)
                     cap.release()
                     time.sleep(2)
                     # Attempt to reconnect
                     cap = cv2.VideoCapture(camera_url)
                     if not cap.isOpened():
-                        print(f"Reconnection failed for {camera_name}, will retry...")
+                        logger.warning("Reconnection failed for %s, will retry...", camera_name)
                         time.sleep(3)
                     continue
                 
@@ -790,19 +1037,24 @@ class MultiCameraAISurveillance:
                 # Calculate FPS
                 current_time = time.time()
                 if current_time - last_fps_time >= 1.0:
-                    self.detection_stats[camera_name]['fps'] = fps_counter
+                    state.update_stats(fps=fps_counter)
                     fps_counter = 0
                     last_fps_time = current_time
                 
                 # AI Processing (optimized timing)
-                processed_data = self.process_frame_ai(frame, camera_name, frame_count)
+                processed_data = self.process_frame_ai(frame, camera_name, frame_count, state)
                 
-                # Update stats
-                if 'detections' in processed_data:
-                    self.detection_stats[camera_name]['total_detections'] += len(processed_data['detections'])
+                # Store latest frame data; overlays are drawn only if a viewer asks for the frame.
+                # Done under the camera lock, so a stop cannot leave a stale result or broadcaster behind
+                render = self._overlay_renderer(camera_name, processed_data)
+                describe = self._metadata_describer(frame, processed_data)
+                published = state.publish_latest(run, processed_data, lambda: self.frame_hub.get(camera_name).publish(
+                    frame, render, describe, timestamp=current_time))
+                if not published:
+                    break  # Stopped while this frame was processed: do not publish it
                 
-                # Store latest frame data
-                self.latest_frames[camera_name] = processed_data
+                # Update stats
+                state.add_stats(total_detections=processed_data.detection_count)
                 
                 # Log activities
                 self.log_activities(processed_data, camera_name)
@@ -811,66 +1063,38 @@ class MultiCameraAISurveillance:
                 time.sleep(0.33)  # ~3 FPS for AI processing to eliminate lag spikes
                 
             except Exception as e:
-                print(f"Camera error {camera_name}: {e}")
+                logger.error("Camera error %s: %s", camera_name, e)
                 time.sleep(2)
         
         cap.release()
         print(f"🛑 Stopped surveillance for {camera_name}")
     
-    def process_frame_ai(self, frame, camera_name, frame_count):
+    def process_frame_ai(self, frame, camera_name, frame_count, state=None):
         """AI processing pipeline for each camera - Performance Optimized"""
+        if state is None:
+            state = self.cameras.get(camera_name)
         
-        # Reload AI mode and camera settings from database every 30 frames (to pick up config changes without restart)
+        # AI mode and motion sensitivity changes arrive through settings_cache subscriptions
         if frame_count % 30 == 0:
             try:
-                from database.models import camera_model, settings_model
-                
-                # Reload camera-specific AI mode
-                camera_doc = camera_model.find_by_name(camera_name)
-                if camera_doc:
-                    new_ai_mode = camera_doc.get('ai_mode', 'both')
-                    if camera_name in self.detection_stats:
-                        old_mode = self.detection_stats[camera_name].get('ai_mode', 'both')
-                        if new_ai_mode != old_mode:
-                            self.detection_stats[camera_name]['ai_mode'] = new_ai_mode
-                            print(f"🔄 [{camera_name}] AI Mode updated: {old_mode} → {new_ai_mode}")
-                
-                # Reload global camera settings (motion sensitivity, night vision, etc.)
-                camera_settings = settings_model.get_settings('camera')
-                if camera_settings:
-                    settings_data = camera_settings.get('settings', {})
-                    
-                    # Update motion sensitivity if changed
-                    new_motion_sens = int(settings_data.get('motionSensitivity', 75))
-                    if camera_name in self.detection_stats:
-                        old_sens = self.detection_stats[camera_name].get('motion_sensitivity', 75)
-                        if new_motion_sens != old_sens:
-                            self.detection_stats[camera_name]['motion_sensitivity'] = new_motion_sens
-                            print(f"🔄 [{camera_name}] Motion Sensitivity updated: {old_sens}% → {new_motion_sens}%")
-                
                 # Update activity analyzer thresholds
-                if camera_name in self.activity_analyzers:
-                    analyzer = self.activity_analyzers[camera_name]
+                analyzer = state.analyzer
+                if analyzer is not None:
                     if analyzer.speed_threshold != 15.0:
                         old_threshold = analyzer.speed_threshold
                         analyzer.speed_threshold = 15.0
-                        print(f"🔄 [{camera_name}] Speed threshold updated: {old_threshold} → 15.0 px/s")
+                        logger.info("🔄 [%s] Speed threshold updated: %s → 15.0 px/s", camera_name, old_threshold)
             except Exception as e:
-                pass  # Silently continue if reload fails
+                logger.debug("[%s] Analyzer threshold update failed: %s", camera_name, e)
         
         # Get AI mode for this camera
-        ai_mode = self.detection_stats.get(camera_name, {}).get('ai_mode', 'both')
+        ai_mode = state.stats.get('ai_mode', 'both')
         
         # Performance optimization: Process every Nth frame based on configuration
         if frame_count % self.FRAME_SKIP_INTERVAL != 0:
-            # Return cached detection data for skipped frames
-            if camera_name in self.latest_frames:
-                cached_data = self.latest_frames[camera_name].copy()
-                cached_data['annotated_frame'] = self.create_annotated_frame(
-                    frame, cached_data.get('detections', []), 
-                    cached_data.get('activities', []), camera_name
-                )
-                return cached_data
+            # Return cached detection data for skipped frames (overlaid on the new frame when viewed)
+            if state.latest is not None:
+                return state.latest
         
         # Resize frame for ULTRA fast processing (reduce resolution even more)
         height, width = frame.shape[:2]
@@ -884,10 +1108,9 @@ class MultiCameraAISurveillance:
         
         if ai_mode in ['yolov9', 'both']:
             # Object Detection on much smaller frame
-            print(f"{'='*60}")
-            print(f"🤖 [{camera_name}] YOLOv9 Detection Running...")
             detections = self.detector.detect(small_frame)
-            print(f"{'='*60}")
+            logger.debug("🤖 [%s] YOLOv9 Detection: %d objects", camera_name, len(detections),
+                         extra=_frame_log(camera_name, 'detection'))
             
             # Scale detection coordinates back to original frame size (adjusted for 0.3 scale)
             for detection in detections:
@@ -901,19 +1124,28 @@ class MultiCameraAISurveillance:
         
         # Initialize activities list
         activities = []
+        tracks = []  # Compact track records for the live view metadata stream
         
         # === Activity Analysis (only if ai_mode is 'yolov9' or 'both') ===
         current_time = time.time()
         
         if ai_mode in ['yolov9', 'both']:
             # Update person tracker with detected persons
-            tracker = self.person_trackers.get(camera_name)
-            activity_analyzer = self.activity_analyzers.get(camera_name)
+            tracker = state.tracker
+            activity_analyzer = state.analyzer
             
             if tracker and activity_analyzer:
+                # Zone lookup mask is sized to the camera resolution (rebuilt only if it changes)
+                activity_analyzer.set_frame_size(width, height)
+                
                 # Always update tracker with current frame and detections (even if empty)
                 # This ensures position_history is maintained when detector temporarily misses persons
-                track_states = tracker.update(frame, persons)
+                # Trackers run on the downscaled detection frame; tracks come back in full-frame coordinates
+                track_states = tracker.update(frame, persons, tracking_frame=small_frame)
+                tracks = [
+                    {'id': track_id, 'box': [int(v) for v in track.bbox], 'identity': track.identity}
+                    for track_id, track in track_states.items()
+                ]
 
                 # Analyze tracks for suspicious activities (analyzer will handle empty/partial tracks)
                 suspicious_activities = activity_analyzer.analyze_frame(
@@ -927,11 +1159,9 @@ class MultiCameraAISurveillance:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     activity_type = sus_activity.activity_type.value
                     
-                    # Save snapshot for suspicious activity
+                    # Save snapshot for suspicious activity (JPEG encoding and disk write happen on the snapshot workers)
                     snapshot_filename = f"{activity_type}_{camera_name}_{timestamp}.jpg"
-                    snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-                    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-                    cv2.imwrite(snapshot_path, frame)
+                    snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
                     
                     # Map activity type to severity
                     severity_map = {
@@ -961,8 +1191,8 @@ class MultiCameraAISurveillance:
                             image_path=snapshot_path
                         )
                         self.alert_count += 1
-                        print(f"⚠️ LOITERING [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        logger.warning("⚠️ LOITERING [Camera_%s]: %s", camera_name, sus_activity.description)
+                        logger.debug("📸 Snapshot saved: %s", snapshot_path)
                         
                     elif activity_type == 'zone_intrusion':
                         self.alert_manager.send_suspicious_activity_alert(
@@ -972,8 +1202,8 @@ class MultiCameraAISurveillance:
                             image_path=snapshot_path
                         )
                         self.alert_count += 1
-                        print(f"🚨 ZONE INTRUSION [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        logger.warning("🚨 ZONE INTRUSION [Camera_%s]: %s", camera_name, sus_activity.description)
+                        logger.debug("📸 Snapshot saved: %s", snapshot_path)
                         
                     elif activity_type == 'running':
                         # Send alert to database but not email (low priority activity)
@@ -984,8 +1214,8 @@ class MultiCameraAISurveillance:
                             image_path=snapshot_path
                         )
                         self.alert_count += 1
-                        print(f"🏃 RUNNING [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        logger.warning("🏃 RUNNING [Camera_%s]: %s", camera_name, sus_activity.description)
+                        logger.debug("📸 Snapshot saved: %s", snapshot_path)
                         
                     elif activity_type == 'fighting':
                         self.alert_manager.send_suspicious_activity_alert(
@@ -995,8 +1225,8 @@ class MultiCameraAISurveillance:
                             image_path=snapshot_path
                         )
                         self.alert_count += 1
-                        print(f"🚨 FIGHTING [Camera_{camera_name}]: {sus_activity.description}")
-                        print(f"📸 Snapshot saved: {snapshot_path}")
+                        logger.warning("🚨 FIGHTING [Camera_%s]: %s", camera_name, sus_activity.description)
+                        logger.debug("📸 Snapshot saved: %s", snapshot_path)
         
         # === END: Activity Analysis ===
         
@@ -1007,13 +1237,7 @@ class MultiCameraAISurveillance:
             # Save weapon detection snapshot
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             snapshot_filename = f"weapon_{camera_name}_{timestamp}.jpg"
-            snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-            
-            # Save the full frame as snapshot
-            cv2.imwrite(snapshot_path, frame)
+            snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
             
             activity = {
                 'type': 'weapon',
@@ -1031,30 +1255,25 @@ class MultiCameraAISurveillance:
                 image_path=snapshot_path
             )
             self.alert_count += 1
-            print(f"🚨 CRITICAL ALERT [Camera_{camera_name}]: WEAPON DETECTED: {weapons[0]['class_name']}")
-            print(f"📸 Weapon snapshot saved: {snapshot_path}")
+            logger.critical("🚨 CRITICAL ALERT [Camera_%s]: WEAPON DETECTED: %s", camera_name, weapons[0]['class_name'])
+            logger.debug("📸 Weapon snapshot saved: %s", snapshot_path)
         
         # === Face Recognition (MobileNetV2 with Unknown Calibration) ===
         authorized_persons_present = False  # Track if authorized persons are detected
         if ai_mode in ['lbph', 'face_recognition', 'both'] and self.face_recognizer.is_trained:
-            # Initialize frame counter for this camera if not exists
-            if camera_name not in self.frame_counters:
-                self.frame_counters[camera_name] = 0
-            
-            self.frame_counters[camera_name] += 1
+            state.face_frames += 1  # Only written by this camera's thread
             
             # Run face recognition when person is detected OR every Nth frame (based on configuration)
             run_face_recognition = False
             if person_count > 0:
                 run_face_recognition = True
-            elif self.frame_counters[camera_name] % self.FRAME_SKIP_INTERVAL == 0:
+            elif state.face_frames % self.FRAME_SKIP_INTERVAL == 0:
                 run_face_recognition = True
             
             if run_face_recognition:
-                print(f"{'='*60}")
-                print(f"🎥 [{camera_name}] Frame counter: {self.frame_counters[camera_name]}")
-                print(f"🔍 Running face detection on frame {self.frame_counters[camera_name]}")
-                print(f"🔍 Frame dimensions: {frame.shape}")
+                logger.debug("🔍 [%s] Running face detection on frame %d (%s)",
+                             camera_name, state.face_frames, frame.shape,
+                             extra=_frame_log(camera_name, 'face_run'))
                 
                 # Use MobileNetV2 face recognition with Unknown calibration
                 face_names, face_locations, verification_results = self.face_recognizer.recognize_faces_in_frame(frame)
@@ -1074,11 +1293,14 @@ class MultiCameraAISurveillance:
                     })
                 
                 # Debug: Show face recognition results
-                print(f"👤 Face Detection for {camera_name}: {len(face_results)} faces detected")
-                if len(face_results) > 0:
-                    print(f"👤 Face Recognition Results for {camera_name}:")
+                logger.debug("👤 Face Detection for %s: %d faces detected", camera_name, len(face_results),
+                             extra=_frame_log(camera_name, 'faces'))
+                if face_results and logger.isEnabledFor(logging.DEBUG):
                     for i, face_result in enumerate(face_results):
-                        print(f"   Face {i+1}: {face_result['person_name']} (confidence: {face_result['confidence']:.2f}, status: {face_result['authorization_status']})")
+                        logger.debug("   Face %d: %s (confidence: %.2f, status: %s)", i + 1,
+                                     face_result['person_name'], face_result['confidence'],
+                                     face_result['authorization_status'],
+                                     extra=_frame_log(camera_name, 'face_result', sample=False))
                 
                 # Check for intruders (unknown faces) - ALWAYS ALERT for unauthorized faces
                 authorized_faces = []
@@ -1096,13 +1318,7 @@ class MultiCameraAISurveillance:
                     # Save intruder snapshot with timestamp
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     snapshot_filename = f"intruder_{camera_name}_{timestamp}.jpg"
-                    snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-                    
-                    # Create directory if it doesn't exist
-                    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-                    
-                    # Save the full frame as snapshot
-                    cv2.imwrite(snapshot_path, frame)
+                    snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
                     
                     # Send intruder alert with snapshot (HIGH priority)
                     # Alert message includes whether authorized persons are also present
@@ -1129,8 +1345,8 @@ class MultiCameraAISurveillance:
                     activities.append(activity)
                     self.alert_count += 1
                     
-                    print(f"🚨 ALERT [Camera_{camera_name}]: {alert_message}")
-                    print(f"📸 Snapshot saved: {snapshot_path}")
+                    logger.warning("🚨 ALERT [Camera_%s]: %s", camera_name, alert_message)
+                    logger.debug("📸 Snapshot saved: %s", snapshot_path)
                 
                 # Show authorized faces confirmation
                 if len(authorized_faces) > 0:
@@ -1143,11 +1359,12 @@ class MultiCameraAISurveillance:
                         'frames_since_seen': 0
                     }
                     
-                    print(f"✅ AUTHORIZED [Camera_{camera_name}]: {', '.join(authorized_faces)} - Access granted")
+                    logger.info("✅ AUTHORIZED [Camera_%s]: %s - Access granted", camera_name, ', '.join(authorized_faces))
                     if len(intruder_faces) > 0:
-                        print(f"⚠️  SECURITY WARNING: {len(intruder_faces)} INTRUDER(S) detected alongside authorized personnel - ALERT SENT")
+                        logger.warning("⚠️  SECURITY WARNING: %d INTRUDER(S) detected alongside authorized personnel - ALERT SENT",
+                                       len(intruder_faces))
                     else:
-                        print(f"ℹ️  INFO: Only authorized personnel detected - no alerts")
+                        logger.debug("ℹ️  INFO: Only authorized personnel detected - no alerts")
                 elif len(intruder_faces) > 0:
                     # Check if intruder might be authorized person with poor frame quality
                     likely_same_person = False
@@ -1163,11 +1380,12 @@ class MultiCameraAISurveillance:
                                     likely_same_person = True
                                     last_auth['frames_since_seen'] += 1
                                     persons_str = ', '.join(last_auth['names'])
-                                    print(f"⚠️  WARNING: Poor quality frame detected (confidence: {intruder['confidence']:.2f}), likely {persons_str} - grace period (frame {last_auth['frames_since_seen']}/3)")
+                                    logger.info("⚠️  WARNING: Poor quality frame detected (confidence: %.2f), likely %s - grace period (frame %d/3)",
+                                                intruder['confidence'], persons_str, last_auth['frames_since_seen'])
                                     break
                     
                     if not likely_same_person:
-                        print(f"🚨 INTRUDERS ONLY: No authorized personnel detected - intruder alert sent")
+                        logger.warning("🚨 INTRUDERS ONLY [Camera_%s]: No authorized personnel detected - intruder alert sent", camera_name)
                         # Clear last authorized person memory (real intruder detected)
                         if camera_name in self.last_authorized_person:
                             del self.last_authorized_person[camera_name]
@@ -1185,22 +1403,18 @@ class MultiCameraAISurveillance:
                             recently_authorized = True
                             # Show ALL authorized persons who were recently seen
                             persons_str = ', '.join(last_auth['names'])
-                            print(f"ℹ️  INFO: {persons_str} face(s) temporarily not visible (frame {last_auth['frames_since_seen']}/{self.max_frames_without_face}) - no alert")
+                            logger.debug("ℹ️  INFO: %s face(s) temporarily not visible (frame %d/%d) - no alert",
+                                         persons_str, last_auth['frames_since_seen'], self.max_frames_without_face)
                         else:
                             # Too many frames without seeing face, forget this person
-                            print(f"🚨 INTRUDER: Person detected but face not visible for {self.max_frames_without_face}+ frames - potential intruder")
+                            logger.warning("🚨 INTRUDER [Camera_%s]: Person detected but face not visible for %d+ frames - potential intruder",
+                                           camera_name, self.max_frames_without_face)
                             del self.last_authorized_person[camera_name]
                             
                             # Send intruder alert (person was authorized but face hidden too long)
                             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                             snapshot_filename = f"intruder_{camera_name}_{timestamp}.jpg"
-                            snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-                            
-                            # Create directory if it doesn't exist
-                            os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-                            
-                            # Save the full frame as snapshot
-                            cv2.imwrite(snapshot_path, frame)
+                            snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
                             
                             # Send intruder alert (face not visible = suspicious)
                             self.alert_manager.send_intruder_alert(
@@ -1212,23 +1426,14 @@ class MultiCameraAISurveillance:
                     else:
                         # No previous memory - face detection will handle this on next frame
                         # Don't alert immediately, give face detection a chance to work
-                        print(f"ℹ️  INFO: Person detected, waiting for face detection (no previous authorization data)")
-                
-                # Close face recognition section (only when face detection actually ran)
-                print(f"{'='*60}")
+                        logger.debug("ℹ️  INFO: Person detected, waiting for face detection (no previous authorization data)")
         
         # Crowd detection (always alert for large groups regardless of authorization)
         if person_count > 3:
             # Save crowd snapshot
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             snapshot_filename = f"crowd_alert_{camera_name}_{timestamp}.jpg"
-            snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-            
-            # Save the full frame as snapshot
-            cv2.imwrite(snapshot_path, frame)
+            snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
             
             activity = {
                 'type': 'crowd',
@@ -1248,21 +1453,15 @@ class MultiCameraAISurveillance:
                     image_path=snapshot_path,
                     details={'person_count': person_count}
                 )
-                print(f"📧 Crowd alert email sent: {person_count} persons detected")
+                logger.warning("📧 Crowd alert sent [Camera_%s]: %d persons detected", camera_name, person_count)
             except Exception as e:
-                print(f"❌ Failed to send crowd alert email: {e}")
+                logger.error("❌ Failed to send crowd alert email: %s", e)
         
         if person_count == 0 and len(bags) > 0:
             # Save abandoned object snapshot
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             snapshot_filename = f"abandoned_object_{camera_name}_{timestamp}.jpg"
-            snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_filename)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
-            
-            # Save the full frame as snapshot
-            cv2.imwrite(snapshot_path, frame)
+            snapshot_path = snapshot_service.save(frame, os.path.join(SNAPSHOTS_DIR, snapshot_filename))
             
             activity = {
                 'type': 'abandoned_object',
@@ -1280,8 +1479,8 @@ class MultiCameraAISurveillance:
                 image_path=snapshot_path
             )
             self.alert_count += 1
-            print(f"⚠️ WARNING [Camera_{camera_name}]: ABANDONED OBJECT: Unattended bag/item detected")
-            print(f"📸 Object snapshot saved: {snapshot_path}")
+            logger.warning("⚠️ WARNING [Camera_%s]: ABANDONED OBJECT: Unattended bag/item detected", camera_name)
+            logger.debug("📸 Object snapshot saved: %s", snapshot_path)
         
         # Multi-camera correlation
         if len(detections) > 10:
@@ -1292,30 +1491,59 @@ class MultiCameraAISurveillance:
                 'bbox': None
             })
         
-        # Create annotated frame
-        annotated_frame = self.create_annotated_frame(frame, detections, activities, camera_name)
-        
-        # Add blank line after each camera's processing
-        print()
-        
-        return {
-            'original_frame': frame,
-            'annotated_frame': annotated_frame,
-            'detections': detections,
-            'persons': persons,
-            'weapons': weapons,
-            'bags': bags,
-            'activities': activities,
-            'timestamp': time.time()
-        }
+        # Compact results only: the frame stays in the frame hub and is annotated on demand (see _overlay_renderer)
+        return FrameResult.from_detections(detections, persons, weapons, bags, activities, tracks,
+                                           timestamp=time.time())
+    
+    def _overlay_renderer(self, camera_name, result):
+        """Render function for the frame hub: draws this result's overlays on a frame at an output width"""
+        return lambda frame, max_width: self.create_annotated_frame(
+            frame, result.detections(), result.activities, camera_name, max_width
+        )
+    
+    @staticmethod
+    def _metadata_describer(frame, result):
+        """Describe function for the frame hub: this result in the live view metadata schema (README)"""
+        def describe():
+            height, width = frame.shape[:2]
+            return {
+                'size': [width, height],
+                'detected_at': round(result.timestamp, 3),
+                'detections': [
+                    {'cls': name, 'conf': round(float(confidence), 3), 'box': box}
+                    for name, confidence, box in zip(result.class_names, result.confidences, result.boxes.tolist())
+                ],
+                'tracks': list(result.tracks),
+                'activities': [
+                    {'type': a['type'], 'severity': a['severity'], 'description': a['description'], 'box': a.get('bbox')}
+                    for a in result.activities
+                ]
+            }
+        return describe
     
-    def create_annotated_frame(self, frame, detections, activities, camera_name):
-        """Create frame with AI annotations"""
-        annotated = frame.copy()
+    def create_annotated_frame(self, frame, detections, activities, camera_name, max_width=0):
+        """
+        Create frame with AI annotations
+        
+        Args:
+            frame: Full resolution frame (not modified)
+            detections: Detections in full resolution coordinates
+            activities: Activities to list in the top left corner
+            camera_name: Camera shown in the info line
+            max_width: Downscale before drawing if the frame is wider (0 = full resolution)
+        """
+        height, width = frame.shape[:2]
+        scale = 1.0
+        if max_width and width > max_width:
+            # Resizing already makes a new image, so small outputs skip the full-frame copy
+            scale = max_width / width
+            annotated = cv2.resize(frame, (max_width, int(height * scale)))
+        else:
+            annotated = frame.copy()
         
         # Draw detections
         for detection in detections:
-            bbox = detection['bbox']
+            bbox = [int(v * scale) for v in detection['bbox']]
             class_name = detection['class_name']
             confidence = detection['confidence']
             
@@ -1364,27 +1592,28 @@ class MultiCameraAISurveillance:
     
     def log_activities(self, processed_data, camera_name):
         """Log activities from all cameras"""
-        activities = processed_data.get('activities', [])
-        detections = processed_data.get('detections', [])
+        activities = processed_data.activities
         
         # Log detection summary every 30 seconds
-        if len(detections) > 0 and int(time.time()) % 30 == 0:
-            persons_count = len(processed_data.get('persons', []))
+        if processed_data.detection_count > 0 and int(time.time()) % 30 == 0:
             log_entry = {
                 'time': datetime.now().strftime("%H:%M:%S"),
                 'camera': camera_name,
-                'description': f"Monitoring: {len(detections)} objects, {persons_count} persons",
+                'type': 'monitoring',
+                'description': f"Monitoring: {processed_data.detection_count} objects, {processed_data.person_count} persons",
                 'is_alert': False,
                 'is_warning': False,
                 'is_info': True
             }
-            self.activity_logs.append(log_entry)
+            seq = self.activity_logs.append(log_entry, time.time(), camera=camera_name, type='monitoring')
+            self.event_channel.publish('activity', dict(log_entry, seq=seq))
         
         # Log specific activities
         for activity in activities:
             log_entry = {
                 'time': datetime.now().strftime("%H:%M:%S"),
                 'camera': camera_name,
+                'type': activity['type'],
                 'description': activity['description'],
                 'severity': activity['severity'],
                 'is_alert': activity['severity'] in ['high', 'critical'],
@@ -1392,30 +1621,29 @@ class MultiCameraAISurveillance:
                 'is_info': activity['severity'] == 'low'
             }
             
-            self.activity_logs.append(log_entry)
+            seq = self.activity_logs.append(log_entry, time.time(), camera=camera_name, type=activity['type'])
+            self.event_channel.publish('activity', dict(log_entry, seq=seq))
             
             if log_entry['is_alert']:
                 self.alert_count += 1
-                print(f"🚨 ALERT [{camera_name}]: {activity['description']}")
+                logger.warning("🚨 ALERT [%s]: %s", camera_name, activity['description'])
             elif log_entry['is_warning']:
-                print(f"⚠️ WARNING [{camera_name}]: {activity['description']}")
-        
-        # Keep recent logs
-        if len(self.activity_logs) > 500:
-            self.activity_logs = self.activity_logs[-500:]
+                logger.info("⚠️ WARNING [%s]: %s", camera_name, activity['description'])
     
     def start_camera_surveillance(self, camera_name):
         """Start surveillance on specific camera"""
-        if camera_name in self.active_cameras:
+        state = self.cameras.get(camera_name)
+        if state is None:
+            print(f"⚠️ {camera_name} not found")
+            return
+        run = self.cameras.activate(camera_name)
+        if run is None:
             print(f"⚠️ {camera_name} already active")
             return
         
-        camera_info = self.camera_urls[camera_name]
-        self.active_cameras[camera_name] = True
-        
         thread = threading.Thread(
             target=self.process_camera_feed,
-            args=(camera_name, camera_info),
+            args=(camera_name, state.info, run),
             daemon=True
         )
         thread.start()
@@ -1423,20 +1651,20 @@ class MultiCameraAISurveillance:
     
     def stop_camera_surveillance(self, camera_name):
         """Stop surveillance on specific camera"""
-        if camera_name in self.active_cameras:
-            del self.active_cameras[camera_name]
-            if camera_name in self.latest_frames:
-                del self.latest_frames[camera_name]
+        state = self.cameras.get(camera_name)
+        if state is not None and self.cameras.deactivate(state):
+            self.frame_hub.remove(camera_name)
+            self.hls_hub.remove(camera_name)
             print(f"🛑 Stopped surveillance on {camera_name}")
     
     def start_all_surveillance(self):
         """Start surveillance on all detected cameras"""
         print("🚀 Starting AI surveillance on ALL cameras...")
         
-        for camera_name in self.camera_urls.keys():
+        for camera_name in self.cameras.names():
             self.start_camera_surveillance(camera_name)
         
-        print(f"🎯 Multi-camera surveillance active on {len(self.active_cameras)} cameras")
+        print(f"🎯 Multi-camera surveillance active on {len(self.cameras.active())} cameras")
         
         # Start automatic camera discovery
         self.start_camera_discovery()
@@ -1459,8 +1687,7 @@ class MultiCameraAISurveillance:
         # Stop auto-discovery first
         self.stop_camera_discovery()
         
-        camera_names = list(self.active_cameras.keys())
-        for camera_name in camera_names:
+        for camera_name in self.cameras.active_names():
             self.stop_camera_surveillance(camera_name)
         print("✅ All camera surveillance stopped")
     
@@ -1475,21 +1702,21 @@ class MultiCameraAISurveillance:
                 
                 # Check for new cameras not in current list
                 for camera_name, camera_info in new_cameras.items():
-                    if camera_name not in self.camera_urls:
+                    if camera_name not in self.cameras:
                         # New camera detected!
                         print(f"\n🆕 NEW CAMERA DETECTED: {camera_name}")
-                        self.camera_urls[camera_name] = camera_info
                         
                         # Get AI mode
                         ai_mode = camera_info.get('ai_mode', 'both') if isinstance(camera_info, dict) else 'both'
                         
                         # Initialize tracker and activity analyzer for new camera
-                        self.person_trackers[camera_name] = PersonTracker(
+                        tracker = PersonTracker(
                             tracker_type='KCF',
                             max_tracks=20,
-                            track_timeout=5.0
+                            track_timeout=5.0,
+                            tracking_scale=0.3
                         )
-                        self.activity_analyzers[camera_name] = SuspiciousActivityAnalyzer(
+                        analyzer = SuspiciousActivityAnalyzer(
                             loitering_threshold=30.0,
                             abandoned_object_threshold=60.0,
                             speed_threshold=150.0,
@@ -1509,14 +1736,11 @@ class MultiCameraAISurveillance:
                                 ActivityType.WEAPON_DETECTED
                             ]
                         )
-                        self.activity_analyzers[camera_name].add_detection_zone(default_zone)
+                        analyzer.add_detection_zone(default_zone)
                         
-                        # Store AI mode in detection stats
-                        self.detection_stats[camera_name] = {
-                            'ai_mode': ai_mode,
-                            'detections': 0,
-                            'alerts': 0
-                        }
+                        # Register the camera fully set up (AI mode in its stats), then start it
+                        self.cameras.add(camera_name, camera_info, tracker=tracker, analyzer=analyzer,
+                                         stats={'ai_mode': ai_mode, 'detections': 0, 'alerts': 0})
                         
                         # Start surveillance on new camera
                         self.start_camera_surveillance(camera_name)
@@ -1524,11 +1748,12 @@ class MultiCameraAISurveillance:
                         print(f"   🤖 AI Mode: {ai_mode.upper()}")
                 
                 # Check for removed cameras
-                for camera_name in list(self.camera_urls.keys()):
+                for camera_name in self.cameras.names():
                     if camera_name not in new_cameras:
                         print(f"\n🔴 CAMERA REMOVED: {camera_name}")
                         self.stop_camera_surveillance(camera_name)
-                        del self.camera_urls[camera_name]
+                        self.passthrough_hub.remove(camera_name)
+                        self.cameras.remove(camera_name)
                         
             except Exception as e:
                 print(f"⚠️ Camera discovery error: {e}")
@@ -1546,6 +1771,8 @@ class MultiCameraAISurveillance:
         self.app.run(host=host, port=port, debug=False, threaded=True)
 
 if __name__ == "__main__":
+    configure_logging()
+    
     print("\n" + "=" * 70)
     print("🔍 MULTI-CAMERA AI SURVEILLANCE SYSTEM - STARTING...")
     print("=" * 70)
@@ -1557,7 +1784,7 @@ if __name__ == "__main__":
     print("✅ SYSTEM READY")
     print("=" * 70)
     print("📊 System Configuration:")
-    print(f"   📹 Cameras Detected: {len(surveillance.camera_urls)}")
+    print(f"   📹 Cameras Detected: {len(surveillance.cameras)}")
     print(f"   🤖 AI Detection: YOLOv9 + MobileNetV2 Face Recognition")
     print(f"   🚨 Email Alerts: {'✅ Enabled' if surveillance.alert_manager.email_service.enabled else '❌ Disabled'}")
     print(f"   🎯 Activity Detection: Loitering | Intrusion | Running | Objects")
@@ -1568,7 +1795,7 @@ if __name__ == "__main__":
         # Auto-start surveillance on all cameras
         print("\n🚀 Starting surveillance on all cameras...")
         surveillance.start_all_surveillance()
-        print(f"✅ {len(surveillance.active_cameras)} camera(s) active")
+        print(f"✅ {len(surveillance.cameras.active())} camera(s) active")
         
         # Launch web dashboard
         print(f"\n🌐 Web Dashboard: http://0.0.0.0:8001")
@@ -1578,4 +1805,6 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n🛑 Shutting down multi-camera surveillance...")
         surveillance.stop_all_surveillance()
+        surveillance.alert_manager.shutdown()
+        snapshot_service.shutdown()
         print("✅ System shutdown complete")
\ No newline at end of file
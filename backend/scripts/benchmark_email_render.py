@@ -0,0 +1,61 @@
+"""
+Render time benchmark for alert email bodies
+Compares compiling the template per alert, rendering a compiled Jinja2
+template per alert and the renderer's cached static fragments
+"""
+
+import sys
+import timeit
+sys.path.append('.')
+
+from app.services.email_templates import EmailTemplateRenderer
+
+STYLE = {'color': '#dc3545', 'icon': '👤', 'priority': 'Critical'}
+ALERT = {
+    'type': 'intruder',
+    'description': 'Unauthorized person detected in farm area: Unknown',
+    'location': 'Camera cam1',
+    'camera_id': 'cam1',
+    'confidence': 0.87,
+    'timestamp': '2025-03-14T09:26:53',
+    'id': 'ALERT_1741944413000',
+    'image_path': 'storage/snapshots/intruder_cam1.jpg'
+}
+JINJA_FIELDS = {
+    'formatted_time': '2025-03-14 09:26:53', 'confidence': 87.0, 'confidence_text': '87.0',
+    'location': 'Camera cam1', 'camera_id': 'cam1', 'description': ALERT['description'],
+    'alert_type_title': 'Intruder', 'alert_id': ALERT['id'], 'escalated': False,
+    'escalated_to': '', 'escalated_by': '', 'has_image': True, 'image_cid': 'alert_image'
+}
+
+
+def per_alert_us(func, number):
+    """Best of 5 runs, in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run_benchmark(number=5000):
+    renderer = EmailTemplateRenderer()
+
+    def compile_each_time():
+        fresh = EmailTemplateRenderer()
+        fresh.render_alert(ALERT, STYLE)
+
+    renderer.warm([STYLE])
+    jinja_template = renderer._styles[renderer._style_key(STYLE)]
+
+    print("=" * 70)
+    print(f"Alert email render benchmark ({len(renderer.render_alert(ALERT, STYLE))} character body)")
+    print("=" * 70)
+    rows = [
+        ('compile + render', per_alert_us(compile_each_time, max(number // 100, 10))),
+        ('Jinja2 render (compiled)', per_alert_us(lambda: jinja_template.render(**JINJA_FIELDS), number)),
+        ('cached fragments', per_alert_us(lambda: renderer.render_alert(ALERT, STYLE), number)),
+    ]
+    for label, us in rows:
+        print(f"{label:>28} | {us:>10.1f} us/alert")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,47 @@
+"""
+Encode cost benchmark for MJPEG live views
+Compares one encoder loop per browser tab (the original generate_frames)
+with the shared per-camera FrameBroadcaster
+"""
+
+import sys
+import time
+import numpy as np
+sys.path.append('.')
+
+from app.services.frame_broadcast import FrameBroadcaster, STREAM_TIERS, encode_live_frame
+
+
+def run_benchmark(cameras=4, viewers=5, ticks=40):
+    frames = [np.random.randint(0, 255, (1080, 1920, 3), dtype=np.uint8) for _ in range(cameras)]
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for frame in frames:
+            for _ in range(viewers):
+                encode_live_frame(frame, STREAM_TIERS['medium'])  # every tab, every 50 ms
+    legacy_s = time.perf_counter() - start
+    legacy_encodes = ticks * cameras * viewers
+
+    broadcasters = [FrameBroadcaster(f'cam{i}') for i in range(cameras)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for broadcaster, frame in zip(broadcasters, frames):
+            broadcaster.publish(frame)
+            version = broadcaster.version
+            for _ in range(viewers):
+                broadcaster.wait_for_frame('medium', version - 1)
+    shared_s = time.perf_counter() - start
+    shared_encodes = sum(b.encodes for b in broadcasters)
+
+    print("=" * 70)
+    print(f"Live view encode benchmark: {cameras} cameras x {viewers} viewers, {ticks} frames per camera")
+    print("=" * 70)
+    for label, encodes, seconds in (('per-viewer encode', legacy_encodes, legacy_s),
+                                    ('shared broadcaster', shared_encodes, shared_s)):
+        print(f"{label:>22} | {encodes:>5} encodes | {seconds * 1000 / ticks:>8.1f} ms per tick")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
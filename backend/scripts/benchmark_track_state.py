@@ -0,0 +1,114 @@
+"""
+Memory benchmark for PersonTracker track state bookkeeping
+Compares the legacy dict + list-of-dicts history with array-backed TrackState
+"""
+
+import sys
+import time
+import tracemalloc
+sys.path.append('.')
+
+from surveillance.tracker import TrackState
+
+
+def legacy_new_state(track_id, bbox, timestamp):
+    """Track state dict as created by the original tracker"""
+    x1, y1, x2, y2 = bbox
+    return {
+        'track_id': track_id,
+        'bbox': bbox,
+        'center': ((x1 + x2) // 2, (y1 + y2) // 2),
+        'detection': None,
+        'confidence': 0.9,
+        'created_time': timestamp,
+        'last_update': timestamp,
+        'frame_count': 1,
+        'position_history': [{'timestamp': timestamp, 'center': ((x1 + x2) // 2, (y1 + y2) // 2), 'bbox': bbox}],
+        'face_crops': [],
+        'identity': 'unknown',
+        'authorization_status': 'pending'
+    }
+
+
+def legacy_update(states, current_time, frame):
+    """Per-frame bookkeeping of the original tracker.update()"""
+    for state in states.values():
+        x, y = 100 + frame % 50, 200
+        bbox = [int(x), int(y), int(x + 80), int(y + 200)]
+        state['bbox'] = bbox
+        state['last_update'] = current_time
+        state['center'] = (int(x + 40), int(y + 100))
+        state['frame_count'] += 1
+        state['position_history'].append({'timestamp': current_time, 'center': (int(x + 40), int(y + 100)), 'bbox': bbox})
+        history = state['position_history']
+        state['position_history'] = [h for h in history if current_time - h['timestamp'] <= 10.0]
+    return {track_id: state.copy() for track_id, state in states.items()}
+
+
+def compact_update(states, current_time, frame):
+    """Per-frame bookkeeping of the array-backed tracker.update()"""
+    for state in states.values():
+        x, y = 100 + frame % 50, 200
+        bbox = [int(x), int(y), int(x + 80), int(y + 200)]
+        center = (int(x + 40), int(y + 100))
+        state.bbox = bbox
+        state.last_update = current_time
+        state.center = center
+        state.frame_count += 1
+        state.push_position(current_time, center, bbox)
+    return {track_id: state for track_id, state in states.items()}
+
+
+def measure(make_state, update, tracks, fps, warmup_seconds=12.0, frames=300):
+    """Run a steady-state simulation and return memory/allocation figures"""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    states = {i: make_state(i, [100, 200, 180, 400], 0.0) for i in range(tracks)}
+    
+    # Fill the 10 second history window first
+    t = 0.0
+    frame = 0
+    while t < warmup_seconds:
+        t += 1.0 / fps
+        frame += 1
+        update(states, t, frame)
+    retained = tracemalloc.get_traced_memory()[0] - base
+    
+    # Allocation churn per frame in steady state
+    allocated = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        t += 1.0 / fps
+        frame += 1
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = update(states, t, frame)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+        del result
+    elapsed = (time.perf_counter() - start) / frames * 1000.0
+    tracemalloc.stop()
+    return retained, allocated / frames, elapsed
+
+
+def run_benchmark(tracks=20, fps=30):
+    print("=" * 70)
+    print(f"Track state benchmark: {tracks} tracks at {fps} updates/s, 10 s history")
+    print("=" * 70)
+    legacy = measure(legacy_new_state, legacy_update, tracks, fps)
+    compact = measure(lambda i, bbox, t: TrackState(i, {'bbox': bbox, 'confidence': 0.9}, t),
+                      compact_update, tracks, fps)
+    
+    print(f"{'':>24} | {'legacy':>12} | {'TrackState':>12} | {'reduction':>10}")
+    print("-" * 70)
+    rows = [
+        ('retained memory (KB)', legacy[0] / 1024, compact[0] / 1024),
+        ('peak alloc/frame (KB)', legacy[1] / 1024, compact[1] / 1024),
+        ('update time (ms, traced)', legacy[2], compact[2]),
+    ]
+    for label, old, new in rows:
+        print(f"{label:>24} | {old:>12.1f} | {new:>12.1f} | {old / max(new, 1e-9):>9.1f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
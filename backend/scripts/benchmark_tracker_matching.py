@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for PersonTracker detection-to-track matching
+Compares the legacy per-pair IoU loop with the vectorized cost matrix + assignment
+"""
+
+import sys
+import time
+import numpy as np
+sys.path.append('.')
+
+from surveillance.tracker import PersonTracker, TrackState, SCIPY_AVAILABLE
+
+
+def make_boxes(rng, count):
+    """Generate random person-shaped boxes on a 1920x1080 frame"""
+    x1 = rng.uniform(0, 1800, count)
+    y1 = rng.uniform(0, 800, count)
+    w = rng.uniform(40, 120, count)
+    h = rng.uniform(120, 280, count)
+    return np.stack([x1, y1, x1 + w, y1 + h], axis=1).astype(int)
+
+
+def legacy_match(tracker, track_boxes, detections):
+    """Original nested-loop greedy matcher (kept here for comparison)"""
+    matches = {}
+    used_detections = set()
+    for track_id, track_bbox in track_boxes.items():
+        best_iou = 0
+        best_detection_idx = -1
+        for det_idx, detection in enumerate(detections):
+            if det_idx in used_detections:
+                continue
+            iou = tracker._calculate_iou(track_bbox, detection['bbox'])
+            if iou > tracker.iou_threshold and iou > best_iou:
+                best_iou = iou
+                best_detection_idx = det_idx
+        if best_detection_idx >= 0:
+            matches[track_id] = best_detection_idx
+            used_detections.add(best_detection_idx)
+    return matches
+
+
+def time_call(func, repeats):
+    """Average wall time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def run_benchmark(sizes=(5, 10, 20, 50), repeats=200):
+    rng = np.random.default_rng(0)
+    print("=" * 70)
+    print(f"PersonTracker matching benchmark (SciPy assignment: {SCIPY_AVAILABLE})")
+    print("=" * 70)
+    print(f"{'tracks x dets':>14} | {'legacy loop (ms)':>16} | {'vectorized (ms)':>16} | {'speedup':>8}")
+    print("-" * 70)
+
+    for size in sizes:
+        tracker = PersonTracker(max_tracks=size)
+        boxes = make_boxes(rng, size)
+        # Detections are the same people shifted by a few pixels, in shuffled order
+        det_boxes = boxes + rng.integers(-5, 6, boxes.shape)
+        detections = [{'bbox': b.tolist(), 'confidence': 0.9} for b in rng.permutation(det_boxes)]
+
+        # Fake active tracks; matching only reads boxes from track_states
+        for track_id, box in enumerate(boxes.tolist(), start=1):
+            tracker.active_tracks[track_id] = None
+            tracker.track_states[track_id] = TrackState(track_id, {'bbox': box, 'confidence': 0.9}, 0.0)
+        track_boxes = {tid: state.bbox for tid, state in tracker.track_states.items()}
+
+        legacy_ms = time_call(lambda: legacy_match(tracker, track_boxes, detections), repeats)
+        vector_ms = time_call(lambda: tracker._match_detections_to_tracks(detections), repeats)
+        print(f"{size:>6} x {size:<5} | {legacy_ms:>16.3f} | {vector_ms:>16.3f} | {legacy_ms / vector_ms:>7.1f}x")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Local SendGrid Stand-in
+Accepts mail/send requests on localhost so email delivery can be tested
+without a SendGrid account
+
+Usage:
+    python scripts/sendgrid_stub.py --port 8025
+    SENDGRID_API_URL=http://127.0.0.1:8025/v3/mail/send python multi_camera_surveillance.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SendGridStub:
+    """
+    Minimal /v3/mail/send endpoint
+
+    Accepted messages are kept in `messages`. fail_next() makes the next
+    requests answer with an error status to exercise retries.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0):
+        """
+        Initialize stand-in server
+
+        Args:
+            host: Interface to listen on
+            port: Port (0 picks a free port)
+            delay: Seconds to wait before answering each request
+        """
+        self.delay = delay
+        self.messages = []
+        self.requests = 0
+        self.connections = set()  # Client (host, port) pairs, shows connection reuse
+        self._failures = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                status = stub._handle(self.path, self.headers, body, self.client_address)
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v3/mail/send"
+
+    def fail_next(self, count=1, status=503):
+        """Answer the next `count` requests with `status`"""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _handle(self, path, headers, body, client_address):
+        if self.delay:
+            time.sleep(self.delay)
+
+        with self._lock:
+            self.requests += 1
+            self.connections.add(client_address)
+            if self._failures:
+                return self._failures.pop(0)
+
+        if path != '/v3/mail/send' or not headers.get('Authorization', '').startswith('Bearer '):
+            return 401
+        try:
+            message = json.loads(body)
+        except ValueError:
+            return 400
+
+        with self._lock:
+            self.messages.append(message)
+        return 202
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="SendGridStub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SendGrid mail/send stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+
+    stub = SendGridStub(args.host, args.port, args.delay)
+    print(f"📧 SendGrid stand-in listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📨 Received {len(stub.messages)} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,24 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
+from .object_registry import StationaryObjectRegistry
+from .event_store import EventStore
+
 logger = logging.getLogger(__name__)
 
+# Zone label masks store zone index + 1 in a uint8 (0 = no zone)
+MAX_MASK_ZONES = 254
+
+# Number of most recent positions used for speed estimation
+SPEED_HISTORY_LENGTH = 5
+
+# Number of activities kept in the analyzer history
+ACTIVITY_HISTORY_SIZE = 1000
+
+# COCO class IDs used by the object detectors
+WEAPON_CLASSES = [34, 43, 76]  # baseball bat, knife, scissors
+BAG_CLASSES = [24, 26, 28]  # backpack, handbag, suitcase
+
 class ActivityType(Enum):
     """Types of suspicious activities"""
     LOITERING = "loitering"
@@ -62,7 +78,10 @@ class SuspiciousActivityAnalyzer:
                  loitering_threshold: float = 30.0,
                  abandoned_object_threshold: float = 60.0,
                  speed_threshold: float = 5.0,
-                 crowd_threshold: int = 5):
+                 crowd_threshold: int = 5,
+                 frame_size: Optional[Tuple[int, int]] = None,
+                 batch_analysis: bool = True,
+                 object_tolerance: float = 40.0):
         """
         Initialize activity analyzer
         
@@ -71,21 +90,37 @@ class SuspiciousActivityAnalyzer:
             abandoned_object_threshold: Time in seconds for abandoned object detection
             speed_threshold: Speed threshold for running detection (pixels/second)
             crowd_threshold: Number of people for crowd formation detection
+            frame_size: Camera resolution (width, height) used to size the zone
+                lookup mask; defaults to the extent of the zone polygons
+            batch_analysis: Compute speeds, loitering and weapon proximity for all
+                tracks at once with numpy instead of track by track
+            object_tolerance: Distance in pixels within which repeated bag
+                detections are treated as the same stationary object
         """
         self.loitering_threshold = loitering_threshold
         self.abandoned_object_threshold = abandoned_object_threshold
         self.speed_threshold = speed_threshold
         self.crowd_threshold = crowd_threshold
+        self.loiter_radius = 50  # pixels
+        self.weapon_distance = 100  # pixels between weapon and person centers
+        self.batch_analysis = batch_analysis
         
         # Detection zones
         self.zones: List[DetectionZone] = []
+        self.frame_size = frame_size
+        
+        # Rasterized zone lookup: label mask (zone index + 1 per pixel) and
+        # per-point cache, both rebuilt when zones or frame size change
+        self._zone_mask: Optional[np.ndarray] = None
+        self._zone_mask_dirty = True
+        self._zone_cache: Dict[Tuple[int, int], Optional[DetectionZone]] = {}
         
         # Activity tracking
         self.active_activities: Dict[str, SuspiciousActivity] = {}  # activity_id -> activity
-        self.activity_history: List[SuspiciousActivity] = []
+        self.activity_history = EventStore(capacity=ACTIVITY_HISTORY_SIZE, index_fields=('type',))
         
         # Object tracking for abandoned objects
-        self.stationary_objects: Dict[str, Dict] = {}  # object_id -> state
+        self.stationary_objects = StationaryObjectRegistry(tolerance=object_tolerance)
         
         # Zone intrusion tracking
         self.zone_intrusions: Dict[Tuple[int, str], float] = {}  # (track_id, zone_name) -> start_time
@@ -98,6 +133,7 @@ class SuspiciousActivityAnalyzer:
             zone: DetectionZone object
         """
         self.zones.append(zone)
+        self._invalidate_zone_mask()
         logger.info(f"Added detection zone: {zone.name} ({zone.zone_type})")
     
     def remove_detection_zone(self, zone_name: str):
@@ -108,8 +144,57 @@ class SuspiciousActivityAnalyzer:
             zone_name: Name of zone to remove
         """
         self.zones = [z for z in self.zones if z.name != zone_name]
+        self._invalidate_zone_mask()
         logger.info(f"Removed detection zone: {zone_name}")
     
+    def set_frame_size(self, width: int, height: int):
+        """
+        Set the camera resolution used for the zone lookup mask
+        
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+        """
+        if self.frame_size != (width, height):
+            self.frame_size = (width, height)
+            self._invalidate_zone_mask()
+    
+    def _invalidate_zone_mask(self):
+        """Mark the zone lookup mask for rebuild after zones change"""
+        self._zone_mask_dirty = True
+        self._zone_cache.clear()
+    
+    def _build_zone_mask(self):
+        """
+        Rasterize zone polygons into a label mask
+        
+        Each pixel holds the index + 1 of the first zone containing it (0 for
+        none), matching the first-match order of the polygon test. Zones are
+        painted last to first so earlier zones win where they overlap.
+        """
+        self._zone_mask_dirty = False
+        self._zone_mask = None
+        
+        if not self.zones or len(self.zones) > MAX_MASK_ZONES:
+            return
+        
+        if self.frame_size is not None:
+            width, height = self.frame_size
+        else:
+            all_points = np.array([p for zone in self.zones for p in zone.points])
+            width, height = int(all_points[:, 0].max()) + 1, int(all_points[:, 1].max()) + 1
+        
+        if width <= 0 or height <= 0:
+            return
+        
+        mask = np.zeros((height, width), dtype=np.uint8)
+        for index in range(len(self.zones) - 1, -1, -1):
+            points = np.array(self.zones[index].points, np.int32).reshape((-1, 1, 2))
+            cv2.fillPoly(mask, [points], index + 1)
+        
+        self._zone_mask = mask
+        logger.debug("Built zone mask %dx%d for %d zones", width, height, len(self.zones))
+    
     def point_in_polygon(self, point: Tuple[int, int], polygon: List[Tuple[int, int]]) -> bool:
         """
         Check if point is inside polygon using ray casting algorithm
@@ -143,16 +228,38 @@ class SuspiciousActivityAnalyzer:
         """
         Get the detection zone containing a point
         
+        Uses the rasterized zone mask (one array lookup); points outside the
+        mask fall back to the polygon test. Results are cached per point until
+        zones change, so detectors looking up the same track center share one
+        lookup.
+        
         Args:
             point: (x, y) coordinates
             
         Returns:
             DetectionZone or None if not in any zone
         """
-        for zone in self.zones:
-            if self.point_in_polygon(point, zone.points):
-                return zone
-        return None
+        if self._zone_mask_dirty:
+            self._build_zone_mask()
+        
+        key = (int(point[0]), int(point[1]))
+        if key in self._zone_cache:
+            return self._zone_cache[key]
+        
+        x, y = key
+        mask = self._zone_mask
+        if mask is not None and 0 <= y < mask.shape[0] and 0 <= x < mask.shape[1]:
+            label = mask[y, x]
+            zone = self.zones[label - 1] if label else None
+        else:
+            zone = None
+            for candidate in self.zones:
+                if self.point_in_polygon(point, candidate.points):
+                    zone = candidate
+                    break
+        
+        self._zone_cache[key] = zone
+        return zone
     
     def calculate_movement_speed(self, track_state: Dict) -> float:
         """
@@ -167,14 +274,14 @@ class SuspiciousActivityAnalyzer:
         track_id = track_state.get('track_id', 'unknown')
         
         if 'position_history' not in track_state or len(track_state['position_history']) < 2:
-            print(f"  [Track {track_id}] No position history (len={len(track_state.get('position_history', []))})")
+            logger.debug("Track %s: no position history", track_id)
             return 0.0
         
         history = track_state['position_history']
-        recent_positions = history[-5:]  # Last 5 positions
+        recent_positions = history[-SPEED_HISTORY_LENGTH:]  # Last 5 positions
         
         if len(recent_positions) < 2:
-            print(f"  [Track {track_id}] Not enough recent positions ({len(recent_positions)})")
+            logger.debug("Track %s: not enough recent positions (%d)", track_id, len(recent_positions))
             return 0.0
         
         # Calculate total distance and time
@@ -195,17 +302,21 @@ class SuspiciousActivityAnalyzer:
         
         if total_time > 0:
             speed = total_distance / total_time
-            print(f"  [Track {track_id}] Speed calculated: {speed:.1f} px/s (distance={total_distance:.1f}, time={total_time:.3f}s)")
+            logger.debug("Track %s: speed %.1f px/s (distance=%.1f, time=%.3fs)",
+                         track_id, speed, total_distance, total_time)
             return speed
         return 0.0
     
-    def detect_loitering(self, track_state: Dict, current_time: float) -> Optional[SuspiciousActivity]:
+    def detect_loitering(self, track_state: Dict, current_time: float,
+                         loiter_stats: Optional[Tuple[int, float]] = None) -> Optional[SuspiciousActivity]:
         """
         Detect loitering behavior
         
         Args:
             track_state: Track state dictionary
             current_time: Current timestamp
+            loiter_stats: Precomputed (recent position count, max displacement from
+                the first recent position) from compute_track_metrics()
             
         Returns:
             SuspiciousActivity if detected, None otherwise
@@ -218,30 +329,36 @@ class SuspiciousActivityAnalyzer:
         if zone is None or ActivityType.LOITERING not in zone.activity_types:
             return None
         
-        # Check time spent in current location
-        if 'position_history' not in track_state:
-            return None
-        
-        # Calculate how long person has been in roughly the same area
-        recent_positions = [h for h in track_state['position_history'] 
-                          if current_time - h['timestamp'] <= self.loitering_threshold]
-        
-        if len(recent_positions) < 2:
-            return None
-        
-        # Check if movement is minimal (within small radius)
-        loiter_radius = 50  # pixels
-        start_pos = recent_positions[0]['center']
-        
-        is_loitering = True
-        for pos_data in recent_positions[1:]:
-            pos = pos_data['center']
-            distance = np.sqrt((pos[0] - start_pos[0])**2 + (pos[1] - start_pos[1])**2)
-            if distance > loiter_radius:
-                is_loitering = False
-                break
-        
-        if is_loitering and len(recent_positions) >= self.loitering_threshold * 2:  # Approximate frame rate
+        if loiter_stats is not None:
+            recent_count, max_displacement = loiter_stats
+            if recent_count < 2:
+                return None
+            is_loitering = max_displacement <= self.loiter_radius
+        else:
+            # Check time spent in current location
+            if 'position_history' not in track_state:
+                return None
+            
+            # Calculate how long person has been in roughly the same area
+            recent_positions = [h for h in track_state['position_history'] 
+                              if current_time - h['timestamp'] <= self.loitering_threshold]
+            recent_count = len(recent_positions)
+            
+            if recent_count < 2:
+                return None
+            
+            # Check if movement is minimal (within small radius)
+            start_pos = recent_positions[0]['center']
+            
+            is_loitering = True
+            for pos_data in recent_positions[1:]:
+                pos = pos_data['center']
+                distance = np.sqrt((pos[0] - start_pos[0])**2 + (pos[1] - start_pos[1])**2)
+                if distance > self.loiter_radius:
+                    is_loitering = False
+                    break
+        
+        if is_loitering and recent_count >= self.loitering_threshold * 2:  # Approximate frame rate
             return SuspiciousActivity(
                 activity_type=ActivityType.LOITERING,
                 threat_level=ThreatLevel.MEDIUM,
@@ -251,7 +368,7 @@ class SuspiciousActivityAnalyzer:
                 location=center,
                 zone_name=zone.name,
                 confidence=0.8,
-                evidence={'duration': len(recent_positions) / 2, 'zone': zone.name}
+                evidence={'duration': recent_count / 2, 'zone': zone.name}
             )
         
         return None
@@ -347,6 +464,32 @@ class SuspiciousActivityAnalyzer:
         self.active_activities[activity_id] = activity
         return activity
     
+    def _weapon_center(self, weapon_det: Dict) -> Tuple[int, int]:
+        """Center point of a weapon detection"""
+        return (
+            (weapon_det['bbox'][0] + weapon_det['bbox'][2]) // 2,
+            (weapon_det['bbox'][1] + weapon_det['bbox'][3]) // 2
+        )
+    
+    def _weapon_activity(self, weapon_det: Dict, weapon_center: Tuple[int, int],
+                         track_id: int, current_time: float) -> SuspiciousActivity:
+        """Build the activity for a weapon associated with a person track"""
+        zone = self.get_zone_for_point(weapon_center)
+        zone_name = zone.name if zone else "unknown_area"
+        
+        return SuspiciousActivity(
+            activity_type=ActivityType.WEAPON_DETECTED,
+            threat_level=ThreatLevel.CRITICAL,
+            track_id=track_id,
+            description=f"Weapon detected: {weapon_det['class_name']}",
+            timestamp=current_time,
+            location=weapon_center,
+            zone_name=zone_name,
+            confidence=weapon_det['confidence'],
+            evidence={'weapon_type': weapon_det['class_name'], 
+                     'weapon_confidence': weapon_det['confidence']}
+        )
+    
     def detect_weapon(self, detections: List[Dict], tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
         """
         Detect weapons in detections and associate with tracks
@@ -362,14 +505,10 @@ class SuspiciousActivityAnalyzer:
         activities = []
         
         # Filter weapon detections
-        weapon_classes = [34, 43, 76]  # baseball bat, knife, scissors
-        weapon_detections = [det for det in detections if det['class_id'] in weapon_classes]
+        weapon_detections = [det for det in detections if det['class_id'] in WEAPON_CLASSES]
         
         for weapon_det in weapon_detections:
-            weapon_center = (
-                (weapon_det['bbox'][0] + weapon_det['bbox'][2]) // 2,
-                (weapon_det['bbox'][1] + weapon_det['bbox'][3]) // 2
-            )
+            weapon_center = self._weapon_center(weapon_det)
             
             # Find closest person track
             closest_track_id = None
@@ -380,29 +519,46 @@ class SuspiciousActivityAnalyzer:
                 distance = np.sqrt((weapon_center[0] - track_center[0])**2 + 
                                  (weapon_center[1] - track_center[1])**2)
                 
-                if distance < min_distance and distance < 100:  # Within 100 pixels
+                if distance < min_distance and distance < self.weapon_distance:
                     min_distance = distance
                     closest_track_id = track_id
             
             if closest_track_id is not None:
-                zone = self.get_zone_for_point(weapon_center)
-                zone_name = zone.name if zone else "unknown_area"
-                
-                activity = SuspiciousActivity(
-                    activity_type=ActivityType.WEAPON_DETECTED,
-                    threat_level=ThreatLevel.CRITICAL,
-                    track_id=closest_track_id,
-                    description=f"Weapon detected: {weapon_det['class_name']}",
-                    timestamp=current_time,
-                    location=weapon_center,
-                    zone_name=zone_name,
-                    confidence=weapon_det['confidence'],
-                    evidence={'weapon_type': weapon_det['class_name'], 
-                             'weapon_confidence': weapon_det['confidence']}
-                )
-                
-                activities.append(activity)
+                activities.append(self._weapon_activity(weapon_det, weapon_center, closest_track_id, current_time))
+        
+        return activities
+    
+    def detect_weapon_batch(self, detections: List[Dict], tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
+        """
+        Vectorized detect_weapon(): all weapon-to-person distances in one matrix
+        
+        Args:
+            detections: List of object detections
+            tracks: Dictionary of track states
+            current_time: Current timestamp
+            
+        Returns:
+            List of weapon-related suspicious activities
+        """
+        weapon_detections = [det for det in detections if det['class_id'] in WEAPON_CLASSES]
+        if not weapon_detections or not tracks:
+            return []
+        
+        track_ids = list(tracks.keys())
+        weapon_centers = [self._weapon_center(det) for det in weapon_detections]
+        track_centers = np.array([state['center'] for state in tracks.values()], dtype=np.int64)
+        
+        diff = np.array(weapon_centers, dtype=np.int64)[:, None, :] - track_centers[None, :, :]
+        distances = np.sqrt((diff ** 2).sum(axis=2))
+        
+        # argmin returns the first minimum, like the strict '<' scan over tracks
+        closest = distances.argmin(axis=1)
+        closest_distance = distances[np.arange(len(weapon_detections)), closest]
         
+        activities = []
+        for i in np.nonzero(closest_distance < self.weapon_distance)[0].tolist():
+            activities.append(self._weapon_activity(weapon_detections[i], weapon_centers[i],
+                                                    track_ids[closest[i]], current_time))
         return activities
     
     def detect_abandoned_objects(self, detections: List[Dict], current_time: float) -> List[SuspiciousActivity]:
@@ -419,70 +575,55 @@ class SuspiciousActivityAnalyzer:
         activities = []
         
         # Filter bag detections
-        bag_classes = [24, 26, 28]  # backpack, handbag, suitcase
-        bag_detections = [det for det in detections if det['class_id'] in bag_classes]
+        bag_detections = [det for det in detections if det['class_id'] in BAG_CLASSES]
         
-        for bag_det in bag_detections:
-            bag_center = (
-                (bag_det['bbox'][0] + bag_det['bbox'][2]) // 2,
-                (bag_det['bbox'][1] + bag_det['bbox'][3]) // 2
-            )
+        # Associate detections with stationary objects (tolerant to box jitter)
+        for obj, bag_det in self.stationary_objects.update(bag_detections, current_time):
+            if obj.alerted:
+                continue  # Already reported while it stays in place
             
-            # Create object ID based on location
-            object_id = f"bag_{bag_center[0]}_{bag_center[1]}"
-            
-            # Check if object is stationary
-            if object_id not in self.stationary_objects:
-                self.stationary_objects[object_id] = {
-                    'first_seen': current_time,
-                    'last_seen': current_time,
-                    'location': bag_center,
-                    'detection': bag_det
-                }
-            else:
-                # Update last seen time
-                obj_state = self.stationary_objects[object_id]
-                obj_state['last_seen'] = current_time
+            # Check if object has been abandoned
+            time_stationary = current_time - obj.first_seen
+            if time_stationary >= self.abandoned_object_threshold:
+                bag_center = (
+                    (bag_det['bbox'][0] + bag_det['bbox'][2]) // 2,
+                    (bag_det['bbox'][1] + bag_det['bbox'][3]) // 2
+                )
+                zone = self.get_zone_for_point(bag_center)
+                zone_name = zone.name if zone else "unknown_area"
+                
+                activity = SuspiciousActivity(
+                    activity_type=ActivityType.ABANDONED_OBJECT,
+                    threat_level=ThreatLevel.MEDIUM,
+                    track_id=-1,  # Not associated with a specific person
+                    description=f"Abandoned object detected: {bag_det['class_name']}",
+                    timestamp=current_time,
+                    location=bag_center,
+                    zone_name=zone_name,
+                    confidence=bag_det['confidence'],
+                    evidence={'object_type': bag_det['class_name'],
+                            'time_abandoned': time_stationary,
+                            'object_id': obj.object_id}
+                )
                 
-                # Check if object has been abandoned
-                time_stationary = current_time - obj_state['first_seen']
-                if time_stationary >= self.abandoned_object_threshold:
-                    zone = self.get_zone_for_point(bag_center)
-                    zone_name = zone.name if zone else "unknown_area"
-                    
-                    activity = SuspiciousActivity(
-                        activity_type=ActivityType.ABANDONED_OBJECT,
-                        threat_level=ThreatLevel.MEDIUM,
-                        track_id=-1,  # Not associated with a specific person
-                        description=f"Abandoned object detected: {bag_det['class_name']}",
-                        timestamp=current_time,
-                        location=bag_center,
-                        zone_name=zone_name,
-                        confidence=bag_det['confidence'],
-                        evidence={'object_type': bag_det['class_name'],
-                                'time_abandoned': time_stationary}
-                    )
-                    
-                    activities.append(activity)
-                    # Remove from tracking to avoid duplicate alerts
-                    del self.stationary_objects[object_id]
+                activities.append(activity)
+                # Keep the object registered but avoid duplicate alerts
+                obj.alerted = True
         
         # Clean up old objects
-        cutoff_time = current_time - self.abandoned_object_threshold * 2
-        self.stationary_objects = {
-            k: v for k, v in self.stationary_objects.items()
-            if v['last_seen'] > cutoff_time
-        }
+        self.stationary_objects.evict_expired(current_time - self.abandoned_object_threshold * 2)
         
         return activities
     
-    def detect_running(self, track_state: Dict, current_time: float) -> Optional[SuspiciousActivity]:
+    def detect_running(self, track_state: Dict, current_time: float,
+                       speed: Optional[float] = None) -> Optional[SuspiciousActivity]:
         """
         Detect running behavior based on movement speed
         
         Args:
             track_state: Track state dictionary
             current_time: Current timestamp
+            speed: Precomputed speed from compute_track_metrics()
             
         Returns:
             SuspiciousActivity if detected, None otherwise
@@ -490,11 +631,13 @@ class SuspiciousActivityAnalyzer:
         track_id = track_state['track_id']
         center = track_state['center']
         
-        speed = self.calculate_movement_speed(track_state)
+        if speed is None:
+            speed = self.calculate_movement_speed(track_state)
         
-        # Debug: Print speed for all tracks with significant movement
+        # Debug: Log speed for all tracks with significant movement
         if speed > 10.0:  # Only log if moving more than 10 px/s
-            print(f"🏃 Track {track_id}: Speed = {speed:.1f} px/s (threshold: {self.speed_threshold:.1f} px/s)")
+            logger.debug("Track %s: speed %.1f px/s (threshold: %.1f px/s)",
+                         track_id, speed, self.speed_threshold)
         
         if speed > self.speed_threshold:
             zone = self.get_zone_for_point(center)
@@ -514,21 +657,114 @@ class SuspiciousActivityAnalyzer:
         
         return None
     
-    def analyze_frame(self, detections: List[Dict], tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
+    def _history_arrays(self, track_state: Dict) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Analyze frame for all types of suspicious activities
+        Get a track's position history as arrays
+        
+        Args:
+            track_state: TrackState or legacy track state dictionary
+            
+        Returns:
+            Tuple of (timestamps (N,), centers (N, 2))
+        """
+        if hasattr(track_state, 'history_timestamps'):
+            return track_state.history_timestamps, track_state.history_centers
+        
+        history = track_state.get('position_history', [])
+        if not history:
+            return np.empty(0, dtype=np.float64), np.empty((0, 2), dtype=np.int64)
+        return (np.array([h['timestamp'] for h in history], dtype=np.float64),
+                np.array([h['center'] for h in history], dtype=np.int64))
+    
+    def compute_track_metrics(self, tracks: Dict[int, Dict], current_time: float) -> Dict[str, np.ndarray]:
+        """
+        Compute movement metrics for all tracks at once
+        
+        Stacks every track's recent positions into arrays and evaluates the same
+        formulas as calculate_movement_speed() and detect_loitering(), summing in
+        the same order so results are bit-identical.
         
         Args:
-            detections: List of object detections
             tracks: Dictionary of track states
             current_time: Current timestamp
             
         Returns:
-            List of detected suspicious activities
+            Dictionary of per-track arrays (in `tracks` order):
+                'speed': speed over the last 5 positions (px/s)
+                'recent_count': positions within the loitering window
+                'max_displacement': farthest distance from the first position in
+                    the loitering window (loiter radius, px)
+                'dwell_time': loitering window duration estimate (seconds)
         """
+        num_tracks = len(tracks)
+        histories = [self._history_arrays(state) for state in tracks.values()]
+        lengths = np.array([len(ts) for ts, _ in histories], dtype=np.int64)
+        
+        # --- Speed over the last K positions ---
+        # Shorter histories are front-padded with their first position, which
+        # adds exact zeros to the distance and time sums
+        k = SPEED_HISTORY_LENGTH
+        stacked_ts = np.zeros((num_tracks, k), dtype=np.float64)
+        stacked_centers = np.zeros((num_tracks, k, 2), dtype=np.int64)
+        for i, (ts, centers) in enumerate(histories):
+            n = min(len(ts), k)
+            if n == 0:
+                continue
+            stacked_ts[i, k - n:] = ts[-n:]
+            stacked_ts[i, :k - n] = ts[-n]
+            stacked_centers[i, k - n:] = centers[-n:]
+            stacked_centers[i, :k - n] = centers[-n]
+        
+        step = np.diff(stacked_centers, axis=1)
+        step_distance = np.sqrt((step ** 2).sum(axis=2))
+        step_time = np.diff(stacked_ts, axis=1)
+        
+        # Accumulate left to right, matching the scalar loop
+        total_distance = np.zeros(num_tracks, dtype=np.float64)
+        total_time = np.zeros(num_tracks, dtype=np.float64)
+        for j in range(k - 1):
+            total_distance += step_distance[:, j]
+            total_time += step_time[:, j]
+        
+        speed = np.zeros(num_tracks, dtype=np.float64)
+        moving = (lengths >= 2) & (total_time > 0)
+        np.divide(total_distance, total_time, out=speed, where=moving)
+        
+        # --- Loitering window: count and radius of positions in the window ---
+        recent_count = np.zeros(num_tracks, dtype=np.int64)
+        max_displacement = np.zeros(num_tracks, dtype=np.float64)
+        nonempty = lengths > 0
+        if nonempty.any():
+            seg_lengths = lengths[nonempty]
+            flat_ts = np.concatenate([ts for ts, _ in histories if len(ts)])
+            flat_centers = np.concatenate([centers for ts, centers in histories if len(ts)]).astype(np.int64)
+            starts = np.concatenate(([0], np.cumsum(seg_lengths)[:-1]))
+            seg_ids = np.repeat(np.arange(len(seg_lengths)), seg_lengths)
+            
+            recent = (current_time - flat_ts) <= self.loitering_threshold
+            counts = np.add.reduceat(recent.astype(np.int64), starts)
+            
+            # First position inside the window for each track
+            positions = np.arange(len(flat_ts))
+            first = np.minimum.reduceat(np.where(recent, positions, len(flat_ts) - 1), starts)
+            
+            offset = flat_centers - flat_centers[first][seg_ids]
+            displacement = np.where(recent, np.sqrt((offset ** 2).sum(axis=1)), 0.0)
+            
+            recent_count[nonempty] = counts
+            max_displacement[nonempty] = np.maximum.reduceat(displacement, starts)
+        
+        return {
+            'speed': speed,
+            'recent_count': recent_count,
+            'max_displacement': max_displacement,
+            'dwell_time': recent_count / 2
+        }
+    
+    def _analyze_tracks(self, tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
+        """Per-track analysis: each detector computes its own metrics"""
         activities = []
         
-        # Analyze each track for person-based activities
         for track_id, track_state in tracks.items():
             frame_count = track_state.get('frame_count', 0)
             
@@ -557,30 +793,86 @@ class SuspiciousActivityAnalyzer:
             if unauthorized:
                 activities.append(unauthorized)
         
-        # Detect weapon-related activities
-        weapon_activities = self.detect_weapon(detections, tracks, current_time)
-        activities.extend(weapon_activities)
+        return activities
+    
+    def _analyze_tracks_batch(self, tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
+        """Batch analysis: metrics for all tracks computed once with numpy"""
+        activities = []
+        if not tracks:
+            return activities
+        
+        metrics = self.compute_track_metrics(tracks, current_time)
+        speeds = metrics['speed'].tolist()
+        recent_counts = metrics['recent_count'].tolist()
+        max_displacements = metrics['max_displacement'].tolist()
+        
+        for i, track_state in enumerate(tracks.values()):
+            frame_count = track_state.get('frame_count', 0)
+            
+            if frame_count >= 3:
+                running = self.detect_running(track_state, current_time, speed=speeds[i])
+                if running:
+                    activities.append(running)
+            
+            if frame_count < 10:
+                continue
+            
+            loitering = self.detect_loitering(track_state, current_time,
+                                              loiter_stats=(recent_counts[i], max_displacements[i]))
+            if loitering:
+                activities.append(loitering)
+            
+            intrusion = self.detect_zone_intrusion(track_state, current_time)
+            if intrusion:
+                activities.append(intrusion)
+            
+            unauthorized = self.detect_unauthorized_person(track_state, current_time)
+            if unauthorized:
+                activities.append(unauthorized)
+        
+        return activities
+    
+    def analyze_frame(self, detections: List[Dict], tracks: Dict[int, Dict], current_time: float) -> List[SuspiciousActivity]:
+        """
+        Analyze frame for all types of suspicious activities
+        
+        Args:
+            detections: List of object detections
+            tracks: Dictionary of track states
+            current_time: Current timestamp
+            
+        Returns:
+            List of detected suspicious activities
+        """
+        # Zone lookups are cached per point; start each frame with a fresh cache
+        self._zone_cache.clear()
+        
+        # Analyze tracks for person-based activities, then weapon-related activities
+        if self.batch_analysis:
+            activities = self._analyze_tracks_batch(tracks, current_time)
+            activities.extend(self.detect_weapon_batch(detections, tracks, current_time))
+        else:
+            activities = self._analyze_tracks(tracks, current_time)
+            activities.extend(self.detect_weapon(detections, tracks, current_time))
         
         # Detect abandoned objects
         abandoned_activities = self.detect_abandoned_objects(detections, current_time)
         activities.extend(abandoned_activities)
         
-        # Store activities in history
+        # Store activities in history (oldest entries are overwritten once full)
         for activity in activities:
-            self.activity_history.append(activity)
-        
-        # Clean up old activities from history (keep last 1000)
-        if len(self.activity_history) > 1000:
-            self.activity_history = self.activity_history[-1000:]
+            self.activity_history.append(activity, activity.timestamp, type=activity.activity_type.value)
         
         return activities
     
-    def get_recent_activities(self, time_window: float = 300.0) -> List[SuspiciousActivity]:
+    def get_recent_activities(self, time_window: float = 300.0,
+                              activity_type: Optional[ActivityType] = None) -> List[SuspiciousActivity]:
         """
         Get recent suspicious activities within time window
         
         Args:
             time_window: Time window in seconds
+            activity_type: Only return activities of this type
             
         Returns:
             List of recent activities
@@ -588,8 +880,8 @@ class SuspiciousActivityAnalyzer:
         current_time = time.time()
         cutoff_time = current_time - time_window
         
-        return [activity for activity in self.activity_history 
-                if activity.timestamp > cutoff_time]
+        return self.activity_history.window(
+            start=cutoff_time, type=activity_type.value if activity_type else None)
     
     def draw_zones(self, frame: np.ndarray) -> np.ndarray:
         """
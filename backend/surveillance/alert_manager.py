@@ -29,6 +29,8 @@ backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+from database.alert_dedup import alert_dedup_index
+
 logger = logging.getLogger(__name__)
 
 class AlertManager:
@@ -67,8 +69,8 @@ class AlertManager:
         self.snapshot_dir = Path(snapshot_dir)
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
         
-        # Alert tracking
-        self.last_alert_times: Dict[str, float] = {}  # activity_type -> timestamp
+        # Alert tracking (cooldowns live in the shared dedup index, 'activity' scope)
+        self.dedup_index = alert_dedup_index
         self.alert_queue = queue.Queue()
         self.alert_thread = None
         self.is_running = False
@@ -131,8 +133,9 @@ class AlertManager:
                 logger.debug(f"Activity {activity.activity_type.value} in cooldown, skipping alert")
                 return
             
-            # Update last alert time
-            self.last_alert_times[activity.activity_type.value] = activity.timestamp
+            # Start cooldown for this activity type
+            self.dedup_index.mark({'activity_type': activity.activity_type.value}, self.alert_cooldown,
+                                  scope='activity', fields=('activity_type',), now=activity.timestamp)
             
             # Create alert data
             alert_data = self._create_alert_data(activity, frame)
@@ -159,12 +162,9 @@ class AlertManager:
         Returns:
             True if in cooldown
         """
-        activity_type = activity.activity_type.value
-        if activity_type not in self.last_alert_times:
-            return False
-        
-        time_since_last = activity.timestamp - self.last_alert_times[activity_type]
-        return time_since_last < self.alert_cooldown
+        return self.dedup_index.is_active({'activity_type': activity.activity_type.value},
+                                          scope='activity', fields=('activity_type',),
+                                          now=activity.timestamp)
     
     def _create_alert_data(self, activity: SuspiciousActivity, frame: Optional[cv2.Mat] = None) -> Dict:
         """
@@ -323,9 +323,9 @@ class AlertManager:
         try:
             # Try to use SendGrid service first
             try:
-                from app.services.email_service import EmailAlertService
+                from app.services.email_service import get_email_service
                 
-                email_service = EmailAlertService()
+                email_service = get_email_service()
                 
                 # Map activity_type to alert type for email service
                 activity_type = alert_data.get('activity_type', '').lower()
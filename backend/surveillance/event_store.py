@@ -0,0 +1,207 @@
+"""
+Event Store Module
+Bounded, time-indexed store for activity events shared by the analyzers and the dashboard
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EventStore:
+    """
+    Fixed-capacity ring buffer of events ordered by timestamp
+
+    Every event gets a sequence number (its cursor). Sequence numbers only grow,
+    so "everything after cursor N" is a slice of the ring. Timestamps are kept
+    non-decreasing (an out-of-order timestamp is clamped to the previous one in
+    the index), which lets time windows be found by binary search. Events can
+    be tagged with index keys (e.g. camera, type); each key value keeps a sorted
+    list of sequence numbers for filtered reads. When the store is full the
+    oldest event is overwritten.
+
+    All methods are thread-safe.
+    """
+
+    def __init__(self, capacity: int = 1000, index_fields: Tuple[str, ...] = ()):
+        """
+        Initialize event store
+
+        Args:
+            capacity: Maximum number of events kept
+            index_fields: Names of the keys events can be filtered on
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.index_fields = tuple(index_fields)
+
+        self._events: List[Any] = [None] * capacity
+        self._times: List[float] = [0.0] * capacity
+        self._keys: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.index_fields}
+
+        self._first_seq = 0  # Oldest sequence number still stored
+        self._next_seq = 0  # Sequence number of the next event
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def __iter__(self):
+        with self._lock:
+            events = self._collect(self._first_seq, self._next_seq, {}, None)
+        return iter(events)
+
+    @property
+    def cursor(self) -> int:
+        """Cursor of the newest event (pass to since() to get only newer events)"""
+        return self._next_seq
+
+    def append(self, event: Any, timestamp: float, **keys) -> int:
+        """
+        Add an event
+
+        Args:
+            event: Event object (stored as is)
+            timestamp: Event time in seconds
+            **keys: Index key values, e.g. camera='cam1', type='loitering'
+
+        Returns:
+            Sequence number of the event
+        """
+        unknown = set(keys) - set(self.index_fields)
+        if unknown:
+            raise KeyError(f"Unknown index fields: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            seq = self._next_seq
+            slot = seq % self.capacity
+
+            if seq - self._first_seq == self.capacity:
+                self._first_seq += 1  # Overwrite the oldest event
+
+            if seq > self._first_seq:
+                timestamp = max(timestamp, self._times[(seq - 1) % self.capacity])
+
+            self._events[slot] = event
+            self._times[slot] = timestamp
+            self._keys[slot] = keys or None
+            self._next_seq = seq + 1
+
+            for field, value in keys.items():
+                seqs = self._indexes[field].setdefault(value, [])
+                seqs.append(seq)
+                if len(seqs) > self.capacity:
+                    # Drop sequence numbers that fell out of the ring (amortized O(1))
+                    del seqs[:bisect_left(seqs, self._first_seq)]
+
+            return seq
+
+    def clear(self):
+        """Remove all events (sequence numbers keep growing)"""
+        with self._lock:
+            self._first_seq = self._next_seq
+            self._events = [None] * self.capacity
+            self._keys = [None] * self.capacity
+            for index in self._indexes.values():
+                index.clear()
+
+    def _bisect_time(self, timestamp: float) -> int:
+        """Sequence number of the first stored event with time > timestamp"""
+        low, high = self._first_seq, self._next_seq
+        while low < high:
+            mid = (low + high) // 2
+            if self._times[mid % self.capacity] <= timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _collect(self, start_seq: int, end_seq: int, filters: Dict[str, Any],
+                 limit: Optional[int]) -> List[Any]:
+        """Events with start_seq <= seq < end_seq matching filters (newest `limit` if given)"""
+        start_seq = max(start_seq, self._first_seq)
+        end_seq = min(end_seq, self._next_seq)
+        if start_seq >= end_seq:
+            return []
+
+        filters = {field: value for field, value in filters.items() if value is not None}
+        if not filters:
+            if limit is not None:
+                start_seq = max(start_seq, end_seq - limit)
+            return [self._events[seq % self.capacity] for seq in range(start_seq, end_seq)]
+
+        unknown = set(filters) - set(self.index_fields)
+        if unknown:
+            raise KeyError(f"Unknown index fields: {', '.join(sorted(unknown))}")
+
+        # Walk the shortest matching index and check the remaining keys per event
+        candidates = None
+        for field, value in filters.items():
+            seqs = self._indexes[field].get(value, [])
+            seqs = seqs[bisect_left(seqs, start_seq):bisect_left(seqs, end_seq)]
+            if candidates is None or len(seqs) < len(candidates):
+                candidates = seqs
+
+        events = []
+        for seq in reversed(candidates):
+            if limit is not None and len(events) >= limit:
+                break
+            slot = seq % self.capacity
+            keys = self._keys[slot] or {}
+            if all(keys.get(field) == value for field, value in filters.items()):
+                events.append(self._events[slot])
+        events.reverse()
+        return events
+
+    def since(self, cursor: int = 0, limit: Optional[int] = None, **filters) -> Tuple[List[Any], int]:
+        """
+        Events added after a cursor
+
+        Args:
+            cursor: Value of `cursor` (or a previous since() result) from an earlier read
+            limit: Return at most the newest `limit` events
+            **filters: Index key values to match
+
+        Returns:
+            (events oldest first, cursor for the next call)
+        """
+        with self._lock:
+            return self._collect(cursor, self._next_seq, filters, limit), self._next_seq
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None,
+               limit: Optional[int] = None, **filters) -> List[Any]:
+        """
+        Events with start < timestamp <= end
+
+        Args:
+            start: Exclusive lower time bound (None for no bound)
+            end: Inclusive upper time bound (None for no bound)
+            limit: Return at most the newest `limit` events
+            **filters: Index key values to match
+
+        Returns:
+            Events oldest first
+        """
+        with self._lock:
+            start_seq = self._first_seq if start is None else self._bisect_time(start)
+            end_seq = self._next_seq if end is None else self._bisect_time(end)
+            return self._collect(start_seq, end_seq, filters, limit)
+
+    def latest(self, count: int, **filters) -> List[Any]:
+        """
+        Newest events
+
+        Args:
+            count: Maximum number of events
+            **filters: Index key values to match
+
+        Returns:
+            Events oldest first
+        """
+        with self._lock:
+            return self._collect(self._first_seq, self._next_seq, filters, count)
@@ -0,0 +1,139 @@
+"""
+Frame Result Module
+Compact record of the AI results for one camera frame
+"""
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_NO_INDEXES = np.zeros(0, dtype=np.int16)
+_NO_BOXES = np.zeros((0, 4), dtype=np.int32)
+
+
+class FrameResult:
+    """
+    AI results of one processed frame
+
+    Detections are stored column-wise: boxes as an (N, 4) int32 array,
+    confidences as float32, class ids as int16 and class names as a tuple
+    of interned strings. The person, weapon and bag subsets are index arrays
+    into those columns instead of lists of the same dicts. The frame itself
+    is not kept: it lives in the camera's FrameBroadcaster, which renders
+    annotated images from it only when a viewer asks for one.
+
+    Dict-style access (`result['detections']`, `result.get('persons', [])`)
+    is kept for existing callers and rebuilds the legacy detection dicts on
+    each call; new code should use the arrays and counts directly.
+    """
+
+    __slots__ = ('boxes', 'confidences', 'class_ids', 'class_names', 'person_indexes',
+                 'weapon_indexes', 'bag_indexes', 'activities', 'tracks', 'timestamp')
+
+    # Keys exposed through the dict-style compatibility accessors
+    FIELDS = ('detections', 'persons', 'weapons', 'bags', 'activities', 'tracks', 'timestamp')
+
+    def __init__(self, boxes: np.ndarray = _NO_BOXES, confidences: Optional[np.ndarray] = None,
+                 class_ids: Optional[np.ndarray] = None, class_names: Tuple[str, ...] = (),
+                 person_indexes: np.ndarray = _NO_INDEXES, weapon_indexes: np.ndarray = _NO_INDEXES,
+                 bag_indexes: np.ndarray = _NO_INDEXES, activities: Tuple[Dict, ...] = (),
+                 tracks: Tuple[Dict, ...] = (), timestamp: float = 0.0):
+        self.boxes = boxes
+        self.confidences = confidences if confidences is not None else np.zeros(len(boxes), dtype=np.float32)
+        self.class_ids = class_ids if class_ids is not None else np.zeros(len(boxes), dtype=np.int16)
+        self.class_names = class_names
+        self.person_indexes = person_indexes
+        self.weapon_indexes = weapon_indexes
+        self.bag_indexes = bag_indexes
+        self.activities = activities
+        self.tracks = tracks
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_detections(cls, detections: List[Dict], persons: List[Dict] = (), weapons: List[Dict] = (),
+                        bags: List[Dict] = (), activities: List[Dict] = (), tracks: List[Dict] = (),
+                        timestamp: float = 0.0) -> 'FrameResult':
+        """
+        Build a result from the detector's dicts
+
+        Args:
+            detections: Detection dicts ('bbox', 'confidence', 'class_id', 'class_name')
+            persons: Subset of `detections` (the same dict objects)
+            weapons: Subset of `detections`
+            bags: Subset of `detections`
+            activities: Activity dicts found on the frame
+            tracks: Compact track records for the live view metadata
+            timestamp: Time the frame was processed
+        """
+        if not detections:
+            return cls(activities=tuple(activities), tracks=tuple(tracks), timestamp=timestamp)
+
+        position = {id(detection): i for i, detection in enumerate(detections)}
+
+        def indexes(subset):
+            if not subset:
+                return _NO_INDEXES
+            return np.fromiter((position[id(d)] for d in subset if id(d) in position), dtype=np.int16)
+
+        return cls(
+            boxes=np.array([d['bbox'] for d in detections], dtype=np.int32).reshape(-1, 4),
+            confidences=np.fromiter((d['confidence'] for d in detections), dtype=np.float32),
+            class_ids=np.fromiter((d['class_id'] for d in detections), dtype=np.int16),
+            class_names=tuple(sys.intern(d['class_name']) for d in detections),
+            person_indexes=indexes(persons),
+            weapon_indexes=indexes(weapons),
+            bag_indexes=indexes(bags),
+            activities=tuple(activities),
+            tracks=tuple(tracks),
+            timestamp=timestamp
+        )
+
+    # ------------------------------------------------------------------ counts
+
+    @property
+    def detection_count(self) -> int:
+        return len(self.boxes)
+
+    @property
+    def person_count(self) -> int:
+        return len(self.person_indexes)
+
+    # ---------------------------------------------------------- legacy dicts
+
+    def detection(self, i: int) -> Dict[str, Any]:
+        """Detection `i` as a detector dict"""
+        return {
+            'bbox': self.boxes[i].tolist(),
+            'confidence': float(self.confidences[i]),
+            'class_id': int(self.class_ids[i]),
+            'class_name': self.class_names[i]
+        }
+
+    def detections(self, indexes: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """All detections (or those at `indexes`) as detector dicts"""
+        return [self.detection(int(i)) for i in (range(len(self.boxes)) if indexes is None else indexes)]
+
+    def __getitem__(self, key: str):
+        if key == 'detections':
+            return self.detections()
+        if key in ('persons', 'weapons', 'bags'):
+            return self.detections(getattr(self, key[:-1] + '_indexes'))
+        if key in ('activities', 'tracks'):
+            return list(getattr(self, key))
+        if key == 'timestamp':
+            return self.timestamp
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Result in the legacy dict shape (without the frame)"""
+        return {key: self[key] for key in self.FIELDS}
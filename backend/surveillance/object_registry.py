@@ -0,0 +1,195 @@
+"""
+Stationary Object Registry Module
+Track stationary objects (bags, suitcases) across frames for abandoned object detection
+"""
+
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StationaryObject:
+    """A stationary object seen at roughly the same place across frames"""
+    object_id: int
+    class_id: int
+    class_name: str
+    location: Tuple[int, int]  # Center where the object was first seen (anchor)
+    bbox: List[int]  # Latest bounding box [x1, y1, x2, y2]
+    first_seen: float
+    last_seen: float
+    detection: Dict  # Latest detection
+    alerted: bool = False  # Abandoned alert already raised for this object
+
+class StationaryObjectRegistry:
+    """
+    Registry of stationary objects backed by a spatial hash grid
+
+    Detections of the same class whose center lies within `tolerance` pixels
+    of an object's anchor are merged into that object, preferring the
+    candidate with the highest IoU. Only the 3x3 grid cells around a detection
+    are searched, so association cost does not grow with clutter elsewhere in
+    the frame. Objects are kept in last-seen order, so eviction only touches
+    expired objects.
+    """
+
+    def __init__(self, tolerance: float = 40.0):
+        """
+        Initialize registry
+
+        Args:
+            tolerance: Maximum center distance in pixels for a detection to
+                merge into an existing object (also the grid cell size)
+        """
+        self.tolerance = tolerance
+        self.cell_size = max(1, int(np.ceil(tolerance)))
+
+        self.objects: 'OrderedDict[int, StationaryObject]' = OrderedDict()  # oldest last_seen first
+        self.grid: Dict[Tuple[int, int], Set[int]] = {}  # cell -> object IDs anchored in it
+        self.next_object_id = 1
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def _cell(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        """Grid cell containing a point"""
+        return (int(point[0]) // self.cell_size, int(point[1]) // self.cell_size)
+
+    def _calculate_iou(self, box1: List[int], box2: List[int]) -> float:
+        """
+        Calculate Intersection over Union (IoU) of two bounding boxes
+
+        Args:
+            box1: [x1, y1, x2, y2]
+            box2: [x1, y1, x2, y2]
+
+        Returns:
+            IoU score between 0 and 1
+        """
+        xi1 = max(box1[0], box2[0])
+        yi1 = max(box1[1], box2[1])
+        xi2 = min(box1[2], box2[2])
+        yi2 = min(box1[3], box2[3])
+
+        if xi1 >= xi2 or yi1 >= yi2:
+            return 0.0
+
+        intersection = (xi2 - xi1) * (yi2 - yi1)
+        union = ((box1[2] - box1[0]) * (box1[3] - box1[1]) +
+                 (box2[2] - box2[0]) * (box2[3] - box2[1]) - intersection)
+
+        return intersection / union if union > 0 else 0.0
+
+    def _find_match(self, detection: Dict, center: Tuple[int, int],
+                    used: Set[int]) -> Optional[StationaryObject]:
+        """
+        Find the existing object a detection belongs to
+
+        Args:
+            detection: Detection dictionary
+            center: Detection center
+            used: Object IDs already matched this frame
+
+        Returns:
+            Best matching StationaryObject or None
+        """
+        cell_x, cell_y = self._cell(center)
+        best = None
+        best_key = None
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for object_id in self.grid.get((cell_x + dx, cell_y + dy), ()):
+                    if object_id in used:
+                        continue
+                    obj = self.objects[object_id]
+                    if obj.class_id != detection['class_id']:
+                        continue
+
+                    distance = np.hypot(center[0] - obj.location[0], center[1] - obj.location[1])
+                    if distance > self.tolerance:
+                        continue
+
+                    # Highest IoU wins; distance breaks ties (e.g. both zero overlap)
+                    key = (self._calculate_iou(detection['bbox'], obj.bbox), -distance)
+                    if best_key is None or key > best_key:
+                        best = obj
+                        best_key = key
+
+        return best
+
+    def update(self, detections: List[Dict], current_time: float) -> List[Tuple[StationaryObject, Dict]]:
+        """
+        Associate detections with registered objects, registering new ones
+
+        Args:
+            detections: Object detections for the current frame
+            current_time: Current timestamp
+
+        Returns:
+            List of (object, detection) pairs for every detection
+        """
+        matched = []
+        used: Set[int] = set()
+
+        for detection in detections:
+            x1, y1, x2, y2 = detection['bbox']
+            center = ((x1 + x2) // 2, (y1 + y2) // 2)
+
+            obj = self._find_match(detection, center, used)
+            if obj is None:
+                obj = StationaryObject(
+                    object_id=self.next_object_id,
+                    class_id=detection['class_id'],
+                    class_name=detection.get('class_name', ''),
+                    location=center,
+                    bbox=list(detection['bbox']),
+                    first_seen=current_time,
+                    last_seen=current_time,
+                    detection=detection
+                )
+                self.next_object_id += 1
+                self.objects[obj.object_id] = obj
+                self.grid.setdefault(self._cell(center), set()).add(obj.object_id)
+            else:
+                obj.bbox = list(detection['bbox'])
+                obj.last_seen = current_time
+                obj.detection = detection
+                self.objects.move_to_end(obj.object_id)
+
+            used.add(obj.object_id)
+            matched.append((obj, detection))
+
+        return matched
+
+    def evict_expired(self, cutoff_time: float) -> int:
+        """
+        Remove objects not seen since cutoff_time
+
+        Args:
+            cutoff_time: Objects with last_seen at or before this time are removed
+
+        Returns:
+            Number of evicted objects
+        """
+        evicted = 0
+        while self.objects:
+            object_id, obj = next(iter(self.objects.items()))
+            if obj.last_seen > cutoff_time:
+                break
+
+            self.objects.popitem(last=False)
+            cell = self._cell(obj.location)
+            members = self.grid.get(cell)
+            if members is not None:
+                members.discard(object_id)
+                if not members:
+                    del self.grid[cell]
+            evicted += 1
+
+        if evicted:
+            logger.debug("Evicted %d stationary objects", evicted)
+        return evicted
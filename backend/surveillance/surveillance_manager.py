@@ -292,9 +292,9 @@ class SurveillanceManager:
                         best_face = max(face_results, key=lambda x: x['confidence'] if x['person_name'] != 'unknown' else 0)
                         
                         # Update track with face recognition results
-                        tracks[track_id]['identity'] = best_face['person_name']
-                        tracks[track_id]['authorization_status'] = best_face['authorization_status']
-                        tracks[track_id]['face_confidence'] = best_face['confidence']
+                        tracks[track_id].set_identity(best_face['person_name'],
+                                                      best_face['authorization_status'],
+                                                      best_face['confidence'])
                         
                         # Adjust face bbox to global coordinates
                         face_bbox = best_face['bbox']
@@ -311,6 +311,7 @@ class SurveillanceManager:
                         self.stats['faces_recognized'] += 1
             
             # 4. Activity Analysis
+            self.activity_analyzer.set_frame_size(frame.shape[1], frame.shape[0])
             activities = self.activity_analyzer.analyze_frame(detections, tracks, timestamp)
             result['activities'] = activities
             self.stats['activities_detected'] += len(activities)
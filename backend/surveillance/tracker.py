@@ -10,8 +10,215 @@ import time
 import logging
 from collections import defaultdict
 
+# Optimal (Hungarian) assignment is optional; fall back to global greedy matching
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Cost assigned to track/detection pairs that fail the matching gate
+INVALID_MATCH_COST = 1e6
+
+# Position history kept per track (seconds) and ring buffer capacity (entries)
+HISTORY_WINDOW = 10.0
+HISTORY_SIZE = 300  # 10 seconds at 30 FPS
+
+
+class TrackState:
+    """
+    Compact state of a single track
+    
+    Position history is stored in fixed-size numpy ring buffers (timestamps,
+    centers, boxes). Every entry is written twice, at `i` and `i + capacity`,
+    so the most recent entries are always one contiguous slice and can be
+    returned as read-only views without copying.
+    
+    Dict-style access (`state['bbox']`, `state.get('identity')`,
+    `'position_history' in state`) is kept for existing callers; `to_dict()`
+    returns the legacy dict shape. PersonTracker.update() hands out these
+    live objects, so the tracked fields are read-only through item access:
+    face recognition records its result with set_identity(), and other keys
+    written by callers are kept as extra annotations on the track.
+    """
+    
+    __slots__ = ('track_id', 'bbox', 'center', 'detection', 'confidence',
+                 'created_time', 'last_update', 'frame_count', 'face_crops',
+                 'identity', 'authorization_status', 'face_confidence',
+                 'history_window', '_capacity', '_timestamps', '_centers', '_boxes',
+                 '_count', '_length', '_history_cache', '_extra')
+    
+    # Keys exposed through the dict-style compatibility accessors
+    FIELDS = ('track_id', 'bbox', 'center', 'detection', 'confidence',
+              'created_time', 'last_update', 'frame_count', 'position_history',
+              'face_crops', 'identity', 'authorization_status', 'face_confidence')
+    
+    def __init__(self,
+                 track_id: int,
+                 detection: Dict,
+                 timestamp: float,
+                 history_size: int = HISTORY_SIZE,
+                 history_window: float = HISTORY_WINDOW):
+        """
+        Initialize track state from its first detection
+        
+        Args:
+            track_id: Unique track ID
+            detection: Detection dictionary that started the track
+            timestamp: Creation timestamp
+            history_size: Maximum number of positions kept
+            history_window: Maximum age of kept positions in seconds
+        """
+        x1, y1, x2, y2 = detection['bbox']
+        
+        self.track_id = track_id
+        self.bbox = list(detection['bbox'])
+        self.center = ((x1 + x2) // 2, (y1 + y2) // 2)
+        self.detection = detection
+        self.confidence = detection['confidence']
+        self.created_time = timestamp
+        self.last_update = timestamp
+        self.frame_count = 1
+        self.face_crops = []  # Store face crops for recognition
+        self.identity = 'unknown'  # Will be updated by face recognition
+        self.authorization_status = 'pending'  # pending, authorized, intruder
+        self.face_confidence = None
+        
+        self.history_window = history_window
+        self._capacity = history_size
+        self._timestamps = np.zeros(2 * history_size, dtype=np.float64)
+        self._centers = np.zeros((2 * history_size, 2), dtype=np.int32)
+        self._boxes = np.zeros((2 * history_size, 4), dtype=np.int32)
+        self._count = 0
+        self._length = 0
+        self._history_cache = None
+        self._extra = None
+        
+        self.push_position(timestamp, self.center, self.bbox)
+    
+    def push_position(self, timestamp: float, center: Tuple[int, int], bbox: List[int]):
+        """
+        Append a position to the history and drop entries older than the window
+        
+        Args:
+            timestamp: Position timestamp
+            center: (x, y) center of the box
+            bbox: [x1, y1, x2, y2]
+        """
+        i = self._count % self._capacity
+        j = i + self._capacity
+        self._timestamps[i] = self._timestamps[j] = timestamp
+        self._centers[i] = self._centers[j] = center
+        self._boxes[i] = self._boxes[j] = bbox
+        self._count += 1
+        
+        # Timestamps in the window are sorted, so the cutoff is a binary search
+        end = i + self._capacity + 1
+        start = end - min(self._count, self._capacity)
+        cutoff = np.searchsorted(self._timestamps[start:end], timestamp - self.history_window, side='left')
+        self._length = end - start - int(cutoff)
+        self._history_cache = None
+    
+    def _history_slice(self, array: np.ndarray) -> np.ndarray:
+        """Read-only view of the in-window history, oldest first"""
+        end = (self._count - 1) % self._capacity + self._capacity + 1
+        view = array[end - self._length:end]
+        view.flags.writeable = False
+        return view
+    
+    @property
+    def history_timestamps(self) -> np.ndarray:
+        """Read-only view of position timestamps, shape (N,)"""
+        return self._history_slice(self._timestamps)
+    
+    @property
+    def history_centers(self) -> np.ndarray:
+        """Read-only view of position centers, shape (N, 2)"""
+        return self._history_slice(self._centers)
+    
+    @property
+    def history_boxes(self) -> np.ndarray:
+        """Read-only view of position boxes, shape (N, 4)"""
+        return self._history_slice(self._boxes)
+    
+    @property
+    def history_length(self) -> int:
+        """Number of positions in the history window"""
+        return self._length
+    
+    @property
+    def position_history(self) -> List[Dict]:
+        """
+        Legacy list-of-dicts history, built on first access after each update
+        
+        Returns:
+            List of {'timestamp', 'center', 'bbox'} dictionaries
+        """
+        if self._history_cache is None:
+            self._history_cache = [
+                {'timestamp': t, 'center': (cx, cy), 'bbox': box}
+                for t, (cx, cy), box in zip(self.history_timestamps.tolist(),
+                                            self.history_centers.tolist(),
+                                            self.history_boxes.tolist())
+            ]
+        return self._history_cache
+    
+    # Dict-style compatibility accessors
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            raise TypeError(f"TrackState field '{key}' is read-only (use set_identity for face results)")
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+    
+    def set_identity(self, identity: str, authorization_status: str, face_confidence: Optional[float] = None):
+        """
+        Record a face recognition result (kept by the tracker for later frames)
+        
+        Args:
+            identity: Recognized person name or 'unknown'
+            authorization_status: 'pending', 'authorized' or 'intruder'
+            face_confidence: Recognition confidence
+        """
+        self.identity = identity
+        self.authorization_status = authorization_status
+        self.face_confidence = face_confidence
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or (self._extra is not None and key in self._extra)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self) -> List[str]:
+        return list(self.FIELDS) + (list(self._extra) if self._extra else [])
+    
+    def to_dict(self) -> Dict:
+        """
+        Get the legacy dict representation of this track
+        
+        Returns:
+            Track state dictionary (history as list of dicts)
+        """
+        return {key: self[key] for key in self.keys()}
+    
+    def copy(self) -> Dict:
+        """Alias of to_dict() for callers that copied the old state dicts"""
+        return self.to_dict()
+
 class PersonTracker:
     """
     Track multiple persons across video frames using OpenCV trackers
@@ -22,7 +229,11 @@ class PersonTracker:
                  tracker_type: str = 'CSRT',
                  max_tracks: int = 50,
                  track_timeout: float = 5.0,
-                 min_track_length: int = 5):
+                 min_track_length: int = 5,
+                 iou_weight: float = 1.0,
+                 distance_weight: float = 0.0,
+                 history_size: int = HISTORY_SIZE,
+                 tracking_scale: float = 1.0):
         """
         Initialize person tracker
         
@@ -31,20 +242,38 @@ class PersonTracker:
             max_tracks: Maximum number of simultaneous tracks
             track_timeout: Time in seconds before dropping inactive tracks
             min_track_length: Minimum number of frames to confirm a track
+            iou_weight: Weight of (1 - IoU) in the matching cost
+            distance_weight: Weight of normalized center distance in the matching cost
+                (0 disables distance-based matching)
+            history_size: Position history capacity per track
+            tracking_scale: Scale factor of the frame the OpenCV trackers run on
+                (e.g. 0.5). Boxes and centers are always reported in original
+                frame coordinates, so speed and distance thresholds are unaffected.
         """
+        if not 0 < tracking_scale <= 1.0:
+            raise ValueError(f"tracking_scale must be in (0, 1], got {tracking_scale}")
+        
         self.tracker_type = tracker_type
         self.max_tracks = max_tracks
         self.track_timeout = track_timeout
         self.min_track_length = min_track_length
+        self.history_size = history_size
+        self.tracking_scale = tracking_scale
+        
+        # Scale from original to tracking frame coordinates for the current update
+        self._scale_x = 1.0
+        self._scale_y = 1.0
         
         # Track management
         self.active_tracks = {}  # track_id -> tracker object
-        self.track_states = {}   # track_id -> track state dict
+        self.track_states: Dict[int, TrackState] = {}  # track_id -> track state
         self.next_track_id = 1
         
         # Matching parameters
         self.iou_threshold = 0.5
         self.distance_threshold = 100
+        self.iou_weight = iou_weight
+        self.distance_weight = distance_weight
         
     def _create_tracker(self) -> Optional[Any]:
         """
@@ -95,7 +324,7 @@ class PersonTracker:
             if tracker is not None:
                 return tracker
         except Exception as e:
-            logger.debug(f"Tracker factory error for {self.tracker_type}: {e}")
+            logger.debug("Tracker factory error for %s: %s", self.tracker_type, e)
 
         # Final fallback to CSRT (most stable)
         return try_factories(factories['CSRT'])
@@ -151,6 +380,109 @@ class PersonTracker:
         """
         return np.sqrt((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)
     
+    def _calculate_iou_matrix(self, boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+        """
+        Calculate IoU for every pair of bounding boxes at once
+        
+        Args:
+            boxes1: Array of shape (N, 4) in [x1, y1, x2, y2] format
+            boxes2: Array of shape (M, 4) in [x1, y1, x2, y2] format
+            
+        Returns:
+            Array of shape (N, M) with IoU scores between 0 and 1
+        """
+        b1 = boxes1[:, None, :]
+        b2 = boxes2[None, :, :]
+        
+        # Intersection (zero when boxes do not overlap)
+        inter_w = np.clip(np.minimum(b1[..., 2], b2[..., 2]) - np.maximum(b1[..., 0], b2[..., 0]), 0, None)
+        inter_h = np.clip(np.minimum(b1[..., 3], b2[..., 3]) - np.maximum(b1[..., 1], b2[..., 1]), 0, None)
+        intersection = inter_w * inter_h
+        
+        # Union
+        area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+        area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+        union = area1[:, None] + area2[None, :] - intersection
+        
+        iou = np.zeros_like(intersection)
+        np.divide(intersection, union, out=iou, where=union > 0)
+        return iou
+    
+    def _calculate_distance_matrix(self, centers1: np.ndarray, centers2: np.ndarray) -> np.ndarray:
+        """
+        Calculate Euclidean distance for every pair of points at once
+        
+        Args:
+            centers1: Array of shape (N, 2)
+            centers2: Array of shape (M, 2)
+            
+        Returns:
+            Array of shape (N, M) with distances
+        """
+        diff = centers1[:, None, :] - centers2[None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=2))
+    
+    def _compute_cost_matrix(self, track_boxes: np.ndarray, det_boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the combined matching cost for all track/detection pairs
+        
+        cost = iou_weight * (1 - IoU) + distance_weight * (distance / distance_threshold)
+        
+        A pair is admissible when its IoU exceeds `iou_threshold`, or, with distance
+        matching enabled, when its centers are within `distance_threshold` pixels.
+        
+        Args:
+            track_boxes: Array of shape (T, 4) with track boxes
+            det_boxes: Array of shape (D, 4) with detection boxes
+            
+        Returns:
+            Tuple of (cost matrix, admissibility mask), both of shape (T, D)
+        """
+        iou = self._calculate_iou_matrix(track_boxes, det_boxes)
+        valid = iou > self.iou_threshold
+        cost = self.iou_weight * (1.0 - iou)
+        
+        if self.distance_weight > 0:
+            track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2.0
+            det_centers = (det_boxes[:, :2] + det_boxes[:, 2:]) / 2.0
+            distance = self._calculate_distance_matrix(track_centers, det_centers)
+            cost = cost + self.distance_weight * (distance / self.distance_threshold)
+            valid |= distance <= self.distance_threshold
+        
+        cost = np.where(valid, cost, INVALID_MATCH_COST)
+        return cost, valid
+    
+    def _assign(self, cost: np.ndarray, valid: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Solve the assignment problem on a cost matrix
+        
+        Uses the Hungarian algorithm when SciPy is available, otherwise greedily
+        takes the cheapest admissible pairs first.
+        
+        Args:
+            cost: Cost matrix of shape (T, D)
+            valid: Admissibility mask of shape (T, D)
+            
+        Returns:
+            List of (row, column) pairs
+        """
+        if SCIPY_AVAILABLE:
+            rows, cols = linear_sum_assignment(cost)
+            return [(r, c) for r, c in zip(rows.tolist(), cols.tolist()) if valid[r, c]]
+        
+        pairs = []
+        used_rows = set()
+        used_cols = set()
+        candidate_rows, candidate_cols = np.nonzero(valid)
+        order = np.argsort(cost[candidate_rows, candidate_cols], kind='stable')
+        for r, c in zip(candidate_rows[order].tolist(), candidate_cols[order].tolist()):
+            if r in used_rows or c in used_cols:
+                continue
+            pairs.append((r, c))
+            used_rows.add(r)
+            used_cols.add(c)
+        return pairs
+    
     def _match_detections_to_tracks(self, detections: List[Dict]) -> Dict[int, int]:
         """
         Match new detections to existing tracks
@@ -165,81 +497,108 @@ class PersonTracker:
             return {}
         
         # Get current track positions
-        track_positions = {}
-        for track_id, state in self.track_states.items():
-            if track_id in self.active_tracks:
-                track_positions[track_id] = state['bbox']
+        track_ids = [track_id for track_id in self.track_states if track_id in self.active_tracks]
+        if not track_ids:
+            return {}
+        
+        track_boxes = np.array([self.track_states[track_id].bbox for track_id in track_ids], dtype=np.float64)
+        det_boxes = np.array([detection['bbox'] for detection in detections], dtype=np.float64)
+        
+        cost, valid = self._compute_cost_matrix(track_boxes, det_boxes)
         
-        # Calculate IoU matrix
-        matches = {}
-        used_detections = set()
+        return {track_ids[row]: col for row, col in self._assign(cost, valid)}
+    
+    def _prepare_tracking_frame(self, frame: np.ndarray, tracking_frame: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Get the frame the OpenCV trackers run on and set the coordinate scale
         
-        for track_id, track_bbox in track_positions.items():
-            best_iou = 0
-            best_detection_idx = -1
+        Args:
+            frame: Original frame
+            tracking_frame: Already downscaled copy of the frame, if the caller has one
             
-            for det_idx, detection in enumerate(detections):
-                if det_idx in used_detections:
-                    continue
-                
-                det_bbox = detection['bbox']
-                iou = self._calculate_iou(track_bbox, det_bbox)
-                
-                if iou > self.iou_threshold and iou > best_iou:
-                    best_iou = iou
-                    best_detection_idx = det_idx
+        Returns:
+            Frame for tracker init/update
+        """
+        if tracking_frame is None:
+            if self.tracking_scale == 1.0:
+                self._scale_x = self._scale_y = 1.0
+                return frame
+            tracking_frame = cv2.resize(frame, None, fx=self.tracking_scale, fy=self.tracking_scale,
+                                        interpolation=cv2.INTER_AREA)
+        
+        # Derive the exact scale from the shapes (resize rounds the output size)
+        self._scale_x = tracking_frame.shape[1] / frame.shape[1]
+        self._scale_y = tracking_frame.shape[0] / frame.shape[0]
+        return tracking_frame
+    
+    def _to_tracking_coords(self, bbox: List[int]) -> Tuple[int, int, int, int]:
+        """
+        Convert an original-frame box to a tracking-frame (x, y, w, h) box
+        
+        Args:
+            bbox: [x1, y1, x2, y2] in original frame coordinates
             
-            if best_detection_idx >= 0:
-                matches[track_id] = best_detection_idx
-                used_detections.add(best_detection_idx)
+        Returns:
+            (x, y, w, h) in tracking frame coordinates
+        """
+        x1, y1, x2, y2 = bbox
+        x = int(round(x1 * self._scale_x))
+        y = int(round(y1 * self._scale_y))
+        w = max(1, int(round((x2 - x1) * self._scale_x)))
+        h = max(1, int(round((y2 - y1) * self._scale_y)))
+        return (x, y, w, h)
+    
+    def _from_tracking_coords(self, bbox: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+        """
+        Convert a tracking-frame (x, y, w, h) box to original frame coordinates
         
-        return matches
+        Args:
+            bbox: (x, y, w, h) in tracking frame coordinates
+            
+        Returns:
+            (x, y, w, h) in original frame coordinates
+        """
+        x, y, w, h = bbox
+        return (x / self._scale_x, y / self._scale_y, w / self._scale_x, h / self._scale_y)
     
-    def update(self, frame: np.ndarray, detections: List[Dict]) -> Dict[int, Dict]:
+    def update(self, frame: np.ndarray, detections: List[Dict],
+               tracking_frame: Optional[np.ndarray] = None) -> Dict[int, TrackState]:
         """
         Update tracker with new frame and detections
         
         Args:
             frame: Current frame
-            detections: List of person detections
+            detections: List of person detections (original frame coordinates)
+            tracking_frame: Optional downscaled copy of `frame` to run the OpenCV
+                trackers on; when omitted it is derived using `tracking_scale`
             
         Returns:
-            Dictionary of active tracks with states
+            Dictionary of confirmed tracks (live TrackState objects, not copies;
+            their tracked fields are read-only through item access)
         """
         current_time = time.time()
+        tracking_frame = self._prepare_tracking_frame(frame, tracking_frame)
         
         # Update existing trackers
         active_track_ids = list(self.active_tracks.keys())
         for track_id in active_track_ids:
             tracker = self.active_tracks[track_id]
-            success, bbox = tracker.update(frame)
+            success, bbox = tracker.update(tracking_frame)
             
             if success:
-                # Convert bbox format (x, y, w, h) to (x1, y1, x2, y2)
-                x, y, w, h = bbox
+                # Convert bbox format (x, y, w, h) to (x1, y1, x2, y2) in original coordinates
+                x, y, w, h = self._from_tracking_coords(bbox)
                 bbox_xyxy = [int(x), int(y), int(x + w), int(y + h)]
                 
-                # Update track state
-                self.track_states[track_id]['bbox'] = bbox_xyxy
-                self.track_states[track_id]['last_update'] = current_time
-                self.track_states[track_id]['center'] = (int(x + w/2), int(y + h/2))
-                self.track_states[track_id]['frame_count'] += 1
-                
-                # Update track history for activity analysis
-                if 'position_history' not in self.track_states[track_id]:
-                    self.track_states[track_id]['position_history'] = []
-                
-                self.track_states[track_id]['position_history'].append({
-                    'timestamp': current_time,
-                    'center': (int(x + w/2), int(y + h/2)),
-                    'bbox': bbox_xyxy
-                })
+                center = (int(x + w/2), int(y + h/2))
                 
-                # Keep only recent history (last 10 seconds)
-                history = self.track_states[track_id]['position_history']
-                self.track_states[track_id]['position_history'] = [
-                    h for h in history if current_time - h['timestamp'] <= 10.0
-                ]
+                # Update track state and history for activity analysis
+                state = self.track_states[track_id]
+                state.bbox = bbox_xyxy
+                state.last_update = current_time
+                state.center = center
+                state.frame_count += 1
+                state.push_position(current_time, center, bbox_xyxy)
                 
             else:
                 # Track failed, mark for removal
@@ -252,42 +611,39 @@ class PersonTracker:
         for track_id, det_idx in matches.items():
             detection = detections[det_idx]
             if track_id in self.track_states:
-                self.track_states[track_id]['detection'] = detection
-                self.track_states[track_id]['confidence'] = detection['confidence']
+                self.track_states[track_id].detection = detection
+                self.track_states[track_id].confidence = detection['confidence']
         
         # Create new tracks for unmatched detections
         matched_detection_indices = set(matches.values())
         for det_idx, detection in enumerate(detections):
             if det_idx not in matched_detection_indices and len(self.active_tracks) < self.max_tracks:
-                self._create_new_track(frame, detection, current_time)
+                self._create_new_track(tracking_frame, detection, current_time)
         
         # Remove timed out tracks
         self._cleanup_old_tracks(current_time)
         
         # Return only confirmed tracks
-        confirmed_tracks = {}
-        for track_id, state in self.track_states.items():
-            if state['frame_count'] >= self.min_track_length:
-                confirmed_tracks[track_id] = state.copy()
-        
-        return confirmed_tracks
+        return {
+            track_id: state for track_id, state in self.track_states.items()
+            if state.frame_count >= self.min_track_length
+        }
     
     def _create_new_track(self, frame: np.ndarray, detection: Dict, timestamp: float):
         """
         Create new track for unmatched detection
         
         Args:
-            frame: Current frame
-            detection: Detection dictionary
+            frame: Current tracking frame
+            detection: Detection dictionary (original frame coordinates)
             timestamp: Current timestamp
         """
         tracker = self._create_tracker()
         if tracker is None:
             return
         
-        # Convert bbox format (x1, y1, x2, y2) to (x, y, w, h)
-        x1, y1, x2, y2 = detection['bbox']
-        bbox_xywh = (x1, y1, x2 - x1, y2 - y1)
+        # Convert bbox format (x1, y1, x2, y2) to tracking frame (x, y, w, h)
+        bbox_xywh = self._to_tracking_coords(detection['bbox'])
         
         # Initialize tracker
         success = tracker.init(frame, bbox_xywh)
@@ -300,26 +656,10 @@ class PersonTracker:
         
         # Store tracker and state
         self.active_tracks[track_id] = tracker
-        self.track_states[track_id] = {
-            'track_id': track_id,
-            'bbox': detection['bbox'],
-            'center': ((x1 + x2) // 2, (y1 + y2) // 2),
-            'detection': detection,
-            'confidence': detection['confidence'],
-            'created_time': timestamp,
-            'last_update': timestamp,
-            'frame_count': 1,
-            'position_history': [{
-                'timestamp': timestamp,
-                'center': ((x1 + x2) // 2, (y1 + y2) // 2),
-                'bbox': detection['bbox']
-            }],
-            'face_crops': [],  # Store face crops for recognition
-            'identity': 'unknown',  # Will be updated by face recognition
-            'authorization_status': 'pending'  # pending, authorized, intruder
-        }
+        self.track_states[track_id] = TrackState(track_id, detection, timestamp,
+                                                 history_size=self.history_size)
         
-        logger.info(f"Created new track {track_id}")
+        logger.info("Created new track %d", track_id)
     
     def _remove_track(self, track_id: int):
         """
@@ -332,7 +672,7 @@ class PersonTracker:
             del self.active_tracks[track_id]
         
         if track_id in self.track_states:
-            logger.info(f"Removed track {track_id} after {self.track_states[track_id]['frame_count']} frames")
+            logger.info("Removed track %d after %d frames", track_id, self.track_states[track_id].frame_count)
             del self.track_states[track_id]
     
     def _cleanup_old_tracks(self, current_time: float):
@@ -344,13 +684,13 @@ class PersonTracker:
         """
         expired_tracks = []
         for track_id, state in self.track_states.items():
-            if current_time - state['last_update'] > self.track_timeout:
+            if current_time - state.last_update > self.track_timeout:
                 expired_tracks.append(track_id)
         
         for track_id in expired_tracks:
             self._remove_track(track_id)
     
-    def get_track_by_id(self, track_id: int) -> Optional[Dict]:
+    def get_track_by_id(self, track_id: int) -> Optional[TrackState]:
         """
         Get track state by ID
         
@@ -358,11 +698,11 @@ class PersonTracker:
             track_id: Track ID
             
         Returns:
-            Track state dictionary or None
+            TrackState or None
         """
         return self.track_states.get(track_id)
     
-    def get_all_tracks(self) -> Dict[int, Dict]:
+    def get_all_tracks(self) -> Dict[int, TrackState]:
         """
         Get all active track states
         
@@ -429,10 +769,12 @@ class PersonTracker:
             cv2.circle(output_frame, center, 3, color, -1)
             
             # Draw trajectory if available
-            if 'position_history' in state and len(state['position_history']) > 1:
-                points = [h['center'] for h in state['position_history']]
-                for i in range(1, len(points)):
-                    cv2.line(output_frame, points[i-1], points[i], color, 2)
+            if isinstance(state, TrackState):
+                points = state.history_centers
+            else:
+                points = np.array([h['center'] for h in state.get('position_history', [])], dtype=np.int32)
+            if len(points) > 1:
+                cv2.polylines(output_frame, [points.reshape(-1, 1, 2)], False, color, 2)
         
         return output_frame
 
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test Suspicious Activity Analyzer
+Checks rasterized zone lookups against the polygon test, the batch
+analysis path against the per-track logic and abandoned object tracking
+"""
+
+import sys
+import numpy as np
+sys.path.append('.')
+
+from surveillance.activity_analyzer import SuspiciousActivityAnalyzer, DetectionZone, ActivityType
+from surveillance.tracker import TrackState
+from surveillance.object_registry import StationaryObjectRegistry
+
+
+def _zone(name, points, zone_type="monitored"):
+    return DetectionZone(name=name, points=points, zone_type=zone_type,
+                         activity_types=[ActivityType.LOITERING, ActivityType.ZONE_INTRUSION])
+
+
+def _polygon_lookup(analyzer, point):
+    """Reference lookup: first zone whose polygon contains the point"""
+    for zone in analyzer.zones:
+        if analyzer.point_in_polygon(point, zone.points):
+            return zone
+    return None
+
+
+def test_zone_mask_matches_polygon_test():
+    """Mask lookups agree with ray casting away from polygon edges"""
+    analyzer = SuspiciousActivityAnalyzer(frame_size=(640, 480))
+    analyzer.add_detection_zone(_zone("gate", [(100, 100), (300, 100), (300, 200), (100, 200)], "restricted"))
+    analyzer.add_detection_zone(_zone("barn", [(200, 150), (500, 150), (500, 400), (350, 400), (350, 300), (200, 300)]))
+    analyzer.add_detection_zone(_zone("field", [(0, 0), (640, 0), (640, 480), (0, 480)]))
+    
+    # Vertices are on a 10px grid, so points at +5 are never on an edge
+    for x in range(5, 640, 10):
+        for y in range(5, 480, 10):
+            expected = _polygon_lookup(analyzer, (x, y))
+            assert analyzer.get_zone_for_point((x, y)) is expected, (x, y)
+    
+    # Overlap resolves to the first zone added
+    assert analyzer.get_zone_for_point((250, 175)).name == "gate"
+
+
+def test_zone_mask_rebuilds_on_change():
+    analyzer = SuspiciousActivityAnalyzer()
+    analyzer.add_detection_zone(_zone("gate", [(0, 0), (100, 0), (100, 100), (0, 100)]))
+    assert analyzer.get_zone_for_point((50, 50)).name == "gate"
+    
+    analyzer.remove_detection_zone("gate")
+    assert analyzer.get_zone_for_point((50, 50)) is None
+    
+    analyzer.add_detection_zone(_zone("yard", [(0, 0), (300, 0), (300, 300), (0, 300)]))
+    assert analyzer.get_zone_for_point((250, 250)).name == "yard"
+
+
+def test_points_outside_mask_use_polygon_test():
+    """Zones larger than the frame still resolve points beyond the mask"""
+    analyzer = SuspiciousActivityAnalyzer(frame_size=(320, 240))
+    analyzer.add_detection_zone(_zone("main", [(0, 0), (1920, 0), (1920, 1080), (0, 1080)]))
+    
+    assert analyzer.get_zone_for_point((100, 100)).name == "main"
+    assert analyzer.get_zone_for_point((1000, 700)).name == "main"
+    assert analyzer.get_zone_for_point((2000, 700)) is None
+    assert analyzer._zone_mask.shape == (240, 320)
+
+
+def _random_tracks(rng, current_time, count):
+    """Mix of TrackState and legacy dict tracks: loiterers, runners, short tracks"""
+    tracks = {}
+    for track_id in range(1, count + 1):
+        length = int(rng.choice([0, 1, 2, 4, 12, 40]))
+        start = rng.integers(0, 1800, 2)
+        step = rng.integers(-3, 4, 2) if rng.random() < 0.5 else rng.integers(-60, 61, 2)
+        timestamps = np.sort(current_time - rng.uniform(0, 8, length))
+        centers = [tuple(int(v) for v in start + i * step + rng.integers(-4, 5, 2)) for i in range(length)]
+        
+        if length and rng.random() < 0.5:
+            first = centers[0]
+            state = TrackState(track_id, {'bbox': [first[0] - 20, first[1] - 50, first[0] + 20, first[1] + 50],
+                                          'confidence': 0.9}, float(timestamps[0]))
+            state.center = first
+            for t, c in zip(timestamps[1:].tolist(), centers[1:]):
+                state.push_position(t, c, [c[0] - 20, c[1] - 50, c[0] + 20, c[1] + 50])
+                state.center = c
+        else:
+            state = {
+                'track_id': track_id,
+                'center': centers[-1] if centers else tuple(int(v) for v in start),
+                'position_history': [{'timestamp': t, 'center': c} for t, c in zip(timestamps.tolist(), centers)],
+            }
+        frame_count = max(length, int(rng.integers(0, 15)))
+        authorization_status = str(rng.choice(['pending', 'authorized', 'intruder']))
+        if isinstance(state, TrackState):  # Tracked fields are read-only through item access
+            state.frame_count = frame_count
+            state.set_identity('unknown', authorization_status)
+        else:
+            state['frame_count'] = frame_count
+            state['authorization_status'] = authorization_status
+        tracks[track_id] = state
+    return tracks
+
+
+def _random_detections(rng, tracks):
+    """Weapons near (and far from) people, plus bags"""
+    detections = []
+    centers = [state['center'] for state in tracks.values()]
+    for _ in range(int(rng.integers(0, 4))):
+        if centers and rng.random() < 0.7:
+            cx, cy = centers[int(rng.integers(0, len(centers)))]
+            cx, cy = cx + int(rng.integers(-90, 91)), cy + int(rng.integers(-90, 91))
+        else:
+            cx, cy = (int(v) for v in rng.integers(0, 1900, 2))
+        detections.append({'bbox': [cx - 10, cy - 10, cx + 10, cy + 10], 'confidence': 0.8,
+                           'class_id': int(rng.choice([34, 43, 76, 24])), 'class_name': 'knife'})
+    return detections
+
+
+def test_batch_analysis_matches_per_track():
+    """Differential test: batch and per-track paths produce identical activities"""
+    rng = np.random.default_rng(7)
+    zones = [
+        _zone("gate", [(0, 0), (600, 0), (600, 600), (0, 600)], "restricted"),
+        _zone("field", [(0, 0), (1920, 0), (1920, 1080), (0, 1080)]),
+    ]
+    zones[1].activity_types.append(ActivityType.RUNNING)
+    
+    analyzers = []
+    for batch in (False, True):
+        analyzer = SuspiciousActivityAnalyzer(loitering_threshold=5.0, speed_threshold=40.0,
+                                              frame_size=(1920, 1080), batch_analysis=batch)
+        for zone in zones:
+            analyzer.add_detection_zone(zone)
+        analyzers.append(analyzer)
+    
+    total = 0
+    for frame in range(60):
+        current_time = 1000.0 + frame
+        tracks = _random_tracks(rng, current_time, int(rng.integers(0, 12)))
+        detections = _random_detections(rng, tracks)
+        
+        expected = analyzers[0].analyze_frame(detections, tracks, current_time)
+        actual = analyzers[1].analyze_frame(detections, tracks, current_time)
+        assert actual == expected, frame
+        total += len(expected)
+    
+    # The scenario must actually exercise the detectors
+    kinds = {a.activity_type for a in analyzers[0].activity_history}
+    assert {ActivityType.RUNNING, ActivityType.LOITERING, ActivityType.WEAPON_DETECTED} <= kinds
+    assert total > 0
+
+
+def _bag(cx, cy, class_id=24, size=30):
+    return {'bbox': [cx - size, cy - size, cx + size, cy + size], 'confidence': 0.8,
+            'class_id': class_id, 'class_name': 'backpack' if class_id == 24 else 'suitcase'}
+
+
+def test_jittering_bag_raises_one_abandoned_alert():
+    """Pixel jitter must not restart the abandonment timer"""
+    rng = np.random.default_rng(3)
+    analyzer = SuspiciousActivityAnalyzer(abandoned_object_threshold=60.0)
+    
+    alerts = []
+    for second in range(0, 200, 2):
+        jitter = rng.integers(-3, 4, 2)
+        detections = [_bag(500 + int(jitter[0]), 400 + int(jitter[1]))]
+        alerts += analyzer.detect_abandoned_objects(detections, 1000.0 + second)
+    
+    assert len(alerts) == 1
+    assert alerts[0].timestamp == 1060.0
+    assert len(analyzer.stationary_objects) == 1
+
+
+def test_registry_association_and_eviction():
+    registry = StationaryObjectRegistry(tolerance=40.0)
+    
+    small, large, suitcase = (obj for obj, _ in registry.update(
+        [_bag(100, 100, size=10), _bag(150, 100, size=40), _bag(105, 100, class_id=28)], 0.0))
+    assert len({small.object_id, large.object_id, suitcase.object_id}) == 3  # classes never merge
+    
+    # Both backpacks are within tolerance; the overlapping one wins over the nearer one
+    matched = registry.update([_bag(120, 100, size=10)], 1.0)
+    assert matched[0][0] is large
+    
+    # Far away detection creates a new object
+    far = registry.update([_bag(400, 100)], 2.0)[0][0]
+    assert far.object_id not in (small.object_id, large.object_id, suitcase.object_id)
+    
+    # Only objects not seen since the cutoff are evicted
+    assert registry.evict_expired(0.5) == 2
+    assert list(registry.objects) == [large.object_id, far.object_id]
+    assert registry.evict_expired(10.0) == 2
+    assert len(registry) == 0 and not registry.grid
+
+
+if __name__ == "__main__":
+    test_zone_mask_matches_polygon_test()
+    test_zone_mask_rebuilds_on_change()
+    test_points_outside_mask_use_polygon_test()
+    test_batch_analysis_matches_per_track()
+    test_jittering_bag_raises_one_abandoned_alert()
+    test_registry_association_and_eviction()
+    print("✅ Activity analyzer tests passed")
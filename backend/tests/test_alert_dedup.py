@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test Alert Dedup Index
+Checks TTL expiry, scopes and per-type key fields, snapshot persistence and
+that AlertModel skips the duplicate query for alerts it already knows about
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append('.')
+
+from database.alert_dedup import AlertDedupIndex, alert_dedup_index, parse_key_fields
+from database.models import AlertModel
+
+
+def _alert(camera_id='cam1', alert_type='intruder', message='Unknown person'):
+    return {'camera_id': camera_id, 'type': alert_type, 'message': message}
+
+
+def test_ttl_and_scopes():
+    index = AlertDedupIndex()
+
+    assert index.check_and_mark(_alert(), ttl=10, now=100.0)
+    assert not index.check_and_mark(_alert(), ttl=10, now=105.0)
+    assert index.is_active(_alert(), now=109.9)
+    assert not index.is_active(_alert(), now=110.0)  # expired
+    assert len(index) == 0
+
+    # Scopes keep separate cooldowns for the same alert
+    index.mark(_alert(), ttl=10, scope='email', fields=('type',), now=200.0)
+    assert index.is_active(_alert(camera_id='cam2'), scope='email', fields=('type',), now=201.0)
+    assert not index.is_active(_alert(), now=201.0)
+
+
+def test_per_type_key_fields():
+    index = AlertDedupIndex(key_fields=parse_key_fields("intruder=camera_id+type"))
+
+    assert index.check_and_mark(_alert(message='first'), ttl=60, now=0.0)
+    # Different message, same camera: still a duplicate for intruder alerts
+    assert not index.check_and_mark(_alert(message='second'), ttl=60, now=1.0)
+    # Other types use camera_id + type + message
+    assert index.check_and_mark(_alert(alert_type='running', message='a'), ttl=60, now=1.0)
+    assert index.check_and_mark(_alert(alert_type='running', message='b'), ttl=60, now=1.0)
+
+
+def test_snapshot_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'dedup.json')
+        index = AlertDedupIndex(snapshot_path=path)
+        index.mark(_alert(), ttl=3600)
+        index.mark(_alert(camera_id='cam2'), ttl=-1)  # already expired
+        index.save_snapshot()
+
+        restored = AlertDedupIndex(snapshot_path=path)
+        assert restored.is_active(_alert())
+        assert not restored.is_active(_alert(camera_id='cam2'))
+        assert len(restored) == 1
+
+
+class CountingCollection:
+    """Counts duplicate queries; stores inserted alerts"""
+
+    def __init__(self):
+        self.find_one_calls = 0
+        self.documents = []
+
+    def find_one(self, query):
+        if 'id' in query:  # find_by_id
+            return next((dict(d) for d in self.documents if d['id'] == query['id']), None)
+        self.find_one_calls += 1
+        return None
+
+    def insert_one(self, document):
+        document['id'] = f"oid{len(self.documents) + 1}"
+        self.documents.append(document)
+
+        class Result:
+            inserted_id = document['id']
+        return Result()
+
+    def delete_one(self, query):
+        before = len(self.documents)
+        self.documents = [d for d in self.documents if d['id'] != query['id']]
+
+        class Result:
+            deleted_count = before - len(self.documents)
+        return Result()
+
+
+class FakeAlertModel(AlertModel):
+    def __init__(self, collection):
+        super().__init__()
+        self._collection = collection
+
+    @property
+    def collection(self):
+        return self._collection
+
+
+def test_create_alert_checks_memory_first():
+    alert_dedup_index.clear()
+    collection = CountingCollection()
+    model = FakeAlertModel(collection)
+
+    try:
+        assert model.create_alert('cam9', 'intruder', 'Unknown person', 'high')
+        assert model.create_alert('cam9', 'intruder', 'Unknown person', 'high') == ""
+        assert collection.find_one_calls == 1  # second alert never reached MongoDB
+        assert len(collection.documents) == 1
+    finally:
+        alert_dedup_index.clear()
+
+
+def test_dismissed_alert_can_be_raised_again():
+    alert_dedup_index.clear()
+    model = FakeAlertModel(CountingCollection())
+
+    try:
+        alert_id = model.create_alert('cam9', 'intruder', 'Unknown person', 'high')
+        assert model.create_alert('cam9', 'intruder', 'Unknown person', 'high') == ""
+
+        assert model.delete_by_id(alert_id)  # Dismissing deletes the alert
+        assert model.create_alert('cam9', 'intruder', 'Unknown person', 'high')
+    finally:
+        alert_dedup_index.clear()
+
+
+if __name__ == "__main__":
+    test_ttl_and_scopes()
+    test_per_type_key_fields()
+    test_snapshot_survives_restart()
+    test_create_alert_checks_memory_first()
+    test_dismissed_alert_can_be_raised_again()
+    print("✅ Alert dedup tests passed")
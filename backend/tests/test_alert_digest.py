@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Alert Digest
+Checks that alerts are coalesced per window, merged per camera and type,
+ordered by severity, and rendered as one email with thumbnails
+"""
+
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+sys.path.append('.')
+
+from app.services.alert_digest import AlertDigest
+from app.services.snapshot_service import SnapshotService, SnapshotProfile
+from app.services import email_service as email_module
+
+
+def _alert(alert_type, severity, camera_id, image_path=None):
+    alert = {'type': alert_type, 'severity': severity, 'camera_id': camera_id,
+             'location': f'Camera {camera_id}', 'description': f'{alert_type} on {camera_id}'}
+    if image_path:
+        alert['image_path'] = image_path
+    return alert
+
+
+def test_window_coalesces_and_orders():
+    digests = []
+    digest = AlertDigest(window=0.2, flush_callback=digests.append)
+    digest.start()
+    try:
+        digest.add(_alert('running', 'low', 'cam1'))
+        digest.add(_alert('intruder', 'high', 'cam2'))
+        digest.add(_alert('intruder', 'high', 'cam2'))
+        digest.add(_alert('crowd_formation', 'medium', 'cam1'))
+        time.sleep(0.05)
+        assert digests == []  # window still open
+
+        deadline = time.monotonic() + 2
+        while not digests and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        digest.stop()
+
+    assert len(digests) == 1
+    sent = digests[0]
+    assert sent['total_alerts'] == 4
+    assert [(e['type'], e['count']) for e in sent['alerts']] == [('intruder', 2), ('crowd_formation', 1), ('running', 1)]
+    assert sent['cameras'] == ['cam1', 'cam2'] and sent['severity'] == 'high'
+    assert digest.pending == 0
+
+
+def test_immediate_types_and_stop_flush():
+    digests = []
+    digest = AlertDigest(window=60, flush_callback=digests.append)
+    assert digest.is_immediate(_alert('weapon_detected', 'critical', 'cam1'))
+    assert not digest.is_immediate(_alert('intruder', 'high', 'cam1'))
+
+    digest.start()
+    digest.add(_alert('intruder', 'high', 'cam1'))
+    digest.stop()  # pending alerts are not lost on shutdown
+    assert len(digests) == 1 and digests[0]['total_alerts'] == 1
+
+
+def test_digest_email_has_thumbnails():
+    service = SnapshotService(profiles={
+        SnapshotService.ARCHIVE: SnapshotProfile(max_width=0, quality=95),
+        'email': SnapshotProfile(max_width=1280, quality=80),
+        'thumbnail': SnapshotProfile(max_width=320, quality=60)
+    })
+    original_service = email_module.snapshot_service
+    email_module.snapshot_service = service
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            frame = np.random.randint(0, 255, (1080, 1920, 3), dtype=np.uint8)
+            paths = [os.path.join(tmp_dir, f'cam{i}.jpg') for i in range(3)]
+            for path in paths:
+                service.save(frame, path)
+
+            digests = []
+            digest = AlertDigest(window=60, flush_callback=digests.append)
+            for i, path in enumerate(paths):
+                digest.add(_alert('intruder', 'high', f'cam{i}', path))
+            digest.flush()
+
+            sender = email_module.EmailAlertService()
+            payload = sender.build_payload(digests[0], ['a@example.com'])
+            single = sender.build_payload(_alert('intruder', 'high', 'cam0', paths[0]), ['a@example.com'])
+
+            assert '3 alerts' in payload['subject']
+            assert len(payload['attachments']) == 3
+            assert {a['content_id'] for a in payload['attachments']} == {'alert_thumb_0', 'alert_thumb_1', 'alert_thumb_2'}
+            assert all(f"cid:{a['content_id']}" in payload['content'][0]['value'] for a in payload['attachments'])
+
+            # Three thumbnails weigh less than one full email snapshot
+            digest_bytes = sum(len(a['content']) for a in payload['attachments'])
+            assert digest_bytes < len(single['attachments'][0]['content'])
+    finally:
+        email_module.snapshot_service = original_service
+        service.shutdown()
+
+
+def test_digest_values_are_escaped():
+    digests = []
+    digest = AlertDigest(window=60, flush_callback=digests.append)
+    alert = _alert('intruder', 'high', 'cam<1>')
+    alert['description'] = '<script>alert(1)</script> & more'
+    digest.add(alert)
+    digest.flush()
+
+    html = email_module.EmailAlertService().build_payload(digests[0], ['a@example.com'])['content'][0]['value']
+    assert '<script>' not in html and '&lt;script&gt;alert(1)&lt;/script&gt; &amp; more' in html
+    assert 'Camera cam&lt;1&gt;' in html
+
+
+if __name__ == "__main__":
+    test_window_coalesces_and_orders()
+    test_immediate_types_and_stop_flush()
+    test_digest_email_has_thumbnails()
+    test_digest_values_are_escaped()
+    print("✅ Alert digest tests passed")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Test Alert Writer
+Checks that alerts are written in batches off the caller's thread, most severe
+first, with bounded queueing and retries of failed batches, and that AlertModel.create_alerts drops duplicates
+"""
+
+import sys
+import time
+import threading
+sys.path.append('.')
+
+from app.services.alert_writer import AlertWriter
+from database.alert_dedup import alert_dedup_index
+from database.models import AlertModel
+
+
+class SlowAlertModel:
+    """Records create_alerts batches; blocks until released"""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+
+    def create_alerts(self, alerts):
+        self.release.wait(5)
+        self.batches.append(alerts)
+        return [f"id{len(self.batches)}_{i}" for i in range(len(alerts))]
+
+
+def _alert(alert_type, severity, camera_id='cam1'):
+    return {'type': alert_type, 'severity': severity, 'camera_id': camera_id,
+            'description': f'{alert_type} on {camera_id}'}
+
+
+def test_batches_written_in_priority_order():
+    model = SlowAlertModel()
+    writer = AlertWriter(model, batch_size=10, flush_interval=0.05)
+    writer.start()
+
+    # Occupy the writer with a first batch so the next alerts queue up behind it
+    first = _alert('running', 'low')
+    writer.enqueue(first)
+    time.sleep(0.2)
+
+    alerts = [_alert('running', 'low'), _alert('loitering', 'medium'),
+              _alert('weapon_detected', 'critical'), _alert('intruder', 'high')]
+    started = time.monotonic()
+    for alert in alerts:
+        assert writer.enqueue(alert)
+    assert time.monotonic() - started < 0.05  # enqueue never waits on the database
+    assert writer.queue_depth == 4
+
+    model.release.set()
+    writer.stop()
+
+    assert [a['severity'] for a in model.batches[1]] == ['critical', 'high', 'medium', 'low']
+    assert all(alert.get('db_id') for alert in [first] + alerts)
+
+    stats = writer.get_stats()
+    assert stats['written'] == 5 and stats['batches'] == 2 and stats['queue_depth'] == 0
+    assert stats['avg_write_ms'] > 0
+
+
+def test_full_queue_keeps_most_severe():
+    model = SlowAlertModel()
+    writer = AlertWriter(model, max_queue_size=2)  # not started: nothing drains the queue
+
+    assert writer.enqueue(_alert('running', 'low'))
+    assert writer.enqueue(_alert('loitering', 'medium'))
+
+    # Not more severe than anything queued: rejected
+    assert not writer.enqueue(_alert('running', 'low', camera_id='cam2'))
+
+    # Critical replaces the least severe queued alert
+    assert writer.enqueue(_alert('weapon_detected', 'critical'))
+    assert sorted(entry[4]['severity'] for entry in writer._queue) == ['critical', 'medium']
+    assert writer.get_stats()['dropped'] == 2
+
+
+class FlakyAlertModel:
+    """create_alerts raises `failures` times, then stores the batch"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.batches = []
+
+    def create_alerts(self, alerts):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("MongoDB not reachable")
+        self.batches.append(alerts)
+        return [f"id{i}" for i in range(len(alerts))]
+
+
+def test_failed_batch_is_retried_in_priority_order():
+    model = FlakyAlertModel(failures=2)
+    writer = AlertWriter(model, flush_interval=0.01, retry_delay=0.05)
+    alerts = [_alert('running', 'low'), _alert('weapon_detected', 'critical')]
+    for alert in alerts:
+        writer.enqueue(alert)
+    writer.start()
+
+    deadline = time.monotonic() + 3
+    while not model.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+
+    assert model.calls == 3 and [a['severity'] for a in model.batches[0]] == ['critical', 'low']
+    assert all(alert.get('db_id') for alert in alerts)
+    stats = writer.get_stats()
+    assert stats['retried'] == 4 and stats['failed'] == 0 and stats['written'] == 2
+
+
+def test_batch_dropped_after_max_attempts():
+    model = FlakyAlertModel(failures=10)
+    writer = AlertWriter(model, flush_interval=0.01, max_attempts=3, retry_delay=0.01)
+    writer.enqueue(_alert('intruder', 'high'))
+    writer.start()
+
+    deadline = time.monotonic() + 3
+    while writer.get_stats()['failed'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+
+    assert model.calls == 3 and writer.queue_depth == 0
+    assert writer.get_stats()['failed'] == 1 and writer.get_stats()['written'] == 0
+
+
+class FakeCursorCollection:
+    """Just enough of a pymongo collection for AlertModel.create_alerts"""
+
+    def __init__(self, existing):
+        self.documents = list(existing)
+
+    def find(self, query, projection=None):
+        matches = []
+        for doc in self.documents:
+            for clause in query['$or']:
+                if all(doc.get(key) == value for key, value in clause.items()):
+                    matches.append(doc)
+                    break
+        return matches
+
+    def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+
+        class Result:
+            inserted_ids = [f"oid{i}" for i in range(len(documents))]
+        return Result()
+
+
+class FakeAlertModel(AlertModel):
+    def __init__(self, collection):
+        super().__init__()
+        self._collection = collection
+
+    @property
+    def collection(self):
+        return self._collection
+
+
+def test_create_alerts_skips_duplicates():
+    alert_dedup_index.clear()
+    collection = FakeCursorCollection([{'camera_id': 'cam1', 'type': 'intruder', 'message': 'seen'}])
+    model = FakeAlertModel(collection)
+
+    try:
+        ids = model.create_alerts([
+            {'camera_id': 'cam1', 'type': 'intruder', 'message': 'seen'},     # already stored
+            {'camera_id': 'cam2', 'type': 'intruder', 'message': 'seen'},
+            {'camera_id': 'cam2', 'type': 'intruder', 'message': 'seen'},     # duplicate within batch
+            {'camera_id': 'cam1', 'type': 'running', 'message': 'fast', 'severity': 'low'},
+        ])
+
+        assert ids == ['', 'oid0', '', 'oid1']
+        assert len(collection.documents) == 3
+        assert collection.documents[-1]['severity'] == 'low'
+    finally:
+        alert_dedup_index.clear()
+
+
+class FailingOnceCollection(FakeCursorCollection):
+    """insert_many fails the first time (e.g. a lost connection)"""
+
+    def __init__(self):
+        super().__init__([])
+        self.failures = 1
+
+    def insert_many(self, documents, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return super().insert_many(documents, ordered)
+
+
+def test_failed_insert_does_not_block_next_copy():
+    alert_dedup_index.clear()
+    collection = FailingOnceCollection()
+    model = FakeAlertModel(collection)
+    alert = {'camera_id': 'cam1', 'type': 'intruder', 'message': 'Unknown person'}
+
+    try:
+        try:
+            model.create_alerts([alert])
+            assert False, "a failed insert must be reported, not look like a duplicate"
+        except ConnectionError:
+            pass
+        assert not alert_dedup_index.is_active(alert)  # Nothing stored, nothing marked
+
+        assert model.create_alerts([dict(alert)]) == ['oid0']
+        assert len(collection.documents) == 1 and alert_dedup_index.is_active(alert)
+    finally:
+        alert_dedup_index.clear()
+
+
+if __name__ == "__main__":
+    test_batches_written_in_priority_order()
+    test_full_queue_keeps_most_severe()
+    test_failed_batch_is_retried_in_priority_order()
+    test_batch_dropped_after_max_attempts()
+    test_create_alerts_skips_duplicates()
+    test_failed_insert_does_not_block_next_copy()
+    print("✅ Alert writer tests passed")
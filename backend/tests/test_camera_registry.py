@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test Camera Registry
+Checks that readers iterate consistent snapshots while cameras are added and
+removed concurrently, that stats are replaced rather than modified, and that
+a restarted camera's old thread sees that it should stop
+"""
+
+import sys
+import threading
+sys.path.append('.')
+
+from app.services.camera_registry import CameraRegistry
+
+
+def test_snapshots_survive_concurrent_changes():
+    registry = CameraRegistry()
+    running = threading.Event()
+    running.set()
+    errors = []
+
+    def discovery():
+        i = 0
+        while running.is_set():
+            registry.add(f'cam{i % 50}', f'http://10.0.0.{i % 50}/video')
+            registry.remove(f'cam{(i + 25) % 50}')
+            i += 1
+
+    def camera(name):
+        while running.is_set():
+            state = registry.get(name)
+            if state is not None:
+                state.add_stats(total_detections=1)
+                state.update_stats(fps=5)
+
+    threads = [threading.Thread(target=discovery)] + [threading.Thread(target=camera, args=(f'cam{i}',))
+                                                      for i in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(2000):
+            try:
+                snapshot = registry.snapshot()
+                total = 0
+                for name, state in snapshot.items():  # Would raise if the dict changed size under us
+                    total += state.stats.get('total_detections', 0)
+                assert len(snapshot) == len(list(snapshot))
+            except RuntimeError as e:
+                errors.append(e)
+    finally:
+        running.clear()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+
+
+def test_stats_are_copy_on_write():
+    registry = CameraRegistry()
+    state = registry.add('cam1', {'url': 'rtsp://cam1', 'ai_mode': 'yolov9'})
+    assert state.url == 'rtsp://cam1' and state.ai_mode == 'yolov9'
+
+    before = state.stats
+    state.update_stats(fps=10, ai_mode='both')
+    state.add_stats(total_detections=3)
+    state.add_stats(total_detections=2)
+    assert before == {} and state.stats == {'fps': 10, 'ai_mode': 'both', 'total_detections': 5}
+    assert state.ai_mode == 'both'
+
+    # Adding a known camera keeps its state
+    assert registry.add('cam1', 'rtsp://other') is state
+
+
+def test_restart_stops_the_old_thread():
+    registry = CameraRegistry()
+    state = registry.add('cam1', 'rtsp://cam1')
+    version = registry.version
+
+    first = registry.activate('cam1')
+    assert first == 1 and state.running(first) and registry.active_names() == ['cam1']
+    assert registry.activate('cam1') is None  # Already active
+
+    state.latest = {'detections': []}
+    assert registry.deactivate(state) and not state.running(first) and state.latest is None
+    assert not registry.deactivate(state)
+
+    second = registry.activate('cam1')
+    assert state.running(second) and not state.running(first)  # Old thread exits even though active again
+    assert registry.version > version
+
+    # A result computed by the old thread is not stored, nor handed to the live view
+    published = []
+    assert not state.publish_latest(first, 'stale', lambda: published.append('stale'))
+    assert state.publish_latest(second, 'fresh', lambda: published.append('fresh'))
+    assert state.latest == 'fresh' and published == ['fresh']
+    registry.deactivate(state)
+    assert not state.publish_latest(second, 'late') and state.latest is None
+
+    registry.remove('cam1')
+    assert 'cam1' not in registry and not state.active and registry.activate('cam1') is None
+
+
+if __name__ == "__main__":
+    test_snapshots_survive_concurrent_changes()
+    test_stats_are_copy_on_write()
+    test_restart_stops_the_old_thread()
+    print("✅ Camera registry tests passed")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test Email Dispatcher
+Checks delivery through one pooled connection, retries with backoff, the
+durable outbox and that EmailAlertService routes per-call recipients through
+the dispatcher, using the local SendGrid stand-in
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+sys.path.append('.')
+
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.email_service import EmailAlertService
+from scripts.sendgrid_stub import SendGridStub
+
+
+def _payload(alert_data, recipients):
+    return {
+        'personalizations': [{'to': [{'email': email} for email in recipients]}],
+        'from': {'email': 'alerts@example.com'},
+        'subject': alert_data['type'],
+        'content': [{'type': 'text/plain', 'value': alert_data.get('description', '')}]
+    }
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_messages_share_one_connection():
+    with SendGridStub() as stub:
+        dispatcher = EmailDispatcher('test-key', _payload, api_url=stub.url, workers=1)
+        dispatcher.start()
+        try:
+            for i in range(5):
+                assert dispatcher.send({'type': 'intruder', 'description': f'alert {i}'}, ['a@example.com'], timeout=5)
+        finally:
+            dispatcher.stop()
+
+        assert len(stub.messages) == 5
+        assert len(stub.connections) == 1  # keep-alive: no new connection per email
+
+        stats = dispatcher.get_stats()
+        assert stats['sent'] == 5 and stats['pending'] == 0
+        assert len(stats['recent']) == 5 and all(entry['send_ms'] > 0 for entry in stats['recent'])
+
+
+def test_retry_with_backoff():
+    with SendGridStub() as stub, tempfile.TemporaryDirectory() as outbox:
+        stub.fail_next(2, status=503)
+        dispatcher = EmailDispatcher('test-key', _payload, api_url=stub.url, outbox_dir=outbox,
+                                     backoff_base=0.05)
+        dispatcher.start()
+        try:
+            assert dispatcher.send({'type': 'weapon_detected'}, ['a@example.com'], timeout=5)
+        finally:
+            dispatcher.stop()
+
+        assert stub.requests == 3
+        assert dispatcher.get_stats()['retries'] == 2
+        assert dispatcher.get_stats()['recent'][-1]['attempts'] == 3
+        assert [name for name in os.listdir(outbox) if name.endswith('.json')] == []
+
+
+def test_rejected_message_moves_to_failed():
+    with SendGridStub() as stub, tempfile.TemporaryDirectory() as outbox:
+        stub.fail_next(1, status=400)
+        dispatcher = EmailDispatcher('test-key', _payload, api_url=stub.url, outbox_dir=outbox)
+        dispatcher.start()
+        try:
+            assert not dispatcher.send({'type': 'intruder'}, ['a@example.com'], timeout=5)
+        finally:
+            dispatcher.stop()
+
+        assert stub.requests == 1  # client errors are not retried
+        assert len(os.listdir(os.path.join(outbox, 'failed'))) == 1
+
+
+def test_outbox_survives_restart():
+    with SendGridStub() as stub, tempfile.TemporaryDirectory() as outbox:
+        # Not started: the message only reaches the outbox
+        dispatcher = EmailDispatcher('test-key', _payload, api_url=stub.url, outbox_dir=outbox)
+        assert dispatcher.submit({'type': 'intruder', 'description': 'queued'}, ['a@example.com'])
+        dispatcher.stop()
+
+        files = [name for name in os.listdir(outbox) if name.endswith('.json')]
+        assert len(files) == 1
+        with open(os.path.join(outbox, files[0]), encoding='utf-8') as f:
+            assert json.load(f)['recipients'] == ['a@example.com']
+
+        restarted = EmailDispatcher('test-key', _payload, api_url=stub.url, outbox_dir=outbox)
+        restarted.start()
+        try:
+            assert _wait_for(lambda: len(stub.messages) == 1)
+        finally:
+            restarted.stop()
+
+        assert stub.messages[0]['subject'] == 'intruder'
+        assert _wait_for(lambda: not [name for name in os.listdir(outbox) if name.endswith('.json')])
+
+
+def test_full_outbox_rejects():
+    dispatcher = EmailDispatcher('test-key', _payload, max_pending=1)  # not started
+    assert dispatcher.submit({'type': 'intruder'}, ['a@example.com'])
+    assert dispatcher.submit({'type': 'intruder'}, ['a@example.com']) is None
+    assert dispatcher.get_stats()['rejected'] == 1
+
+
+def test_email_service_uses_dispatcher_recipients():
+    with SendGridStub() as stub:
+        service = EmailAlertService()
+        service.enabled = True
+        service.api_key = 'test-key'
+        service.dispatcher = EmailDispatcher('test-key', service.build_payload, api_url=stub.url)
+        service.dispatcher.start()
+        try:
+            alert = {'type': 'intruder', 'description': 'Unknown person', 'camera_id': 'cam1', 'confidence': 0.9}
+            assert service.send_alert(alert, recipients=['guard@example.com'])
+            assert service.send_alert(alert, wait=False)
+            assert _wait_for(lambda: len(stub.messages) == 2)
+        finally:
+            service.dispatcher.stop()
+
+        assert stub.messages[0]['personalizations'][0]['to'] == [{'email': 'guard@example.com'}]
+        assert stub.messages[1]['personalizations'][0]['to'] == [{'email': email} for email in service.recipients]
+
+
+def test_email_service_requires_api_key():
+    service = EmailAlertService()
+    service.enabled = True
+    service.api_key = 'your_sendgrid_api_key_here'
+    assert not service.configured and not service.send_alert({'type': 'intruder'}, wait=False)
+    assert not service.get_configuration_status()['configured']
+
+
+if __name__ == "__main__":
+    test_messages_share_one_connection()
+    test_retry_with_backoff()
+    test_rejected_message_moves_to_failed()
+    test_outbox_survives_restart()
+    test_full_outbox_rejects()
+    test_email_service_uses_dispatcher_recipients()
+    test_email_service_requires_api_key()
+    print("✅ Email dispatcher tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Email Templates
+Golden-output checks for alert email bodies rendered from the precompiled
+templates, plus escaping of alert fields
+"""
+
+import sys
+import os
+sys.path.append('.')
+
+from app.services.email_service import EmailAlertService
+from app.services.email_templates import EmailTemplateRenderer
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+# Golden files were produced by the original f-string implementation
+GOLDEN_CASES = {
+    'intruder': {
+        'type': 'intruder',
+        'description': 'Unauthorized person detected in farm area: Unknown',
+        'location': 'Camera cam1',
+        'camera_id': 'cam1',
+        'confidence': 0.87,
+        'timestamp': '2025-03-14T09:26:53',
+        'id': 'ALERT_1741944413000',
+        'image_path': 'storage/snapshots/intruder_cam1.jpg'
+    },
+    'weapon_escalated': {
+        'type': 'weapon_detected',
+        'description': 'WEAPON DETECTED: knife',
+        'location': 'Camera 2',
+        'camera': 'Gate Camera',
+        'confidence': 92.5,
+        'timestamp': '2025-03-14T21:05:00Z',
+        'id': '65f2a1b3c4d5e6f708192a3b',
+        'escalated': True,
+        'escalated_to': 'Owner Rajasekhar',
+        'escalated_by': 'Dashboard User'
+    },
+    'fallback_defaults': {
+        'type': 'running',
+        'confidence': 50,
+        'timestamp': '2025-01-02T03:04:05'
+    }
+}
+
+
+def _render(service, alert_data):
+    template = service.templates.get(alert_data['type'], service.templates['suspicious_activity'])
+    return service._create_modern_html_body(alert_data, template)
+
+
+def test_golden_output():
+    service = EmailAlertService()
+    for name, alert_data in GOLDEN_CASES.items():
+        with open(os.path.join(GOLDEN_DIR, f'email_{name}.html'), encoding='utf-8', newline='') as f:
+            expected = f.read()
+        assert _render(service, alert_data) == expected, f"{name} differs from its golden output"
+
+
+def test_fragments_match_jinja_render():
+    renderer = EmailTemplateRenderer()
+    style = EmailAlertService().templates['crowd_formation']
+    alert = dict(GOLDEN_CASES['weapon_escalated'], type='crowd_formation')
+
+    for escalated in (False, True):
+        for has_image in (False, True):
+            alert_data = dict(alert, escalated=escalated)
+            if has_image:
+                alert_data['image_path'] = 'snap.jpg'
+            rendered = renderer.render_alert(alert_data, style)
+
+            jinja = renderer._styles[renderer._style_key(style)].render(
+                formatted_time='2025-03-14 21:05:00', confidence=92.5, confidence_text='92.5',
+                location='Camera 2', camera_id='Gate Camera', description='WEAPON DETECTED: knife',
+                alert_type_title='Crowd Formation', alert_id=alert['id'], escalated=escalated,
+                escalated_to='Owner Rajasekhar', escalated_by='Dashboard User',
+                has_image=has_image, image_cid='alert_image')
+            assert rendered == jinja
+
+
+def test_alert_fields_are_escaped():
+    service = EmailAlertService()
+    html = _render(service, dict(GOLDEN_CASES['intruder'], description='<script>alert(1)</script> & co'))
+    assert '<script>' not in html
+    assert '&lt;script&gt;alert(1)&lt;/script&gt; &amp; co' in html
+
+
+if __name__ == "__main__":
+    test_golden_output()
+    test_fragments_match_jinja_render()
+    test_alert_fields_are_escaped()
+    print("✅ Email template tests passed")
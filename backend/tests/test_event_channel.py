@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test Event Channel
+Checks status deltas, per-client coalescing and rate limits, and resuming a dashboard event
+stream from its cursor
+"""
+
+import sys
+import json
+import threading
+import time
+sys.path.append('.')
+
+from app.services.event_channel import EventChannel, merge_delta, status_delta
+
+
+def _parse(message):
+    """(event, id, data) of one SSE message"""
+    fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+    return fields['event'], int(fields['id']), json.loads(fields['data'])
+
+
+def _status(fps=0, cameras=('cam1', 'cam2')):
+    return {
+        'active_cameras': len(cameras),
+        'camera_stats': {name: {'fps': fps, 'persons': 0} for name in cameras}
+    }
+
+
+def test_status_delta_roundtrip():
+    old, new = _status(3), _status(5, cameras=('cam1',))
+    delta = status_delta(old, new)
+    assert delta == {'active_cameras': 1, 'camera_stats': {'cam1': {'fps': 5}, 'cam2': None}}
+
+    client = json.loads(json.dumps(old))
+    merge_delta(client, delta)
+    client['camera_stats'] = {k: v for k, v in client['camera_stats'].items() if v is not None}
+    assert client == new
+    assert status_delta(new, new) == {}
+
+
+def test_snapshot_then_coalesced_updates():
+    current = {'status': _status()}
+    channel = EventChannel(status_provider=lambda: current['status'], max_rate=4)
+    stream = channel.stream()
+
+    assert next(stream).startswith('retry:')
+    event, cursor, data = _parse(next(stream))
+    assert event == 'snapshot' and data == _status() and channel.clients == 1
+
+    # Five events while the client is rate limited arrive as one message per type
+    for fps in range(1, 4):
+        current['status'] = _status(fps)
+        channel.publish_status(current['status'])
+    channel.publish('activity', {'seq': 0, 'description': 'loitering'})
+    channel.emit('new_alert', {'id': 'ALERT_1'})
+
+    messages = [_parse(next(stream)) for _ in range(3)]
+    by_type = {event: (msg_id, data) for event, msg_id, data in messages}
+    assert by_type['status'][1] == {'camera_stats': {'cam1': {'fps': 3}, 'cam2': {'fps': 3}}}
+    assert by_type['activity'][1] == [{'seq': 0, 'description': 'loitering'}]
+    assert by_type['alert'][1] == [{'id': 'ALERT_1'}]
+    assert all(msg_id == channel.events.cursor for msg_id, _ in by_type.values())
+
+    # Published deltas are not modified by coalescing
+    events, _ = channel.events.since(0, type='status')
+    assert [data['camera_stats']['cam1']['fps'] for _, data in events] == [0, 1, 2, 3]  # 0: snapshot
+
+    stream.close()
+    assert channel.clients == 0
+
+
+def test_rate_limit_per_client():
+    channel = EventChannel(max_rate=5)
+    received = []
+
+    def client():
+        for message in channel.stream(cursor=0):
+            if message.startswith('event:'):
+                received.append((time.monotonic(), _parse(message)))
+            if sum(len(data) for _, (_, _, data) in received) >= 20:
+                break
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    for i in range(20):
+        channel.publish('activity', {'seq': i})
+        time.sleep(0.02)
+    thread.join(3)
+
+    assert [item['seq'] for _, (_, _, data) in received for item in data] == list(range(20))
+    assert len(received) <= 4  # 20 events over 0.4 s at no more than 5 messages per second
+    gaps = [b[0] - a[0] for a, b in zip(received, received[1:])]
+    assert all(gap >= 0.18 for gap in gaps)
+
+
+def test_every_message_counts_and_rate_cannot_be_raised():
+    channel = EventChannel(max_rate=5)
+    received = []
+    stop = threading.Event()
+
+    def client():
+        for message in channel.stream(cursor=0, max_rate=-1):  # Ignored: the channel's 5/s applies
+            if message.startswith('event:'):
+                received.append(time.monotonic())
+            if stop.is_set():
+                break
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    started = time.monotonic()
+    while time.monotonic() - started < 0.6:
+        channel.publish('activity', {'seq': 0})
+        channel.publish('alert', {'id': 'ALERT_1'})
+        channel.publish('status', {'active_cameras': 1})
+        time.sleep(0.02)
+    stop.set()
+    channel.publish('activity', {'seq': 1})
+    thread.join(3)
+
+    # Status, activity and alert batches are three messages: 0.6 s at 5/s leaves room for two batches
+    assert len([t for t in received if t - started < 0.6]) <= 6
+
+
+def test_resume_from_cursor():
+    channel = EventChannel(capacity=5, max_rate=0)
+    channel.publish('activity', {'seq': 0})
+    resume_at = channel.events.cursor
+    channel.publish('activity', {'seq': 1})
+    channel.publish('activity', {'seq': 2})
+
+    stream = channel.stream(cursor=resume_at)
+    next(stream)
+    event, cursor, data = _parse(next(stream))
+    assert event == 'activity' and [a['seq'] for a in data] == [1, 2] and cursor == 3
+    stream.close()
+
+    # Missed events already overwritten: the client starts over from a snapshot
+    for i in range(3, 10):
+        channel.publish('activity', {'seq': i})
+    stream = channel.stream(cursor=resume_at)
+    next(stream)
+    event, cursor, _ = _parse(next(stream))
+    assert event == 'snapshot' and cursor == channel.events.cursor
+    stream.close()
+
+
+if __name__ == "__main__":
+    test_status_delta_roundtrip()
+    test_snapshot_then_coalesced_updates()
+    test_rate_limit_per_client()
+    test_every_message_counts_and_rate_cannot_be_raised()
+    test_resume_from_cursor()
+    print("✅ Event channel tests passed")
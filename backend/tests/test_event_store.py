@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test Event Store
+Checks ring buffer eviction, time windows, cursors and index filters against plain list scans
+"""
+
+import sys
+import random
+sys.path.append('.')
+
+from surveillance.event_store import EventStore
+
+
+def _fill(store, count, seed=0):
+    """Append random events, returning the reference list of (seq, time, camera, type)"""
+    rng = random.Random(seed)
+    reference = []
+    timestamp = 0.0
+    for _ in range(count):
+        timestamp += rng.choice([0.0, 0.5, 1.0])  # duplicates on purpose
+        camera = rng.choice(['cam1', 'cam2', 'cam3'])
+        kind = rng.choice(['loitering', 'running', 'intruder'])
+        event = {'time': timestamp, 'camera': camera, 'type': kind}
+        seq = store.append(event, timestamp, camera=camera, type=kind)
+        reference.append((seq, event))
+    return reference
+
+
+def test_eviction_keeps_newest():
+    store = EventStore(capacity=5)
+    for i in range(12):
+        assert store.append(i, float(i)) == i
+
+    assert len(store) == 5
+    assert list(store) == [7, 8, 9, 10, 11]
+    assert store.latest(2) == [10, 11]
+    assert store.cursor == 12
+
+
+def test_window_matches_linear_scan():
+    store = EventStore(capacity=100, index_fields=('camera', 'type'))
+    reference = [event for _, event in _fill(store, 350)][-100:]
+
+    for start, end in [(None, None), (150.0, None), (150.0, 160.0), (None, 120.0), (1000.0, None)]:
+        for filters in [{}, {'camera': 'cam2'}, {'camera': 'cam1', 'type': 'running'}]:
+            expected = [e for e in reference
+                        if (start is None or e['time'] > start)
+                        and (end is None or e['time'] <= end)
+                        and all(e[field] == value for field, value in filters.items())]
+            assert store.window(start, end, **filters) == expected
+            assert store.window(start, end, limit=3, **filters) == expected[-3:]
+
+
+def test_since_cursor():
+    store = EventStore(capacity=50, index_fields=('camera', 'type'))
+    _fill(store, 30, seed=1)
+
+    events, cursor = store.since(0)
+    assert len(events) == 30 and cursor == 30
+
+    # Nothing new yet
+    assert store.since(cursor) == ([], cursor)
+
+    new = _fill(store, 5, seed=2)
+    events, next_cursor = store.since(cursor, camera='cam1')
+    assert events == [e for _, e in new if e['camera'] == 'cam1']
+    assert next_cursor == 35
+
+    # A cursor older than the ring only returns what is still stored
+    _fill(store, 100, seed=3)
+    events, _ = store.since(cursor)
+    assert len(events) == 50
+
+
+def test_out_of_order_timestamps_are_clamped():
+    store = EventStore(capacity=10)
+    for timestamp in [1.0, 5.0, 3.0, 6.0]:
+        store.append(timestamp, timestamp)
+
+    # 3.0 arrived after 5.0 and is indexed at 5.0
+    assert store.window(start=4.0) == [5.0, 3.0, 6.0]
+    assert store.window(end=4.0) == [1.0]
+
+
+def test_unknown_index_field():
+    store = EventStore(capacity=10, index_fields=('camera',))
+    try:
+        store.append('event', 0.0, zone='A')
+    except KeyError:
+        return
+    raise AssertionError("unknown index field should be rejected")
+
+
+if __name__ == "__main__":
+    test_eviction_keeps_newest()
+    test_window_matches_linear_scan()
+    test_since_cursor()
+    test_out_of_order_timestamps_are_clamped()
+    test_unknown_index_field()
+    print("✅ Event store tests passed")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test Frame Broadcast
+Checks that live view frames are encoded once per tier for all viewers,
+that unchanged frames are not re-sent, that viewers are counted and that
+overlays are only rendered on demand, once per frame version, and that
+the metadata stream lines up with the video frames
+"""
+
+import sys
+import json
+import threading
+import time
+import numpy as np
+sys.path.append('.')
+
+from app.services.frame_broadcast import BroadcastHub, FrameBroadcaster, MJPEG_BOUNDARY
+
+
+def _frame(value=0):
+    frame = np.random.randint(0, 255, (720, 1280, 3), dtype=np.uint8)
+    frame[0, 0] = value
+    return frame
+
+
+def test_encode_once_per_tier():
+    broadcaster = FrameBroadcaster('cam1')
+    broadcaster.publish(_frame())
+
+    results = [broadcaster.wait_for_frame('medium', 0) for _ in range(5)]
+    assert all(r is results[0] for r in results)  # same bytes object for every viewer
+    assert broadcaster.encodes == 1
+
+    low = broadcaster.wait_for_frame('low', 0)
+    assert low[0] == 1 and len(low[1]) < len(results[0][1])
+    assert broadcaster.encodes == 2
+
+    # Nothing new: a viewer that already has version 1 times out instead of getting it again
+    assert broadcaster.wait_for_frame('medium', 1, timeout=0.05) is None
+
+    broadcaster.publish(_frame())
+    version, _ = broadcaster.wait_for_frame('medium', 1)
+    assert version == 2 and broadcaster.encodes == 3
+
+
+def test_streams_share_frames_and_count_viewers():
+    hub = BroadcastHub()
+    broadcaster = hub.get('cam1')
+    received = [[] for _ in range(3)]
+
+    def viewer(parts):
+        for part in broadcaster.stream('medium', max_fps=0):
+            assert part.startswith(MJPEG_BOUNDARY)
+            assert b'X-Frame-Version: %d' % (len(parts) + 1) in part
+            parts.append(part)
+            if len(parts) == 3:
+                break
+
+    threads = [threading.Thread(target=viewer, args=(parts,)) for parts in received]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.monotonic() + 2
+    while hub.viewers('cam1') < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hub.viewers('cam1') == 3
+
+    for i in range(3):
+        broadcaster.publish(_frame(i))
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join(2)
+
+    assert all(len(parts) == 3 for parts in received)
+    assert broadcaster.encodes == 3  # one per frame, not one per viewer per frame
+    assert hub.viewers('cam1') == 0
+
+
+def test_overlays_rendered_only_on_demand():
+    calls = []
+
+    def render(frame, max_width):
+        calls.append(max_width)
+        return frame[:, :max_width] if max_width else frame
+
+    broadcaster = FrameBroadcaster('cam1')
+    for i in range(10):
+        broadcaster.publish(_frame(i), render)  # headless: nobody asks, nothing is drawn
+    assert calls == [] and broadcaster.renders == 0
+
+    broadcaster.wait_for_frame('medium', 0)
+    broadcaster.wait_for_frame('medium', 0)
+    assert calls == [640]  # at the tier's output width, memoized for the version
+
+    version, image = broadcaster.rendered(640)
+    assert version == 10 and image.shape[1] == 640 and calls == [640]
+
+    broadcaster.rendered(0)  # full resolution snapshot
+    broadcaster.publish(_frame(), render)
+    broadcaster.rendered(640)
+    assert calls == [640, 0, 640]
+
+
+def test_metadata_stream_matches_frames():
+    described = []
+
+    def describe():
+        described.append(1)
+        return {'detections': [{'cls': 'person', 'conf': 0.9, 'box': [1, 2, 3, 4]}]}
+
+    broadcaster = FrameBroadcaster('cam1')
+    events = broadcaster.metadata_stream()
+    assert next(events).startswith('retry:')
+
+    broadcaster.publish(_frame(), describe=describe, timestamp=1000.5)
+    event = next(events)
+    assert event.startswith('event: frame\nid: 1\ndata: ')
+    data = json.loads(event.split('data: ', 1)[1])
+    assert data == {'v': 1, 'ts': 1000.5, 'camera': 'cam1',
+                    'detections': [{'cls': 'person', 'conf': 0.9, 'box': [1, 2, 3, 4]}]}
+    assert broadcaster.metadata() == broadcaster.metadata() and described == [1]
+    assert broadcaster.viewers == 1
+
+    # Plain video for client-side overlays never calls the renderer
+    broadcaster.publish(_frame(), render=lambda frame, width: 1 / 0, describe=describe)
+    version, jpeg = broadcaster.wait_for_frame('medium', 1, overlay=False)
+    assert version == 2 and jpeg[:2] == b'\xff\xd8'
+    assert '"v":2' in next(events)
+
+    broadcaster.close()
+    assert list(events) == [] and broadcaster.viewers == 0
+
+
+def test_remove_ends_streams():
+    hub = BroadcastHub()
+    stream = hub.get('cam1').stream()
+    hub.get('cam1').publish(_frame())
+    next(stream)
+
+    hub.remove('cam1')
+    assert list(stream) == []
+    assert hub.viewers('cam1') == 0
+
+
+if __name__ == "__main__":
+    test_encode_once_per_tier()
+    test_streams_share_frames_and_count_viewers()
+    test_overlays_rendered_only_on_demand()
+    test_metadata_stream_matches_frames()
+    test_remove_ends_streams()
+    print("✅ Frame broadcast tests passed")
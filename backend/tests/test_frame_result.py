@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test Frame Result
+Checks that the compact per-frame AI result keeps detections in arrays,
+stores subsets as indexes, and still answers the legacy dict-style reads
+"""
+
+import sys
+import numpy as np
+sys.path.append('.')
+
+from surveillance.frame_result import FrameResult
+
+
+def _detections():
+    return [
+        {'bbox': [10, 20, 110, 220], 'confidence': 0.91, 'class_id': 0, 'class_name': 'person',
+         'is_security_relevant': True, 'threat_level': 'low'},
+        {'bbox': [300, 40, 360, 120], 'confidence': 0.55, 'class_id': 24, 'class_name': 'backpack',
+         'is_security_relevant': True, 'threat_level': 'low'},
+        {'bbox': [400, 50, 500, 260], 'confidence': 0.77, 'class_id': 0, 'class_name': 'person',
+         'is_security_relevant': True, 'threat_level': 'low'},
+    ]
+
+
+def test_columns_and_subsets():
+    detections = _detections()
+    persons = [detections[0], detections[2]]
+    activity = {'type': 'loitering', 'description': 'Loitering', 'severity': 'medium', 'bbox': None}
+    result = FrameResult.from_detections(detections, persons=persons, bags=[detections[1]],
+                                         activities=[activity], tracks=[{'id': 1, 'box': [10, 20, 110, 220]}],
+                                         timestamp=12.5)
+
+    assert result.boxes.dtype == np.int32 and result.boxes.shape == (3, 4)
+    assert result.class_ids.tolist() == [0, 24, 0] and result.class_names[1] == 'backpack'
+    assert result.person_indexes.tolist() == [0, 2] and result.bag_indexes.tolist() == [1]
+    assert result.detection_count == 3 and result.person_count == 2
+    assert result.activities == (activity,) and result.timestamp == 12.5
+    assert not hasattr(result, '__dict__')  # __slots__ only
+
+
+def test_legacy_dict_reads():
+    detections = _detections()
+    result = FrameResult.from_detections(detections, persons=[detections[2]])
+
+    rebuilt = result['detections']
+    assert [d['bbox'] for d in rebuilt] == [d['bbox'] for d in detections]
+    assert rebuilt[1]['class_name'] == 'backpack' and abs(rebuilt[1]['confidence'] - 0.55) < 1e-6
+    assert result['persons'][0]['bbox'] == [400, 50, 500, 260]
+    assert result.get('weapons', None) == [] and result.get('original_frame') is None
+    assert 'detections' in result and 'annotated_frame' not in result
+    assert set(result.to_dict()) == set(FrameResult.FIELDS)
+
+
+def test_empty_result():
+    result = FrameResult.from_detections([], activities=[{'type': 'x', 'description': '', 'severity': 'low'}])
+    assert result.detection_count == 0 and result.person_count == 0
+    assert result['detections'] == [] and len(result.activities) == 1
+
+
+if __name__ == "__main__":
+    test_columns_and_subsets()
+    test_legacy_dict_reads()
+    test_empty_result()
+    print("✅ Frame result tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test HLS Output
+Checks the FFmpeg command (fMP4 segments, sliding playlist, one keyframe per
+segment), the file names served, and - when FFmpeg is installed - that a
+camera is encoded by one FFmpeg process however many requests it gets and
+that its files are removed when it stops
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+sys.path.append('.')
+
+from app.services.frame_broadcast import BroadcastHub
+from app.services.hls_output import (HLSHub, HLSProfile, HLS_AVAILABLE, FFMPEG_PATH,
+                                     ffmpeg_command, is_hls_file)
+
+PROFILE = HLSProfile(max_width=320, fps=10, bitrate_kbps=200, segment_seconds=1, playlist_size=3)
+
+
+def test_ffmpeg_command():
+    command = ffmpeg_command('ffmpeg', (320, 181), PROFILE, '/tmp/hls/cam1')
+    args = dict(zip(command, command[1:]))
+
+    assert args['-s'] == '320x181' and command[command.index('-pix_fmt') + 1] == 'bgr24'  # Raw input
+    assert args['-c:v'] == 'libx264' and args['-hls_segment_type'] == 'fmp4'
+    assert args['-g'] == args['-keyint_min'] == '10'  # One keyframe per 1 s segment at 10 fps
+    assert args['-hls_list_size'] == '3' and 'delete_segments' in args['-hls_flags']
+    assert command[-1] == os.path.join('/tmp/hls/cam1', 'index.m3u8')
+
+
+def test_served_file_names():
+    assert is_hls_file('index.m3u8') and is_hls_file('init.mp4') and is_hls_file('segment_000012.m4s')
+    assert not is_hls_file('../index.m3u8')
+    assert not is_hls_file('segment_1.m4s.tmp')
+    assert not is_hls_file('other.mp4')
+
+
+def test_without_ffmpeg_nothing_starts():
+    hub = HLSHub(BroadcastHub(), tempfile.mkdtemp(), PROFILE, ffmpeg=None)
+    stream = hub.get('cam1')
+    stream.touch()
+    assert not hub.available and stream.get_stats()['running'] is False
+    shutil.rmtree(hub.root_dir)
+
+
+def test_live_segments():
+    if not HLS_AVAILABLE:
+        import pytest
+        pytest.skip("FFmpeg not installed - skipping HLS encoding test")
+
+    frames = BroadcastHub()
+    root = tempfile.mkdtemp()
+    hub = HLSHub(frames, root, PROFILE, ffmpeg=FFMPEG_PATH, idle_timeout=10)
+    running = threading.Event()
+    running.set()
+
+    def camera():
+        while running.is_set():
+            frames.get('cam 1').publish(np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8))
+            time.sleep(0.1)
+
+    threading.Thread(target=camera, daemon=True).start()
+    stream = hub.get('cam 1')
+    try:
+        deadline = time.monotonic() + 20
+        while stream.get_stats()['segments'] < 2 and time.monotonic() < deadline:
+            for _ in range(5):  # Several viewers polling the playlist
+                stream.touch()
+            time.sleep(0.2)
+
+        stats = stream.get_stats()
+        assert stats['segments'] >= 2 and stream.ready, stats
+        assert stats['processes_started'] == 1
+        assert os.path.basename(stream.output_dir) == 'cam_1'
+        with open(stream.playlist_path) as f:
+            playlist = f.read()
+        assert '#EXT-X-MAP:URI="init.mp4"' in playlist and 'segment_' in playlist
+    finally:
+        running.clear()
+        hub.remove('cam 1')
+
+    assert not os.path.exists(stream.output_dir)
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    test_ffmpeg_command()
+    test_served_file_names()
+    test_without_ffmpeg_nothing_starts()
+    if HLS_AVAILABLE:
+        test_live_segments()
+    else:
+        print("⚠️ FFmpeg not installed, HLS encoding test skipped")
+    print("✅ HLS output tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Logging Setup
+Checks per-key rate limiting, sampling, per-module levels and JSON-lines output
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import tempfile
+sys.path.append('.')
+
+from app.utils.logging_setup import HotPathFilter, configure_logging, parse_module_levels
+
+
+def _record(msg, args=(), **extra):
+    record = logging.LogRecord('multi_camera', logging.INFO, __file__, 0, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_rate_limit_per_key():
+    hot_path_filter = HotPathFilter(interval=0.05, burst=2)
+
+    # Same template counts as one key regardless of arguments
+    passed = [hot_path_filter.filter(_record("Faces: %d", (i,))) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Other templates and explicit keys have their own budget
+    assert hot_path_filter.filter(_record("Tracks: %d", (1,)))
+    assert hot_path_filter.filter(_record("Faces: %d", (1,), rate_key='cam2'))
+
+    # Next window reports how many records were dropped
+    time.sleep(0.06)
+    record = _record("Faces: %d", (9,))
+    assert hot_path_filter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_decision_shared_between_handlers():
+    hot_path_filter = HotPathFilter(interval=60.0, burst=1)
+    record = _record("Alert")
+
+    # Second handler sees the stored decision instead of spending budget again
+    assert hot_path_filter.filter(record)
+    assert hot_path_filter.filter(record)
+    assert not hot_path_filter.filter(_record("Alert"))
+
+
+def test_warnings_are_never_dropped():
+    hot_path_filter = HotPathFilter(interval=60.0, burst=1)
+    alert = "🚨 CRITICAL ALERT [Camera_%s]: WEAPON DETECTED: %s"
+
+    for camera in ('cam1', 'cam2', 'cam3', 'cam3'):
+        record = _record(alert, (camera, 'knife'), sample_every=5)
+        record.levelno, record.levelname = logging.CRITICAL, 'CRITICAL'
+        assert hot_path_filter.filter(record)
+
+    assert hot_path_filter.filter(_record("Faces: %d", (1,)))
+    assert not hot_path_filter.filter(_record("Faces: %d", (2,)))
+
+
+def test_sampling():
+    hot_path_filter = HotPathFilter(burst=0)
+    passed = [hot_path_filter.filter(_record("Frame %d", (i,), sample_every=3)) for i in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+
+
+def test_parse_module_levels():
+    assert parse_module_levels("surveillance=warning, multi_camera=DEBUG") == {
+        'surveillance': logging.WARNING,
+        'multi_camera': logging.DEBUG
+    }
+    assert parse_module_levels("") == {}
+
+    for spec in ("surveillance", "surveillance=LOUD"):
+        try:
+            parse_module_levels(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec!r} should be rejected")
+
+
+def test_json_lines_file():
+    root = logging.getLogger()
+    old_level = root.level
+    module_logger = logging.getLogger('test_logging_setup.quiet')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, 'logs', 'surveillance.jsonl')
+        try:
+            configure_logging(level='INFO', module_levels='test_logging_setup.quiet=ERROR',
+                              log_file=log_file, console=False, rate_burst=0)
+
+            logging.getLogger('test_logging_setup').info("Faces: %d", 2, extra={'camera': 'cam1'})
+            module_logger.warning("dropped by module level")
+            assert not module_logger.isEnabledFor(logging.WARNING)
+        finally:
+            configure_logging(level=logging.getLevelName(old_level), module_levels='',
+                              log_file='', console=False)
+            module_logger.setLevel(logging.NOTSET)
+
+        with open(log_file, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+
+    assert len(entries) == 1
+    assert entries[0]['message'] == "Faces: 2"
+    assert entries[0]['level'] == 'INFO'
+    assert entries[0]['logger'] == 'test_logging_setup'
+    assert entries[0]['camera'] == 'cam1'
+    assert '_hot_path_allowed' not in entries[0]
+
+
+if __name__ == "__main__":
+    test_rate_limit_per_key()
+    test_decision_shared_between_handlers()
+    test_warnings_are_never_dropped()
+    test_sampling()
+    test_parse_module_levels()
+    test_json_lines_file()
+    print("✅ Logging setup tests passed")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test MJPEG Relay
+Checks multipart parsing, that all passthrough viewers share one upstream
+connection, that camera JPEGs are relayed byte for byte and that FPS
+throttling drops parts
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append('.')
+
+from app.services.mjpeg_relay import MJPEGRelay, MultipartJPEGParser
+
+JPEGS = [b'\xff\xd8' + bytes([i]) * (1000 + i) + b'\xff\xd9' for i in range(20)]
+
+
+def _multipart(parts, boundary=b'camboundary', content_length=True):
+    body = b''
+    for part in parts:
+        headers = b'Content-Type: image/jpeg\r\n'
+        if content_length:
+            headers += b'Content-Length: %d\r\n' % len(part)
+        body += b'--' + boundary + b'\r\n' + headers + b'\r\n' + part + b'\r\n'
+    return body
+
+
+class CameraHandler(BaseHTTPRequestHandler):
+    """Fake IP camera streaming JPEGS at `fps`, then holding the connection open"""
+    connections = 0
+    fps = 50
+
+    def do_GET(self):
+        CameraHandler.connections += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=camboundary')
+        self.end_headers()
+        try:
+            for part in JPEGS:
+                self.wfile.write(_multipart([part]))
+                self.wfile.flush()
+                time.sleep(1 / self.fps)
+            time.sleep(1)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    CameraHandler.connections = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CameraHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/video'
+
+
+def test_parser_handles_split_chunks():
+    cases = [
+        ('multipart/x-mixed-replace; boundary=camboundary', _multipart(JPEGS[:5])),
+        ('multipart/x-mixed-replace;boundary="--camboundary"', _multipart(JPEGS[:5], content_length=False)),
+        ('image/jpeg', b''.join(JPEGS[:5]))  # no boundary: cut at JPEG markers
+    ]
+    for content_type, stream in cases:
+        parser = MultipartJPEGParser(content_type)
+        parts = []
+        for i in range(0, len(stream), 333):
+            parts.extend(parser.feed(stream[i:i + 333]))
+        if 'Length' not in stream.decode('latin-1') and 'boundary' in content_type:
+            parts.extend(parser.feed(b'--camboundary\r\n'))  # last part ends at the next boundary
+        assert parts == JPEGS[:5], content_type
+
+
+def test_viewers_share_one_upstream():
+    server, url = _serve()
+    relay = MJPEGRelay('cam1', url, idle_timeout=0.2)
+    received = [[] for _ in range(3)]
+
+    def viewer(parts):
+        for chunk in relay.stream():
+            parts.append(chunk.split(b'\r\n\r\n', 1)[1][:-2])
+            if len(parts) == 5:
+                break
+
+    try:
+        threads = [threading.Thread(target=viewer, args=(parts,)) for parts in received]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert CameraHandler.connections == 1
+        for parts in received:
+            assert len(parts) == 5 and all(part in JPEGS for part in parts)  # relayed byte for byte
+
+        deadline = time.monotonic() + 3
+        while relay.get_stats()['upstream_open'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not relay.get_stats()['upstream_open']  # closed once nobody watches
+    finally:
+        relay.close()
+        server.shutdown()
+
+
+def test_fps_throttle_drops_parts():
+    server, url = _serve()
+    relay = MJPEGRelay('cam1', url, idle_timeout=0.2)
+    try:
+        sent = []
+        start = time.monotonic()
+        for chunk in relay.stream(max_fps=5):
+            sent.append(time.monotonic())
+            if len(sent) == 3:
+                break
+        assert sent[-1] - sent[0] >= 0.35  # at most 5 per second while the camera sends 50
+        assert relay.parts_dropped > 0 and relay.parts_received > len(sent)
+        assert time.monotonic() - start < 3
+    finally:
+        relay.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_parser_handles_split_chunks()
+    test_viewers_share_one_upstream()
+    test_fps_throttle_drops_parts()
+    print("✅ MJPEG relay tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test Mosaic
+Checks the grid geometry, that a mosaic is composed and encoded once per
+tick however many viewers it has, that ticks without new camera frames are
+skipped, that cameras without frames get a placeholder tile and that
+settings are snapped to presets and idle streams dropped
+"""
+
+import sys
+import threading
+import time
+import numpy as np
+sys.path.append('.')
+
+from app.services.frame_broadcast import BroadcastHub
+from app.services.mosaic import MosaicHub, MosaicLayout, MosaicStream
+
+
+def _frame(width=1280, height=720):
+    return np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_layout_geometry():
+    layout = MosaicLayout(width=1280)
+    assert layout.grid(1) == (1, 1)
+    assert layout.grid(3) == (2, 2)
+    assert layout.grid(5) == (3, 2)
+
+    tile_w, tile_h, origins = layout.tiles(4)
+    assert (tile_w, tile_h) == (640, 360)
+    assert origins == [(0, 0), (640, 0), (0, 360), (640, 360)]
+
+    tile_w, _, origins = MosaicLayout(width=1200, columns=3).tiles(4)
+    assert tile_w == 400 and origins[3] == (0, 225)
+
+
+def test_compose_skips_unchanged_ticks():
+    hub = BroadcastHub()
+    mosaic = MosaicStream(hub, lambda: ['cam1', 'cam2'], MosaicLayout(width=640))
+    hub.get('cam1').publish(_frame())
+    hub.get('cam2').publish(_frame(640, 480))  # 4:3 camera is letterboxed in its 16:9 tile
+
+    canvas = mosaic.compose()
+    assert canvas.shape == (180, 640, 3)
+    assert mosaic.compose() is None  # Nothing new
+
+    hub.get('cam2').publish(_frame(640, 480))
+    assert mosaic.compose() is not None
+    assert mosaic.compositions == 2
+
+
+def test_missing_camera_gets_placeholder():
+    hub = BroadcastHub()
+    hub.get('cam1').publish(_frame())
+    mosaic = MosaicStream(hub, lambda: ['cam1', 'cam2'], MosaicLayout(width=640))
+
+    canvas = mosaic.compose()
+    assert canvas[:, 320:].any()  # "No signal" and the camera name are drawn
+    assert mosaic.compositions == 1
+
+
+def test_viewers_share_one_composition_per_tick():
+    hub = BroadcastHub()
+    mosaics = MosaicHub(hub, lambda: ['cam1', 'cam2'])
+    mosaic = mosaics.get(width=640, fps=20, overlay=False)
+    assert mosaics.get(width=640, fps=20, overlay=False) is mosaic
+
+    received = []
+
+    def viewer():
+        stream = mosaic.stream()
+        for _ in range(3):
+            received.append(next(stream))
+        stream.close()
+
+    viewers = [threading.Thread(target=viewer) for _ in range(4)]
+    for thread in viewers:
+        thread.start()
+
+    for _ in range(10):
+        hub.get('cam1').publish(_frame())
+        hub.get('cam2').publish(_frame())
+        time.sleep(0.06)
+    for thread in viewers:
+        thread.join(timeout=5)
+
+    assert len(received) == 12 and all(part.startswith(b'--frame') for part in received)
+    stats = mosaic.get_stats()
+    assert stats['compositions'] <= 20  # At most one per new camera frame, not per viewer
+    assert stats['encodes'] <= stats['compositions'] and stats['encodes'] < len(received)
+    assert stats['viewers']['mosaic'] == 0
+
+
+def test_settings_snap_to_presets_and_idle_streams_are_dropped():
+    hub = BroadcastHub()
+    hub.get('cam1').publish(_frame())
+    mosaics = MosaicHub(hub, lambda: ['cam1'])
+
+    mosaic = mosaics.get(width=1279, columns=-3, fps=4.7)
+    assert mosaics.get(width=1300, columns=0, fps=5) is mosaic
+    assert (mosaic.layout.width, mosaic.layout.columns, mosaic.fps) == (1280, 0, 5)
+    assert mosaics.get(width=10 ** 9, fps=-1).layout.width == 3840
+    assert len(mosaics.get_stats()) == 2
+
+    mosaic.idle_timeout = 0.05
+    stream = mosaic.stream()
+    assert next(stream).startswith(b'--frame')
+    stream.close()
+
+    deadline = time.monotonic() + 3
+    while mosaic.running and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert not mosaic.running and mosaic.broadcaster.rendered() is None  # Last canvas released
+    assert len(mosaics.get_stats()) == 1 and mosaics.get(width=1280) is not mosaic
+
+
+if __name__ == "__main__":
+    test_layout_geometry()
+    test_compose_skips_unchanged_ticks()
+    test_missing_camera_gets_placeholder()
+    test_viewers_share_one_composition_per_tick()
+    test_settings_snap_to_presets_and_idle_streams_are_dropped()
+    print("✅ Mosaic tests passed")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test Person Tracker
+Checks the vectorized IoU/distance cost matrix, optimal track assignment,
+the array-backed track state and tracking on downscaled frames
+"""
+
+import sys
+import numpy as np
+sys.path.append('.')
+
+from surveillance.tracker import PersonTracker, TrackState
+
+
+def _tracker_with_tracks(boxes, **kwargs):
+    """Create a tracker with fake active tracks at the given boxes"""
+    tracker = PersonTracker(**kwargs)
+    for track_id, box in enumerate(boxes, start=1):
+        tracker.active_tracks[track_id] = None
+        tracker.track_states[track_id] = TrackState(track_id, {'bbox': list(box), 'confidence': 1.0}, 0.0)
+    return tracker
+
+
+def test_iou_matrix_matches_scalar_iou():
+    """Vectorized IoU must agree with the per-pair implementation"""
+    rng = np.random.default_rng(1)
+    tracker = PersonTracker()
+    xy = rng.integers(0, 500, (30, 2))
+    wh = rng.integers(-5, 200, (30, 2))  # includes degenerate boxes
+    boxes = np.concatenate([xy, xy + wh], axis=1)
+    
+    matrix = tracker._calculate_iou_matrix(boxes[:15].astype(float), boxes[15:].astype(float))
+    for i in range(15):
+        for j in range(15):
+            expected = tracker._calculate_iou(boxes[i].tolist(), boxes[15 + j].tolist())
+            assert abs(matrix[i, j] - expected) < 1e-9
+
+
+def test_optimal_assignment_beats_greedy():
+    """Track order must not steal a detection from a better-matching track"""
+    # Track 1 prefers detection 0 but also matches detection 1;
+    # track 2 can only match detection 0
+    tracker = _tracker_with_tracks([[0, 0, 100, 100], [20, 0, 120, 100]])
+    detections = [
+        {'bbox': [5, 0, 105, 100], 'confidence': 0.9},
+        {'bbox': [-30, 0, 70, 100], 'confidence': 0.9},
+    ]
+    
+    matches = tracker._match_detections_to_tracks(detections)
+    assert matches == {1: 1, 2: 0}
+
+
+def test_iou_gate_and_distance_cost():
+    """Low-IoU pairs only match when distance matching is enabled"""
+    boxes = [[0, 0, 100, 200]]
+    detections = [{'bbox': [60, 0, 160, 200], 'confidence': 0.9}]  # IoU 0.25, 60px away
+    
+    iou_only = _tracker_with_tracks(boxes)
+    assert iou_only._match_detections_to_tracks(detections) == {}
+    
+    combined = _tracker_with_tracks(boxes, distance_weight=0.5)
+    assert combined._match_detections_to_tracks(detections) == {1: 0}
+
+
+def test_empty_inputs():
+    tracker = _tracker_with_tracks([[0, 0, 10, 10]])
+    assert tracker._match_detections_to_tracks([]) == {}
+    assert PersonTracker()._match_detections_to_tracks([{'bbox': [0, 0, 10, 10], 'confidence': 1.0}]) == {}
+
+
+def test_track_state_ring_buffer_wraps():
+    """History keeps the newest entries in order once the ring buffer wraps"""
+    state = TrackState(1, {'bbox': [0, 0, 10, 20], 'confidence': 0.9}, 0.0, history_size=5)
+    for i in range(1, 12):
+        state.push_position(float(i), (i, i + 1), [i, i, i + 10, i + 20])
+    
+    assert state.history_length == 5
+    assert state.history_timestamps.tolist() == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert state.history_centers[:, 0].tolist() == [7, 8, 9, 10, 11]
+    assert state.history_boxes[-1].tolist() == [11, 11, 21, 31]
+    assert not state.history_centers.flags.writeable
+
+
+def test_track_state_time_window():
+    """Entries older than the history window are dropped"""
+    state = TrackState(1, {'bbox': [0, 0, 10, 20], 'confidence': 0.9}, 0.0, history_window=10.0)
+    for t in (5.0, 11.0, 12.0):
+        state.push_position(t, (5, 10), [0, 0, 10, 20])
+    
+    assert state.history_timestamps.tolist() == [5.0, 11.0, 12.0]
+
+
+def test_track_state_dict_compatibility():
+    """Existing dict-style callers keep working"""
+    state = TrackState(7, {'bbox': [0, 0, 10, 20], 'confidence': 0.9}, 100.0)
+    state.push_position(100.5, (6, 11), [1, 1, 11, 21])
+    
+    assert state['track_id'] == 7
+    assert state['center'] == (5, 10)
+    assert 'position_history' in state
+    assert state['position_history'] == [
+        {'timestamp': 100.0, 'center': (5, 10), 'bbox': [0, 0, 10, 20]},
+        {'timestamp': 100.5, 'center': (6, 11), 'bbox': [1, 1, 11, 21]},
+    ]
+    
+    state.set_identity('farmer_Basava', 'authorized', 0.97)
+    state['note'] = 'extra field'
+    assert state.identity == 'farmer_Basava' and state['authorization_status'] == 'authorized'
+    assert state.get('note') == 'extra field'
+    assert state.get('missing', 'default') == 'default'
+    assert set(state.to_dict()) >= {'track_id', 'bbox', 'position_history', 'note'}
+
+
+def test_returned_tracks_reject_field_writes():
+    """update() returns live states: item writes must not change tracked fields"""
+    state = TrackState(3, {'bbox': [0, 0, 10, 20], 'confidence': 0.9}, 0.0)
+    for key, value in (('identity', 'someone'), ('bbox', [1, 2, 3, 4]), ('position_history', [])):
+        try:
+            state[key] = value
+            assert False, f"write to {key} was accepted"
+        except TypeError:
+            pass
+    assert state.identity == 'unknown' and state.bbox == [0, 0, 10, 20]
+
+
+class _RecordingTracker:
+    """Stand-in for an OpenCV tracker that moves its box 10px right per update"""
+    
+    def __init__(self):
+        self.frame_shapes = []
+        self.bbox = None
+    
+    def init(self, frame, bbox):
+        self.frame_shapes.append(frame.shape)
+        self.bbox = bbox
+        return True
+    
+    def update(self, frame):
+        self.frame_shapes.append(frame.shape)
+        x, y, w, h = self.bbox
+        self.bbox = (x + 10, y, w, h)
+        return True, self.bbox
+
+
+def test_tracking_scale_remaps_coordinates():
+    """Trackers run on the downscaled frame; tracks stay in original coordinates"""
+    tracker = PersonTracker(tracking_scale=0.5, min_track_length=1)
+    created = []
+    
+    def create_tracker():
+        created.append(_RecordingTracker())
+        return created[-1]
+    
+    tracker._create_tracker = create_tracker
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    
+    tracker.update(frame, [{'bbox': [400, 200, 600, 600], 'confidence': 0.9}])
+    assert created[0].bbox == (200, 100, 100, 200)
+    
+    tracks = tracker.update(frame, [])
+    state = tracks[1]
+    assert created[0].frame_shapes == [(540, 960, 3), (540, 960, 3)]
+    assert state.bbox == [420, 200, 620, 600]  # 10px at half scale = 20px in the original frame
+    assert state.center == (520, 400)
+    
+    # A caller-provided downscaled frame is used as-is
+    tracker.update(frame, [], tracking_frame=np.zeros((324, 576, 3), dtype=np.uint8))
+    assert created[0].frame_shapes[-1] == (324, 576, 3)
+    assert tracker.track_states[1].bbox[0] == int((210 + 10) / 0.3)
+
+
+if __name__ == "__main__":
+    test_iou_matrix_matches_scalar_iou()
+    test_optimal_assignment_beats_greedy()
+    test_iou_gate_and_distance_cost()
+    test_empty_inputs()
+    test_track_state_ring_buffer_wraps()
+    test_track_state_time_window()
+    test_track_state_dict_compatibility()
+    test_returned_tracks_reject_field_writes()
+    test_tracking_scale_remaps_coordinates()
+    print("✅ Person tracker tests passed")
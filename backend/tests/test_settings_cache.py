@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test Settings Cache
+Checks that settings and camera configs are loaded once, diffed on reload
+and pushed to subscribers as change events
+"""
+
+import sys
+import time
+sys.path.append('.')
+
+from app.services.settings_cache import SettingsCache
+
+
+class FakeDatabase:
+    """Settings and camera documents standing in for MongoDB"""
+
+    def __init__(self):
+        self.settings = {'camera': {'motionSensitivity': 75}, 'alerts': {'cooldownPeriod': 5}}
+        self.cameras = {'cam1': {'name': 'cam1', 'ai_mode': 'both', 'status': 'active'}}
+        self.available = True
+        self.reads = 0
+
+    def load_settings(self):
+        if not self.available:
+            raise ConnectionError("MongoDB not connected")
+        self.reads += 1
+        return {category: dict(values) for category, values in self.settings.items()}
+
+    def load_cameras(self):
+        if not self.available:
+            raise ConnectionError("MongoDB not connected")
+        return {name: dict(doc) for name, doc in self.cameras.items()}
+
+
+def _cache(db, **kwargs):
+    return SettingsCache(load_settings=db.load_settings, load_cameras=db.load_cameras,
+                         defaults=lambda: {'camera': {'motionSensitivity': 50}},
+                         use_change_streams=False, **kwargs)
+
+
+def test_reads_hit_the_database_once():
+    db = FakeDatabase()
+    cache = _cache(db)
+    for _ in range(100):
+        assert cache.get('camera')['motionSensitivity'] == 75
+        assert cache.camera('cam1')['ai_mode'] == 'both'
+    assert db.reads == 1
+    assert cache.camera('missing') is None
+
+
+def test_reload_publishes_changes():
+    db = FakeDatabase()
+    cache = _cache(db)
+    cache.get('camera')
+    events, alert_events = [], []
+    cache.subscribe(events.append)
+    unsubscribe = cache.subscribe(alert_events.append, kind='settings', key='alerts')
+
+    # Heartbeat fields do not count as config changes
+    db.cameras['cam1']['status'] = 'offline'
+    assert cache.reload()
+    assert events == [] and cache.version == 0
+
+    db.cameras['cam1']['ai_mode'] = 'yolov9'
+    db.settings['alerts']['cooldownPeriod'] = 1
+    db.cameras['cam2'] = {'name': 'cam2', 'ai_mode': 'both'}
+    cache.reload()
+
+    changes = {(e.kind, e.key): e for e in events}
+    assert set(changes) == {('camera', 'cam1'), ('camera', 'cam2'), ('settings', 'alerts')}
+    assert changes[('camera', 'cam1')].changed_fields == {'ai_mode'}
+    assert changes[('camera', 'cam2')].old is None
+    assert cache.version == 3 and cache.camera('cam1')['ai_mode'] == 'yolov9'
+    assert [e.new['cooldownPeriod'] for e in alert_events] == [1]
+
+    unsubscribe()
+    db.settings['alerts']['cooldownPeriod'] = 2
+    cache.reload()
+    assert len(alert_events) == 1 and cache.get('alerts')['cooldownPeriod'] == 2
+
+
+def test_defaults_until_database_is_available():
+    db = FakeDatabase()
+    db.available = False
+    cache = _cache(db)
+    assert cache.get('camera')['motionSensitivity'] == 50
+    assert not cache.reload() and cache.reload_errors == 2
+
+    db.available = True
+    assert cache.reload()
+    assert cache.get('camera')['motionSensitivity'] == 75
+
+
+def test_polling_fallback():
+    db = FakeDatabase()
+    cache = _cache(db, poll_interval=0.05)
+    events = []
+    cache.subscribe(events.append, kind='settings', key='camera')
+    cache.start()
+    try:
+        db.settings['camera']['motionSensitivity'] = 30
+        deadline = time.monotonic() + 2
+        while not events and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        cache.stop()
+
+    assert cache.change_source == 'polling'
+    assert len(events) == 1 and events[0].new['motionSensitivity'] == 30
+
+
+if __name__ == "__main__":
+    test_reads_hit_the_database_once()
+    test_reload_publishes_changes()
+    test_defaults_until_database_is_available()
+    test_polling_fallback()
+    print("✅ Settings cache tests passed")
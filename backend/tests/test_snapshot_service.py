@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test Snapshot Service
+Checks that snapshots are encoded off the caller's thread, written once per
+profile, that email attachments reuse the cached bytes and that the queue
+of pending snapshots is bounded
+"""
+
+import sys
+import os
+import base64
+import tempfile
+import threading
+import cv2
+import numpy as np
+sys.path.append('.')
+
+from app.services.snapshot_service import SnapshotService, SnapshotProfile
+from app.services import email_service as email_module
+
+
+def _frame(width=1920, height=1080):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (100, 100), (600, 500), (0, 0, 255), -1)
+    return frame
+
+
+def test_profiles_and_archive_file():
+    service = SnapshotService(profiles={
+        SnapshotService.ARCHIVE: SnapshotProfile(max_width=0, quality=95),
+        'email': SnapshotProfile(max_width=640, quality=70)
+    })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'snapshots', 'intruder_cam1.jpg')
+        assert service.save(_frame(), path) == path
+        assert service.is_known(path)
+
+        email_bytes = service.get_encoded(path, 'email')
+        email_image = cv2.imdecode(np.frombuffer(email_bytes, np.uint8), cv2.IMREAD_COLOR)
+        assert email_image.shape[:2] == (360, 640)
+
+        archive_image = cv2.imread(path)
+        assert archive_image.shape[:2] == (1080, 1920)
+
+        # Archive bytes go to disk only
+        assert service.get_encoded(path, SnapshotService.ARCHIVE) is None
+
+    service.shutdown()
+
+
+def test_pending_snapshots_are_bounded():
+    service = SnapshotService(max_workers=1, max_pending=2)
+    release = threading.Event()
+    service._executor.submit(release.wait)  # Worker busy: queued snapshots wait
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f'crowd{i}.jpg') for i in range(4)]
+        for path in paths:
+            service.save(_frame(320, 240), path)
+
+        stats = service.get_stats()
+        assert stats['pending'] == 2 and stats['synchronous'] == 2
+        assert os.path.exists(paths[2]) and os.path.exists(paths[3])  # Encoded by save() itself
+        assert not os.path.exists(paths[0])
+
+        release.set()
+        service.shutdown()
+        assert all(os.path.exists(path) for path in paths) and service.get_stats()['pending'] == 0
+
+
+def test_cache_is_bounded():
+    service = SnapshotService(max_workers=1, cache_size=2)  # one worker: snapshots finish in order
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f'snap{i}.jpg') for i in range(3)]
+        for path in paths:
+            service.save(_frame(320, 240), path)
+        service.shutdown()
+
+        assert service.get_encoded(paths[0]) is None  # evicted
+        assert service.get_encoded(paths[2]) is not None
+        assert all(os.path.exists(path) for path in paths)
+
+
+def test_email_attachment_uses_cached_bytes():
+    service = SnapshotService()
+    original_service = email_module.snapshot_service
+    email_module.snapshot_service = service
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'weapon_cam1.jpg')
+            service.save(_frame(), path)
+            expected = service.get_encoded(path, 'email')
+            os.remove(path)  # attachment must not need the file
+
+            class Message:
+                attachment = None
+
+            message = Message()
+            email_module.EmailAlertService()._add_image_attachment(message, path)
+
+            assert message.attachment is not None
+            assert base64.b64decode(message.attachment.file_content.get()) == expected
+    finally:
+        email_module.snapshot_service = original_service
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    test_profiles_and_archive_file()
+    test_pending_snapshots_are_bounded()
+    test_cache_is_bounded()
+    test_email_attachment_uses_cached_bytes()
+    print("✅ Snapshot service tests passed")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test Stream Pacing
+Checks that slow clients step down the tier/frame rate ladder, that clients
+with headroom step back up to their ceiling, and that adaptive streams skip
+stale frames instead of queueing them and report per-client stats
+"""
+
+import sys
+import threading
+import time
+import numpy as np
+sys.path.append('.')
+
+from app.services.frame_broadcast import BroadcastHub
+from app.services.stream_pacing import ClientPacer, PACING_LADDER
+
+
+def test_slow_client_steps_down():
+    pacer = ClientPacer('cam1', start=1)
+    assert (pacer.tier, pacer.fps) == ('medium', 20)
+
+    # 60 ms per frame at 20 fps (50 ms interval): the client cannot keep up
+    changes = [pacer.record(0.06, 30000) for _ in range(3)]
+    assert changes == [False, False, True]
+    assert (pacer.tier, pacer.fps) == ('medium', 10) and pacer.step_downs == 1
+
+    # Still 60% of a 100 ms interval: stays put
+    assert not any(pacer.record(0.06, 30000) for _ in range(10))
+
+    # Much slower: keeps stepping down to the bottom of the ladder, no further
+    for _ in range(50):
+        pacer.record(1.0, 30000)
+    assert pacer.level == len(PACING_LADDER) - 1 and (pacer.tier, pacer.fps) == ('low', 2)
+
+
+def test_fast_client_steps_up_to_ceiling():
+    pacer = ClientPacer.for_quality('cam1', 'medium', step_up_after=0)
+    assert (pacer.tier, pacer.fps, pacer.ceiling) == ('medium', 20, 1)
+    for _ in range(6):
+        pacer.record(1.0, 30000)
+    assert pacer.level > pacer.ceiling
+
+    for _ in range(100):
+        pacer.record(0.001, 30000)
+    assert pacer.level == pacer.ceiling and pacer.step_ups == pacer.step_downs  # Never above 'medium'
+
+    auto = ClientPacer.for_quality('cam1', 'auto', step_up_after=0)
+    for _ in range(10):
+        auto.record(0.001, 30000)
+    assert auto.tier == 'high'
+
+
+def test_step_up_waits_for_sustained_headroom():
+    pacer = ClientPacer('cam1', start=2, step_up_after=0.2)
+    for _ in range(5):
+        pacer.record(0.001, 1000)
+    assert pacer.level == 2  # Headroom not sustained long enough yet
+    time.sleep(0.25)
+    assert pacer.record(0.001, 1000) and pacer.level == 1
+
+
+def test_adaptive_stream_skips_stale_frames():
+    hub = BroadcastHub()
+    broadcaster = hub.get('cam1')
+    running = threading.Event()
+    running.set()
+
+    def camera():
+        while running.is_set():
+            broadcaster.publish(np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8))
+            time.sleep(0.01)
+
+    threading.Thread(target=camera, daemon=True).start()
+    pacer = ClientPacer('cam1', start=1, client='10.0.0.7')
+    stream = broadcaster.adaptive_stream(pacer)
+    try:
+        for _ in range(6):
+            next(stream)
+            time.sleep(0.1)  # Slow client: 100 ms to take each frame
+        assert pacer.step_downs >= 1 and pacer.frames_skipped > 0
+        assert broadcaster.get_stats()['viewers'][pacer.tier] == 1
+
+        clients = hub.clients()
+        assert len(clients) == 1 and clients[0]['client'] == '10.0.0.7' and clients[0]['tier'] == pacer.tier
+    finally:
+        running.clear()
+        stream.close()
+
+    assert hub.clients() == [] and broadcaster.viewers == 0
+
+
+if __name__ == "__main__":
+    test_slow_client_steps_down()
+    test_fast_client_steps_up_to_ceiling()
+    test_step_up_waits_for_sustained_headroom()
+    test_adaptive_stream_skips_stale_frames()
+    print("✅ Stream pacing tests passed")